@@ -42,6 +42,13 @@ def get_finding_masterk():
             'type': 'string',
             'required': True,
             'description': 'ID of the project to get findings for'
+        },
+        {
+            'name': 'cursor',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Keyset pagination: empty for the first page, then the next_cursor of the previous page. Replaces page.'
         }
     ],
     'responses': {
@@ -177,6 +184,63 @@ def get_finding_master_counts(project_id):
     return finding_master_controller.get_finding_master_counts(project_id)
 
 
+@finding_master_blueprint.route('/crscan/finding_master/export/<project_id>', methods=['GET'])
+@swag_from({
+    'tags': ['Findings'],
+    'summary': 'Export all findings of a project',
+    'description': 'Streams every finding of a project with its target, scan type, fix recommendation and extended details as NDJSON or CSV, gzip encoded when the client accepts it',
+    'produces': ['application/x-ndjson', 'text/csv'],
+    'parameters': [
+        {
+            'name': 'Authorization',
+            'in': 'header',
+            'type': 'string',
+            'required': True,
+            'description': 'Bearer token for authentication'
+        },
+        {
+            'name': 'project_id',
+            'in': 'path',
+            'type': 'string',
+            'required': True,
+            'description': 'ID of the project to export findings for'
+        },
+        {
+            'name': 'format',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'enum': ['ndjson', 'csv'],
+            'default': 'ndjson',
+            'description': 'One JSON finding per line, or one CSV row per finding with the details flattened'
+        },
+        {
+            'name': 'severity',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Same filters as the project findings listing: severity, status, targetType and scanTypeIds'
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Findings export stream'
+        },
+        400: {
+            'description': 'Bad request - Unknown export format',
+            'schema': error_response
+        },
+        401: {
+            'description': 'Unauthorized - Invalid or missing JWT token',
+            'schema': error_response
+        }
+    },
+    'security': [{'Bearer': []}]
+})
+def export_finding_master(project_id):
+    return finding_master_controller.export_by_project_id(project_id)
+
+
 @finding_master_blueprint.route('/crscan/finding_master/<finding_id>/extended_details', methods=['GET'])
 def get_extended_finding_details(finding_id):
     return finding_master_controller.get_extended_finding_details(finding_id)
@@ -89,3 +89,31 @@ def get_raw_scan_output():
     if 'raw_scan_output_id' in request.args:
         fields['_id'] = request.args['raw_scan_output_id']
     return raw_scan_output_controller.fetch_all(request, fields)
+
+
+@raw_scan_output_blueprint.route('/cs/rawscanoutput/<raw_scan_output_id>/output', methods=['GET'])
+@swag_from({
+    'tags': ['Raw Scan Output'],
+    'summary': 'Download raw scan output',
+    'description': 'Stream the raw, uncompressed report of a scanner run',
+    'parameters': [
+        {
+            'name': 'raw_scan_output_id',
+            'in': 'path',
+            'type': 'string',
+            'required': True,
+            'description': 'ID of the raw scan output'
+        }
+    ],
+    'responses': {
+        '200': {
+            'description': 'Raw scanner report'
+        },
+        '404': {
+            'description': 'Raw scan output not found',
+            'schema': error_response
+        }
+    }
+})
+def get_raw_scan_output_content(raw_scan_output_id):
+    return raw_scan_output_controller.fetch_output(raw_scan_output_id)
@@ -34,6 +34,60 @@ repoScanResultsController = RepoScanResultsController()
             'type': 'string',
             'required': False,
             'description': 'Filter by specific license type (e.g., MIT, Apache, GPL)'
+        },
+        {
+            'name': 'page',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'default': 1,
+            'description': 'Page of the license findings, the statistics always cover all of them'
+        },
+        {
+            'name': 'limit',
+            'in': 'query',
+            'type': 'integer',
+            'required': False,
+            'default': 10,
+            'description': 'Number of license findings per page'
+        },
+        {
+            'name': 'pkg_name',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Comma separated package names the page is filtered on, NOASSERTION for none'
+        },
+        {
+            'name': 'name',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Comma separated license names the page is filtered on, NOASSERTION for none'
+        },
+        {
+            'name': 'severity',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Comma separated severities the page is filtered on'
+        },
+        {
+            'name': 'sort_by',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['pkg_name', 'name', 'severity', 'created'],
+            'required': False,
+            'description': 'Field the page is sorted on, newest first by default'
+        },
+        {
+            'name': 'sort_order',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['asc', 'desc'],
+            'required': False,
+            'default': 'desc',
+            'description': 'Sort direction of sort_by'
         }
     ],
     'responses': {
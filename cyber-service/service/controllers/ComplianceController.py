@@ -5,6 +5,7 @@ from entities.CyberServiceEntity import DomainWapiti1, Compliance
 from typing import List
 import uuid, json
 from datetime import datetime, timezone
+from .utility.compliance.compliance_summary import read_compliance_summary, invalidate_compliance_summaries
 
 class ComplianceController():
     """
@@ -146,149 +147,13 @@ class ComplianceController():
     def fetch_compliance_summary(self, project_id) -> dict:
         """
         Fetch compliance summary grouped by compliance_type for a given project_id.
+        Served from the snapshot refreshed when a scan completes or a manual
+        evaluation changes.
         """
         verify_jwt_in_request()
 
         try:
-            pipeline = [
-                {
-                    "$lookup": {
-                        "from": "ComplianceScannerMapping",
-                        "localField": "_id",
-                        "foreignField": "compliance_id",
-                        "as": "compliance_scanner_mapping"
-                    }
-                },
-                {
-                    "$unwind": {
-                        "path": "$compliance_scanner_mapping",
-                        "preserveNullAndEmptyArrays": True
-                    }
-                },
-                {
-                    "$lookup": {
-                        "from": "ScannerTypes",
-                        "localField": "compliance_scanner_mapping.scanner_type_id",
-                        "foreignField": "_id",
-                        "as": "scanner_types"
-                    }
-                },
-                {
-                    "$lookup": {
-                        "from": "FindingMaster",
-                        "let": {
-                            "scanner_types_ids": "$scanner_types._id",
-                            "project_id": project_id
-                        },
-                        "pipeline": [
-                            {
-                                "$match": {
-                                    "$expr": {
-                                        "$and": [
-                                            {"$in": ["$scan_type_id", "$$scanner_types_ids"]},
-                                            {"$eq": ["$project_id", "$$project_id"]}
-                                        ]
-                                    }
-                                }
-                            }
-                        ],
-                        "as": "matched_findings"
-                    }
-                },
-                {
-                    "$lookup": {
-                        "from": "ManualComplianceEvaluation",
-                        "let": {
-                            "compliance_id": "$_id",
-                            "project_id": project_id
-                        },
-                        "pipeline": [
-                            {
-                                "$match": {
-                                    "$expr": {
-                                        "$and": [
-                                            {"$eq": ["$compliance_id", "$$compliance_id"]},
-                                            {"$eq": ["$project_id", "$$project_id"]}
-                                        ]
-                                    }
-                                }
-                            }
-                        ],
-                        "as": "manual_compliance_evaluation"
-                    }
-                },
-                {
-                    "$group": {
-                        "_id": "$compliance_type",
-                        "total_count": {"$sum": 1},
-                        "non_complying_count": {
-                            "$sum": {
-                                "$cond": {
-                                    "if": {
-                                        "$or": [
-                                            {"$gt": [{"$size": "$matched_findings"}, 0]},
-                                            {
-                                                "$gt": [
-                                                    {
-                                                        "$size": {
-                                                            "$filter": {
-                                                                "input": "$manual_compliance_evaluation",
-                                                                "as": "eval",
-                                                                "cond": {"$eq": ["$$eval.evaluation_status", "not-complying"]}
-                                                            }
-                                                        }
-                                                    },
-                                                    0
-                                                ]
-                                            }
-                                        ]
-                                    },
-                                    "then": 1,
-                                    "else": 0
-                                }
-                            }
-                        },
-                        "complying_count": {
-                            "$sum": {
-                                "$cond": {
-                                    "if": {
-                                        "$gt": [
-                                            {
-                                                "$size": {
-                                                    "$filter": {
-                                                        "input": "$manual_compliance_evaluation",
-                                                        "as": "eval",
-                                                        "cond": {"$eq": ["$$eval.evaluation_status", "complying"]}
-                                                    }
-                                                }
-                                            },
-                                            0
-                                        ]
-                                    },
-                                    "then": 1,
-                                    "else": 0
-                                }
-                            }
-                        }
-                    }
-                },
-                {
-                    "$project": {
-                        "compliance_type": "$_id",
-                        "_id": 0,
-                        "non_complying_count": 1,
-                        "complying_count": 1,
-                        "manual_evaluation_needed_count": {
-                            "$subtract": [
-                                "$total_count",
-                                {"$add": ["$non_complying_count", "$complying_count"]}
-                            ]
-                        }
-                    }
-                }
-            ]
-
-            compliance_summary = list(Compliance.objects.aggregate(*pipeline))
+            compliance_summary = read_compliance_summary(project_id)
 
             return {'success': 'Summary fetched successfully', 'data': compliance_summary}, 200
 
@@ -403,6 +268,7 @@ class ComplianceController():
                     # creator=current_user,
             )
             new_compliance_obj.save()
+            invalidate_compliance_summaries()
             response = json.loads(new_compliance_obj.to_json())
             return {'success': 'Record Created Successfully', 'data': response}, '200 Ok'
         except DoesNotExist as e:
@@ -422,6 +288,7 @@ class ComplianceController():
                 return {'error': 'No valid fields provided for update'}, 400
             compliance_record = Compliance.objects.get(compliance_id=compliance_id)
             compliance_record.update(**updated_data)
+            invalidate_compliance_summaries()
             updated_record = Compliance.objects.get(compliance_id=compliance_id)
             response = json.loads(updated_record.to_json())
             return response, 200
@@ -438,6 +305,7 @@ class ComplianceController():
         try:
             compliance_record = Compliance.objects.get(compliance_id=compliance_id)
             compliance_record.delete()
+            invalidate_compliance_summaries()
             return {'message': 'Compliance successfully deleted'}, 200
         except Compliance.DoesNotExist:
             return {'error': 'Compliance ID not found'}, 404
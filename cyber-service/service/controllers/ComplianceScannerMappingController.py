@@ -6,6 +6,7 @@ from typing import List
 from datetime import datetime, timezone
 import json
 import uuid
+from .utility.compliance.compliance_summary import invalidate_compliance_summaries
 
 
 class ComplianceScannerMappingController():
@@ -114,6 +115,7 @@ class ComplianceScannerMappingController():
                 created=datetime.now(timezone.utc),
             )
             compliance_scanner_mapping.save()
+            invalidate_compliance_summaries()
             response = json.loads(compliance_scanner_mapping.to_json())
             return {'success': 'Record Created Successfully', 'data': response}, '200 Ok'
         except ValidationError as e:
@@ -162,6 +164,7 @@ class ComplianceScannerMappingController():
             compliance_scanner_mapping.compliance_id = compliance_id
             compliance_scanner_mapping.scanner_type_id = valid_scanner_type_ids
             compliance_scanner_mapping.save()
+            invalidate_compliance_summaries()
 
             response = json.loads(compliance_scanner_mapping.to_json())
             return jsonify({'success': 'Record Updated Successfully', 'data': response}), 200
@@ -183,6 +186,7 @@ class ComplianceScannerMappingController():
             compliance_scanner_mapping = ComplianceScannerMapping.query.get(
                 compliance_scanner_mapping_id)
             compliance_scanner_mapping.delete()
+            invalidate_compliance_summaries()
             return {'success': 'Record Deleted Successfully'}, '200 Ok'
         except Exception as e:
             return {'error': 'Error: ' + str(e)}, '500 Internal Server Error'
@@ -13,6 +13,8 @@ import json
 import os
 import zipfile
 from werkzeug.utils import secure_filename
+from .utility.findings.finding_stats import update_finding_stats
+from .utility.projects.target_summary import sync_target_summary
 
 ALLOWED_EXTENSIONS = {'sol', 'zip'}
 UPLOAD_FOLDER = 'uploads'
@@ -138,6 +140,7 @@ class ContractController:
             contract_obj['updated'] = datetime.now(timezone.utc)
 
             contract_obj.save()
+            sync_target_summary(contract_obj)
             response = json.loads(contract_obj.to_json())
 
             return {'success': 'Record updated successfully', 'data': response}, '200 Ok'
@@ -249,6 +252,7 @@ class ContractController:
 
             # Save the new contract object
             new_contract_obj.save()
+            sync_target_summary(new_contract_obj)
 
             return {
                 'success': 'Record Created Successfully',
@@ -304,6 +308,7 @@ class ContractController:
                 return {'error': 'No contract record found with the given ID' +str(contract_id)}, '404 Not Found'
            
             # Optionally, mark as deleted without removing from the database (soft delete)
+            removed_findings = []
             finding_master_queryset = FindingMaster.objects(target_id=contract_id)
             for finding in finding_master_queryset:
                 try:
@@ -327,15 +332,18 @@ class ContractController:
                     print(f"FixRecommendations record with target id {finding.fix_recommendation_id} not found")
 
                 # Update each object in the FindingMaster queryset
+                removed_findings.append(finding.to_mongo())
                 finding.isdeleted = True
                 finding.deleted_at = datetime.now(timezone.utc)
                 finding.save()
                 print(f"Deleted FindingMaster record with ID: {finding.id}")
+            update_finding_stats(removed=removed_findings)
 
             # Mark the Smart Contract object as deleted
             contract_obj.isdeleted = True
             contract_obj.deleted_at = datetime.now(timezone.utc)
             contract_obj.save()
+            sync_target_summary(contract_obj)
 
             # Print the deletion details for Smart Contract
             print(f"Deleted Smart Contract record with contract id: {contract_id}")
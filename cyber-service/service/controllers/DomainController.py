@@ -11,6 +11,8 @@ from typing import List
 from bson import ObjectId
 import uuid
 import json
+from .utility.findings.finding_stats import update_finding_stats
+from .utility.projects.target_summary import sync_target_summary
 
 
 class DomainAddSchema(Schema):
@@ -122,6 +124,7 @@ class DomainController:
 
             # Save changes
             domain_obj.save()
+            sync_target_summary(domain_obj)
             response = json.loads(domain_obj.to_json())
 
             return {'success': 'Record Updated Successfully', 'data': response}, '200 Ok'
@@ -155,6 +158,7 @@ class DomainController:
                 creator=current_user,
             )
             new_domain_obj.save()
+            sync_target_summary(new_domain_obj)
             response = json.loads(new_domain_obj.to_json())
             return {'success': 'Record Created Successfully', 'data': response}, '200 Ok'
         except DoesNotExist as e:
@@ -179,6 +183,7 @@ class DomainController:
                 return {'error': 'No domain record found with the given ID'}, '404 Not Found'
 
             # Optionally, mark as deleted without removing from the database (soft delete)
+            removed_findings = []
             finding_master_queryset = FindingMaster.objects(target_id=domain_id)
             finding_master_data = json.loads(finding_master_queryset.to_json())
 
@@ -216,17 +221,20 @@ class DomainController:
 
                 # Update each object in the FindingMaster queryset
                 for finding_master_obj in finding_master_queryset:
+                    removed_findings.append(finding_master_obj.to_mongo())
                     finding_master_obj.isdeleted = True
                     finding_master_obj.deleted_at = datetime.now(timezone.utc)
                     finding_master_obj.save()
                     
                     # Print the deletion details for FindingMaster
                     print(f"Deleted FindingMaster record with ID: {finding_master_obj.id}")
+            update_finding_stats(removed=removed_findings)
 
             # Mark the Domain object as deleted
             domain_obj.isdeleted = True
             domain_obj.deleted_at = datetime.now(timezone.utc)
             domain_obj.save()
+            sync_target_summary(domain_obj)
 
             # Print the deletion details for Domain
             print(f"Deleted Domain record with domain id: {domain_id}")
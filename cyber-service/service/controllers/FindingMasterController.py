@@ -1,4 +1,4 @@
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
 from mongoengine import *
 from controllers.util import *
@@ -8,6 +8,10 @@ import json
 from entities.CyberServiceEntity import FindingMaster, DomainWapiti1, DomainZap1, RepositoryTrivy1,RepoSecretDetections, RepoSmartContractSlither1, CloudCloudSploitAzure1, CloudCloudSploitGoogle1, ScannerTypes
 from typing import List
 from bson import ObjectId
+from .utility.findings.finding_page import encode_cursor, decode_cursor, keyset_condition, cached_finding_count
+from .utility.findings.finding_stats import update_finding_stats, read_finding_stats
+from .utility.findings.finding_export import export_findings, gzip_chunks, EXPORT_FORMATS
+from .utility.compliance.compliance_summary import refresh_compliance_summary
 
 collection_map = {
     "DomainWapiti1": {"model": DomainWapiti1, "id_field": "domain_wapiti_1_id"},
@@ -94,6 +98,8 @@ class FindingMasterController():
 
         # Save the entity to the database
         finding_master_obj.save()
+        update_finding_stats(added=[finding_master_obj])
+        refresh_compliance_summary(project_id)
         response = json.loads(finding_master_obj.to_json())
         return jsonify({"message": "Finding Master Entry created successfully", "data": response}), 200
 
@@ -161,10 +167,12 @@ class FindingMasterController():
                     pass
 
             # Update the status field
+            previous_finding = finding_master.to_mongo().to_dict()
             finding_master.status = new_status
             finding_master.updated = datetime.now(timezone.utc)
             finding_master.updator = current_user
             finding_master.save()
+            update_finding_stats(added=[finding_master], removed=[previous_finding])
 
             # Return the updated document
             response = json.loads(finding_master.to_json())
@@ -179,6 +187,8 @@ class FindingMasterController():
         """
         Get the count of issues categorized by severity and status for a specific project_id.
         Non-admin users only see counts for their own Manual VAPT findings.
+        The counts are read from ProjectFindingStats, which is kept up to date
+        as findings are written (see utility/findings/finding_stats.py).
         """
         # Validate JWT Token
         verify_jwt_in_request()
@@ -189,90 +199,38 @@ class FindingMasterController():
         is_admin = claims.get('role') == 'admin'
 
         try:
-            # Build match conditions
-            match_conditions = [{"project_id": project_id}]
-
             # For non-admin users, filter Manual VAPT findings to only count their own
+            manual_vapt_scan_type_id = None
             if not is_admin:
-                manual_vapt_scan_type_id = None
                 try:
                     scanner_type = ScannerTypes.objects.get(scan_type="Manual VAPT")
                     manual_vapt_scan_type_id = scanner_type.scan_type_id
                 except DoesNotExist:
                     pass
 
-                if manual_vapt_scan_type_id:
-                    match_conditions.append({
-                        "$or": [
-                            {"scan_type_id": {"$ne": manual_vapt_scan_type_id}},
-                            {"$and": [
-                                {"scan_type_id": manual_vapt_scan_type_id},
-                                {"creator": current_user}
-                            ]}
-                        ]
-                    })
-
-            # Combine conditions
-            match_stage = {"$and": match_conditions} if len(match_conditions) > 1 else match_conditions[0]
-
-            # Define the aggregation pipeline
-            pipeline = [
-    {
-        "$match": match_stage
-    },
-    {
-        "$group": {
-            "_id": None,  # Grouping everything together
-            "critical_count": {"$sum": {"$cond": [{"$eq": ["$severity", "critical"]}, 1, 0]}},
-            "high_count": {"$sum": {"$cond": [{"$eq": ["$severity", "high"]}, 1, 0]}},
-            "medium_count": {"$sum": {"$cond": [{"$eq": ["$severity", "medium"]}, 1, 0]}},
-            "low_count": {"$sum": {"$cond": [{"$eq": ["$severity", "low"]}, 1, 0]}},
-            "informational_count": {"$sum": {"$cond": [{"$eq": ["$severity", "informational"]}, 1, 0]}},
-            "open_count": {"$sum": {"$cond": [{"$eq": ["$status", "open"]}, 1, 0]}},
-            "closed_count": {"$sum": {"$cond": [{"$eq": ["$status", "closed"]}, 1, 0]}},
-            "ignored_count": {"$sum": {"$cond": [{"$eq": ["$status", "ignored"]}, 1, 0]}},
-            "false_positive_count": {"$sum": {"$cond": [{"$eq": ["$status", "false positive"]}, 1, 0]}}
-        }
-    }
-]
-
-
-            # Execute the aggregation pipeline
-            result = list(FindingMaster.objects.aggregate(*pipeline))
-            print(result)
-
-            # If no results were returned, default the counts to 0
-            if not result:
-                counts = {
-                    "critical_count": 0,
-                    "high_count": 0,
-                    "medium_count": 0,
-                    "low_count": 0,
-                    "informational_count": 0,
-                    "open_count": 0,
-                    "closed_count": 0,
-                    "ignored_count": 0,
-                    "false_positive_count": 0
-                }
-            else:
-                counts = result[0]  # Extract the count from the aggregation result
+            counts = read_finding_stats(project_id, manual_vapt_scan_type_id, current_user)
+            severity_counts = counts['severity']
+            status_counts = counts['status']
 
             return jsonify({
                 "message": "Counts fetched successfully",
                 "data": {
                     "severity_counts": {
-                        "critical": counts.get('critical_count', 0),
-                        "high": counts.get('high_count', 0),
-                        "medium": counts.get('medium_count', 0),
-                        "low": counts.get('low_count', 0),
-                        "informational": counts.get('informational_count', 0),
+                        "critical": severity_counts.get('critical', 0),
+                        "high": severity_counts.get('high', 0),
+                        "medium": severity_counts.get('medium', 0),
+                        "low": severity_counts.get('low', 0),
+                        "informational": severity_counts.get('informational', 0),
                     },
                     "status_counts": {
-                        "open": counts.get('open_count', 0),
-                        "closed": counts.get('closed_count', 0),
-                        "ignored": counts.get('ignored_count', 0),
-                        "false_positive": counts.get('false_positive_count', 0),
-                    }
+                        "open": status_counts.get('open', 0),
+                        "closed": status_counts.get('closed', 0),
+                        "ignored": status_counts.get('ignored', 0),
+                        "false_positive": status_counts.get('false positive', 0),
+                    },
+                    "target_type_counts": counts['target_type'],
+                    "scan_type_counts": counts['scan_type'],
+                    "total": counts['total'],
                 }
             }), 200
 
@@ -296,14 +254,10 @@ class FindingMasterController():
 
         if "project_id" in fields:
             project_id = fields['project_id']
-            target_type = request.args.get('targetType')
-            severity = request.args.get('severity')
-            status = request.args.get('status')
-            scan_type_ids = request.args.get("scanTypeIds")  # Get comma-separated values as a string
-            if scan_type_ids:
-                scan_type_ids = scan_type_ids.split(",")  # Convert to list
             order_by = request.args.get('orderBy', 'finding_date')
             order_direction = request.args.get('orderDirection', 'desc')
+            # Keyset pagination when a cursor is passed, empty for the first page
+            cursor = request.args.get('cursor')
 
             try:
                 # Fetch pagination parameters
@@ -311,170 +265,36 @@ class FindingMasterController():
                 limit = int(request.args.get('limit', 10))
                 skip = (page - 1) * limit
 
-                # Build match conditions
-                match_conditions = [{"project_id": project_id}]
-
-                # For non-admin users, filter Manual VAPT findings to only show their own
-                if not is_admin:
-                    # Get the Manual VAPT scanner type ID
-                    manual_vapt_scan_type_id = None
-                    try:
-                        scanner_type = ScannerTypes.objects.get(scan_type="Manual VAPT")
-                        manual_vapt_scan_type_id = scanner_type.scan_type_id
-                    except DoesNotExist:
-                        pass  # No Manual VAPT type exists yet
-
-                    if manual_vapt_scan_type_id:
-                        # Show findings that are either:
-                        # 1. NOT Manual VAPT findings, OR
-                        # 2. Manual VAPT findings created by the current user
-                        match_conditions.append({
-                            "$or": [
-                                {"scan_type_id": {"$ne": manual_vapt_scan_type_id}},
-                                {"$and": [
-                                    {"scan_type_id": manual_vapt_scan_type_id},
-                                    {"creator": current_user}
-                                ]}
-                            ]
-                        })
-
-                # Apply filters if any
-                if target_type:
-                    match_conditions.append({"target_type": target_type})
-                if severity:
-                    match_conditions.append({"severity": severity})
-                if status:
-                    match_conditions.append({"status": status})
-                if scan_type_ids:
-                    match_conditions.append({"scan_type_id": {"$in": scan_type_ids}})
-
-                # Combine all conditions with $and
-                match_stage = {"$and": match_conditions} if len(match_conditions) > 1 else match_conditions[0]
+                match_stage = self.findings_match_stage(project_id, current_user, is_admin)
 
                 # Determine sorting direction
                 sort_direction = 1 if order_direction == 'asc' else -1
 
+                if cursor is not None:
+                    return self.fetch_page_by_cursor(match_stage, order_by, sort_direction, cursor, limit)
+
+                # The page is cut before the joins, so only its findings are joined
                 pipeline = [
                     {
                         "$match": match_stage  # Apply the match stage with filters
                     },
-                    {
-                        "$lookup": {
-                            "from": "TargetDomain",
-                            "localField": "target_id",
-                            "foreignField": "_id",
-                            "as": "target_domain_details"
-                        }
-                    },
-                    {
-                        "$lookup": {
-                            "from": "TargetRepository",
-                            "localField": "target_id",
-                            "foreignField": "_id",
-                            "as": "target_repository_details"
-                        }
-                    },
-                    {
-                        "$lookup": {
-                            "from": "TargetContract",
-                            "localField": "target_id",
-                            "foreignField": "_id",
-                            "as": "target_contract_details"
-                        }
-                    },
-                    {
-                        "$lookup": {
-                            "from": "TargetAzureCloud",
-                            "localField": "target_id",
-                            "foreignField": "_id",
-                            "as": "target_azure_cloud_details"
-                        }
-                    },
-                    {
-                        "$lookup": {
-                            "from": "TargetGoogleCloud",
-                            "localField": "target_id",
-                            "foreignField": "_id",
-                            "as": "target_google_cloud_details"
-                        }
-                    },
-                    # Combine the target details into one field
-                    {
-                        "$addFields": {
-                            "target_details": {
-                                "$cond": {
-                                    "if": {"$gt": [{"$size": "$target_domain_details"}, 0]},
-                                    "then": {"$arrayElemAt": ["$target_domain_details", 0]},
-                                    "else": {
-                                        "$cond": {
-                                            "if": {"$gt": [{"$size": "$target_repository_details"}, 0]},
-                                            "then": {"$arrayElemAt": ["$target_repository_details", 0]},
-                                            "else": {
-                                                "$cond": {
-                                                    "if": {"$gt": [{"$size": "$target_contract_details"}, 0]},
-                                                    "then": {"$arrayElemAt": ["$target_contract_details", 0]},
-                                                    "else": {
-                                                        "$cond": {
-                                                            "if": {"$gt": [{"$size": "$target_azure_cloud_details"}, 0]},
-                                                            "then": {"$arrayElemAt": ["$target_azure_cloud_details", 0]},
-                                                            "else": {"$arrayElemAt": ["$target_google_cloud_details", 0]}
-                                                        }
-                                                    }
-                                                }
-                                            }
-                                        }
-                                    }
-                                }
-                            }
-                        }
-                    },
-                    # Lookup details for scan_type_id from ScannerTypes collection
-                    {
-                        "$lookup": {
-                            "from": "ScannerTypes",
-                            "localField": "scan_type_id",
-                            "foreignField": "_id",
-                            "as": "scan_type_details"
-                        }
-                    },
-                    # Flatten scan_type_details array
-                    {
-                        "$addFields": {
-                            "scan_type_details": {
-                                "$arrayElemAt": ["$scan_type_details", 0]
-                            }
-                        }
-                    },
-                    # Sort by the specified field (finding_date by default)
+                    # Sort by the specified field (finding_date by default), _id keeps equal values in a stable order
                     {
                         "$sort": {
-                            order_by: sort_direction  # Sort by finding_date, severity, or status
-                        }
-                    },
-                    {
-                        "$project": {
-                            "isdeleted": 0,
-                            "target_domain_details": 0,
-                            "target_repository_details": 0,
-                            "target_azure_cloud_details": 0,
-                            "target_google_cloud_details": 0,
-                            "target_contract_details": 0,
+                            order_by: sort_direction,  # Sort by finding_date, severity, or status
+                            "_id": sort_direction
                         }
                     },
                     {"$skip": skip},
-                    {"$limit": limit}
+                    {"$limit": limit},
+                    *self.finding_details_stages()
                 ]
 
                 # Execute the aggregation pipeline
                 finding_master_results_list = list(FindingMaster.objects.aggregate(*pipeline))
 
-                # Count total documents for pagination metadata using aggregation
-                count_pipeline = [
-                    {"$match": match_stage},
-                    {"$count": "total"}
-                ]
-                count_result = list(FindingMaster.objects.aggregate(*count_pipeline))
-                total_count = count_result[0]["total"] if count_result else 0
+                # Count total documents for pagination metadata
+                total_count = cached_finding_count(match_stage)
 
                 return {
                     'success': 'Records fetched successfully',
@@ -487,12 +307,241 @@ class FindingMasterController():
                     }
                 }, '200 Ok'
 
+            except ValueError as e:
+                return {'error': 'Validation error: ' + str(e)}, '400 Bad Request'
             except DoesNotExist as e:
                 return {'error': 'Empty query: ' + str(e)}, '404 Not Found'
             except ValidationError as e:
                 return {'error': 'Validation error: ' + e.message}, '400 Bad Request'
 
     
+    def findings_match_stage(self, project_id, current_user, is_admin):
+        """
+        Match stage of the findings of a project with the targetType, severity,
+        status and scanTypeIds filters of the request. Non-admin users only
+        see their own Manual VAPT findings.
+        """
+        target_type = request.args.get('targetType')
+        severity = request.args.get('severity')
+        status = request.args.get('status')
+        scan_type_ids = request.args.get("scanTypeIds")  # Get comma-separated values as a string
+        if scan_type_ids:
+            scan_type_ids = scan_type_ids.split(",")  # Convert to list
+
+        # Build match conditions
+        match_conditions = [{"project_id": project_id}]
+
+        # For non-admin users, filter Manual VAPT findings to only show their own
+        if not is_admin:
+            # Get the Manual VAPT scanner type ID
+            manual_vapt_scan_type_id = None
+            try:
+                scanner_type = ScannerTypes.objects.get(scan_type="Manual VAPT")
+                manual_vapt_scan_type_id = scanner_type.scan_type_id
+            except DoesNotExist:
+                pass  # No Manual VAPT type exists yet
+
+            if manual_vapt_scan_type_id:
+                # Show findings that are either:
+                # 1. NOT Manual VAPT findings, OR
+                # 2. Manual VAPT findings created by the current user
+                match_conditions.append({
+                    "$or": [
+                        {"scan_type_id": {"$ne": manual_vapt_scan_type_id}},
+                        {"$and": [
+                            {"scan_type_id": manual_vapt_scan_type_id},
+                            {"creator": current_user}
+                        ]}
+                    ]
+                })
+
+        # Apply filters if any
+        if target_type:
+            match_conditions.append({"target_type": target_type})
+        if severity:
+            match_conditions.append({"severity": severity})
+        if status:
+            match_conditions.append({"status": status})
+        if scan_type_ids:
+            match_conditions.append({"scan_type_id": {"$in": scan_type_ids}})
+
+        # Combine all conditions with $and
+        return {"$and": match_conditions} if len(match_conditions) > 1 else match_conditions[0]
+
+    def export_by_project_id(self, project_id):
+        """
+        Streams every finding of a project, with the filters of the project
+        listing, as NDJSON (default) or CSV with its target, scan type, fix
+        recommendation and extended details. Findings are read from one cursor
+        and joined batch by batch, so memory stays constant however many
+        findings the project has. The stream is gzip encoded when the client
+        accepts it.
+        """
+        # Validate JWT Token
+        verify_jwt_in_request()
+        current_user = get_jwt_identity()
+        is_admin = get_jwt().get('role') == 'admin'
+
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return {'error': 'Validation error: format must be one of ' + ', '.join(EXPORT_FORMATS)}, '400 Bad Request'
+
+        match_stage = self.findings_match_stage(project_id, current_user, is_admin)
+        chunks = export_findings(match_stage, export_format,
+                                 {name: info["model"] for name, info in collection_map.items()})
+        headers = {'Content-Disposition': f'attachment; filename=findings-{project_id}.{export_format}'}
+        if 'gzip' in request.accept_encodings:
+            chunks = gzip_chunks(chunks)
+            headers['Content-Encoding'] = 'gzip'
+        return Response(stream_with_context(chunks), mimetype=EXPORT_FORMATS[export_format], headers=headers)
+
+    def fetch_page_by_cursor(self, match_stage, order_by, sort_direction, cursor, limit):
+        """
+        Keyset pagination of a findings listing: the page starts right after
+        the cursor in (order_by, _id) order, so every page costs the same no
+        matter how deep it is. Pass an empty cursor for the first page and the
+        returned next_cursor for the following ones.
+        """
+        page_match_stage = match_stage
+        if cursor:
+            value, finding_id = decode_cursor(cursor, order_by)
+            page_match_stage = {"$and": [match_stage, keyset_condition(order_by, sort_direction, value, finding_id)]}
+        limit = max(limit, 1)
+
+        # One extra finding tells whether there is a next page
+        page = list(FindingMaster.objects.aggregate(
+            {"$match": page_match_stage},
+            {"$sort": {order_by: sort_direction, "_id": sort_direction}},
+            {"$limit": limit + 1},
+            {"$project": {"_id": 1, order_by: 1}}
+        ))
+        has_more = len(page) > limit
+        page = page[:limit]
+
+        # Join the targets and scan types of the page only
+        finding_master_results_list = list(FindingMaster.objects.aggregate(
+            {"$match": {"_id": {"$in": [finding['_id'] for finding in page]}}},
+            *self.finding_details_stages()
+        ))
+        position = {finding['_id']: index for index, finding in enumerate(page)}
+        finding_master_results_list.sort(key=lambda finding: position[finding['_id']])
+
+        return {
+            'success': 'Records fetched successfully',
+            'data': serialize_mongo_data(finding_master_results_list),
+            'pagination': {
+                'limit': limit,
+                'next_cursor': encode_cursor(page[-1], order_by) if has_more else None,
+                'has_more': has_more,
+                # Total of the whole listing, cached between pages
+                'total': cached_finding_count(match_stage)
+            }
+        }, '200 Ok'
+
+    def finding_details_stages(self):
+        """
+        Aggregation stages adding the target and scan type details to findings.
+        """
+        return [
+            {
+                "$lookup": {
+                    "from": "TargetDomain",
+                    "localField": "target_id",
+                    "foreignField": "_id",
+                    "as": "target_domain_details"
+                }
+            },
+            {
+                "$lookup": {
+                    "from": "TargetRepository",
+                    "localField": "target_id",
+                    "foreignField": "_id",
+                    "as": "target_repository_details"
+                }
+            },
+            {
+                "$lookup": {
+                    "from": "TargetContract",
+                    "localField": "target_id",
+                    "foreignField": "_id",
+                    "as": "target_contract_details"
+                }
+            },
+            {
+                "$lookup": {
+                    "from": "TargetAzureCloud",
+                    "localField": "target_id",
+                    "foreignField": "_id",
+                    "as": "target_azure_cloud_details"
+                }
+            },
+            {
+                "$lookup": {
+                    "from": "TargetGoogleCloud",
+                    "localField": "target_id",
+                    "foreignField": "_id",
+                    "as": "target_google_cloud_details"
+                }
+            },
+            # Combine the target details into one field
+            {
+                "$addFields": {
+                    "target_details": {
+                        "$cond": {
+                            "if": {"$gt": [{"$size": "$target_domain_details"}, 0]},
+                            "then": {"$arrayElemAt": ["$target_domain_details", 0]},
+                            "else": {
+                                "$cond": {
+                                    "if": {"$gt": [{"$size": "$target_repository_details"}, 0]},
+                                    "then": {"$arrayElemAt": ["$target_repository_details", 0]},
+                                    "else": {
+                                        "$cond": {
+                                            "if": {"$gt": [{"$size": "$target_contract_details"}, 0]},
+                                            "then": {"$arrayElemAt": ["$target_contract_details", 0]},
+                                            "else": {
+                                                "$cond": {
+                                                    "if": {"$gt": [{"$size": "$target_azure_cloud_details"}, 0]},
+                                                    "then": {"$arrayElemAt": ["$target_azure_cloud_details", 0]},
+                                                    "else": {"$arrayElemAt": ["$target_google_cloud_details", 0]}
+                                                }
+                                            }
+                                        }
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            },
+            # Lookup details for scan_type_id from ScannerTypes collection
+            {
+                "$lookup": {
+                    "from": "ScannerTypes",
+                    "localField": "scan_type_id",
+                    "foreignField": "_id",
+                    "as": "scan_type_details"
+                }
+            },
+            # Flatten scan_type_details array
+            {
+                "$addFields": {
+                    "scan_type_details": {
+                        "$arrayElemAt": ["$scan_type_details", 0]
+                    }
+                }
+            },
+            {
+                "$project": {
+                    "isdeleted": 0,
+                    "target_domain_details": 0,
+                    "target_repository_details": 0,
+                    "target_azure_cloud_details": 0,
+                    "target_google_cloud_details": 0,
+                    "target_contract_details": 0,
+                }
+            }
+        ]
+
     def get_extended_finding_details(self, finding_id):
         try:
             # Fetch the FindingMaster document using the finding_id
@@ -5,6 +5,7 @@ from entities.CyberServiceEntity import FrameworkScannerMapping, Samm, ScannerTy
 from typing import List
 import uuid, json
 from datetime import datetime, timezone
+from .utility.compliance.samm_coverage import invalidate_samm_coverage
 
 class FrameworkScannerMappingController():
     """
@@ -104,6 +105,7 @@ class FrameworkScannerMappingController():
                 created=datetime.now(timezone.utc),
             )
             framework_scanner_mapping.save()
+            invalidate_samm_coverage()
             response = json.loads(framework_scanner_mapping.to_json())
             return {'success': 'Record Created Successfully', 'data': response}, '200 Ok'
         except ValidationError as e:
@@ -145,6 +147,7 @@ class FrameworkScannerMappingController():
             framework_scanner_mapping.framework_id = framework_id
             framework_scanner_mapping.scanner_type_id = valid_scanner_type_ids
             framework_scanner_mapping.save(validate=False) 
+            invalidate_samm_coverage()
 
             response = json.loads(framework_scanner_mapping.to_json())
             return {'success': 'Record Updated Successfully', 'data': response}, '200 Ok'
@@ -164,6 +167,7 @@ class FrameworkScannerMappingController():
             framework_scanner_mapping = FrameworkScannerMapping.objects.get(
                 _id=framework_id)
             framework_scanner_mapping.delete()
+            invalidate_samm_coverage()
             return {'success': 'Record Deleted Successfully'}, '200 Ok'
         except DoesNotExist:
             return {'error': 'Record not found'}, '404 Not Found'
@@ -6,6 +6,7 @@ from typing import List
 from datetime import datetime, timezone
 import uuid
 import json
+from .utility.compliance.compliance_summary import refresh_compliance_summary
 
 
 class ManualComplianceEvaluationController():
@@ -70,6 +71,7 @@ class ManualComplianceEvaluationController():
                 existing_record.evaluation_status = evaluation_status
                 existing_record.updated = datetime.now(timezone.utc)
                 existing_record.save()
+                refresh_compliance_summary(project_id)
                 return jsonify({'message': 'Manual Compliance Evaluation updated successfully'}), 200
             else:
                 # Create a new record
@@ -81,6 +83,7 @@ class ManualComplianceEvaluationController():
                     created=datetime.now(timezone.utc)
                 )
                 manual_compliance_evaluation_obj.save()
+                refresh_compliance_summary(project_id)
                 return jsonify({'message': 'Manual Compliance Evaluation added successfully'}), 200
 
         except Exception as e:
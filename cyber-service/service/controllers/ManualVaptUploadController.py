@@ -6,9 +6,12 @@ import uuid
 from datetime import datetime, timezone
 import json
 from entities.CyberServiceEntity import (
-    FindingMaster, RawScanOutput, Scans, ScannerTypes, Scanners,
+    FindingMaster, Scans, ScannerTypes, Scanners,
     FindingSeverity, FindingStatus, ScanTargetType, ScanStatus
 )
+from controllers.utility.storage.raw_output_store import store_raw_scan_output
+from controllers.utility.findings.finding_stats import update_finding_stats
+from controllers.utility.compliance.compliance_summary import refresh_compliance_summary
 from typing import List
 
 
@@ -212,17 +215,9 @@ class ManualVaptUploadController:
             )
             scan.save()
 
-            # Create RawScanOutput with original JSON
+            # Store the original JSON as the raw scan output
             raw_scan_output_id = str(uuid.uuid4())
-            raw_scan_output = RawScanOutput(
-                raw_scan_output_id=raw_scan_output_id,
-                scan_id=scan_id,
-                scanner_id=scanner_id,
-                output=file_content,
-                created=datetime.now(timezone.utc),
-                creator=user_id,
-            )
-            raw_scan_output.save()
+            store_raw_scan_output(scan_id, scanner_id, file_content, user_id, raw_scan_output_id)
 
             # Create FindingMaster entries for each finding
             findings = json_data.get('findings', [])
@@ -282,6 +277,7 @@ class ManualVaptUploadController:
                     creator=user_id,
                 )
                 finding_master.save()
+                update_finding_stats(added=[finding_master])
                 created_findings.append({
                     'finding_id': finding_id,
                     'finding_name': finding.get('finding_name'),
@@ -289,6 +285,8 @@ class ManualVaptUploadController:
                     'status': status_str,
                 })
 
+            refresh_compliance_summary(project_id)
+
             return jsonify({
                 "message": "Manual VAPT findings uploaded successfully",
                 "data": {
@@ -503,6 +501,7 @@ class ManualVaptUploadController:
 
             # Get request data
             data = request.get_json()
+            previous_finding = finding.to_mongo().to_dict()
 
             # Update fields if provided
             if 'finding_name' in data:
@@ -549,6 +548,7 @@ class ManualVaptUploadController:
             finding.updated = datetime.now(timezone.utc)
             finding.updator = current_user
             finding.save()
+            update_finding_stats(added=[finding], removed=[previous_finding])
 
             return jsonify({
                 "message": "Finding updated successfully",
@@ -593,6 +593,7 @@ class ManualVaptUploadController:
             finding.updated = datetime.now(timezone.utc)
             finding.updator = current_user
             finding.save()
+            update_finding_stats(removed=[finding])
 
             return jsonify({
                 "message": "Finding deleted successfully",
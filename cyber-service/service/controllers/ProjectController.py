@@ -9,6 +9,8 @@ from datetime import datetime, timezone
 import uuid
 import json
 from bson import ObjectId
+from .utility.db.lean_queries import live_filter
+from .utility.projects.target_summary import backfill_target_summaries, project_with_targets
 
 
 def serialize_mongo_data(data):
@@ -127,81 +129,9 @@ class ProjectController:
         except ValidationError as e:
             return None, {'error': 'Validation error: ' + e.message}, '400 Bad Request'
 
-    pipeline = [
-        {
-            "$match": fields  # Additional match condition (if any) passed through the request
-        },
-        {
-            "$lookup": {
-                "from": "TargetRepository",  # Join with the TargetRepository collection
-                "let": {"project_id": "$_id"},  # Define local variable
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$eq": ["$project_id", "$$project_id"]  # Match project_id
-                            }
-                        }
-                    }
-                ],
-                "as": "repo_url_data"
-            }
-        },
-        {
-            "$lookup": {
-                "from": "TargetDomain", 
-                "let": {"project_id": "$_id"}, 
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$eq": ["$project_id", "$$project_id"]  # Match project_id
-                            }
-                        }
-                    }
-                ],
-                "as": "domain_data"  # This will add the domain data to the result
-            }
-        },
-        {
-            "$lookup": {
-                "from": "TargetContract",
-                "let": {"project_id": "$_id"},  # Define local variable
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$eq": ["$project_id", "$$project_id"]  # Match project_id
-                            }
-                        }
-                    }
-                ],
-                "as": "contract_data"  # This will add the contract data to the result
-            }
-        },
-        {
-            "$addFields": {
-                "repo_url": {
-                    "$arrayElemAt": ["$repo_url_data.repo_url", 0]  # Extract first repo_url
-                },
-                "domain_info": {
-                    "$arrayElemAt": ["$domain_data.domain_value", 0]  # Extract first domain value
-                },
-                "contract_info": {
-                    "$arrayElemAt": ["$contract_data.contract_info", 0]  # Extract first contract value
-                }
-            }
-        },
-        {
-            "$project": {
-                "isdeleted": 0  # Exclude the "isdeleted" field from the result
-            }
-        }
-    ]
-
     def fetch_all(self, request, fields) -> List[dict]:
         """
-        Fetches all the project objects from the database, with repo_url from TargetRepository,
+        Fetches all the project objects from the database with their targets,
         filtered first by creator (current user).
         """
         verify_jwt_in_request()
@@ -215,142 +145,11 @@ class ProjectController:
         else:
             creator_filter = {"creator": current_user}  # Filter for projects created by the current user
         
-        # First, filter the projects based on the creator (current user)
-        try:
-            filtered_projects = Project.objects.filter(**creator_filter)  # Get the projects for the current user
-        except DoesNotExist as e:
-            return {'error': 'No projects found for the current user.'}, '404 Not Found'
-        except ValidationError as e:
-            return {'error': 'Validation error: ' + e.message}, '400 Bad Request'
-
-        # After filtering the projects, apply the aggregation pipeline
-        pipeline = [
-        {
-            "$match": fields  # Additional match condition (if any) passed through the request
-        },
-        {
-            "$lookup": {
-                "from": "TargetRepository",  # Join with the TargetRepository collection
-                "let": {"project_id": "$_id"},  # Define local variable
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$and": [
-                                    { "$eq": ["$project_id", "$$project_id"] },  # Match project_id
-                                    { "$eq": ["$isdeleted", None] }  
-                                ]
-                            }
-                        }
-                    }
-                ],
-                "as": "repo_url_data"
-            }
-        },
-        {
-            "$lookup": {
-                "from": "TargetDomain",  # Join with the TargetDomain collection
-                "let": {"project_id": "$_id"},  # Define local variable
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$and": [
-                                    { "$eq": ["$project_id", "$$project_id"] },  # Match project_id
-                                    { "$eq": ["$isdeleted", None] }  
-                                ]
-                            }
-                        }
-                    }
-                ],
-                "as": "domain_data"  # This will add the domain data to the result
-            }
-        },
-        {
-            "$lookup": {
-                "from": "TargetContract",  # Join with the TargetContract collection
-                "let": {"project_id": "$_id"},  # Define local variable
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$and": [
-                                    { "$eq": ["$project_id", "$$project_id"] },  # Match project_id
-                                    { "$eq": ["$isdeleted", None] }  # Check if isdeleted is null
-                                ]
-                            }
-                        }
-                    }
-                ],
-                "as": "contract_data"  # This will add the contract data to the result
-            }
-        },
-        {
-            "$lookup": {
-                "from": "TargetAzureCloud",  
-                "let": {"project_id": "$_id"},  
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$and": [
-                                    { "$eq": ["$project_id", "$$project_id"] },  
-                                    { "$eq": ["$isdeleted", None] }  
-                                ]
-                            }
-                        }
-                    }
-                ],
-                "as": "azure_cloud_data"  
-            }
-        },
-        {
-            "$lookup": {
-                "from": "TargetGoogleCloud",  
-                "let": {"project_id": "$_id"},  
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$and": [
-                                    { "$eq": ["$project_id", "$$project_id"] },  
-                                    { "$eq": ["$isdeleted", None] }  
-                                ]
-                            }
-                        }
-                    }
-                ],
-                "as": "google_cloud_data"  
-            }
-        },
-        {
-            "$addFields": {
-                "repo_url": {
-                    "$arrayElemAt": ["$repo_url_data.repo_url", 0]  # Extract first repo_url
-                },
-                "domain_info": {
-                    "$arrayElemAt": ["$domain_data.domain_value", 0]  # Extract first domain value
-                },
-                "contract_info": {
-                    "$arrayElemAt": ["$contract_data.contract_info", 0]  # Extract first contract value
-                },
-                "azure_cloud_info": {
-                    "$arrayElemAt": ["$azure_cloud_data.azure_cloud_info", 0]  
-                }
-            }
-        },
-        {
-            "$project": {
-                "isdeleted": 0  # Exclude the "isdeleted" field from the result
-            }
-        }
-    ]
-
-        
-        # Execute the aggregation pipeline after filtering projects by creator
+        # A single find on Project, the targets are read from the summary embedded in each project
         try:
-            project_list = list(filtered_projects.aggregate(pipeline))  # Apply the aggregation on the filtered projects
-            response = project_list
+            projects = list(Project._get_collection().find(live_filter(Project, {**creator_filter, **fields})))
+            backfill_target_summaries(projects)
+            response = [project_with_targets(project) for project in projects]
             response = serialize_mongo_data(response)
             return {'success': 'Records Fetched Successfully', 'data': response}, '200 Ok'
         except Exception as e:
@@ -361,7 +160,7 @@ class ProjectController:
     def update_by_id(self, request_json) -> dict:
         """
         Updates a project object by its ID, updating only the fields provided in the request,
-        and returns the updated project with repo_url information.
+        and returns the updated project with its targets.
         """
         # Fetching user id from JWT token and validate JWT token
         current_user = get_current_user_from_jwt_token()
@@ -395,88 +194,13 @@ class ProjectController:
             # Save changes
             project_obj.save()
 
-            # Apply the aggregation pipeline to fetch repo_url data
-            pipeline = [
-            {
-                "$match": {
-                    "_id": project_obj.id  # Match the project by its ID
-                }
-            },
-            {
-                "$lookup": {
-                    "from": "TargetRepository",  # Join with the TargetRepository collection
-                    "let": {"project_id": "$_id"},  # Define local variable
-                    "pipeline": [
-                        {
-                            "$match": {
-                                "$expr": {
-                                    "$eq": ["$project_id", "$$project_id"]  # Match project_id
-                                }
-                            }
-                        }
-                    ],
-                    "as": "repo_url_data"
-                }
-            },
-            {
-                "$lookup": {
-                    "from": "TargetDomain",  # Join with the TargetDomain collection
-                    "let": {"project_id": "$_id"},  # Define local variable
-                    "pipeline": [
-                        {
-                            "$match": {
-                                "$expr": {
-                                    "$eq": ["$project_id", "$$project_id"]  # Match project_id
-                                }
-                            }
-                        }
-                    ],
-                    "as": "domain_data"  # This will add the domain data to the result
-                }
-            },
-            {
-            "$lookup": {
-                "from": "TargetContract",  # Join with the TargetContract collection
-                "let": {"project_id": "$_id"},  # Define local variable
-                "pipeline": [
-                    {
-                        "$match": {
-                            "$expr": {
-                                "$eq": ["$project_id", "$$project_id"]  # Match project_id
-                            }
-                        }
-                    }
-                ],
-                "as": "contract_data"  # This will add the contract data to the result
-            }
-            },
-            {
-                "$addFields": {
-                    "repo_url": {
-                        "$arrayElemAt": ["$repo_url_data.repo_url", 0]  # Extract first repo_url
-                    },
-                    "domain_info": {
-                        "$arrayElemAt": ["$domain_data.domain_value", 0]  # Extract first domain value
-                    },
-                    "contract_info": {
-                    "$arrayElemAt": ["$contract_data.contract_info", 0]  # Extract first domain value
-                    }
-                }
-            },
-            {
-                "$project": {
-                    "isdeleted": 0  # Exclude the "isdeleted" field from the result
-                }
-            }
-        ]
-
-
-            # Run the aggregation pipeline on the updated project
-            updated_project = list(Project.objects.aggregate(pipeline))
+            # Read the updated project back with its embedded target summary
+            updated_project = Project._get_collection().find_one(live_filter(Project, {'_id': project_obj.id}))
 
             # Check if the project was found and return the updated response
             if updated_project:
-                response = updated_project[0]  # Assuming a single result
+                backfill_target_summaries([updated_project])
+                response = project_with_targets(updated_project)
                 response = serialize_mongo_data(response)
                 return {'success': 'Record Updated Successfully', 'data': response}, '200 Ok'
             else:
@@ -1,10 +1,9 @@
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context
 from mongoengine import *
 from controllers.util import *
-import uuid
-from datetime import datetime, timezone
 import json
 from entities.CyberServiceEntity import RawScanOutput
+from controllers.utility.storage.raw_output_store import store_raw_scan_output, stream_raw_scan_output
 from typing import List
 
 
@@ -37,18 +36,8 @@ class RawScanOutputController():
         if not output:
             return jsonify({"error": "Output not provided"}), 400
 
-        # Creating the Raw Scan Output entry
-        raw_scan_output_obj = RawScanOutput(
-            raw_scan_output_id=str(uuid.uuid4()),
-            scanner_id=scanner_id,
-            scan_id=scan_id,
-            output=output,
-            created=datetime.now(timezone.utc),
-            creator=current_user,
-        )
-
-        # Save the entity to the database
-        raw_scan_output_obj.save()
+        # Creating the Raw Scan Output entry, the output is stored compressed
+        raw_scan_output_obj = store_raw_scan_output(scan_id, scanner_id, output, current_user)
         response = json.loads(raw_scan_output_obj.to_json())
         return jsonify({"message": "Raw Scan Output Entry created successfully", "data": response}), 201
 
@@ -61,6 +50,7 @@ class RawScanOutputController():
         if not current_user:
             return jsonify({"error": "Unauthorized"}), 401
 
+        # The outputs themselves are read through fetch_output
         pipeline = [
             {
                 "$match": {
@@ -69,7 +59,8 @@ class RawScanOutputController():
             },
             {
                 "$project": {
-                    "isdeleted": 0
+                    "isdeleted": 0,
+                    "output": 0
                 }
             }
         ]
@@ -78,3 +69,18 @@ class RawScanOutputController():
         raw_scan_output_list = list(RawScanOutput.objects.aggregate(pipeline))
         response = raw_scan_output_list
         return {'success': 'Records Fetched Successfully', 'data': response}, '200 Ok'
+
+    def fetch_output(self, raw_scan_output_id):
+        """
+        Streams a raw scanner report, decompressed chunk by chunk, so large
+        reports are never held in memory as a whole.
+        """
+        # Fetching user id from jwt token and validate jwt token
+        current_user = get_current_user_from_jwt_token()
+        if not current_user:
+            return jsonify({"error": "Unauthorized"}), 401
+
+        stream = stream_raw_scan_output(raw_scan_output_id)
+        if stream is None:
+            return jsonify({"error": "Raw Scan Output not found"}), 404
+        return Response(stream_with_context(stream), mimetype='application/octet-stream')
@@ -2,6 +2,38 @@ from entities.CyberServiceEntity import FindingLicensesAndSbom, FindingLicense,
 from flask_jwt_extended import verify_jwt_in_request
 from mongoengine import DoesNotExist
 
+# Columns the license findings can be filtered and sorted on
+LICENSE_FILTER_FIELDS = ['pkg_name', 'name', 'severity']
+LICENSE_SORT_FIELDS = ['pkg_name', 'name', 'severity', 'created']
+
+
+def license_filters(request):
+    """
+    Builds the $match of the license findings from the comma separated
+    pkg_name, name and severity query parameters. NOASSERTION matches a
+    missing value, like in the statistics.
+    """
+    filters = {}
+    for field in LICENSE_FILTER_FIELDS:
+        values = [value for value in (request.args.get(field) or '').split(',') if value]
+        if not values:
+            continue
+        if field == 'severity':
+            # Severities are stored in any case, the statistics count them upper case
+            values = list({variant for value in values for variant in (value, value.upper(), value.lower(), value.capitalize())})
+        if 'NOASSERTION' in values:
+            values.append(None)
+        filters[field] = {'$in': values}
+    return filters
+
+
+def license_sort(request):
+    sort_by = request.args.get('sort_by')
+    if sort_by not in LICENSE_SORT_FIELDS:
+        return {"created": -1, "_id": -1}
+    return {sort_by: 1 if request.args.get('sort_order') == 'asc' else -1, "_id": 1}
+
+
 class RepoScanResultsController:
     """
     Defines controller methods for the getting Licenses and SBOM from the repo scan by trivy.
@@ -12,8 +44,10 @@ class RepoScanResultsController:
 
     def fetch_licenses_and_sbom(self, request, fields):
         """
-        Fetches all the licenses and SBOM objects by project id from the database and generates
-        elaborate statistical counts for licenses, severities, package names, and other relevant data.
+        Fetches one page of the licenses and SBOM objects by project id from the database, with
+        statistical counts for licenses, severities, package names, and other relevant data over
+        all of them. The counts and the page come from a single $facet aggregation, so the
+        findings of large SBOMs are never loaded all at once.
         """
         # Validate JWT Token
         verify_jwt_in_request()
@@ -23,6 +57,12 @@ class RepoScanResultsController:
             return {'error': 'Project ID is required'}, '400 Bad Request'
 
         try:
+            # Fetch pagination parameters
+            page = max(int(request.args.get('page', 1)), 1)
+            limit = max(int(request.args.get('limit', 10)), 1)
+            skip = (page - 1) * limit
+            filters = license_filters(request)
+
             # Create the aggregation pipeline
             pipeline = [
                 {"$match": {
@@ -31,79 +71,90 @@ class RepoScanResultsController:
                         {"isdeleted": None}  
                     ]
                 }},
-                {"$sort": {"created": -1}},  
+                {"$facet": {
+                    # Filters and sort apply to the page only, the statistics cover every license
+                    "findings": [
+                        {"$match": filters},
+                        {"$sort": license_sort(request)},
+                        {"$skip": skip},
+                        {"$limit": limit}
+                    ],
+                    "filtered_total": [
+                        {"$match": filters},
+                        {"$count": "count"}
+                    ],
+                    # Use 'NOASSERTION' for missing license and package data
+                    "license_stats": [
+                        {"$group": {"_id": {"$ifNull": ["$name", "NOASSERTION"]}, "count": {"$sum": 1}}}
+                    ],
+                    "severity_stats": [
+                        {"$group": {"_id": {"$toUpper": {"$ifNull": ["$severity", ""]}}, "count": {"$sum": 1}}}
+                    ],
+                    "package_stats": [
+                        {"$group": {"_id": {"$ifNull": ["$pkg_name", "NOASSERTION"]}, "count": {"$sum": 1}}}
+                    ],
+                    "total": [
+                        {"$count": "count"}
+                    ]
+                }}
             ]
 
             # Execute the aggregation pipeline
-            findings = list(FindingLicense.objects.aggregate(*pipeline))
-            print("findings", findings)
+            result = list(FindingLicense.objects.aggregate(*pipeline))[0]
+            total_findings = result['total'][0]['count'] if result['total'] else 0
+            filtered_total = result['filtered_total'][0]['count'] if result['filtered_total'] else 0
 
             # If no records found, return an appropriate message
-            if not findings:
+            if not total_findings:
                 return {'error': 'No records found for the provided project_id'}, '200 Ok'
-            
-            # Initialize statistics counters
-            license_stats = {}
+
+            license_stats = {group['_id']: group['count'] for group in result['license_stats']}
+            package_stats = {group['_id']: group['count'] for group in result['package_stats']}
+
+            # Severity levels outside the known ones are counted as unknown
             severity_stats = {'LOW': 0, 'MEDIUM': 0, 'HIGH': 0, 'CRITICAL': 0, 'UNKNOWN': 0}
-            package_stats = {}
-            no_assertion_count = 0
             unknown_severity_count = 0
-            total_packages = 0
-
-            # Iterate through findings to calculate the counts
-            for finding in findings:
-                # Count licenses
-                license_name = finding.get('name', 'NOASSERTION')  # Use 'NOASSERTION' for missing license data
-                if license_name not in license_stats:
-                    license_stats[license_name] = 0
-                license_stats[license_name] += 1
-
-                # Track how many findings have 'NOASSERTION' license
-                if license_name == 'NOASSERTION':
-                    no_assertion_count += 1
-
-                # Count severity levels
-                severity = finding.get('severity', '').upper()  # Make sure severity is in uppercase
-                if severity in severity_stats:
-                    severity_stats[severity] += 1
+            for group in result['severity_stats']:
+                if group['_id'] in severity_stats:
+                    severity_stats[group['_id']] += group['count']
                 else:
-                    unknown_severity_count += 1  # Track unknown/missing severity values
-
-                # Count package names
-                package_name = finding.get('pkg_name', 'NOASSERTION')  # Use 'UNKNOWN_PACKAGE' for missing data
-                if package_name not in package_stats:
-                    package_stats[package_name] = 0
-                package_stats[package_name] += 1
-                total_packages += 1
+                    unknown_severity_count += group['count']
 
             # Additional summary statistics
             license_count = sum(license_stats.values())  
-            severity_count = sum(severity_stats.values())  
-            unique_package_count = len(package_stats)  
+            no_assertion_count = license_stats.get('NOASSERTION', 0)
             no_license_percentage = (no_assertion_count / license_count) * 100 if license_count > 0 else 0
-            unknown_severity_percentage = (unknown_severity_count / len(findings)) * 100 if findings else 0
+            unknown_severity_percentage = (unknown_severity_count / total_findings) * 100
 
             # Prepare the response data
             response_data = {
-                'findings': findings, 
+                'findings': result['findings'], 
                 'license_stats': license_stats,  
                 'severity_stats': severity_stats,  
                 'package_stats': package_stats,  
                 'summary_stats': {
-                    'total_findings': len(findings),
-                    'total_packages': total_packages,
-                    'unique_package_count': unique_package_count,
+                    'total_findings': total_findings,
+                    'total_packages': total_findings,
+                    'unique_package_count': len(package_stats),
                     'license_count': license_count,
                     'no_assertion_count': no_assertion_count,
                     'no_license_percentage': no_license_percentage,
                     'unknown_severity_count': unknown_severity_count,
                     'unknown_severity_percentage': unknown_severity_percentage,
+                },
+                'pagination': {
+                    'page': page,
+                    'limit': limit,
+                    'total': filtered_total,
+                    'total_pages': (filtered_total + limit - 1) // limit
                 }
             }
 
             # Return results with statistical counts
             return {'success': 'Records fetched successfully', 'data': response_data}, '200 Ok'
 
+        except ValueError as e:
+            return {'error': 'Validation error: ' + str(e)}, '400 Bad Request'
         except Exception as e:
             return {'error': str(e)}, '500 Internal Server Error'
 
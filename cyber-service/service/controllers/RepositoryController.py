@@ -10,6 +10,8 @@ from bson import ObjectId
 import uuid
 import json
 from enum import Enum
+from .utility.findings.finding_stats import update_finding_stats
+from .utility.projects.target_summary import sync_target_summary
 
 class RepositoryProvider(Enum):
     GITLAB = "gitlab"
@@ -158,6 +160,7 @@ class RepositoryController:
 
             # Save changes
             repository_obj.save()
+            sync_target_summary(repository_obj)
             response = json.loads(repository_obj.to_json())
 
             return {'success': 'Record Updated Successfully', 'data': response}, '200 Ok'
@@ -192,6 +195,7 @@ class RepositoryController:
                 creator=current_user,
             )
             new_repository_obj.save()
+            sync_target_summary(new_repository_obj)
             response = json.loads(new_repository_obj.to_json())
             return {'success': 'Record Created Successfully', 'data': response}, '200 Ok'
         except DoesNotExist as e:
@@ -267,16 +271,19 @@ class RepositoryController:
 
             # Bulk update FindingMaster records
             print(f"Marking FindingMaster records as deleted for target_id: {target_repository_id}")
+            removed_findings = [finding.to_mongo() for finding in finding_master_queryset]
             result_finding_master = finding_master_queryset.update(
                 set__isdeleted=True, set__updated=current_time
             )
             print(f"Marked {result_finding_master} FindingMaster records as deleted.")
+            update_finding_stats(removed=removed_findings)
 
             # Mark the Repository object as deleted
             print(f"Marking Repository record as deleted for target_repository_id: {target_repository_id}")
             repository_obj.isdeleted = True
             repository_obj.deleted_at = current_time
             repository_obj.save()
+            sync_target_summary(repository_obj)
             print(f"Marked Repository record as deleted for target_repository_id: {target_repository_id}")
 
             return {'success': f'Repository record with ID {target_repository_id} has been marked as deleted'}, '200 Ok'
@@ -5,6 +5,7 @@ from entities.CyberServiceEntity import DomainWapiti1, Compliance,Samm
 from typing import List
 import uuid, json
 from datetime import datetime, timezone
+from .utility.compliance.samm_coverage import read_samm_coverage, invalidate_samm_coverage
 
 class SammController():
     """
@@ -185,6 +186,7 @@ class SammController():
             )
         # Save the new Samm entity
             new_samm_obj.save()
+            invalidate_samm_coverage()
             return {'success': 'Samm entity created successfully', 'data': new_samm_obj.to_json()}, '201 Created'
         except Exception as e:
             return {'error': f'Error creating Samm entity: {str(e)}'}, '500 Internal Server Error'
@@ -214,6 +216,7 @@ class SammController():
                 return {'error': 'No valid fields provided for update'}, 400
             samm_record = Samm.objects.get(samm_id=samm_id)
             samm_record.update(**updated_data)
+            invalidate_samm_coverage()
             updated_record = Samm.objects.get(samm_id=samm_id)
             response = json.loads(updated_record.to_json())
             return response, 200
@@ -229,6 +232,7 @@ class SammController():
         try:
             samm_entity = Samm.objects.get(samm_id=samm_id)
             samm_entity.delete()
+            invalidate_samm_coverage()
             return {'success': f'Samm entity with _id: {samm_id} deleted successfully'}, '200 Ok'
         except DoesNotExist:
             return {'error': f'No Samm entity found with _id: {samm_id}'}, '404 Not Found'
@@ -256,60 +260,8 @@ class SammController():
         verify_jwt_in_request()
 
         try:
-            pipeline = [
-                {
-                    "$lookup": {
-                        "from": "FrameworkScannerMapping",
-                        "localField": "_id",
-                        "foreignField": "framework_id",
-                        "as": "framework_scanner_mapping"
-                    }
-                },
-                {
-                    "$unwind": {
-                        "path": "$framework_scanner_mapping",
-                        "preserveNullAndEmptyArrays": True
-                    }
-                },
-                {
-                    "$lookup": {
-                        "from": "ScannerTypes",
-                        "localField": "framework_scanner_mapping.scanner_type_id",
-                        "foreignField": "_id",
-                        "as": "scanner_types"
-                    }
-                },
-                {
-                    "$lookup": {
-                        "from": "FindingMaster",
-                        "let": {
-                            "scanner_types_ids": "$scanner_types._id",
-                            "project_id": project_id
-                        },
-                        "pipeline": [
-                            {
-                                "$match": {
-                                    "$expr": {
-                                        "$and": [
-                                            {"$in": ["$scan_type_id", "$$scanner_types_ids"]},
-                                            {"$eq": ["$project_id", "$$project_id"]}
-                                        ]
-                                    }
-                                }
-                            }
-                        ],
-                        "as": "matched_findings"
-                    }
-                },
-                {
-                    "$project": {
-                        "isdeleted": 0
-                    }
-                }
-            ]
-
-            # Execute query on Samm collection
-            samm_list = list(Samm.objects.aggregate(*pipeline))
+            # Cached per project, the findings are summarized as counts per scan type and severity
+            samm_list = read_samm_coverage(project_id)
 
             return {'success': 'Records fetched successfully', 'data': samm_list}, '200 Ok'
         
@@ -25,6 +25,9 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from pymongo import MongoClient
 import re
 from entities.CyberServiceEntity import ScanTargetType, ScannerTypes
+from controllers.utility.ScanTypeResolver import invalidateScanTypeCache
+from controllers.utility.compliance.samm_coverage import invalidate_samm_coverage
+from controllers.utility.compliance.compliance_summary import invalidate_compliance_summaries
 from enum import Enum
 class ScanTargetType(Enum):
     REPO = 'repo'
@@ -299,6 +302,9 @@ class ScannerTypeController():
             )
             scanner_type_entity.save()
             created_entities.append(json.loads(scanner_type_entity.to_json()))
+        invalidateScanTypeCache()
+        invalidate_samm_coverage()
+        invalidate_compliance_summaries()
 
         return jsonify({"message": "Scanner types created successfully", "data": created_entities}), 201
 
@@ -335,6 +341,9 @@ class ScannerTypeController():
                 scanner_type_entity.updated = datetime.now(timezone.utc)
                 scanner_type_entity.updator = current_user
         scanner_type_entity.save()
+        invalidateScanTypeCache()
+        invalidate_samm_coverage()
+        invalidate_compliance_summaries()
         return jsonify({"message": "Scanner type updated successfully", "data": json.loads(scanner_type_entity.to_json())}), 200
 
 
@@ -345,6 +354,9 @@ class ScannerTypeController():
             scanner_type_entity = ScannerTypes.objects.get(scan_type_id=scanner_ids)
             print("entity",scanner_type_entity)
             scanner_type_entity.soft_delete()  
+            invalidateScanTypeCache()
+            invalidate_samm_coverage()
+            invalidate_compliance_summaries()
             return {'success': 'Scanner type deleted successfully'}, '200 Ok'
         except DoesNotExist as e:
             return {'error': 'Scanner type not found: ' + str(e)}, '404 Not Found'
@@ -5,26 +5,41 @@ from controllers.util import *
 import uuid
 from datetime import datetime, timezone
 import json
-from entities.CyberServiceEntity import Contract, Scans, RawScanOutput, RepositoryTrivy1, LanguagesAndFramework, RepoSmartContractSlither1, TargetAzureCloud, CloudCloudSploitAzure1, FindingSBOMVulnerability, FindingLicense
-from entities.CyberServiceEntity import FindingMaster, DomainWapiti1, DomainZap1, FixRecommendations, RawScanOutput, ScannerTypes, Scanners, Domain, RepoSecretDetections, Repository, FindingLicensesAndSbom, TargetGoogleCloud, CloudCloudSploitGoogle1
+from entities.CyberServiceEntity import Contract, Scans, RepositoryTrivy1, LanguagesAndFramework, RepoSmartContractSlither1, TargetAzureCloud, CloudCloudSploitAzure1, FindingSBOMVulnerability, FindingLicense
+from entities.CyberServiceEntity import FindingMaster, DomainWapiti1, DomainZap1, ScannerTypes, Scanners, Domain, RepoSecretDetections, Repository, TargetGoogleCloud, CloudCloudSploitGoogle1
 from typing import List
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from .utility.zap.zap_scanner import run_zap_scan
-from .utility.FindScanTypeId import findScanTypeId
+from .utility.ScanTypeResolver import resolveScanTypeId, resolveScanTypeIds
+from .utility.findings.finding_batch import FindingBatch
+from .utility.findings.fingerprint import finding_fingerprint
+from .utility.storage.raw_output_store import store_raw_scan_output
+from .utility.sbom.sbom_reconcile import reconcile_sbom, vulnerability_fields, license_fields
+from .utility.compliance.compliance_summary import refresh_compliance_summary
+from .utility.db.lean_queries import find_document, find_documents
 import shutil
 import tempfile
 import subprocess
 import time
 import base64
-import re, os
+import os
 from openai import OpenAI
 from .utility.zap.zap_scanner import run_zap_scan, convert_raw_output
-from .utility.trivy.trivy_scanner import run_trivy_scan, convert_trivy_output, run_package_licenses_scan, run_licenses_and_sbom_scan
-from .utility.FindDuplicateFindingAndLink import findDuplicateFindingAndLink, findDuplicateFindingAndLinkForLanguages, findDuplicateFindingAndLinkForSmartContract
+from .utility.gitleaks.gitleaks_scanner import run_gitleaks_scan, convert_gitleaks_report
+from .utility.trivy.trivy_scanner import run_trivy_combined_scan, convert_trivy_output
+from .utility.trivy.trivy_db import start_trivy_db_updater, trivy_db_version
+from .utility.llm.llm_cache import cached_chat_completion, normalize_input
+from .utility.FindDuplicateFindingAndLink import findDuplicateFindingAndLinkForLanguages
 from .utility.cloudsploit.azure_cloud_scanner import run_azure_cloud_scan, convert_structured_azure_output, map_scan_type_id
 from .utility.cloudsploit.google_cloud_scanner import run_google_cloud_scan, convert_structured_google_output
 from .utility.slither.slither_scanner import detect_imported_dependencies, install_dependencies, resolve_local_imports, set_solc_version, extract_solidity_version, rename_directories_with_spaces, chunk_data, process_smart_contract_with_gpt
+from .utility.git.repo_cache import checkout_from_mirror, clone_from_remote, REPO_CACHE_ENABLED
+from .utility.git.clone_strategy import select_clone_strategy, CLONE_STRATEGY_FULL
+from .utility.git.incremental_scan import head_commit, last_scanned_commits, plan_incremental_scan, link_findings_forward, record_scanned_commit, INCREMENTAL_SCANNERS, SCAN_MODE_SKIP, SCAN_MODE_RANGE
+from .utility.jobs.scan_job_queue import enqueue_scan_job, SCAN_JOB_PRIORITY_INTERACTIVE, SCAN_JOB_PRIORITY_SCHEDULED
+from .utility.jobs.scan_worker_pool import ScanWorkerPool, SCAN_WORKER_CONCURRENCY
 from controllers.RepositoryController import RepositoryProvider
+import threading
 from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
@@ -35,6 +50,26 @@ openai_api_key = os.getenv('OPENAI_API_KEY')
 # Set your OpenAI API key
 client = OpenAI(api_key=openai_api_key)
 
+# Bump when the prompt template changes, cached responses of older versions are then ignored
+WAPITI_PROMPT_VERSION = 'wapiti-findings:3'
+
+
+def wapiti_fingerprint(result):
+    """
+    Fingerprints a structured Wapiti finding by what Wapiti reported (alert,
+    URL, parameters, method) rather than by the wording of the LLM summary.
+    """
+    details = result.get('detailed_findings') or [{}]
+    detail = details[0]
+    affected_parameters = sorted({str(parameter) for detail in details for parameter in detail.get('affected_parameters') or []})
+    return finding_fingerprint('wapiti', detail.get('alert_name') or detail.get('vulnerability_type'),
+                               f"{detail.get('http_method', '')} {result.get('target', '')} {','.join(affected_parameters)}")
+
+# Scans are run by the separate worker process (python -m worker). Single-box
+# setups can run the worker pool inside the API process instead.
+scan_worker_in_api_process = os.getenv('SCAN_WORKER_IN_API_PROCESS', 'false').lower() == 'true'
+scan_worker_pool = None
+scan_worker_pool_lock = threading.Lock()
 
 class ScansController():
     """
@@ -54,28 +89,19 @@ class ScansController():
             print("run_command_error", e)
             return f"Error running command: {str(e)}. Output: {e.output}"
 
-    def clone_github_repo(self, repo_url, access_token, repository_provider):
-        temp_dir = tempfile.mkdtemp()
-
+    def clone_github_repo(self, repo_url, access_token, repository_provider, clone_strategy=CLONE_STRATEGY_FULL):
+        auth_url = repo_url
         if access_token is not None:
             if repository_provider == RepositoryProvider.GITLAB.value:
-                repo_url = repo_url.replace("gitlab.com", f"oauth2:{access_token}@gitlab.com")
+                auth_url = repo_url.replace("gitlab.com", f"oauth2:{access_token}@gitlab.com")
             elif repository_provider == RepositoryProvider.GITHUB.value:
-                repo_url = repo_url.replace("github.com", f"{access_token}@github.com")
-
-        clone_command = f"git clone {repo_url} {temp_dir}"
-        clone_output = self.run_command(clone_command)
-
-        git_dir = os.path.join(temp_dir, ".git")
-        if not os.path.exists(git_dir):
-            shutil.rmtree(temp_dir)
-            return None, f"Error: {clone_output}. Git repository not found."
-
-        if "Error" in clone_output:
-            shutil.rmtree(temp_dir)
-            return None, clone_output
+                auth_url = repo_url.replace("github.com", f"{access_token}@github.com")
 
-        return temp_dir, clone_output
+        print(f"Cloning {repo_url} with the '{clone_strategy}' strategy")
+        if REPO_CACHE_ENABLED:
+            # Working copy is materialized from the shared bare mirror of the repository
+            return checkout_from_mirror(repo_url, auth_url, clone_strategy)
+        return clone_from_remote(repo_url, auth_url, clone_strategy)
     
     def list_solidity_files_in_tree(directory):
         """
@@ -132,18 +158,16 @@ class ScansController():
         return contracts_dirs
     
     def get_cloudsploit_scanner_types(self):
-        try:
-            # Fetch the scanner object where the name is 'Cloudsploit'
-            cloudsploit_scanner = Scanners.objects.get(name="Cloudsploit")
-            scanner_id = cloudsploit_scanner.id
-        except DoesNotExist:
+        # Fetch the scanner object where the name is 'Cloudsploit'
+        scanner = find_document(Scanners, {'name': "Cloudsploit"}, ['_id'])
+        if not scanner:
             print("Scanner 'Cloudsploit' not found")
             return None
+        scanner_id = scanner['_id']
 
         # Fetch the related scanner types if the scanner_id exists
         if scanner_id:
-            scanner_types = ScannerTypes.objects(scanner_ids=scanner_id)
-            scanner_types_data = json.loads(scanner_types.to_json())
+            scanner_types_data = find_documents(ScannerTypes, {'scanner_ids': scanner_id}, ['scan_type'])
             # Collect a list of dictionaries with scanner_type_id and scan_type
             scan_types_list = [{
                 'scanner_type_id': str(scanner_type.get('_id')),
@@ -155,18 +179,16 @@ class ScansController():
             return None
         
     def get_wapiti_scanner_types(self):
-        try:
-            # Fetch the scanner object where the name is 'Wapiti'
-            Wapiti_scanner = Scanners.objects.get(name="Wapiti")
-            scanner_id = Wapiti_scanner.id
-        except DoesNotExist:
+        # Fetch the scanner object where the name is 'Wapiti'
+        scanner = find_document(Scanners, {'name': "Wapiti"}, ['_id'])
+        if not scanner:
             print("Scanner 'Wapiti' not found")
             return None
+        scanner_id = scanner['_id']
 
         # Fetch the related scanner types if the scanner_id exists
         if scanner_id:
-            scanner_types = ScannerTypes.objects(scanner_ids=scanner_id)
-            scanner_types_data = json.loads(scanner_types.to_json())
+            scanner_types_data = find_documents(ScannerTypes, {'scanner_ids': scanner_id}, ['scan_type'])
             # Collect a list of dictionaries with scanner_type_id and scan_type
             scan_types_list = [{
                 'scanner_type_id': str(scanner_type.get('_id')),
@@ -177,116 +199,118 @@ class ScansController():
         else:
             return None
 
-    def delete_by_project_id(self, project_id):
-        # Filter the records that match the project_id
-        records_to_delete = FindingLicensesAndSbom.objects(project_id=project_id)
-        
-        # Delete the filtered records
-        if records_to_delete:
-            deletion_count = records_to_delete.delete()  # This will return the number of documents deleted
-            print(f"Deleted {deletion_count} records with project_id: {project_id}")
+    def add_entity(self, request):
+        print("#requestttt", request)
+        scheduler_secret = request.get('scheduler_secret', '')
+        if scheduler_secret:
+            current_user = "Google Cloud Scheduler"
         else:
-            print(f"No records found with project_id: {project_id}")
-
-    def generate_google_cloud_config(self, google_cloud_data):
-        google_cloud_target_id = google_cloud_data[0].get('_id')
-        print("Extracted google_cloud_target_id:", google_cloud_target_id)
-        # Map the google_cloud_data fields to the required JSON structure
-        azure_credentials = {
-            "type": google_cloud_data[0]['type'],
-            "project_id": google_cloud_data[0]['gcp_project_id'],
-            "private_key_id": google_cloud_data[0]['private_key_id'],
-            "private_key": google_cloud_data[0]['private_key'],
-            "client_email": google_cloud_data[0]['client_email'],
-            "client_id": google_cloud_data[0]['client_id'],
-            "auth_uri": google_cloud_data[0]['auth_uri'],
-            "token_uri": google_cloud_data[0]['token_uri'],
-            "auth_provider_x509_cert_url": google_cloud_data[0]['auth_provider_x509_cert_url'],
-            "client_x509_cert_url": google_cloud_data[0]['client_x509_cert_url'],
-            "universe_domain": google_cloud_data[0]['universe_domain']
-        }
-        # Create a JSON file in the system temporary directory
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.json', mode='w') as temp_file:
-            json.dump(azure_credentials, temp_file, indent=4)
-            temp_file_path = temp_file.name
+            # Fetching user id from jwt token and validate jwt token
+            current_user = get_current_user_from_jwt_token()
+            if not current_user:
+                return jsonify({"error": "Unauthorized"}), 401
+        print("current_user", current_user)
+        # request_json = request.get_json()
+        scheduler_details = request.get('scheduler_response', '')
+        scheduler_id = scheduler_details.get('_id', '')
+        project_id = scheduler_details.get('project_id')
+        status = request.get('scan_status', '')
+        scanner_type_ids_list = scheduler_details.get('scanner_type_ids_list', '')
 
-        print(f"Temporary JSON file created at: {temp_file_path}")
+        # Creating the Scans entry
+        scans_obj = Scans(
+            scan_id=str(uuid.uuid4()),
+            scheduler_id=scheduler_id,
+            project_id=project_id,
+            status=status,
+            execution_date=datetime.now(timezone.utc),
+            duration=None,
+            created=datetime.now(timezone.utc),
+            creator=current_user,
+        )
 
-        cloudsploit_base_path = os.getenv('CLOUDSPLOIT_CLONE_PATH')
-        # Path to config_example.js
-        google_cloudsploit_config_path = os.path.join(cloudsploit_base_path, "config_example.js")
 
+        # Save the entity to the database
+        scans_obj.save()
+        response = json.loads(scans_obj.to_json())
+        scan_id = scans_obj.scan_id
+        # Queue the scan; targets are resolved by the worker that claims the job
+        priority = SCAN_JOB_PRIORITY_SCHEDULED if scheduler_secret else SCAN_JOB_PRIORITY_INTERACTIVE
+        scan_job_obj = enqueue_scan_job(scan_id, project_id, {'scanner_type_ids_list': scanner_type_ids_list or []}, current_user, priority)
+        response['scan_job_id'] = scan_job_obj.scan_job_id
+        if scan_worker_in_api_process:
+            self.start_worker_pool()
+        return jsonify({"message": "Scans created successfully", "data": response}), 201
+
+    def start_worker_pool(self, concurrency=SCAN_WORKER_CONCURRENCY):
+        """
+        Starts the bounded pool of scan workers for this process, once.
+        """
+        global scan_worker_pool
+        with scan_worker_pool_lock:
+            if scan_worker_pool is None:
+                # Keeps the shared vulnerability DB warm so scans never download it
+                start_trivy_db_updater()
+                scan_worker_pool = ScanWorkerPool(self.run_scan_job, concurrency=concurrency)
+                scan_worker_pool.start()
+        return scan_worker_pool
+
+    def run_scan_job(self, scan_job):
+        """
+        Handler for a leased ScanJobs document: resolves the project targets and
+        scanners and runs the scan. Returns None on success or the scan error.
+        """
+        project_id = scan_job.project_id
+        scan_id = scan_job.scan_id
+        payload = scan_job.payload or {}
+        current_user = scan_job.creator
 
-        # Read the content of config_example.js
-        with open(google_cloudsploit_config_path, 'r') as file:
-            config_content = file.read()
+        Scans.objects.filter(scan_id=scan_id).update(status='running', updated=datetime.now(timezone.utc))
 
-        # Save the original content to restore later
-        google_cloudsploit_original_content = config_content   
-        
-        # Regex to find the azure section and uncomment the 'credential_file' line, then update the value
-        google_credential_pattern = re.compile(
-            r"(google:\s*{[^}]*?)//\s*credential_file:\s*process\.env\.GOOGLE_APPLICATION_CREDENTIALS\s*\|\|\s*'[^']*'([^}]*})", 
-            re.DOTALL
-        )
+        scan_context, error = self.build_scan_context(project_id, payload.get('scanner_type_ids_list', []))
+        if error:
+            Scans.objects.filter(scan_id=scan_id).update(status='error', updated=datetime.now(timezone.utc))
+            return error
 
-        # Replace the commented credential_file with the new path and uncomment it
-        updated_content = google_credential_pattern.sub(
-            rf"\1credential_file: '{temp_file_path}'\2", config_content
-        )
+        result = self.run_scan(project_id=project_id, scan_id=scan_id, current_user=current_user, **scan_context)
+        if result:
+            return result[0]
+        return None
 
-        # Write the updated content back to config_example.js
-        with open(google_cloudsploit_config_path, 'w') as file:
-            file.write(updated_content)
+    def build_scan_context(self, project_id, scanner_type_ids_list):
+        """
+        Loads the scanners selected for a scan and the targets of the project,
+        CloudSploit configs are generated per scan by the cloud scanners.
 
-        print(f"Updated 'credential_file' in {google_cloudsploit_config_path} to: {temp_file_path}")
-        return google_cloud_data, google_cloud_target_id, google_cloudsploit_config_path, google_cloudsploit_original_content
-    
-    def add_entity(self, request):
+        Returns:
+            tuple: (keyword arguments for run_scan, error dict or None)
+        """
         domain_url =''
         repo_url =''
-        contract_url = ''
+        contract_label = None
         contract_target_id = ''
         repo_target_id = ''
         domain_target_id = ''
         access_token =''
         is_private_repo= None
         repository_provider=''
+        azure_cloud_data = []
         azure_cloud_target_id= ''
+        google_cloud_data = []
         google_cloud_target_id= ''
-        cloudsploit_config_path= ''
-        cloudsploit_original_content = None
-        contract_label = None
-        google_cloudsploit_config_path = ''
-        google_cloudsploit_original_content = None
-        print("#requestttt", request)
-        scheduler_secret = request.get('scheduler_secret', '')
-        if scheduler_secret:
-            current_user = "Google Cloud Scheduler"
-        else:
-            # Fetching user id from jwt token and validate jwt token
-            current_user = get_current_user_from_jwt_token()
-            if not current_user:
-                return jsonify({"error": "Unauthorized"}), 401
-        print("current_user", current_user)
-        # request_json = request.get_json()
-        scheduler_details = request.get('scheduler_response', '')
-        scheduler_id = scheduler_details.get('_id', '')
-        project_id = scheduler_details.get('project_id')
-        status = request.get('scan_status', '')
+        scanner_types_data = []
+        matching_scanners = []
 
-        scanner_type_ids_list = scheduler_details.get('scanner_type_ids_list', '')
         print("scanner_type_ids_list", scanner_type_ids_list)
         if scanner_type_ids_list:
             try:
                 # Convert string to ObjectId if needed
-                scanner_types_obj = ScannerTypes.objects(scan_type_id__in=scanner_type_ids_list)
-                scanner_types_data = json.loads(scanner_types_obj.to_json())
+                scanner_types_data = find_documents(ScannerTypes, {'_id': {'$in': scanner_type_ids_list}}, ['scanner_ids'])
                 print("scanner_types_data", scanner_types_data)
                 # return {'success': 'Record Deleted Successfully'}, '200 Ok'
             except Exception as e:
                 print("Exception", e)
-                return {'error': 'Unexpected error: ' + str(e)}, '500 Internal Server Error'
+                return None, {'error': 'Unexpected error: ' + str(e)}
 
         if scanner_types_data:
             # Step 1: Extract all scanner_ids from each dictionary
@@ -300,8 +324,7 @@ class ScansController():
             # Step 3: Query the Scanners table for all matching scanner_ids
             # Assuming you're using MongoEngine or a similar ORM
             try:
-                matching_scanners_obj = Scanners.objects(scanner_id__in=unique_scanner_ids)
-                matching_scanners = json.loads(matching_scanners_obj.to_json())
+                matching_scanners = find_documents(Scanners, {'_id': {'$in': unique_scanner_ids}}, ['name'])
                 print("################",matching_scanners) 
             except Exception as e:
                 print(f"An error occurred while querying Scanners: {e}")
@@ -309,8 +332,8 @@ class ScansController():
         unique_scanner_names_list = list({scanner['name'] for scanner in matching_scanners})
         if project_id:
             try:
-                domain_obj = Domain.objects(project_id=project_id)
-                domain_data = json.loads(domain_obj.to_json())
+                # Only the first target of each kind is scanned
+                domain_data = find_documents(Domain, {'project_id': project_id}, ['domain_url'], limit=1)
                 
                 print("domain_data:", domain_data)
                 # Extract domain_url from the first element in the list
@@ -320,8 +343,7 @@ class ScansController():
                     print("Extracted domain_url:", domain_url)
                     print("Extracted domain_target_id:", domain_target_id)
 
-                repo_obj = Repository.objects(project_id=project_id)
-                repo_data = json.loads(repo_obj.to_json())
+                repo_data = find_documents(Repository, {'project_id': project_id}, ['repository_provider', 'repository_url', 'access_token', 'is_private_repo'], limit=1)
                 
                 print("repo_data:", repo_data)
                 # Extract domain_url from the first element in the list
@@ -336,8 +358,7 @@ class ScansController():
                     print("Extracted access_token:", access_token)
                     print("Extracted is_private_repo:", is_private_repo)
 
-                contract_obj = Contract.objects(project_id=project_id)
-                contract_data = json.loads(contract_obj.to_json())
+                contract_data = find_documents(Contract, {'project_id': project_id}, ['contract_label', 'contract_url'], limit=1)
 
                 print("contract_data:", contract_data)
                 # Extract contract_label from the first element in the list
@@ -349,85 +370,40 @@ class ScansController():
                     print("Extracted contract_url:", contract_url)
                     print("Extracted contract_target_id:", contract_target_id)
 
-                azure_cloud_obj = TargetAzureCloud.objects(project_id=project_id)
-                azure_cloud_data = json.loads(azure_cloud_obj.to_json())
+                azure_cloud_data = find_documents(TargetAzureCloud, {'project_id': project_id}, limit=1)
                 
                 print("azure_cloud_data:", azure_cloud_data)
                 if azure_cloud_data:
                     azure_cloud_target_id = azure_cloud_data[0].get('_id')
                     print("Extracted azure_cloud_target_id:", azure_cloud_target_id)
-                    # Map the azure_cloud_data fields to the required JSON structure
-                    azure_credentials = {
-                        "ApplicationID": azure_cloud_data[0]['application_id'],
-                        "KeyValue": azure_cloud_data[0]['client_secret_key'],
-                        "DirectoryID": azure_cloud_data[0]['directory_id'],
-                        "SubscriptionID": azure_cloud_data[0]['subscription_id']
-                    }
-                    # Create a JSON file in the system temporary directory
-                    with tempfile.NamedTemporaryFile(delete=False, suffix='.json', mode='w') as temp_file:
-                        json.dump(azure_credentials, temp_file, indent=4)
-                        temp_file_path = temp_file.name
 
-                    print(f"Temporary JSON file created at: {temp_file_path}")
-
-                    cloudsploit_base_path = os.getenv('CLOUDSPLOIT_CLONE_PATH')
-                    # Path to config_example.js
-                    cloudsploit_config_path = os.path.join(cloudsploit_base_path, "config_example.js")
-
-
-                    # Read the content of config_example.js
-                    with open(cloudsploit_config_path, 'r') as file:
-                        config_content = file.read()
-
-                    # Save the original content to restore later
-                    cloudsploit_original_content = config_content   
-                    
-                    # Regex to find the azure section and uncomment the 'credential_file' line, then update the value
-                    azure_credential_pattern = re.compile(
-                        r"(azure:\s*{[^}]*?)//\s*credential_file:\s*'[^']*'([^}]*})", re.DOTALL
-                    )
-
-                    # Replace the commented credential_file with the new path and uncomment it
-                    updated_content = azure_credential_pattern.sub(
-                        rf"\1credential_file: '{temp_file_path}'\2", config_content
-                    )
-
-                    # Write the updated content back to config_example.js
-                    with open(cloudsploit_config_path, 'w') as file:
-                        file.write(updated_content)
-
-                    print(f"Updated 'credential_file' in {cloudsploit_config_path} to: {temp_file_path}")
-
-                google_cloud_obj = TargetGoogleCloud.objects(project_id=project_id)
-                google_cloud_data = json.loads(google_cloud_obj.to_json())
+                google_cloud_data = find_documents(TargetGoogleCloud, {'project_id': project_id}, limit=1)
                 if google_cloud_data:
-                    google_cloud_data, google_cloud_target_id, google_cloudsploit_config_path, google_cloudsploit_original_content = self.generate_google_cloud_config(google_cloud_data)
+                    google_cloud_target_id = google_cloud_data[0].get('_id')
+                    print("Extracted google_cloud_target_id:", google_cloud_target_id)
 
             except Exception as e:
                 print("Exception:", e)
-                return {'error': 'Unexpected error: ' + str(e)}, '500 Internal Server Error'
+                return None, {'error': 'Unexpected error: ' + str(e)}
             
-        # Creating the Scans entry
-        scans_obj = Scans(
-            scan_id=str(uuid.uuid4()),
-            scheduler_id=scheduler_id,
-            project_id=project_id,
-            status=status,
-            execution_date=datetime.now(timezone.utc),
-            duration=None,
-            created=datetime.now(timezone.utc),
-            creator=current_user,
-        )
-
-
-        # Save the entity to the database
-        scans_obj.save()
-        response = json.loads(scans_obj.to_json())
-        scan_id = response.get('_id', '')
-        # Run the scan asynchronously
-        executor = ThreadPoolExecutor()
-        executor.submit(self.run_scan, project_id, scan_id, domain_target_id, domain_url, repo_target_id, repo_url, access_token, contract_target_id, contract_label, unique_scanner_names_list, matching_scanners, current_user, is_private_repo, azure_cloud_data, azure_cloud_target_id, cloudsploit_config_path, cloudsploit_original_content, google_cloud_data, google_cloud_target_id, google_cloudsploit_config_path, google_cloudsploit_original_content, repository_provider)
-        return jsonify({"message": "Scans created successfully", "data": "response"}), 201
+        scan_context = {
+            'domain_target_id': domain_target_id,
+            'domain_url': domain_url,
+            'repo_target_id': repo_target_id,
+            'repo_url': repo_url,
+            'access_token': access_token,
+            'contract_target_id': contract_target_id,
+            'contract_label': contract_label,
+            'unique_scanner_names_list': unique_scanner_names_list,
+            'matching_scanners': matching_scanners,
+            'is_private_repo': is_private_repo,
+            'azure_cloud_data': azure_cloud_data,
+            'azure_cloud_target_id': azure_cloud_target_id,
+            'google_cloud_data': google_cloud_data,
+            'google_cloud_target_id': google_cloud_target_id,
+            'repository_provider': repository_provider,
+        }
+        return scan_context, None
 
     def fetch_all(self, request, fields) -> List[dict]:
         """
@@ -456,7 +432,7 @@ class ScansController():
         response = scans_list
         return {'success': 'Records Fetched Successfully', 'data': response}, '200 Ok'
     
-    def run_scan(self, project_id, scan_id, domain_target_id, domain_url, repo_target_id, repo_url, access_token, contract_target_id, contract_label, unique_scanner_names_list, matching_scanners, current_user, is_private_repo, azure_cloud_data, azure_cloud_target_id, cloudsploit_config_path, cloudsploit_original_content, google_cloud_data, google_cloud_target_id, google_cloudsploit_config_path, google_cloudsploit_original_content, repository_provider):
+    def run_scan(self, project_id, scan_id, domain_target_id, domain_url, repo_target_id, repo_url, access_token, contract_target_id, contract_label, unique_scanner_names_list, matching_scanners, current_user, is_private_repo, azure_cloud_data, azure_cloud_target_id, google_cloud_data, google_cloud_target_id, repository_provider):
         print("Inside domain run scan")
         print("project_id", project_id)
         print("scan_id", scan_id)
@@ -475,65 +451,74 @@ class ScansController():
         print("google_cloud_target_id", google_cloud_target_id)
         print("repository_provider", repository_provider)
         
+        repo_path = None
+        commit_sha = None
+        incremental_plan = {}
+        # Read once, so the version a skip is decided on is the one recorded
+        db_version = trivy_db_version() if 'Trivy' in unique_scanner_names_list else None
         if repo_url: 
             try:
-                repo_path, clone_output = self.clone_github_repo(repo_url, access_token, repository_provider)
+                # Scanners with a previously scanned commit only look at what changed since
+                previous_commits = last_scanned_commits(repo_target_id, unique_scanner_names_list)
+                clone_strategy = select_clone_strategy(unique_scanner_names_list, needs_history=bool(previous_commits))
+                repo_path, clone_output = self.clone_github_repo(repo_url, access_token, repository_provider, clone_strategy)
                 if not repo_path:
                     print("clone_output" , clone_output)
                     print("Failed to clone repository")
                     # return None, f"Failed to clone repository: {clone_output}"
+                else:
+                    commit_sha = head_commit(repo_path)
+                    incremental_plan = plan_incremental_scan(repo_path, commit_sha, previous_commits, db_version)
+                    print("commit_sha", commit_sha, "incremental_plan", incremental_plan)
             except Exception as e:
                 print("Exception:", e)
                 # return {'error': 'Unexpected error: ' + str(e)}, '500 Internal Server Error'
 
-        scan_futures = []
+        scan_futures = {}
         with ThreadPoolExecutor() as executor:
             # Submit scanner tasks based on scanner_names_mapped
             if repo_url:
-                if 'Linguist' in unique_scanner_names_list:
+                if 'Linguist' in unique_scanner_names_list and self.scanner_mode(incremental_plan, 'Linguist') != SCAN_MODE_SKIP:
                     linguist_id = next((scanner['_id'] for scanner in matching_scanners if scanner['name'] == 'Linguist'), None)
-                    scan_futures.append(executor.submit(
-                        self.run_linguist, project_id, scan_id, repo_target_id, repo_path, current_user, linguist_id))
+                    scan_futures[executor.submit(
+                        self.run_linguist, project_id, scan_id, repo_target_id, repo_path, current_user, linguist_id)] = 'Linguist'
                 # if 'Slither' in unique_scanner_names_list:
                 #     slither_scanner_id = next((scanner['_id'] for scanner in matching_scanners if scanner['name'] == 'Slither'), None)
                 #     scan_futures.append(executor.submit(
                 #         self.run_slither, project_id, scan_id, repo_target_id, slither_scanner_id, current_user))
-                if 'Gitleaks' in unique_scanner_names_list:
+                if 'Gitleaks' in unique_scanner_names_list and self.scanner_mode(incremental_plan, 'Gitleaks') != SCAN_MODE_SKIP:
                     gitleaks_scanner_id = next((scanner['_id'] for scanner in matching_scanners if scanner['name'] == 'Gitleaks'), None)
-                    scan_futures.append(executor.submit(
-                        self.run_gitleaks, project_id, scan_id, repo_target_id, repo_path, gitleaks_scanner_id, current_user))
-                if 'Trivy' in unique_scanner_names_list:
+                    since_commit = incremental_plan['Gitleaks'][1] if self.scanner_mode(incremental_plan, 'Gitleaks') == SCAN_MODE_RANGE else None
+                    scan_futures[executor.submit(
+                        self.run_gitleaks, project_id, scan_id, repo_target_id, repo_path, gitleaks_scanner_id, current_user, since_commit)] = 'Gitleaks'
+                if 'Trivy' in unique_scanner_names_list and self.scanner_mode(incremental_plan, 'Trivy') != SCAN_MODE_SKIP:
                     trivy_scanner_id = next((scanner['_id'] for scanner in matching_scanners if scanner['name'] == 'Trivy'), None)
-                    scan_futures.append(executor.submit(
-                        self.run_trivy_vulnerability, project_id, scan_id, repo_target_id, repo_url, current_user, trivy_scanner_id, access_token, is_private_repo))
-                    scan_futures.append(executor.submit(
-                        self.run_licenses_sbom_scan, project_id, scan_id, repo_target_id, repo_url, repo_path, current_user, trivy_scanner_id, access_token, is_private_repo))
-                    scan_futures.append(executor.submit(
-                        self.run_licenses_scan, project_id, scan_id, repo_target_id, repo_url, repo_path, current_user, trivy_scanner_id, access_token, is_private_repo))
+                    scan_futures[executor.submit(
+                        self.run_trivy, project_id, scan_id, repo_target_id, repo_path, current_user, trivy_scanner_id, access_token, is_private_repo)] = 'Trivy'
             if domain_url:
                 if 'Zap' in unique_scanner_names_list:
                     zap_scanner_id = next((scanner['_id'] for scanner in matching_scanners if scanner['name'] == 'Zap'), None)
-                    scan_futures.append(executor.submit(
-                        self.run_zap, project_id, scan_id, domain_target_id, domain_url, zap_scanner_id, current_user))
+                    scan_futures[executor.submit(
+                        self.run_zap, project_id, scan_id, domain_target_id, domain_url, zap_scanner_id, current_user)] = 'Zap'
                 if 'Wapiti' in unique_scanner_names_list:
                     wapiti_scanner_id = next((scanner['_id'] for scanner in matching_scanners if scanner['name'] == 'Wapiti'), None)
-                    scan_futures.append(executor.submit(
-                        self.run_wapiti, project_id, scan_id, domain_target_id, domain_url, current_user, wapiti_scanner_id))
+                    scan_futures[executor.submit(
+                        self.run_wapiti, project_id, scan_id, domain_target_id, domain_url, current_user, wapiti_scanner_id)] = 'Wapiti'
             if azure_cloud_data:
                 if 'Cloudsploit' in unique_scanner_names_list:
                     azure_scanner_id = next((scanner['_id'] for scanner in matching_scanners if scanner['name'] == 'Cloudsploit'), None)
-                    scan_futures.append(executor.submit(
-                        self.run_cloudsploit, project_id, scan_id, azure_cloud_target_id, azure_cloud_data, azure_scanner_id, current_user, cloudsploit_config_path, cloudsploit_original_content))
+                    scan_futures[executor.submit(
+                        self.run_cloudsploit, project_id, scan_id, azure_cloud_target_id, azure_cloud_data, azure_scanner_id, current_user)] = 'Cloudsploit'
             if google_cloud_data:
                 if 'Cloudsploit' in unique_scanner_names_list:
                     google_scanner_id = next((scanner['_id'] for scanner in matching_scanners if scanner['name'] == 'Cloudsploit'), None)
-                    scan_futures.append(executor.submit(
-                        self.run_cloudsploit_for_google, project_id, scan_id, google_cloud_target_id, google_cloud_data, google_scanner_id, current_user, google_cloudsploit_config_path, google_cloudsploit_original_content))
+                    scan_futures[executor.submit(
+                        self.run_cloudsploit_for_google, project_id, scan_id, google_cloud_target_id, google_cloud_data, google_scanner_id, current_user)] = 'Cloudsploit'
             if contract_label:
                 if 'Slither' in unique_scanner_names_list:
                     slither_scanner_id = next((scanner['_id'] for scanner in matching_scanners if scanner['name'] == 'Slither'), None)
-                    scan_futures.append(executor.submit(
-                        self.run_slither, project_id, scan_id, contract_target_id, slither_scanner_id, current_user))
+                    scan_futures[executor.submit(
+                        self.run_slither, project_id, scan_id, contract_target_id, slither_scanner_id, current_user)] = 'Slither'
             # if 'Amass' in scanner_ids:
             #     scan_futures.append(executor.submit(
             #         self.run_amass, raw_scan_output_id, domain, current_user, scanner_ids_length))
@@ -550,20 +535,50 @@ class ScansController():
             #     scan_futures.append(executor.submit(
             #         self.run_nikto, raw_scan_output_id, domain, current_user, scanner_ids_length))
 
+        # The executor has waited for every scanner, the working copy is no longer needed
+        if repo_path:
+            shutil.rmtree(repo_path, ignore_errors=True)
+
         # Wait for all scanners to complete
+        scan_error = None
+        # Skipped scanners are done on this commit, the others once their future succeeds
+        succeeded = {scanner_name for scanner_name in incremental_plan if self.scanner_mode(incremental_plan, scanner_name) == SCAN_MODE_SKIP}
         for future in as_completed(scan_futures):
+            scanner_name = scan_futures[future]
             try:
                 result = future.result()
-                if isinstance(result, dict) and "error" in result:
-                    # If any scan has an error, update the scan status and return the error
-                    print(f"Error in scan: {result['error']}")
-                    Scans.objects.filter(scan_id=scan_id).update(status='error', updated=datetime.now(timezone.utc))
-                    return result, 500  # Return error response here
+                error = self.scanner_error(result)
+                if error:
+                    print(f"Error in {scanner_name} scan: {error}")
+                    scan_error = scan_error or {'error': error}
+                    continue
+                succeeded.add(scanner_name)
                 print("Task completed with result:", result)
             except Exception as e:
                 print(f"Exception in thread execution: {e}")
-                Scans.objects.filter(scan_id=scan_id).update(status='error', updated=datetime.now(timezone.utc))
-                return {"error": f"Unexpected error in scan: {str(e)}"}, 500
+                scan_error = scan_error or {"error": f"Unexpected error in scan: {str(e)}"}
+
+        # Findings that were not re-computed still belong to this scan, only for
+        # the scanners that confirmed them
+        for scanner_name in incremental_plan:
+            if scanner_name in succeeded:
+                link_findings_forward(project_id, repo_target_id, scanner_name, scan_id, current_user)
+
+        # The next scan of the repository diffs against this commit, only for the
+        # scanners that completed on it
+        if commit_sha:
+            for scanner_name in INCREMENTAL_SCANNERS:
+                if scanner_name in unique_scanner_names_list and scanner_name in succeeded:
+                    try:
+                        record_scanned_commit(project_id, repo_target_id, scanner_name, commit_sha, scan_id, current_user,
+                                              db_version if scanner_name == 'Trivy' else None)
+                    except Exception as e:
+                        print(f"Error recording scanned commit for {scanner_name}: {e}")
+
+        if scan_error:
+            # If any scan has an error, update the scan status and return the error
+            Scans.objects.filter(scan_id=scan_id).update(status='error', updated=datetime.now(timezone.utc))
+            return scan_error, 500
 
         # Update the scan status to 'completed' after all threads finish
         try:
@@ -572,6 +587,30 @@ class ScansController():
         except Exception as e:
             print(f"Error updating scan status: {e}")
 
+        try:
+            refresh_compliance_summary(project_id)
+        except Exception as e:
+            print(f"Error refreshing compliance summary: {e}")
+
+        return None
+
+    @staticmethod
+    def scanner_mode(incremental_plan, scanner_name):
+        return incremental_plan.get(scanner_name, (None, None))[0]
+
+    @staticmethod
+    def scanner_error(result):
+        """
+        Returns the error message of a scanner result, or None on success. The
+        scanners report errors as {'error': ...}, ({'error': ...}, status) or
+        (None, message).
+        """
+        if isinstance(result, tuple) and result:
+            if result[0] is None:
+                return result[1] if len(result) > 1 else 'Scan failed'
+            result = result[0]
+        if isinstance(result, dict) and "error" in result:
+            return result['error']
         return None
     
     def run_zap(self, project_id, scan_id, target_id, domain, zap_scanner_id, current_user):
@@ -583,32 +622,23 @@ class ScansController():
         # print("#################structured_op", type(structured_op))
         raw_output_str = json.dumps(raw_output)
         try: 
-            new_raw_scan_op_obj = RawScanOutput(
-                raw_scan_output_id=str(uuid.uuid4()),
-                scan_id= scan_id,
-                scanner_id= zap_scanner_id,
-                output=raw_output_str,
-                created=datetime.now(timezone.utc),
-                creator=current_user)
-            new_raw_scan_op_obj.save()
-            # print("response", json.loads(new_raw_scan_op_obj.to_json()))
-            new_raw_scan_op_data = json.loads(new_raw_scan_op_obj.to_json())
+            new_raw_scan_op_obj = store_raw_scan_output(scan_id, zap_scanner_id, raw_output_str, current_user)
 
         except Exception as e:
             # Catch any other unforeseen exceptions
             print(f"General Exception: {e}")
             return {'error': f'Unexpected error: {str(e)}'}, '500 Internal Server Error'
-        # Process and store the results
+        # Resolve the scan types of all alerts at once
+        scan_type_ids = resolveScanTypeIds(result.get('domain_zap_1_record', {}).get('alert', '') for result in structured_op)
+        # Process and store the results, known alerts are linked on write by their fingerprint
+        finding_batch = FindingBatch(current_user, scan_id)
         for result in structured_op:
             try:
                 domain_zap_1_record_details = result.get('domain_zap_1_record')
                 input_text = domain_zap_1_record_details.get('alert', '')
-                scan_type_id = findScanTypeId(input_text, 'scan_type')
-                is_found = findDuplicateFindingAndLink(project_id, target_id, scan_type_id, result.get('finding_name', ''), scan_id, current_user)
-                if is_found:
-                    continue
+                scan_type_id = scan_type_ids[input_text]
 
-                new_domain_zap_1 = DomainZap1(
+                domain_zap_1 = DomainZap1(
                     domain_zap_1_id=str(uuid.uuid4()),
                     param= domain_zap_1_record_details.get('param', ''),
                     attack= domain_zap_1_record_details.get('attack', ''),
@@ -623,47 +653,38 @@ class ScansController():
                     created=datetime.now(timezone.utc),
                     creator=current_user
                 )
-                new_domain_zap_1.save()
-                # print("response", json.loads(new_domain_zap_1.to_json()))
-                new_domain_zap_1_data = json.loads(new_domain_zap_1.to_json())
-                new_fix_recom_obj = FixRecommendations(
-                    fix_recommendation_id=str(uuid.uuid4()),
-                    scanner_fix= result.get('fix_recommendation'),
-                    ai_fix= None,
-                    created=datetime.now(timezone.utc),
-                    creator=current_user
-                )
-                new_fix_recom_obj.save()
-                # print("response", json.loads(new_fix_recom_obj.to_json()))
-                new_fix_recom_obj_data = json.loads(new_fix_recom_obj.to_json())
-                
-                new_finding_master_obj = FindingMaster(
+                fix_recommendation = finding_batch.fix_recommendation(result.get('fix_recommendation'))
+
+                finding_batch.add_finding(FindingMaster(
                     finding_id=str(uuid.uuid4()),
                     project_id= project_id,
                     finding_date= datetime.now(timezone.utc),
                     target_id=target_id,
                     target_type = 'domain',
+                    fingerprint= result.get('fingerprint'),
                     scan_type_id= scan_type_id,
                     finding_name= result.get('finding_name', ''),
                     finding_desc= result.get('finding_desc', ''),
                     severity= result.get('severity', ''),
                     status= "open",
                     extended_finding_details_name= result.get('extended_finding_details_name', ''),
-                    extended_finding_details_id= new_domain_zap_1_data.get('_id', ''),
-                    fix_recommendation_id= new_fix_recom_obj_data.get('_id', ''),
-                    raw_scan_output_id= new_raw_scan_op_data.get('_id', ''),
+                    extended_finding_details_id= domain_zap_1.domain_zap_1_id,
+                    fix_recommendation_id= fix_recommendation.fix_recommendation_id,
+                    raw_scan_output_id= new_raw_scan_op_obj.raw_scan_output_id,
                     created=datetime.now(timezone.utc),
                     creator=current_user
-                )
-                new_finding_master_obj.save()
-                # print("response", json.loads(new_finding_master_obj.to_json()))
-                new_finding_master_data = json.loads(new_finding_master_obj.to_json())
+                ), domain_zap_1, fix_recommendation)
 
             except Exception as e:
                 # Catch any other unforeseen exceptions
                 print(f"General Exception: {e}")
                 return {'error': f'Unexpected error: {str(e)}'}, '500 Internal Server Error'
-        
+
+        try:
+            print(f"Saved {finding_batch.write()} ZAP finding documents.")
+        except Exception as e:
+            print(f"General Exception: {e}")
+            return {'error': f'Unexpected error: {str(e)}'}, '500 Internal Server Error'
         return None
 
     def run_wapiti(self, project_id, scan_id, target_id, domain_url, current_user, wapiti_scanner_id):
@@ -739,27 +760,17 @@ class ScansController():
         
         # Save raw scan output
         try:
-            raw_scan_output_obj = RawScanOutput(
-                raw_scan_output_id=str(uuid.uuid4()),
-                scan_id=scan_id,
-                scanner_id=wapiti_scanner_id,
-                output=wapiti_output,
-                created=datetime.now(timezone.utc),
-                creator=current_user
-            )
-            raw_scan_output_obj.save()
+            raw_scan_output_obj = store_raw_scan_output(scan_id, wapiti_scanner_id, wapiti_output, current_user)
             print("Wapiti Raw scan output saved:", raw_scan_output_obj)
-            raw_scan_output_data = json.loads(
-                raw_scan_output_obj.to_json())
         except Exception as e:
             print(f"Following Exception on saving raw scan output: {e}")
             return {'error': f'Error saving raw output: {e}'}, '500 Internal Server Error'
 
-        # Prepare the OpenAI API prompt
+        # Prepare the OpenAI API prompt from the normalized report, the text the cache is keyed on
         prompt = f"""
-        Given the following raw Wapiti scan output, convert it into a structured and detailed format:
-        Raw Scan Output:
-        {wapiti_output}
+        Given the following Wapiti JSON report, convert it into a structured and detailed format:
+        Wapiti Report:
+        {normalize_input(wapiti_results)}
 
         Desired Structured Format:
         [
@@ -771,12 +782,12 @@ class ScansController():
                 "issue_remediation": "",  # Recommend effective steps to fix or mitigate the issue, including best practices and specific configuration or coding practices to avoid it
                 "references": "",  # List relevant resources, such as security articles, cheat sheets, or tool documentation
                 "vulnerability_classifications": "",  # Provide vulnerability classification codes, like CWE or CAPEC
-                "target": "{domain_url}",  # The target URL scanned
+                "target": "",  # Leave empty, filled in from the scan itself
                 "status": "open",  # Default status for all vulnerabilities
                 "risk_level": "",  # Risk level (e.g., high, medium, low, critical, informational)
                 "severity_range": 0,  # A single integer between 1 and 100 representing severity
                 "source_scanners": "Wapiti",  # Fixed to Wapiti as the source scanner
-                "scan_date": "{datetime.now(timezone.utc).strftime('%Y-%m-%d')}",  # Date of the scan in YYYY-MM-DD format
+                "scan_date": "",  # Leave empty, filled in from the scan itself
                 "additional_info": "",  # Additional observations, anomalies, or related details
                 "detailed_findings": [  # This section includes detailed data for the vulnerabilities
                     {{
@@ -810,18 +821,18 @@ class ScansController():
 
         # Generate structured findings using OpenAI
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7
-            )
-            structured_results = response.choices[0].message.content
+            structured_results = cached_chat_completion(client, prompt, WAPITI_PROMPT_VERSION, wapiti_results)
             print("Structured Results from OpenAI:", structured_results)
 
             # Extract and validate JSON
             cleaned_results = structured_results.split(
                 '```json', 1)[-1].strip().rstrip('`')
             findings_data = json.loads(cleaned_results)
+            # A cached response may come from an earlier scan
+            scan_date = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+            for result in findings_data:
+                result['scan_date'] = scan_date
+                result['target'] = domain_url
         except json.JSONDecodeError as e:
             return None, f"Error parsing structured JSON: {e}"
         except Exception as e:
@@ -830,22 +841,20 @@ class ScansController():
         # Save findings and details in the database
         try:
             wapiti_scanners_data = self.get_wapiti_scanner_types()
-
-            for result in findings_data:
+            # domain_wapiti_1_record_details = result.get(
+            #     'detailed_findings', [])
+            # input_text = domain_wapiti_1_record_details[0].get(
+            #     'alert_name', '')
+            # scan_type_id = findScanTypeId(input_text, 'scan_type')
+            scan_type_ids = [map_scan_type_id(result, wapiti_scanners_data) for result in findings_data]
+            finding_batch = FindingBatch(current_user, scan_id)
+
+            for scan_type_id, result in zip(scan_type_ids, findings_data):
                 # Save detailed findings
-                # domain_wapiti_1_record_details = result.get(
-                #     'detailed_findings', [])
-                # input_text = domain_wapiti_1_record_details[0].get(
-                #     'alert_name', '')
-                # scan_type_id = findScanTypeId(input_text, 'scan_type')
-                scan_type_id = map_scan_type_id(result, wapiti_scanners_data)
-
-                is_found = findDuplicateFindingAndLink(project_id, target_id, scan_type_id, result.get('findings', ''), scan_id, current_user)
-                if is_found:
-                    continue
-
+                # The finding points at the last detail record
+                domain_wapiti_1_records = []
                 for detail in result.get('detailed_findings', []):
-                    wapiti_extended_obj = DomainWapiti1(
+                    domain_wapiti_1_records.append(DomainWapiti1(
                         domain_wapiti_1_id=str(uuid.uuid4()),
                         url=result.get('target', ''),
                         vulnerability_type=detail.get(
@@ -863,55 +872,46 @@ class ScansController():
                         module=detail.get('module', ''),
                         created=datetime.now(timezone.utc),
                         creator=current_user
-                    )
-                    wapiti_extended_obj.save()
-                    print("Saved DomainWapiti1 Object:", wapiti_extended_obj)
-                    new_domain_wapiti_1_data = json.loads(
-                        wapiti_extended_obj.to_json())
-
-                new_fix_recom_obj = FixRecommendations(
-                    fix_recommendation_id=str(uuid.uuid4()),
-                    scanner_fix=result.get('issue_remediation', ''),
-                    ai_fix=None,
-                    created=datetime.now(timezone.utc),
-                    creator=current_user
-                )
-                new_fix_recom_obj.save()
-                new_fix_recom_obj_data = json.loads(
-                    new_fix_recom_obj.to_json())
+                    ))
+                domain_wapiti_1_id = domain_wapiti_1_records[-1].domain_wapiti_1_id if domain_wapiti_1_records else ''
+
+                fix_recommendation = finding_batch.fix_recommendation(result.get('issue_remediation', ''))
 
-                # Save the main finding
-                findings_obj = FindingMaster(
+                # Queue the main finding
+                finding_batch.add_finding(FindingMaster(
                     finding_id=str(uuid.uuid4()),
                     project_id=project_id,
                     finding_date=datetime.now(timezone.utc),
                     target_id=target_id,
                     target_type = 'domain',
+                    fingerprint=wapiti_fingerprint(result),
                     scan_type_id=scan_type_id,
                     finding_name=result.get('findings', ''),
                     finding_desc=result.get('issue_detail', '')[:255],
                     severity=result.get('risk_level', 'low'),
                     status=result.get('status', 'open'),
-                    raw_scan_output_id=raw_scan_output_data.get('_id', ''),
+                    raw_scan_output_id=raw_scan_output_obj.raw_scan_output_id,
                     extended_finding_details_name='DomainWapiti1',
-                    extended_finding_details_id=new_domain_wapiti_1_data.get(
-                        '_id', ''),
-                    fix_recommendation_id=new_fix_recom_obj_data.get(
-                        '_id', ''),
+                    extended_finding_details_id=domain_wapiti_1_id,
+                    fix_recommendation_id=fix_recommendation.fix_recommendation_id,
                     created=datetime.now(timezone.utc),
                     creator=current_user
-                )
-                findings_obj.save()
-                print("Saved Wapiti Finding Master Object:", findings_obj)
+                ), *domain_wapiti_1_records, fix_recommendation)
+
+            print(f"Saved {finding_batch.write()} Wapiti finding documents.")
 
         except Exception as e:
             return None, f"Error saving findings: {e}"
 
         return "Wapiti scan completed and results saved.", "200 OK"
     
-    def run_gitleaks(self, project_id, scan_id, target_id, repo_path, gitleaks_scanner_id, current_user):
+    def run_gitleaks(self, project_id, scan_id, target_id, repo_path, gitleaks_scanner_id, current_user, since_commit=None):
+        """
+        Runs Gitleaks on the working copy, or only on the commits after
+        `since_commit` when the previous findings are still valid.
+        """
         print("Running Gitleaks...")
-        print(project_id, scan_id, target_id, repo_path, gitleaks_scanner_id, current_user)
+        print(project_id, scan_id, target_id, repo_path, gitleaks_scanner_id, current_user, since_commit)
 
         try:
            # Get the default branch (main or master) from the local repo
@@ -929,22 +929,13 @@ class ScansController():
                 checkout_command = f"git -C {repo_path} checkout {default_branch}"
                 os.system(checkout_command)
 
-            # Run Gitleaks on the current state (the most up-to-date branch)
-            gitleaks_command = f"gitleaks dir {repo_path} --verbose --report-format json"
-            gitleaks_output = os.popen(gitleaks_command).read()
+            # Secrets in older commits are already recorded when since_commit is set, only new commits are scanned
+            gitleaks_output, leaks = run_gitleaks_scan(repo_path, since_commit)
+            if gitleaks_output is None:
+                raise Exception(leaks)
 
-            print("Gitleaks Output:", gitleaks_output)
-
-            # Save the raw Gitleaks output to the database
-            raw_scan_output_obj = RawScanOutput(
-                raw_scan_output_id=str(uuid.uuid4()),
-                scan_id=scan_id,
-                scanner_id=gitleaks_scanner_id,
-                output=gitleaks_output,
-                created=datetime.now(timezone.utc),
-                creator=current_user
-            )
-            raw_scan_output_obj.save()
+            # Save the raw Gitleaks report to the database
+            raw_scan_output_obj = store_raw_scan_output(scan_id, gitleaks_scanner_id, gitleaks_output, current_user)
             print("Raw scan output saved:", raw_scan_output_obj)
 
         except Exception as e:
@@ -953,125 +944,64 @@ class ScansController():
 
         print("Completed Gitleaks")
 
-        # Filter and validate results to remove false positives
-        validated_results = self.filter_and_validate_results(gitleaks_output, repo_path)
-        length_of_validated_results = len(validated_results)
-        # Prepare the prompt for the AI model with specified columns
-        prompt = f"""
-        Given the following validated Raw Gitleaks findings, convert them into a structured format:
-        Validated Raw Scan Findings:
-        {validated_results}
-
-        Desired Structured Format:
-        [
-        {{
-            "finding_name": "",  # Specific leak name, keep it below 5 words. For example: "Encryption Key leaked"
-            "finding_desc": "",  # Provide description of the secret leak
-            "status": "open",  # Leaks are marked "open" by default
-            "severity": "",  # Risk level (high, medium, low, critical) based on Gitleaks output
-            "severity_range": 0,  # A single integer between 1 and 100 representing severity
-            "extra" : {{
-                "cweid": "",  # CWE ID representing the vulnerability classification
-                "wascid": "",  # WASC ID representing the vulnerability classification
-                "secret": "",  # The detected secret
-                "file_name": "",  # Full path of the file where the secret was detected, including the relative repository path
-                "line_number": "",  # Exact line number where the secret was detected
-                "column_number": "",  # Exact column number where the secret was detected, if available
-                "references": ""  # List of references related to the vulnerability, e.g., CVE, articles
-            }}
-        }}
-        ]
-
-        Ensure that the information provided is precise, complete, and highly useful for developers and security teams. 
-        Return the result **strictly as a raw JSON Array without any additional text or formatting**.
-        There are {length_of_validated_results} gitleaks output, i expect same number of output in desired structure.
-        """
-
-        # Call the OpenAI API to get the structured output
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7
-        )
-
-        print("Response from OpenAI:", response)
-
-        structured_results = response.choices[0].message.content
-        print("Structured Results:", structured_results)
-
-        cleaned_results = structured_results.split('```json', 1)[-1].strip().rstrip('`')
-
-        # Ensure the cleaned results are valid JSON
-        try:
-            json_data = json.loads(cleaned_results)
-            print("Validated JSON Data:", json_data)
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON: {e}")
-            return {'error': 'Failed to parse JSON from OpenAI response', 'details': str(e)}
+        # Map the report to findings, false positives and deleted files are left out
+        json_data = convert_gitleaks_report(leaks, repo_path)
+        if not json_data:
+            print("No new Gitleaks findings.")
+            return "Gitleaks scan completed and results saved.", "200 OK"
 
         input_text = "Secrets Detection"
-        scan_type_id = findScanTypeId(input_text, 'scan_type')
+        scan_type_id = resolveScanTypeId(input_text, 'scan_type')
 
-        # Save structured findings to the database
+
+        # Save structured findings to the database, known leaks are linked on write by their fingerprint
+        finding_batch = FindingBatch(current_user, scan_id)
         for result in json_data:
             try:
-                extra = result.get('extra', [])
-                references = extra.get('references', [])
-                if not isinstance(references, list):
-                    references = [references]
-
-                is_found = findDuplicateFindingAndLink(project_id, target_id, scan_type_id, result.get('finding_name', ''), scan_id, current_user)
-                if is_found:
-                    continue
+                extra = result['repo_secret_detections_record']
 
-                repo_secret_detections_obj = RepoSecretDetections(
+                repo_secret_detections = RepoSecretDetections(
                     repo_secret_detections_id=str(uuid.uuid4()),
-                    secret=result.get('secret', ''),
+                    secret=extra.get('secret', ''),
                     cweid=extra.get('cweid', ''),
                     wascid=extra.get('wascid', ''),
                     file_name=extra.get('file_name', ''),
                     line_number=extra.get('line_number', ''),
                     column_number=extra.get('column_number', ''),
                     fix_time=extra.get('fix_time', ''),
-                    references=references,
-                    created=datetime.now(timezone.utc),
-                    creator=current_user
-                )
-                repo_secret_detections_obj.save()
-                repo_secret_detections_data = json.loads(repo_secret_detections_obj.to_json())
-
-                new_fix_recom_obj = FixRecommendations(
-                    fix_recommendation_id=str(uuid.uuid4()),
-                    scanner_fix=None,
-                    ai_fix=None,
+                    references=extra.get('references', []),
                     created=datetime.now(timezone.utc),
                     creator=current_user
                 )
-                new_fix_recom_obj.save()
-                new_fix_recom_obj_data = json.loads(new_fix_recom_obj.to_json())
+                fix_recommendation = finding_batch.fix_recommendation()
 
-                findings_obj = FindingMaster(
+                finding_batch.add_finding(FindingMaster(
                     finding_id=str(uuid.uuid4()),
                     project_id=project_id,
                     finding_date=datetime.now(timezone.utc),
                     target_id=target_id,
                     target_type='repo',
+                    fingerprint=result.get('fingerprint'),
                     scan_type_id=scan_type_id,
                     finding_name=result.get('finding_name', ''),
                     finding_desc=result.get('finding_desc', ''),
                     severity=result.get('severity', 'low'),
                     status=result.get('status', 'open'),
                     extended_finding_details_name='RepoSecretDetections',
-                    extended_finding_details_id=repo_secret_detections_data.get('_id', ''),
+                    extended_finding_details_id=repo_secret_detections.repo_secret_detections_id,
                     raw_scan_output_id=raw_scan_output_obj.raw_scan_output_id,
-                    fix_recommendation_id=new_fix_recom_obj_data.get('_id', ''),
+                    fix_recommendation_id=fix_recommendation.fix_recommendation_id,
                     created=datetime.now(timezone.utc),
                     creator=current_user
-                )
-                findings_obj.save()
+                ), repo_secret_detections, fix_recommendation)
             except Exception as e:
                 print(f"Unexpected error occurred while saving: {e}")
 
+        try:
+            print(f"Saved {finding_batch.write()} Gitleaks finding documents.")
+        except Exception as e:
+            print(f"Unexpected error occurred while saving: {e}")
+
         print("Gitleaks scan completed and results saved.")
         return "Gitleaks scan completed and results saved.", "200 OK"
 
@@ -1085,154 +1015,53 @@ class ScansController():
             print(f"Error fetching default branch: {e}")
             return ""
 
-    def filter_and_validate_results(self, gitleaks_output, repo_path):
+    def run_trivy(self, project_id, scan_id, target_id, repo_path, current_user, trivy_scanner_id, access_token, is_private_repo):
         """
-        Filters and validates Gitleaks results by cleaning output,
-        validating file existence, and filtering out false positives.
-        """
-        try:
-            # Clean up the Gitleaks output by removing ANSI escape sequences (color codes)
-            gitleaks_output_clean = self.strip_ansi_escape_sequences(gitleaks_output)
-
-            # Parse the cleaned Gitleaks output
-            validated_results = self.parse_gitleaks_output(gitleaks_output_clean, repo_path)
-
-            # Filter out false positives
-            final_results = []
-            for finding in validated_results:
-                if not self.is_false_positive(finding):
-                    final_results.append(finding)
-
-            validated_results = []
-            for result in final_results:
-                # Remove repo_path from 'File' and 'Fingerprint'
-                if 'File' in result:
-                    result['File'] = result['File'].replace(repo_path, '')
-                if 'Fingerprint' in result:
-                    result['Fingerprint'] = result['Fingerprint'].replace(repo_path, '')
-
-                # Add the validated result to the final results list
-                validated_results.append(result)
-            return validated_results
-
-        except json.JSONDecodeError as e:
-            print(f"JSON decoding error: {e}")
-            return []
-
-        except Exception as e:
-            print(f"Error filtering Gitleaks results: {e}")
-            return []
+        Runs Trivy once on the working copy and fans the report out to the
+        vulnerability findings, the SBOM vulnerabilities and the licenses.
 
-    def parse_gitleaks_output(self, gitleaks_output, repo_path):
-        """
-        Parses Gitleaks output to extract findings and validate them based on file names in the repository.
-        
-        Parameters:
-            gitleaks_output (str): Raw output from Gitleaks.
-            repo_path (str): Path to the local repository being scanned.
-
-        Returns:
-            list: A list of validated findings as dictionaries.
-        """
-        # Generate findings from Gitleaks output
-        def generate_findings(gitleaks_output):
-            for finding in gitleaks_output.strip().split("\n\n"):
-                yield finding
-
-        findings = generate_findings(gitleaks_output)
-        validated_results = []
-
-        # Collect all file names in the repository into a set for quick lookup
-        repo_file_names = {file for _, _, files in os.walk(repo_path) for file in files}
-
-        # Process each finding
-        for finding in findings:
-            finding_dict = self.parse_finding(finding)
-            if not finding_dict:
-                continue
-
-            # Extract the file name from the finding
-            file_name = os.path.basename(finding_dict.get("File", "").strip())
-
-            # Check if the file name exists in the repository
-            if file_name not in repo_file_names:
-                print(f"Skipping non-existent file name: {file_name}")
-                continue
-
-            # Add to validated results
-            validated_results.append(finding_dict)
-
-        return validated_results
-
-    def parse_finding(self, finding_text):
-        """Parse a single finding text block into a dictionary."""
-        finding_dict = {}
-        for line in finding_text.split("\n"):
-            match = re.match(r"(\w+):\s+(.*)", line)
-            if match:
-                key, value = match.groups()
-                finding_dict[key] = value
-        return finding_dict
-
-    def strip_ansi_escape_sequences(self, text):
-        """
-        Remove ANSI escape sequences (color codes) from the Gitleaks output.
-        """
-        ansi_escape = re.compile(r'\x1b\[[0-9;]*m')
-        return ansi_escape.sub('', text)
-
-    def is_false_positive(self, finding):
-        """
-        Additional filtering for false positives based on known patterns or rules.
+        Args:
+            scan_id (str): UUID of the scan (collection - scans)
+            target_id (str): UUID of the target to scan (collection - target_repository).
+            repo_path (str): Path to the repository being scanned.
+            current_user (str): User initiating the scan.
+            trivy_scanner_id (str): UUID of the scanner (collection - scanners).
         """
-        ignore_patterns = [
-            "dummy",        # Ignore files with "dummy" in their path or content
-            "test",         # Ignore files in test-related paths
-            "example-key",  # Ignore matches with "example-key"
-        ]
-
-        # Check the match or path for known false-positive patterns
-        for pattern in ignore_patterns:
-            if pattern in finding.get("File", "").lower() or pattern in finding.get("Secret", "").lower():
-                return True
-        return False
-
-    def run_trivy_vulnerability(self, project_id, scan_id, target_id, repo_path, current_user, trivy_scanner_id, access_token, is_private_repo):
-        print("running Trivy Vulnerability scan....")
+        print("Running Trivy scan....")
         print(project_id, scan_id, target_id, repo_path, trivy_scanner_id, current_user)
-        # Call the new Trivy scan logic from trivy_scanner.py
-        trivy_raw_output, trivy_json_data = run_trivy_scan(repo_path, access_token, is_private_repo)
-        print("Trivy raw scan completed")
-        structured_trivy_output = convert_trivy_output(trivy_json_data)
-        print("Trivy output converted to structured format")
+        trivy_result = run_trivy_combined_scan(repo_path, access_token, is_private_repo)
+        if not trivy_result:
+            return {'error': 'Trivy execution failed'}
+        trivy_raw_output, trivy_json_data = trivy_result
         try:
-            new_trivy_raw_scan_obj = RawScanOutput(
-                raw_scan_output_id=str(uuid.uuid4()),
-                scan_id=scan_id,
-                scanner_id=trivy_scanner_id,
-                output=trivy_raw_output,
-                created=datetime.now(timezone.utc),
-                creator=current_user)
-            new_trivy_raw_scan_obj.save()
+            new_trivy_raw_scan_obj = store_raw_scan_output(scan_id, trivy_scanner_id, trivy_raw_output, current_user)
             print("Trivy raw scan output saved")
-            new_trivy_raw_scan_data = json.loads(new_trivy_raw_scan_obj.to_json())
-        
         except Exception as e:
             print(f"Unexpected error occurred while saving: {e}")
             return {'error': f'Unexpected error: {str(e)}'}, '500 Internal Server Error'
-        # Process and store the results
+
+        # The report is parsed once, each consumer stores its own part of it
+        vulnerability_error = self.save_trivy_vulnerability_findings(project_id, scan_id, target_id, current_user, trivy_json_data, new_trivy_raw_scan_obj.raw_scan_output_id)
+        license_error = self.save_licenses_and_sbom(project_id, target_id, current_user, trivy_json_data)
+        return vulnerability_error or license_error or ("Trivy scan completed and results saved.", "200 OK")
+
+    def save_trivy_vulnerability_findings(self, project_id, scan_id, target_id, current_user, trivy_json_data, raw_scan_output_id):
+        """
+        Stores the fixable vulnerabilities and the misconfigurations of a Trivy
+        report as findings (collection - FindingMaster).
+        """
+        structured_trivy_output = convert_trivy_output(trivy_json_data, ignore_unfixed=True)
+        print("Trivy output converted to structured format")
+
+        input_text = "Dependency Vulnerability Scanner"
+        scan_type_id = resolveScanTypeId(input_text, 'scan_type')
+        # Known vulnerabilities are linked on write by their fingerprint
+        finding_batch = FindingBatch(current_user, scan_id)
         for result in structured_trivy_output:
             try:
                 repo_trivy_1_record_details = result.get('repository_trivy_1_record')
 
-                input_text = "Dependency Vulnerability Scanner"
-                scan_type_id = findScanTypeId(input_text, 'scan_type')
-
-                is_found = findDuplicateFindingAndLink(project_id, target_id, scan_type_id, result.get('findings', ''), scan_id, current_user)
-                if is_found:
-                    continue
-
-                new_repo_trivy_1 = RepositoryTrivy1(
+                repository_trivy_1 = RepositoryTrivy1(
                     repository_trivy_1_id=str(uuid.uuid4()),  # Generate unique ID for the document
                     finding_id=repo_trivy_1_record_details.get('finding_id', ''),
                     alert=repo_trivy_1_record_details.get('alert', ''),
@@ -1245,242 +1074,63 @@ class ScansController():
                     created=datetime.now(timezone.utc),
                     creator=current_user
                 )
-                new_repo_trivy_1.save()
-                new_repo_trivy_1_data = json.loads(new_repo_trivy_1.to_json())
-                new_fix_recom_obj = FixRecommendations(
-                    fix_recommendation_id=str(uuid.uuid4()),
-                    scanner_fix= repo_trivy_1_record_details.get('fixed_version'),
-                    ai_fix= None,
-                    created=datetime.now(timezone.utc),
-                    creator=current_user
-                )
-                new_fix_recom_obj.save()
-                # print("response", json.loads(new_fix_recom_obj.to_json()))
-                new_fix_recom_obj_data = json.loads(new_fix_recom_obj.to_json())
+                fix_recommendation = finding_batch.fix_recommendation(repo_trivy_1_record_details.get('fixed_version'))
 
-                findings_obj = FindingMaster(
+                finding_batch.add_finding(FindingMaster(
                     finding_id=str(uuid.uuid4()),
                     project_id=project_id,
                     finding_date=datetime.now(timezone.utc),
                     target_id=target_id,
                     target_type = 'repo',
+                    fingerprint=result.get('fingerprint'),
                     scan_type_id=scan_type_id,
                     finding_name=result.get('finding_name', ''),
                     finding_desc=result.get('finding_desc', '')[:255],
                     severity=result.get('severity', ''),
                     status=result.get('status', 'open'),
-                    raw_scan_output_id=new_trivy_raw_scan_data.get('_id', ''),
+                    raw_scan_output_id=raw_scan_output_id,
                     extended_finding_details_name='RepositoryTrivy1',
-                    extended_finding_details_id=new_repo_trivy_1_data.get(
-                        '_id', ''),
-                    fix_recommendation_id=new_fix_recom_obj_data.get(
-                        '_id', ''),
+                    extended_finding_details_id=repository_trivy_1.repository_trivy_1_id,
+                    fix_recommendation_id=fix_recommendation.fix_recommendation_id,
                     created=datetime.now(timezone.utc),
                     creator=current_user
-                )
-                findings_obj.save()
-                print("Saved Trivy Finding Master Object:", findings_obj)
-        
+                ), repository_trivy_1, fix_recommendation)
+
             except Exception as e:
                 return None, f"Error saving findings: {e}"
-
-        return "Trivy scan completed and results saved.", "200 OK"
-
-    def run_licenses_sbom_scan(self, project_id, scan_id, target_id, repo_url, repo_path, current_user, trivy_scanner_id, access_token, is_private_repo):
-        """
-        Runs the license and SBOM scan.
-
-        Args:
-            scan_id (str): UUID of the scan (collection - scans)
-            scanner_id (str): UUID of the scanner (collection - scanners).
-            scan_type_id (str): UUID of the scan type (collection - scan_types).
-            target_id (str): UUID of the target to scan (collection - target_repository).
-            repo_path (str): Path to the repository being scanned.
-            current_user (str): User initiating the scan.
-        """
-
-        trivy_raw_data, trivy_json_data = run_licenses_and_sbom_scan(repo_path, access_token, is_private_repo)
-        trivy_raw_data_str = json.dumps(trivy_raw_data)
         try:
-            raw_scan_output_obj = RawScanOutput(
-                raw_scan_output_id=str(uuid.uuid4()),
-                scan_id=scan_id,
-                scanner_id=trivy_scanner_id,
-                output=trivy_raw_data_str,
-                created=datetime.now(timezone.utc),
-                creator=current_user,
-            )
-            raw_scan_output_obj.save()
-            raw_scan_output_details = json.loads(
-                raw_scan_output_obj.to_json())
-            print("raw scan result", raw_scan_output_details)
-            # return {'success': 'Record Updated Successfully', 'data': response}, '200 Ok'
+            print(f"Saved {finding_batch.write()} Trivy finding documents.")
         except Exception as e:
-            print("general exception", e)
             return None, f"Error saving findings: {e}"
-        
-        self.delete_by_project_id(project_id)
+        return None
 
-        input_text = "Licenses and SBOM"
-        scan_type_id = findScanTypeId(input_text, 'scan_type')
-        try:
-            for data in trivy_json_data.get("Results", []):
-                if "Vulnerabilities" in data:
-                    for vulnerability in data["Vulnerabilities"]:
-                        new_vulnerability_obj = FindingSBOMVulnerability(
-                            sbom_vulnerability_id=str(uuid.uuid4()),
-                            project_id=project_id,
-                            scan_type_id=scan_type_id,
-                            target_id=target_id,
-                            target_type="repo",
-                            vulnerabilityid=vulnerability["VulnerabilityID"],
-                            pkgid=vulnerability["PkgID"],
-                            pkg_name=vulnerability["PkgName"],
-                            pkg_identifier=vulnerability["PkgIdentifier"],
-                            installed_version=vulnerability["InstalledVersion"],
-                            fixed_version=vulnerability.get("FixedVersion", ""),
-                            status=vulnerability["Status"],
-                            severity_source=vulnerability["SeveritySource"],
-                            primary_url=vulnerability["PrimaryURL"],
-                            data_source=vulnerability["DataSource"],
-                            title=vulnerability["Title"],
-                            severity=vulnerability["Severity"],
-                            description=vulnerability["Description"],
-                            # cwe_ids=vulnerability["CweIDs"],
-                            vendor_severity=vulnerability["VendorSeverity"],
-                            # CVSS=vulnerability["CVSS"],
-                            references=json.dumps(vulnerability["References"]),
-                            created=datetime.now(timezone.utc),
-                            creator=current_user,
-                        )
-                        new_vulnerability_obj.save()
-                        print("Vulnerability saved")
-            
-                if "Licenses" in data:
-                    for license in data["Licenses"]:
-                        new_license_obj = FindingLicense(
-                            license_id=str(uuid.uuid4()),
-                            project_id=project_id,
-                            scan_type_id=scan_type_id,
-                            target_id=target_id,
-                            target_type="repo",
-                            severity=license["Severity"],
-                            category=license["Category"],
-                            pkg_name=license["PkgName"],
-                            file_path=license["FilePath"],
-                            name=license["Name"],
-                            text=license["Text"],
-                            # confidence=license["Confidence"],
-                            link=license["Link"],
-                            created=datetime.now(timezone.utc),
-                            creator=current_user,
-                        )
-                        new_license_obj.save()
-                        print("License saved")
-        except Exception as e:
-            print(f"Unexpected error occurred while saving: {e}")
-            return {'error': f'Unexpected error: {str(e)}'}, '500 Internal Server Error'
-        print("Trivy scan completed for license.")
-        return {"message": "Trivy scan for License and SBOM completed and results saved."}, 200
-    
-    def run_licenses_scan(self, project_id, scan_id, target_id, repo_url, repo_path, current_user, trivy_scanner_id, access_token, is_private_repo):
+    def save_licenses_and_sbom(self, project_id, target_id, current_user, trivy_json_data):
         """
-        Runs the license and SBOM scan.
-
-        Args:
-            scan_id (str): UUID of the scan (collection - scans)
-            scanner_id (str): UUID of the scanner (collection - scanners).
-            scan_type_id (str): UUID of the scan type (collection - scan_types).
-            target_id (str): UUID of the target to scan (collection - target_repository).
-            repo_path (str): Path to the repository being scanned.
-            current_user (str): User initiating the scan.
+        Stores the vulnerabilities of every package, including development
+        dependencies, and the detected licenses of a Trivy report
+        (collections - FindingSBOMVulnerability, FindingLicense). Only the
+        differences with the previous scan of the target are written.
         """
-
-        trivy_raw_data, trivy_json_data = run_package_licenses_scan(repo_path, access_token, is_private_repo)
-        trivy_raw_data_str = json.dumps(trivy_raw_data)
-        try:
-            raw_scan_output_obj = RawScanOutput(
-                raw_scan_output_id=str(uuid.uuid4()),
-                scan_id=scan_id,
-                scanner_id=trivy_scanner_id,
-                output=trivy_raw_data_str,
-                created=datetime.now(timezone.utc),
-                creator=current_user,
-            )
-            raw_scan_output_obj.save()
-            raw_scan_output_details = json.loads(
-                raw_scan_output_obj.to_json())
-            print("raw scan result", raw_scan_output_details)
-            # return {'success': 'Record Updated Successfully', 'data': response}, '200 Ok'
-        except Exception as e:
-            print("general exception", e)
-            return None, f"Error saving findings: {e}"
-        
-        self.delete_by_project_id(project_id)
-
         input_text = "Licenses and SBOM"
-        scan_type_id = findScanTypeId(input_text, 'scan_type')
+        scan_type_id = resolveScanTypeId(input_text, 'scan_type')
         try:
+            vulnerabilities = []
+            licenses = []
             for data in trivy_json_data.get("Results", []):
-                if "Vulnerabilities" in data:
-                    for vulnerability in data["Vulnerabilities"]:
-                        new_vulnerability_obj = FindingSBOMVulnerability(
-                            sbom_vulnerability_id=str(uuid.uuid4()),
-                            project_id=project_id,
-                            scan_type_id=scan_type_id,
-                            target_id=target_id,
-                            target_type="repo",
-                            vulnerabilityid=vulnerability["VulnerabilityID"],
-                            pkgid=vulnerability["PkgID"],
-                            pkg_name=vulnerability["PkgName"],
-                            pkg_identifier=vulnerability["PkgIdentifier"],
-                            installed_version=vulnerability["InstalledVersion"],
-                            fixed_version=vulnerability.get("FixedVersion", ""),
-                            status=vulnerability["Status"],
-                            severity_source=vulnerability["SeveritySource"],
-                            primary_url=vulnerability["PrimaryURL"],
-                            data_source=vulnerability["DataSource"],
-                            title=vulnerability["Title"],
-                            severity=vulnerability["Severity"],
-                            description=vulnerability["Description"],
-                            # cwe_ids=vulnerability["CweIDs"],
-                            vendor_severity=vulnerability["VendorSeverity"],
-                            # CVSS=vulnerability["CVSS"],
-                            references=json.dumps(vulnerability["References"]),
-                            created=datetime.now(timezone.utc),
-                            creator=current_user,
-                        )
-                        new_vulnerability_obj.save()
-                        print("Vulnerability saved")
-            
-                if "Licenses" in data:
-                    for license in data["Licenses"]:
-                        new_license_obj = FindingLicense(
-                            license_id=str(uuid.uuid4()),
-                            project_id=project_id,
-                            scan_type_id=scan_type_id,
-                            target_id=target_id,
-                            target_type="repo",
-                            severity=license["Severity"],
-                            category=license["Category"],
-                            pkg_name=license["PkgName"],
-                            file_path=license["FilePath"],
-                            name=license["Name"],
-                            text=license["Text"],
-                            # confidence=license["Confidence"],
-                            link=license["Link"],
-                            created=datetime.now(timezone.utc),
-                            creator=current_user,
-                        )
-                        new_license_obj.save()
-                        print("License saved", license['Name'])
+                vulnerabilities.extend(vulnerability_fields(vulnerability) for vulnerability in data.get("Vulnerabilities") or [])
+                licenses.extend(license_fields(license) for license in data.get("Licenses") or [])
+
+            counts = reconcile_sbom(FindingSBOMVulnerability, project_id, target_id, scan_type_id, current_user, vulnerabilities)
+            print(f"SBOM vulnerabilities reconciled: {counts}")
+            counts = reconcile_sbom(FindingLicense, project_id, target_id, scan_type_id, current_user, licenses)
+            print(f"Licenses reconciled: {counts}")
         except Exception as e:
             print(f"Unexpected error occurred while saving: {e}")
             return {'error': f'Unexpected error: {str(e)}'}, '500 Internal Server Error'
         print("Trivy scan completed for license.")
-        return {"message": "Trivy scan for License and SBOM completed and results saved."}, 200
-    
-    def run_cloudsploit(self, project_id, scan_id, azure_cloud_target_id, azure_cloud_data, azure_scanner_id, current_user, cloudsploit_config_path, cloudsploit_original_content):
+        return None
+
+    def run_cloudsploit(self, project_id, scan_id, azure_cloud_target_id, azure_cloud_data, azure_scanner_id, current_user):
         """
         Runs the license and SBOM scan.
 
@@ -1494,7 +1144,7 @@ class ScansController():
         """
 
         scanner_types = self.get_cloudsploit_scanner_types()
-        azure_raw_op, azure_scan_json_data = run_azure_cloud_scan(project_id, scan_id, azure_cloud_data, azure_scanner_id, current_user, cloudsploit_config_path, cloudsploit_original_content)
+        azure_raw_op, azure_scan_json_data = run_azure_cloud_scan(project_id, scan_id, azure_cloud_data, azure_scanner_id, current_user)
 
         # Check if an error occurred (i.e., azure_raw_op contains an error message)
         if isinstance(azure_raw_op, dict) and "error" in azure_raw_op:
@@ -1504,18 +1154,8 @@ class ScansController():
         structured_azure_op = convert_structured_azure_output(azure_scan_json_data, scanner_types)
         azure_raw_data_str = json.dumps(azure_raw_op)
         try:
-            raw_scan_output_obj = RawScanOutput(
-                raw_scan_output_id=str(uuid.uuid4()),
-                scan_id=scan_id,
-                scanner_id=scan_id,
-                output=azure_raw_data_str,
-                created=datetime.now(timezone.utc),
-                creator=current_user,
-            )
-            raw_scan_output_obj.save()
-            raw_scan_output_details = json.loads(
-                raw_scan_output_obj.to_json())
-            print("raw scan result", raw_scan_output_details)
+            raw_scan_output_obj = store_raw_scan_output(scan_id, scan_id, azure_raw_data_str, current_user)
+            print("raw scan output saved", raw_scan_output_obj.raw_scan_output_id)
         except Exception as e:
             print("general exception", e)
             return None, f"Error saving findings: {e}"
@@ -1524,14 +1164,12 @@ class ScansController():
         # scan_type_id = findScanTypeId(input_text, 'scan_type')
         # Save structured findings to the database
         try:
+            # Known resources are linked on write by their fingerprint
+            finding_batch = FindingBatch(current_user, scan_id)
             for result in structured_azure_op:
                 cloud_cloudsploit_azure_1_details = result.get('cloud_cloudsploit_azure_1_record')
 
-                is_found = findDuplicateFindingAndLink(project_id, azure_cloud_target_id, result.get('scan_type_id', ''), result.get('finding_name', ''), scan_id, current_user)
-                if is_found:
-                    continue
-
-                cloud_cloudsploit_azure_obj = CloudCloudSploitAzure1(
+                cloud_cloudsploit_azure_1 = CloudCloudSploitAzure1(
                     cloud_azure_id=str(uuid.uuid4()),
                     plugin=cloud_cloudsploit_azure_1_details.get('plugin', ''),
                     category=cloud_cloudsploit_azure_1_details.get('category', ''),
@@ -1543,45 +1181,35 @@ class ScansController():
                     created=datetime.now(timezone.utc),
                     creator=current_user
                 )
-                cloud_cloudsploit_azure_obj.save()
-                cloud_cloudsploit_azure_data = json.loads(cloud_cloudsploit_azure_obj.to_json())
+                fix_recommendation = finding_batch.fix_recommendation()
 
-                new_fix_recom_obj = FixRecommendations(
-                    fix_recommendation_id=str(uuid.uuid4()),
-                    scanner_fix=None,
-                    ai_fix=None,
-                    created=datetime.now(timezone.utc),
-                    creator=current_user
-                )
-                new_fix_recom_obj.save()
-                new_fix_recom_obj_data = json.loads(new_fix_recom_obj.to_json())
-
-                findings_obj = FindingMaster(
+                finding_batch.add_finding(FindingMaster(
                     finding_id=str(uuid.uuid4()),
                     project_id=project_id,
                     finding_date=datetime.now(timezone.utc),
                     target_id=azure_cloud_target_id,
                     target_type='cloud',
+                    fingerprint=result.get('fingerprint'),
                     scan_type_id=result.get('scan_type_id', ''),
                     finding_name=result.get('finding_name', ''),
                     finding_desc=result.get('finding_desc', ''),
                     severity=result.get('severity', ''),
                     status=result.get('status', 'open'),
                     extended_finding_details_name='CloudCloudSploitAzure1',
-                    extended_finding_details_id=cloud_cloudsploit_azure_data.get('_id', ''),
-                    raw_scan_output_id=raw_scan_output_details.get('_id', ''),
-                    fix_recommendation_id=new_fix_recom_obj_data.get('_id', ''),
+                    extended_finding_details_id=cloud_cloudsploit_azure_1.cloud_azure_id,
+                    raw_scan_output_id=raw_scan_output_obj.raw_scan_output_id,
+                    fix_recommendation_id=fix_recommendation.fix_recommendation_id,
                     created=datetime.now(timezone.utc),
                     creator=current_user
-                )
-                findings_obj.save()
+                ), cloud_cloudsploit_azure_1, fix_recommendation)
+            print(f"Saved {finding_batch.write()} CloudSploit Azure finding documents.")
         except Exception as e:
             print(f"Unexpected error occurred while saving: {e}")
             return {"message": "CloudSploit scan for Azure failed.", "error": str(e)}, 500
         print("CloudSploit scan for Azure completed.")
         return {"message": "CloudSploit scan for Azure completed and results saved."}, 200
          
-    def run_cloudsploit_for_google(self, project_id, scan_id, google_cloud_target_id, google_cloud_data, google_scanner_id, current_user, google_cloudsploit_config_path, google_cloudsploit_original_content):
+    def run_cloudsploit_for_google(self, project_id, scan_id, google_cloud_target_id, google_cloud_data, google_scanner_id, current_user):
         """
         Runs the license and SBOM scan.
 
@@ -1595,7 +1223,7 @@ class ScansController():
         """
 
         scanner_types = self.get_cloudsploit_scanner_types()
-        google_raw_op, google_scan_json_data = run_google_cloud_scan(project_id, scan_id, google_cloud_data, google_scanner_id, current_user, google_cloudsploit_config_path, google_cloudsploit_original_content)
+        google_raw_op, google_scan_json_data = run_google_cloud_scan(project_id, scan_id, google_cloud_data, google_scanner_id, current_user)
 
         # Check if an error occurred (i.e., google_raw_op contains an error message)
         if isinstance(google_raw_op, dict) and "error" in google_raw_op:
@@ -1605,18 +1233,8 @@ class ScansController():
         structured_google_op = convert_structured_google_output(google_scan_json_data, scanner_types)
         google_raw_data_str = json.dumps(google_raw_op)
         try:
-            raw_scan_output_obj = RawScanOutput(
-                raw_scan_output_id=str(uuid.uuid4()),
-                scan_id=scan_id,
-                scanner_id=scan_id,
-                output=google_raw_data_str,
-                created=datetime.now(timezone.utc),
-                creator=current_user,
-            )
-            raw_scan_output_obj.save()
-            raw_scan_output_details = json.loads(
-                raw_scan_output_obj.to_json())
-            print("raw scan result", raw_scan_output_details)
+            raw_scan_output_obj = store_raw_scan_output(scan_id, scan_id, google_raw_data_str, current_user)
+            print("raw scan output saved", raw_scan_output_obj.raw_scan_output_id)
         except Exception as e:
             print("general exception", e)
             return None, f"Error saving findings: {e}"
@@ -1625,14 +1243,12 @@ class ScansController():
         # scan_type_id = findScanTypeId(input_text, 'scan_type')
         # Save structured findings to the database
         try:
+            # Known resources are linked on write by their fingerprint
+            finding_batch = FindingBatch(current_user, scan_id)
             for result in structured_google_op:
                 cloud_cloudsploit_google_1_details = result.get('cloud_cloudsploit_google_1_record')
 
-                is_found = findDuplicateFindingAndLink(project_id, google_cloud_target_id, result.get('scan_type_id', ''), result.get('finding_name', ''), scan_id, current_user)
-                if is_found:
-                    continue
-
-                cloud_cloudsploit_google_obj = CloudCloudSploitGoogle1(
+                cloud_cloudsploit_google_1 = CloudCloudSploitGoogle1(
                     cloud_google_id=str(uuid.uuid4()),
                     plugin=cloud_cloudsploit_google_1_details.get('plugin', ''),
                     category=cloud_cloudsploit_google_1_details.get('category', ''),
@@ -1645,38 +1261,28 @@ class ScansController():
                     created=datetime.now(timezone.utc),
                     creator=current_user
                 )
-                cloud_cloudsploit_google_obj.save()
-                cloud_cloudsploit_google_data = json.loads(cloud_cloudsploit_google_obj.to_json())
-
-                new_fix_recom_obj = FixRecommendations(
-                    fix_recommendation_id=str(uuid.uuid4()),
-                    scanner_fix=None,
-                    ai_fix=None,
-                    created=datetime.now(timezone.utc),
-                    creator=current_user
-                )
-                new_fix_recom_obj.save()
-                new_fix_recom_obj_data = json.loads(new_fix_recom_obj.to_json())
+                fix_recommendation = finding_batch.fix_recommendation()
 
-                findings_obj = FindingMaster(
+                finding_batch.add_finding(FindingMaster(
                     finding_id=str(uuid.uuid4()),
                     project_id=project_id,
                     finding_date=datetime.now(timezone.utc),
                     target_id=google_cloud_target_id,
                     target_type='cloud',
+                    fingerprint=result.get('fingerprint'),
                     scan_type_id=result.get('scan_type_id', ''),
                     finding_name=result.get('finding_name', ''),
                     finding_desc=result.get('finding_desc', ''),
                     severity=result.get('severity', ''),
                     status=result.get('status', 'open'),
                     extended_finding_details_name='CloudCloudSploitGoogle1',
-                    extended_finding_details_id=cloud_cloudsploit_google_data.get('_id', ''),
-                    raw_scan_output_id=raw_scan_output_details.get('_id', ''),
-                    fix_recommendation_id=new_fix_recom_obj_data.get('_id', ''),
+                    extended_finding_details_id=cloud_cloudsploit_google_1.cloud_google_id,
+                    raw_scan_output_id=raw_scan_output_obj.raw_scan_output_id,
+                    fix_recommendation_id=fix_recommendation.fix_recommendation_id,
                     created=datetime.now(timezone.utc),
                     creator=current_user
-                )
-                findings_obj.save()
+                ), cloud_cloudsploit_google_1, fix_recommendation)
+            print(f"Saved {finding_batch.write()} CloudSploit Google finding documents.")
             print("CloudSploit scan for Google completed.")
             return {"message": "CloudSploit scan for Google completed and results saved."}, 200
         except Exception as e:
@@ -1817,27 +1423,18 @@ class ScansController():
             
             # Step 3: Save raw scan output
             print("Saving raw scan output...")
-            raw_scan_output_obj = RawScanOutput(
-                raw_scan_output_id=str(uuid.uuid4()),
-                scan_id=scan_id,
-                scanner_id=linguist_id,
-                output=linguist_output,
-                created=datetime.now(timezone.utc),
-                creator=current_user
-            )
-            raw_scan_output_obj.save()
+            raw_scan_output_obj = store_raw_scan_output(scan_id, linguist_id, linguist_output, current_user)
             print(f"Linguist Raw scan output saved: {raw_scan_output_obj}")
             
             # Step 4: Process Linguist data
+            input_text = 'Languages and Framework'
+            scan_type_id = resolveScanTypeId(input_text, 'scan_type')
+            print(f"Scan type ID found: {scan_type_id}")
             for language_name, language_data in linguist_data.items():
                 print(f"Processing language: {language_name}")
                 language_count = language_data.get('size', 0)
                 language_percentage = float(language_data.get('percentage', 0))
 
-                input_text = 'Languages and Framework'
-                scan_type_id = findScanTypeId(input_text, 'scan_type')
-                print(f"Scan type ID found: {scan_type_id}")
-
                 # Check for duplicate findings and mark as deleted if found
                 print(f"Checking for duplicate findings for {language_name}...")
                 duplicate_found = findDuplicateFindingAndLinkForLanguages(project_id, target_id, scan_type_id, language_name)
@@ -1983,16 +1580,7 @@ class ScansController():
                 return {'error': f"Error during Slither execution: {str(e)}"}, 500
 
             # Save the raw scan output to the database
-            raw_scan_output_obj = RawScanOutput(
-                raw_scan_output_id=str(uuid.uuid4()),
-                scan_id=scan_id,
-                scanner_id=slither_scanner_id,
-                output=slither_output,
-                created=datetime.now(timezone.utc),
-                creator=current_user
-            )
-            raw_scan_output_obj.save()
-            new_slither_raw_scan_data = json.loads(raw_scan_output_obj.to_json())
+            raw_scan_output_obj = store_raw_scan_output(scan_id, slither_scanner_id, slither_output, current_user)
             print("INFO: Slither raw scan output saved to database.")
 
             findings_data = []
@@ -2006,34 +1594,26 @@ class ScansController():
             # Flatten findings_data into a single list of dictionaries
             flattened_findings = [finding for sublist in findings_data for finding in sublist]
 
+            # Resolve the scan types of all findings, and the fallback, at once
+            scan_type_ids = resolveScanTypeIds([result.get('finding_name', '') for result in flattened_findings] + ["Smart Contract Vulnerability Scanner"])
+
             # Save findings, details, and fix recommendations in the database
             try:
+                # Known issues are linked on write by their fingerprint
+                finding_batch = FindingBatch(current_user, scan_id)
                 for result in flattened_findings:
-                    input_text = result.get('finding_name')
-                    scan_type_id = findScanTypeId(input_text, 'scan_type')
+                    input_text = result.get('finding_name', '')
+                    scan_type_id = scan_type_ids[input_text]
 
                     # If the result is 'others', fallback to "Smart Contract Vulnerability Scanner"
                     if scan_type_id == 'others':
-                        scan_type_id = findScanTypeId("Smart Contract Vulnerability Scanner", 'scan_type')
+                        scan_type_id = scan_type_ids["Smart Contract Vulnerability Scanner"]
 
-                    is_found = findDuplicateFindingAndLinkForSmartContract(project_id, repo_target_id, scan_type_id, result.get('finding_name', ''), result.get('detailed_findings', []), scan_id, current_user)
-                    if is_found:
-                        continue
-
-                    print(f"INFO: Saving finding: {result.get('finding_name')}")
-                    fix_recom_obj = FixRecommendations(
-                        fix_recommendation_id=str(uuid.uuid4()),
-                        scanner_fix=result.get('issue_remediation', ''),
-                        ai_fix=None,
-                        created=datetime.now(timezone.utc),
-                        creator=current_user
-                    )
-                    fix_recom_obj.save()
-                    new_fix_recom_data = json.loads(fix_recom_obj.to_json())
-                    print("INFO: Fix recommendation saved.")
+                    print(f"INFO: Queuing finding: {result.get('finding_name')}")
+                    fix_recommendation = finding_batch.fix_recommendation(result.get('issue_remediation', ''))
 
                     for detail in result.get('detailed_findings', []):
-                        slither_detail_obj = RepoSmartContractSlither1(
+                        slither_detail = RepoSmartContractSlither1(
                             repo_smart_contract_slither_1_id=str(uuid.uuid4()),
                             issue_type=detail.get('issue_type', ''),
                             line_number=detail.get('line_number', ''),
@@ -2045,36 +1625,28 @@ class ScansController():
                             created=datetime.now(timezone.utc),
                             creator=current_user
                         )
-                        slither_detail_obj.save()
-                        new_slither_detail_data = json.loads(slither_detail_obj.to_json())
-                        print(f"INFO: Slither detail finding saved for issue type: {detail.get('issue_type')}")
-
-                        scan_type_id = findScanTypeId(result.get('finding_name', ''), 'scan_type')
 
-                        # If the result is 'others', fallback to "Smart Contract Vulnerability Scanner"
-                        if scan_type_id == 'others':
-                            scan_type_id = findScanTypeId("Smart Contract Vulnerability Scanner", 'scan_type')
-
-                        findings_obj = FindingMaster(
+                        finding_batch.add_finding(FindingMaster(
                             finding_id=str(uuid.uuid4()),
                             project_id=project_id,
                             finding_date=datetime.now(timezone.utc),
                             target_id=repo_target_id,
                             target_type='web3',
+                            fingerprint=finding_fingerprint('slither', detail.get('issue_type') or result.get('finding_name'),
+                                                            f"{detail.get('contract', '')}/{detail.get('function', '')}:{detail.get('line_number', '')}"),
                             scan_type_id=scan_type_id,
                             finding_name=result.get('finding_name', ''),
                             finding_desc=result.get('issue_detail', '')[:255],
                             severity=result.get('risk_level', 'low').lower(),
                             status=result.get('status', 'open').lower(),
-                            raw_scan_output_id=new_slither_raw_scan_data.get('_id', ''),
+                            raw_scan_output_id=raw_scan_output_obj.raw_scan_output_id,
                             extended_finding_details_name='RepoSmartContractSlither1',
-                            extended_finding_details_id=new_slither_detail_data.get('_id', ''),
-                            fix_recommendation_id=new_fix_recom_data.get('_id', ''),
+                            extended_finding_details_id=slither_detail.repo_smart_contract_slither_1_id,
+                            fix_recommendation_id=fix_recommendation.fix_recommendation_id,
                             created=datetime.now(timezone.utc),
                             creator=current_user
-                        )
-                        findings_obj.save()
-                        print(f"INFO: Slither main finding saved with name: {result.get('finding_name')}.")
+                        ), slither_detail, fix_recommendation)
+                print(f"INFO: Saved {finding_batch.write()} Slither finding documents.")
             except Exception as e:
                 print(f"ERROR: Error saving findings to the database: {e}")
                 return {'error': f"Error saving findings: {e}"}, 500
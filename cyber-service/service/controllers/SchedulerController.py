@@ -1,6 +1,6 @@
 import os
 from controllers.util import *
-from entities.CyberServiceEntity import Project, Scanners, ScannerTypes,Scheduler, FindingLicensesAndSbom, RawScanOutput, FindingMaster, RepoSecretDetections
+from entities.CyberServiceEntity import Project, Scanners, ScannerTypes,Scheduler, FindingLicensesAndSbom, FindingMaster, RepoSecretDetections
 from typing import List
 from flask import request, jsonify
 from flask_jwt_extended import verify_jwt_in_request
@@ -20,11 +20,12 @@ from openai import OpenAI
 from entities.CyberServiceEntity import Project, Scanners, Scheduler,Scans
 import subprocess
 from .utility.zap.zap_scanner import run_zap_scan
+from .utility.storage.raw_output_store import store_raw_scan_output
+from .utility.findings.finding_stats import update_finding_stats
 # from .utility.trivy.TrivyScanner import TrivyScanner
 from .ScansController import ScansController
 from .utility.googleCloudScheduler import create_cloud_scheduler_job, generate_cron_expression
 
-from controllers.RepositoryController import RepositoryProvider
 
 from dotenv import load_dotenv
 # Load environment variables from .env file
@@ -86,27 +87,9 @@ class SchedulerController:
             return f"Error running command: {str(e)}. Output: {e.output}"
 
     def clone_github_repo(self, repo_url, access_token, repository_provider):
-        temp_dir = tempfile.mkdtemp()
-
-        if access_token is not None:
-            if repository_provider == RepositoryProvider.GITLAB.value:
-                repo_url = repo_url.replace("gitlab.com", f"oauth2:{access_token}@gitlab.com")
-            elif repository_provider == RepositoryProvider.GITHUB.value:
-                repo_url = repo_url.replace("github.com", f"{access_token}@github.com")
-
-        clone_command = f"git clone {repo_url} {temp_dir}"
-        clone_output = self.run_command(clone_command)
-
-        git_dir = os.path.join(temp_dir, ".git")
-        if not os.path.exists(git_dir):
-            shutil.rmtree(temp_dir)
-            return None, f"Error: {clone_output}. Git repository not found."
-
-        if "Error" in clone_output:
-            shutil.rmtree(temp_dir)
-            return None, clone_output
+        # Shares the cached repository mirrors used by scans
+        return scancontroller_obj.clone_github_repo(repo_url, access_token, repository_provider)
 
-        return temp_dir, clone_output
     def _validateSchedulerAdd(self, request_json):
         schema = SchedulerAddSchema()
         try:
@@ -1110,15 +1093,7 @@ class SchedulerController:
 
         # Store raw Gitleaks scan output
         try:
-            raw_scan_output_obj = RawScanOutput(
-                raw_scan_output_id=str(uuid.uuid4()),
-                scan_id=scan_id,
-                scanner_id=scanner_id,
-                output=gitleaks_output,
-                created=datetime.now(timezone.utc),
-                creator=current_user
-            )
-            raw_scan_output_obj.save()
+            raw_scan_output_obj = store_raw_scan_output(scan_id, scanner_id, gitleaks_output, current_user)
             print("Raw scan output saved:", raw_scan_output_obj)
         except DoesNotExist as e:
             return {'error': 'Empty query: ' + str(e)}, '404 Not Found'
@@ -1195,6 +1170,7 @@ class SchedulerController:
                     creator=current_user
                 )
                 findings_obj.save()
+                update_finding_stats(added=[findings_obj])
 
                 # Save detailed findings
                 for detail in result.get('extra', []):
@@ -1240,15 +1216,7 @@ class SchedulerController:
         # trivy_output = trivyScanner.run_licenses_and_sbom_scan(scan_id, repo_path)
 
         try:
-            raw_scan_output_obj = RawScanOutput(
-                raw_scan_output_id=raw_scan_output_id,
-                scan_id=scan_id,
-                scanner_id=scanner_id,
-                output=trivy_output,
-                created=datetime.now(timezone.utc),
-                creator=current_user,
-            )
-            raw_scan_output_obj.save()
+            raw_scan_output_obj = store_raw_scan_output(scan_id, scanner_id, trivy_output, current_user, raw_scan_output_id)
             raw_scan_output_details = json.loads(
                 raw_scan_output_obj.to_json())
             print("raw scan result", raw_scan_output_details)
@@ -6,6 +6,8 @@ from typing import List
 import uuid, json
 from datetime import datetime, timezone
 import requests
+from ..utility.findings.finding_stats import update_finding_stats
+from ..utility.projects.target_summary import sync_target_summary
 class AzureController():
     """
     Defines controller methods for the TargetAzureCloud Entity.
@@ -227,6 +229,7 @@ class AzureController():
                 creator=current_user,
             )
             new_azure_cloud_obj.save()
+            sync_target_summary(new_azure_cloud_obj)
             response = json.loads(new_azure_cloud_obj.to_json())
             return {'success': 'Record Created Successfully', 'data': response}, '200 Ok'
         except DoesNotExist as e:
@@ -253,6 +256,7 @@ class AzureController():
                 return {'error': 'No TargetAzureCloud record found with the given ID'}, '404 Not Found'
 
             # Optionally, mark as deleted without removing from the database (soft delete)
+            removed_findings = []
             finding_master_queryset = FindingMaster.objects(target_id=azure_id)
             finding_master_data = json.loads(finding_master_queryset.to_json())
 
@@ -275,17 +279,20 @@ class AzureController():
 
                 # Update each object in the FindingMaster queryset
                 for finding_master_obj in finding_master_queryset:
+                    removed_findings.append(finding_master_obj.to_mongo())
                     finding_master_obj.isdeleted = True
                     finding_master_obj.deleted_at = datetime.now(timezone.utc)
                     finding_master_obj.save()
                     
                     # Print the deletion details for FindingMaster
                     print(f"Deleted FindingMaster record with ID: {finding_master_obj.id}")
+            update_finding_stats(removed=removed_findings)
 
             # Mark the TargetAzureCloud object as deleted
             azure_cloud_obj.isdeleted = True
             azure_cloud_obj.deleted_at = datetime.now(timezone.utc)
             azure_cloud_obj.save()
+            sync_target_summary(azure_cloud_obj)
 
             # Print the deletion details for TargetAzureCloud
             print(f"Deleted TargetAzureCloud record with azure_id: {azure_cloud_obj.azure_id}")
@@ -5,6 +5,8 @@ from entities.CyberServiceEntity import TargetGoogleCloud, FindingMaster, CloudC
 from typing import List
 import uuid, json
 from datetime import datetime, timezone
+from ..utility.findings.finding_stats import update_finding_stats
+from ..utility.projects.target_summary import sync_target_summary
 
 class GoogleController():
     """
@@ -176,6 +178,7 @@ class GoogleController():
                 creator=current_user,
             )
             new_google_cloud_obj.save()
+            sync_target_summary(new_google_cloud_obj)
             response = json.loads(new_google_cloud_obj.to_json())
             return {'success': 'Record Created Successfully', 'data': response}, '200 Ok'
         except DoesNotExist as e:
@@ -198,6 +201,7 @@ class GoogleController():
                 return {'error': 'No TargetAzureCloud record found with the given ID'}, '404 Not Found'
 
             # Optionally, mark as deleted without removing from the database (soft delete)
+            removed_findings = []
             finding_master_queryset = FindingMaster.objects(target_id=google_id)
             finding_master_data = json.loads(finding_master_queryset.to_json())
 
@@ -220,17 +224,20 @@ class GoogleController():
 
                 # Update each object in the FindingMaster queryset
                 for finding_master_obj in finding_master_queryset:
+                    removed_findings.append(finding_master_obj.to_mongo())
                     finding_master_obj.isdeleted = True
                     finding_master_obj.deleted_at = datetime.now(timezone.utc)
                     finding_master_obj.save()
                     
                     # Print the deletion details for FindingMaster
                     print(f"Deleted FindingMaster record with ID: {finding_master_obj.id}")
+            update_finding_stats(removed=removed_findings)
 
             # Mark the TargetAzureCloud object as deleted
             google_cloud_obj.isdeleted = True
             google_cloud_obj.deleted_at = datetime.now(timezone.utc)
             google_cloud_obj.save()
+            sync_target_summary(google_cloud_obj)
 
             # Print the deletion details for TargetAzureCloud
             print(f"Deleted TargetAzureCloud record with google_id: {google_cloud_obj.google_id}")
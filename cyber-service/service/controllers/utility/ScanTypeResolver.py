@@ -0,0 +1,61 @@
+from entities.CyberServiceEntity import ScannerTypes
+import os
+import time
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Bounds how long another process (API vs scan worker) keeps an outdated catalog
+SCAN_TYPE_CACHE_TTL_SECONDS = int(os.getenv('SCAN_TYPE_CACHE_TTL_SECONDS', 300))
+
+scan_type_index_cache = {}
+scan_type_index_lock = threading.Lock()
+
+
+def loadScanTypeIndex(field):
+    """
+    Returns the (lowercase value, scan type id) pairs of the ScannerTypes
+    catalog in collection order, loading them at most once per TTL.
+    """
+    with scan_type_index_lock:
+        cached = scan_type_index_cache.get(field)
+        if cached and time.monotonic() - cached[0] < SCAN_TYPE_CACHE_TTL_SECONDS:
+            return cached[1]
+        scanner_types = ScannerTypes.objects().only(field).as_pymongo()
+        index = [(str(scanner_type.get(field) or '').lower(), scanner_type['_id']) for scanner_type in scanner_types]
+        scan_type_index_cache[field] = (time.monotonic(), index)
+        return index
+
+
+def invalidateScanTypeCache():
+    """Drops the cached catalog, called whenever ScannerTypes change."""
+    with scan_type_index_lock:
+        scan_type_index_cache.clear()
+
+
+def resolveScanTypeIds(input_texts, field='scan_type'):
+    """
+    Resolves many finding texts against the scanner type catalog at once.
+    The first scan type contained in the text (case-insensitive) wins and
+    'others' is returned when none matches.
+
+    Args:
+        input_texts (iterable): Finding texts to resolve.
+        field (str): ScannerTypes field matched against the texts.
+
+    Returns:
+        dict: Scan type id for every distinct input text.
+    """
+    index = loadScanTypeIndex(field)
+    resolved = {}
+    for input_text in input_texts:
+        if input_text in resolved:
+            continue
+        lower_text = (input_text or '').lower()
+        resolved[input_text] = next((scan_type_id for value, scan_type_id in index if value in lower_text), 'others')
+    return resolved
+
+
+def resolveScanTypeId(input_text, field='scan_type'):
+    return resolveScanTypeIds([input_text], field)[input_text]
@@ -0,0 +1,70 @@
+import os
+import json
+import shutil
+import tempfile
+
+
+def azure_credentials(azure_cloud_data):
+    """Maps a TargetAzureCloud record to CloudSploit's Azure credential file."""
+    return {
+        "ApplicationID": azure_cloud_data[0]['application_id'],
+        "KeyValue": azure_cloud_data[0]['client_secret_key'],
+        "DirectoryID": azure_cloud_data[0]['directory_id'],
+        "SubscriptionID": azure_cloud_data[0]['subscription_id']
+    }
+
+
+def google_credentials(google_cloud_data):
+    """Maps a TargetGoogleCloud record to a GCP service account key file."""
+    return {
+        "type": google_cloud_data[0]['type'],
+        "project_id": google_cloud_data[0]['gcp_project_id'],
+        "private_key_id": google_cloud_data[0]['private_key_id'],
+        "private_key": google_cloud_data[0]['private_key'],
+        "client_email": google_cloud_data[0]['client_email'],
+        "client_id": google_cloud_data[0]['client_id'],
+        "auth_uri": google_cloud_data[0]['auth_uri'],
+        "token_uri": google_cloud_data[0]['token_uri'],
+        "auth_provider_x509_cert_url": google_cloud_data[0]['auth_provider_x509_cert_url'],
+        "client_x509_cert_url": google_cloud_data[0]['client_x509_cert_url'],
+        "universe_domain": google_cloud_data[0]['universe_domain']
+    }
+
+
+def write_scan_config(cloud, credentials):
+    """
+    Writes the credential file and a CloudSploit config pointing at it into a
+    new private directory, so concurrent scans never share a config. The
+    shared config_example.js of the CloudSploit checkout is left untouched.
+
+    Args:
+        cloud (str): CloudSploit cloud name ('azure' or 'google').
+        credentials (dict): Content of the credential file.
+
+    Returns:
+        tuple: (scan directory to remove after the scan, path of the config file)
+    """
+    scan_dir = tempfile.mkdtemp(prefix=f"cloudsploit-{cloud}-")
+    try:
+        credential_file_path = os.path.join(scan_dir, 'credentials.json')
+        # Readable by the scanning user only
+        with os.fdopen(os.open(credential_file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'w') as file:
+            json.dump(credentials, file, indent=4)
+
+        config_path = os.path.join(scan_dir, 'config.js')
+        with open(config_path, 'w') as file:
+            file.write(
+                "module.exports = {\n"
+                "    credentials: {\n"
+                f"        {cloud}: {{\n"
+                f"            credential_file: {json.dumps(credential_file_path)}\n"
+                "        }\n"
+                "    }\n"
+                "};\n"
+            )
+    except Exception:
+        shutil.rmtree(scan_dir, ignore_errors=True)
+        raise
+
+    print(f"CloudSploit {cloud} config written to {config_path}")
+    return scan_dir, config_path
@@ -1,6 +1,6 @@
 import json
 import subprocess
-import tempfile
+import shutil
 import os
 import requests
 import time
@@ -9,6 +9,9 @@ from datetime import datetime, timezone
 from uuid import uuid4
 from enum import Enum
 from openai import OpenAI
+from ..llm.llm_cache import cached_chat_completion
+from ..findings.fingerprint import finding_fingerprint
+from .cloudsploit_config import write_scan_config, google_credentials
 
 
 # Get OpenAI API key from environment variable
@@ -17,6 +20,8 @@ openai_api_key = os.getenv('OPENAI_API_KEY')
 # Set your OpenAI API key
 client = OpenAI(api_key=openai_api_key)
 
+SCAN_TYPE_MAPPING_PROMPT_VERSION = 'scan-type-mapping:1'
+
 
 
 def map_scan_type_id(finding, scanner_types):
@@ -43,14 +48,7 @@ def map_scan_type_id(finding, scanner_types):
     """
     try:
         # Call OpenAI API
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7
-        )
-        # print("response:", response)
-
-        structured_results = response.choices[0].message.content
+        structured_results = cached_chat_completion(client, prompt, SCAN_TYPE_MAPPING_PROMPT_VERSION, [finding, scanner_types])
         print("INFO: Structured results received from OpenAI.")
         print(f"DEBUG: Structured results: {structured_results}")
 
@@ -71,17 +69,20 @@ def map_scan_type_id(finding, scanner_types):
         print(f"Error mapping scan_type_id: {e}")
         return None, str(e)
   
-def run_google_cloud_scan(project_id, scan_id, google_cloud_data, google_scanner_id, current_user, google_cloudsploit_config_path, google_cloudsploit_original_content):
-    # Step 1: Create a temp file to store the output of the scan
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.json', mode='w') as temp_output_file:
-        temp_output_file_path = temp_output_file.name
+def run_google_cloud_scan(project_id, scan_id, google_cloud_data, google_scanner_id, current_user):
+    # Step 1: Generate the config and credential file of this scan in its own directory
+    try:
+        scan_dir, config_js_path = write_scan_config("google", google_credentials(google_cloud_data))
+    except Exception as e:
+        print(f"Failed to write CloudSploit config: {str(e)}")
+        return {"error": "Failed to write CloudSploit config", "details": str(e)}, None
+    temp_output_file_path = os.path.join(scan_dir, "output.json")
 
     cloudsploit_base_path = os.getenv('CLOUDSPLOIT_CLONE_PATH')
 
     index_js_path = os.path.join(cloudsploit_base_path, "index.js")
-    config_js_path = os.path.join(cloudsploit_base_path, "config_example.js")
-    
-    # Step 2: Define the command to run the scan (credentials are handled in config_example.js)
+
+    # Step 2: Define the command to run the scan (credentials are handled in the generated config)
     scan_command = [
         index_js_path,
         "--config", config_js_path,
@@ -91,40 +92,34 @@ def run_google_cloud_scan(project_id, scan_id, google_cloud_data, google_scanner
         "--run-asl"
     ]
 
-    # Step 3: Run the scan using subprocess and capture the output
     try:
-        result = subprocess.run(scan_command, capture_output=True, text=True, check=True)
-        print(f"Scan successful. Command output: {result.stdout}")
-    except subprocess.CalledProcessError as e:
-        print(f"Error running scan: {e.stderr}")
-        return {"error": "Scan failed", "details": e.stderr}, None
-
-    # Restore the original content after printing
-    with open(google_cloudsploit_config_path, 'w') as file:
-        file.write(google_cloudsploit_original_content) 
-
-    # Step 4: Check for any generic error message in stdout
-    # error_pattern = r"(ERROR|Error|error):\s*(.*)"
-    # match = re.search(error_pattern, result.stdout)
-    # if match:
-    #     error_message = match.group(2)  # Extract the error message after "ERROR"
-    #     print(f"Error detected: {error_message}")
-    #     return {"error": "Scan encountered an error", "details": error_message}, None
-
-    # Step 5: Read the JSON output from the temp file
-    try:
-        with open(temp_output_file_path, 'r') as output_file:
-            scan_output = json.load(output_file)
-        print(f"Scan output: {scan_output}")
-    except Exception as e:
-        print(f"Failed to read scan output: {str(e)}")
-        return {"error": "Failed to parse scan output", "details": str(e)}, None
+        # Step 3: Run the scan using subprocess and capture the output
+        try:
+            result = subprocess.run(scan_command, capture_output=True, text=True, check=True)
+            print(f"Scan successful. Command output: {result.stdout}")
+        except subprocess.CalledProcessError as e:
+            print(f"Error running scan: {e.stderr}")
+            return {"error": "Scan failed", "details": e.stderr}, None
+
+        # Step 4: Check for any generic error message in stdout
+        # error_pattern = r"(ERROR|Error|error):\s*(.*)"
+        # match = re.search(error_pattern, result.stdout)
+        # if match:
+        #     error_message = match.group(2)  # Extract the error message after "ERROR"
+        #     print(f"Error detected: {error_message}")
+        #     return {"error": "Scan encountered an error", "details": error_message}, None
+
+        # Step 5: Read the JSON output from the temp file
+        try:
+            with open(temp_output_file_path, 'r') as output_file:
+                scan_output = json.load(output_file)
+            print(f"Scan output: {scan_output}")
+        except Exception as e:
+            print(f"Failed to read scan output: {str(e)}")
+            return {"error": "Failed to parse scan output", "details": str(e)}, None
     finally:
-        # Step 6: Clean up the temp output file
-        os.remove(temp_output_file_path)
-
-
-    print(f"Reverted {google_cloudsploit_config_path} back to its original state.")
+        # Step 6: Remove the config, the credentials and the output of the scan
+        shutil.rmtree(scan_dir, ignore_errors=True)
 
     # Return the command output and parsed JSON output of the scan
     return result.stdout, scan_output
@@ -143,6 +138,7 @@ def convert_structured_google_output(google_scan_json_data, scanner_types):
             "severity": "high",
             "status": "open",
             "extended_finding_details_name": "CloudCloudSploitGoogle1",  
+            "fingerprint": finding_fingerprint("cloudsploit-google", data.get("plugin"), data.get("resource"), data.get("region")),
             "extended_finding_details_id": "",  
             "fix_recommendation": "",
             "raw_scan_output_id": "",
@@ -0,0 +1,81 @@
+from entities.CyberServiceEntity import Compliance, ComplianceScannerMapping, ScannerTypes, FindingMaster, \
+    ManualComplianceEvaluation, ProjectComplianceSummary
+from ..db.lean_queries import find_documents
+from .snapshot import begin_snapshot, store_snapshot
+
+
+def compute_compliance_summary(project_id):
+    """
+    Counts, per compliance type, the controls the project does not comply
+    with (a mapped scan type has findings or a manual evaluation says
+    'not-complying'), the ones manually evaluated as complying and the ones
+    still needing a manual evaluation. Every scanner mapping of a control is
+    counted, like the $unwind of the aggregation this replaces.
+
+    Returns:
+        list: One dict per compliance type, ordered by compliance type.
+    """
+    controls = find_documents(Compliance, fields=['compliance_type'])
+    mappings_by_control = {}
+    for mapping in ComplianceScannerMapping._get_collection().find({}, {'compliance_id': 1, 'scanner_type_id': 1}):
+        mappings_by_control.setdefault(mapping.get('compliance_id'), []).append(mapping.get('scanner_type_id') or [])
+
+    # Only scan types that exist in the catalog, one indexed distinct for the project's findings
+    scan_type_ids = set(ScannerTypes._get_collection().distinct('_id'))
+    found_scan_type_ids = set(FindingMaster._get_collection().distinct('scan_type_id', {'project_id': project_id})) & scan_type_ids
+
+    evaluations_by_control = {}
+    for evaluation in ManualComplianceEvaluation._get_collection().find(
+            {'project_id': project_id}, {'compliance_id': 1, 'evaluation_status': 1}):
+        evaluations_by_control.setdefault(evaluation.get('compliance_id'), set()).add(evaluation.get('evaluation_status'))
+
+    counts = {}
+    for control in controls:
+        evaluations = evaluations_by_control.get(control['_id'], set())
+        for mapped_scan_type_ids in mappings_by_control.get(control['_id']) or [[]]:
+            count = counts.setdefault(control.get('compliance_type'), {'total': 0, 'non_complying': 0, 'complying': 0})
+            count['total'] += 1
+            if found_scan_type_ids.intersection(mapped_scan_type_ids) or 'not-complying' in evaluations:
+                count['non_complying'] += 1
+            if 'complying' in evaluations:
+                count['complying'] += 1
+
+    return [{
+        'compliance_type': compliance_type,
+        'non_complying_count': count['non_complying'],
+        'complying_count': count['complying'],
+        'manual_evaluation_needed_count': count['total'] - count['non_complying'] - count['complying'],
+    } for compliance_type, count in sorted(counts.items(), key=lambda item: str(item[0]))]
+
+
+def refresh_compliance_summary(project_id):
+    """
+    Recomputes the compliance summary snapshot of a project, called when a
+    scan completes or a manual evaluation changes. The summary is not stored
+    when the snapshot was invalidated or refreshed again while computing.
+
+    Returns:
+        list: The new summary.
+    """
+    version = begin_snapshot(ProjectComplianceSummary, project_id)
+    summary = compute_compliance_summary(project_id)
+    store_snapshot(ProjectComplianceSummary, project_id, version, {'summary': summary})
+    return summary
+
+
+def read_compliance_summary(project_id):
+    """Returns the compliance summary snapshot of a project, computing it when there is none."""
+    snapshot = ProjectComplianceSummary._get_collection().find_one({'_id': project_id}, {'summary': 1})
+    # A snapshot being computed for the first time has no summary yet
+    if snapshot is None or 'summary' not in snapshot:
+        return refresh_compliance_summary(project_id)
+    return snapshot.get('summary', [])
+
+
+def invalidate_compliance_summaries(project_ids=None):
+    """
+    Drops the snapshots of the given projects, called whenever their findings
+    change. Without project ids every snapshot is dropped, for changes to the
+    controls or their scanner mappings. They are recomputed on read.
+    """
+    ProjectComplianceSummary._get_collection().delete_many({} if project_ids is None else {'_id': {'$in': list(project_ids)}})
@@ -0,0 +1,81 @@
+from entities.CyberServiceEntity import Samm, FrameworkScannerMapping, ScannerTypes, ProjectFindingStats, ProjectSammCoverage
+from ..db.lean_queries import find_documents
+from .snapshot import begin_snapshot, store_snapshot
+
+
+def finding_counts_by_scan_type(project_id):
+    """Finding total and severity counts of a project per scan type, read from ProjectFindingStats."""
+    counts = {}
+    for stats in ProjectFindingStats._get_collection().find({'project_id': project_id}, {'scan_type_id': 1, 'total': 1, 'severity': 1}):
+        scan_type_counts = counts.setdefault(stats.get('scan_type_id'), {'total': 0, 'severity': {}})
+        scan_type_counts['total'] += stats.get('total', 0)
+        for severity, count in (stats.get('severity') or {}).items():
+            scan_type_counts['severity'][severity] = scan_type_counts['severity'].get(severity, 0) + count
+    return counts
+
+
+def compute_samm_coverage(project_id):
+    """
+    One row per SAMM practice and framework scanner mapping, with the mapped
+    scanner types and, instead of the matched findings themselves, the
+    number of findings per matched scan type and per severity.
+
+    Returns:
+        list: The SAMM coverage rows of the project.
+    """
+    mappings_by_framework = {}
+    for mapping in FrameworkScannerMapping._get_collection().find({}):
+        mappings_by_framework.setdefault(mapping.get('framework_id'), []).append(mapping)
+    scanner_types = {scanner_type['_id']: scanner_type for scanner_type in ScannerTypes._get_collection().find({})}
+    finding_counts = finding_counts_by_scan_type(project_id)
+
+    rows = []
+    for practice in find_documents(Samm):
+        practice.pop('isdeleted', None)
+        for mapping in mappings_by_framework.get(practice['_id']) or [None]:
+            row = dict(practice)
+            matched_scanner_types = []
+            if mapping is not None:
+                row['framework_scanner_mapping'] = mapping
+                matched_scanner_types = [scanner_types[scan_type_id] for scan_type_id in dict.fromkeys(mapping.get('scanner_type_id') or [])
+                                         if scan_type_id in scanner_types]
+            row['scanner_types'] = matched_scanner_types
+
+            matched_scan_types = []
+            severity_counts = {}
+            for scanner_type in matched_scanner_types:
+                counts = finding_counts.get(scanner_type['_id'])
+                if not counts or not counts['total']:
+                    continue
+                matched_scan_types.append({'scan_type_id': scanner_type['_id'], 'scan_type': scanner_type.get('scan_type'),
+                                           'finding_count': counts['total']})
+                for severity, count in counts['severity'].items():
+                    severity_counts[severity] = severity_counts.get(severity, 0) + count
+            row['matched_scan_types'] = matched_scan_types
+            row['matched_finding_count'] = sum(scan_type['finding_count'] for scan_type in matched_scan_types)
+            row['matched_severity_counts'] = {severity: count for severity, count in severity_counts.items() if count}
+            rows.append(row)
+    return rows
+
+
+def read_samm_coverage(project_id):
+    """
+    Returns the cached SAMM coverage of a project, computing it when there is
+    none. Coverage invalidated while computing is returned but not cached.
+    """
+    cached = ProjectSammCoverage._get_collection().find_one({'_id': project_id}, {'practices': 1})
+    if cached is not None and 'practices' in cached:
+        return cached['practices']
+    version = begin_snapshot(ProjectSammCoverage, project_id)
+    practices = compute_samm_coverage(project_id)
+    store_snapshot(ProjectSammCoverage, project_id, version, {'practices': practices})
+    return practices
+
+
+def invalidate_samm_coverage(project_ids=None):
+    """
+    Drops the cached coverage of the given projects, called whenever their
+    findings change. Without project ids every project is dropped, for
+    changes to the practices, their scanner mappings or the scanner types.
+    """
+    ProjectSammCoverage._get_collection().delete_many({} if project_ids is None else {'_id': {'$in': list(project_ids)}})
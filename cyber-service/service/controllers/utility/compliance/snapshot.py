@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime, timezone
+
+
+def begin_snapshot(document_class, project_id):
+    """
+    Stamps a new version on the snapshot of a project before it is computed.
+
+    Returns:
+        str: Version the computed snapshot is stored under.
+    """
+    version = str(uuid.uuid4())
+    document_class._get_collection().update_one({'_id': project_id}, {'$set': {'version': version}}, upsert=True)
+    return version
+
+
+def store_snapshot(document_class, project_id, version, fields):
+    """
+    Stores a computed snapshot unless it was invalidated or a newer
+    computation started meanwhile, which deleted or re-stamped the document.
+
+    Returns:
+        bool: True when the snapshot was stored.
+    """
+    result = document_class._get_collection().update_one(
+        {'_id': project_id, 'version': version},
+        {'$set': {**fields, 'computed': datetime.now(timezone.utc)}})
+    return result.matched_count > 0
@@ -0,0 +1,61 @@
+def live_filter(document_class, filters=None):
+    """
+    Adds the soft delete condition of the entity to a raw query filter,
+    like `Entity.objects` does.
+
+    Args:
+        document_class: mongoengine entity class.
+        filters (dict): Query on the stored field names, '_id' for the primary key.
+
+    Returns:
+        dict: The filter without soft deleted documents.
+    """
+    query = dict(filters or {})
+    for field, deleted_value in document_class._meta.get('soft_delete', {}).items():
+        condition = {'$ne': deleted_value}
+        if field in query:
+            query = {'$and': [query, {field: condition}]}
+        else:
+            query[field] = condition
+    return query
+
+
+def find_documents(document_class, filters=None, fields=None, sort=None, limit=0):
+    """
+    Reads documents as plain dicts straight from pymongo, without building
+    mongoengine documents or round tripping them through to_json().
+    Datetimes stay datetimes and the primary key is '_id'.
+
+    Args:
+        document_class: mongoengine entity class.
+        filters (dict): Query on the stored field names.
+        fields (list): Fields to return, all when not given.
+        sort (list): (field, direction) pairs.
+        limit (int): Maximum number of documents, 0 for all.
+
+    Returns:
+        list: The matching documents.
+    """
+    projection = dict.fromkeys(fields, 1) if fields else None
+    cursor = document_class._get_collection().find(live_filter(document_class, filters), projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    return list(cursor)
+
+
+def find_document(document_class, filters=None, fields=None, sort=None):
+    """
+    Reads the first matching document as a plain dict.
+
+    Returns:
+        dict | None: The document, None when nothing matches.
+    """
+    documents = find_documents(document_class, filters, fields, sort, limit=1)
+    return documents[0] if documents else None
+
+
+def find_ids(document_class, filters=None):
+    """Returns the primary keys of the matching documents."""
+    return [document['_id'] for document in find_documents(document_class, filters, ['_id'])]
@@ -0,0 +1,285 @@
+import os
+import uuid
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from entities.CyberServiceEntity import FindingMaster, FindingScanLink, FixRecommendations
+from .finding_stats import STATS_FIELDS, update_finding_stats
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Documents per insert_many call
+BULK_WRITE_BATCH_SIZE = int(os.getenv('BULK_WRITE_BATCH_SIZE', 1000))
+
+
+class FindingBatch:
+    """
+    Collects the detail, fix recommendation and FindingMaster documents of one
+    scanner result and writes them with a few unordered bulk calls instead of
+    one save() per document. Ids are generated up front, so documents can
+    reference each other before anything is written.
+
+    Findings with a fingerprint are deduplicated on write: they are upserted
+    on (project_id, target_id, fingerprint), findings that already exist are
+    reopened and linked to the scan, and only the new ones get their detail
+    documents written.
+    """
+
+    def __init__(self, current_user, scan_id=None, batch_size=BULK_WRITE_BATCH_SIZE) -> None:
+        self.current_user = current_user
+        self.scan_id = scan_id
+        self.batch_size = batch_size
+        self.documents = {}
+        self.findings = {}
+
+    def add(self, document):
+        """
+        Validates and queues a document that is written unconditionally.
+
+        Returns:
+            str: Primary key of the document.
+        """
+        document.validate()
+        self.documents.setdefault(type(document), []).append(document.to_mongo())
+        return document.pk
+
+    def fix_recommendation(self, scanner_fix=None):
+        return FixRecommendations(
+            fix_recommendation_id=str(uuid.uuid4()),
+            scanner_fix=scanner_fix,
+            ai_fix=None,
+            created=datetime.now(timezone.utc),
+            creator=self.current_user
+        )
+
+    def add_finding(self, finding, *related_documents):
+        """
+        Queues a fingerprinted finding with the documents it points at, which
+        are only written when the finding turns out to be new. A fingerprint
+        already queued in this batch is skipped.
+
+        Returns:
+            bool: False when the fingerprint was already queued.
+        """
+        if not finding.fingerprint:
+            for document in related_documents:
+                self.add(document)
+            self.add(finding)
+            return True
+        key = (finding.project_id, finding.target_id, finding.fingerprint)
+        if key in self.findings:
+            return False
+        finding.validate()
+        for document in related_documents:
+            document.validate()
+        self.findings[key] = (finding.to_mongo(), [(type(document), document.to_mongo()) for document in related_documents])
+        return True
+
+    def __len__(self):
+        return sum(len(documents) for documents in self.documents.values()) + len(self.findings)
+
+    def write(self):
+        """
+        Writes the queued documents. The documents a finding points at are
+        inserted before the finding, and a finding whose detail or fix
+        recommendation failed to be written is dropped, so a finding never
+        points at a missing document.
+
+        Returns:
+            int: Number of documents inserted.
+        """
+        failed_ids = set()
+        inserted = self.upsert_findings(failed_ids)
+        for document_class in sorted(self.documents, key=lambda document_class: document_class is FindingMaster):
+            documents = self.documents[document_class]
+            if document_class is FindingMaster:
+                documents = [document for document in documents if not self.references_failed(document, failed_ids)]
+            inserted += self.insert_documents(document_class, documents, failed_ids)
+        self.documents = {}
+        self.findings = {}
+        return inserted
+
+    @staticmethod
+    def references_failed(finding, failed_ids):
+        return bool(failed_ids) and (finding.get('extended_finding_details_id') in failed_ids
+                                     or finding.get('fix_recommendation_id') in failed_ids)
+
+    def insert_documents(self, document_class, documents, failed_ids=None):
+        """
+        Inserts documents with unordered insert_many calls of batch_size.
+        The ids of the documents that failed are added to `failed_ids`.
+        """
+        inserted = 0
+        collection = document_class._get_collection()
+        for start in range(0, len(documents), self.batch_size):
+            chunk = documents[start:start + self.batch_size]
+            failed = set()
+            try:
+                result = collection.insert_many(chunk, ordered=False)
+                inserted += len(result.inserted_ids)
+            except BulkWriteError as e:
+                inserted += e.details.get('nInserted', 0)
+                failed = {error['index'] for error in e.details.get('writeErrors', [])}
+                print(f"Bulk insert into {collection.name} failed for {len(failed)} documents")
+                if failed_ids is not None:
+                    failed_ids.update(chunk[index]['_id'] for index in failed)
+            if document_class is FindingMaster:
+                update_finding_stats(added=[document for index, document in enumerate(chunk) if index not in failed])
+        return inserted
+
+    def upsert_findings(self, failed_ids=None):
+        """
+        Upserts the fingerprinted findings on (project_id, target_id,
+        fingerprint). The related documents of the findings not stored yet are
+        inserted first; the ones of a finding another worker inserted in the
+        meantime are removed again. Existing findings are reopened and linked
+        to the scan.
+
+        Returns:
+            int: Number of findings and related documents inserted.
+        """
+        if failed_ids is None:
+            failed_ids = set()
+        if not self.findings:
+            return 0
+        collection = FindingMaster._get_collection()
+        stored_keys = self.stored_finding_keys()
+        stored_keys |= self.adopt_legacy_findings(stored_keys)
+
+        # Related documents of the findings expected to be new, a fix shared by
+        # several findings of the batch is written once
+        related = {}
+        for key, (_, documents) in self.findings.items():
+            if key not in stored_keys:
+                for document_class, document in documents:
+                    related.setdefault(document_class, {})[document['_id']] = document
+        inserted = 0
+        for document_class, documents in related.items():
+            inserted += self.insert_documents(document_class, list(documents.values()), failed_ids)
+
+        pending = [(key, (finding, documents)) for key, (finding, documents) in self.findings.items()
+                   if key in stored_keys or not any(document['_id'] in failed_ids for _, document in documents)]
+        if len(pending) < len(self.findings):
+            print(f"Skipped {len(self.findings) - len(pending)} findings whose related documents failed to be written")
+        new_keys = set()
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            operations = [
+                UpdateOne({'project_id': project_id, 'target_id': target_id, 'fingerprint': fingerprint},
+                          {'$setOnInsert': finding}, upsert=True)
+                for (project_id, target_id, fingerprint), (finding, _) in chunk
+            ]
+            try:
+                upserted = collection.bulk_write(operations, ordered=False).upserted_ids.values()
+            except BulkWriteError as e:
+                # Two workers inserting the same fingerprint: the loser is an existing finding
+                upserted = [item['_id'] for item in e.details.get('upserted', [])]
+                print(f"Finding upsert failed for {len(e.details.get('writeErrors', []))} documents")
+            # The finding ids are generated up front, an upserted id is a new finding
+            upserted = set(upserted)
+            new_keys.update(key for key, (finding, _) in chunk if finding['_id'] in upserted)
+        update_finding_stats(added=[self.findings[key][0] for key in new_keys])
+
+        # Findings that turned out to exist already do not need their related documents
+        new_ids = {document['_id'] for key in new_keys for _, document in self.findings[key][1]}
+        for document_class, documents in related.items():
+            orphan_ids = [document_id for document_id in documents if document_id not in new_ids and document_id not in failed_ids]
+            if orphan_ids:
+                inserted -= document_class._get_collection().delete_many({'_id': {'$in': orphan_ids}}).deleted_count
+
+        existing_keys = [key for key, _ in pending if key not in new_keys]
+        self.link_existing_findings(existing_keys)
+        return inserted + len(new_keys)
+
+    def stored_finding_keys(self):
+        """Keys of the queued findings whose fingerprint is already stored."""
+        fingerprints_by_target = {}
+        for project_id, target_id, fingerprint in self.findings:
+            fingerprints_by_target.setdefault((project_id, target_id), []).append(fingerprint)
+        stored_keys = set()
+        for (project_id, target_id), fingerprints in fingerprints_by_target.items():
+            for finding in FindingMaster._get_collection().find(
+                    {'project_id': project_id, 'target_id': target_id, 'fingerprint': {'$in': fingerprints}},
+                    {'fingerprint': 1}):
+                stored_keys.add((project_id, target_id, finding['fingerprint']))
+        return stored_keys
+
+    def adopt_legacy_findings(self, stored_keys):
+        """
+        Stamps the fingerprint on findings recorded before fingerprints
+        existed, matched on scan type and finding name like the old duplicate
+        check, so the upsert treats them as existing instead of adding a copy.
+        A fingerprint another finding of the target already carries is not
+        stamped again, the partial unique index would reject it.
+
+        Returns:
+            set: Keys of the findings that were adopted.
+        """
+        pending_by_target = {}
+        for key, (finding, _) in self.findings.items():
+            if key in stored_keys:
+                continue
+            project_id, target_id, fingerprint = key
+            pending_by_target.setdefault((project_id, target_id), {}).setdefault(
+                (finding.get('scan_type_id'), finding.get('finding_name')), fingerprint)
+
+        operations = []
+        adopted = []
+        for (project_id, target_id), pending in pending_by_target.items():
+            legacy_findings = FindingMaster._get_collection().find(
+                {'project_id': project_id, 'target_id': target_id, 'fingerprint': None,
+                 'finding_name': {'$in': list({finding_name for _, finding_name in pending})}},
+                {'_id': 1, 'scan_type_id': 1, 'finding_name': 1})
+            for legacy_finding in legacy_findings:
+                fingerprint = pending.pop((legacy_finding.get('scan_type_id'), legacy_finding.get('finding_name')), None)
+                if fingerprint:
+                    operations.append(UpdateOne({'_id': legacy_finding['_id']}, {'$set': {'fingerprint': fingerprint}}))
+                    adopted.append((project_id, target_id, fingerprint))
+        if not operations:
+            return set()
+        try:
+            FindingMaster._get_collection().bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Another worker stamped or inserted the fingerprint first, the upsert finds that finding
+            failed = {error['index'] for error in e.details.get('writeErrors', [])}
+            print(f"Fingerprinting legacy findings failed for {len(failed)} documents")
+            adopted = [key for index, key in enumerate(adopted) if index not in failed]
+        print(f"Fingerprinted {len(adopted)} findings recorded before fingerprints.")
+        return set(adopted)
+
+    def link_existing_findings(self, keys):
+        if not keys:
+            return
+        finding_ids = []
+        closed_ids = []
+        reopened = []
+        removed = []
+        keys_by_target = {}
+        for project_id, target_id, fingerprint in keys:
+            keys_by_target.setdefault((project_id, target_id), []).append(fingerprint)
+        for (project_id, target_id), fingerprints in keys_by_target.items():
+            for finding in FindingMaster._get_collection().find(
+                    {'project_id': project_id, 'target_id': target_id, 'fingerprint': {'$in': fingerprints}},
+                    ['_id', 'isdeleted', *STATS_FIELDS]):
+                finding_ids.append(finding['_id'])
+                # A deleted finding keeps its fingerprint, finding it again brings it back
+                if finding.get('status') == 'closed' or finding.get('isdeleted'):
+                    closed_ids.append(finding['_id'])
+                    if not finding.get('isdeleted'):
+                        removed.append(finding)
+                    reopened.append({**finding, 'status': 'open'})
+
+        if closed_ids:
+            FindingMaster._get_collection().update_many(
+                {'_id': {'$in': closed_ids}}, {'$set': {'status': 'open', 'isdeleted': False}})
+            update_finding_stats(added=reopened, removed=removed)
+        if self.scan_id:
+            self.insert_documents(FindingScanLink, [FindingScanLink(
+                finding_scan_link_id=str(uuid.uuid4()),
+                finding_id=finding_id,
+                scan_id=self.scan_id,
+                created=datetime.now(timezone.utc),
+                creator=self.current_user,
+            ).to_mongo() for finding_id in finding_ids])
+        print(f"Linked {len(finding_ids)} existing findings, {len(closed_ids)} reopened.")
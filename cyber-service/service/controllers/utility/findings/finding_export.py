@@ -0,0 +1,171 @@
+import os
+import io
+import csv
+import json
+import zlib
+from datetime import datetime
+from entities.CyberServiceEntity import FindingMaster, Repository, Domain, Contract, TargetAzureCloud, TargetGoogleCloud, \
+    ScannerTypes, FixRecommendations
+from ..db.lean_queries import live_filter
+from ..storage.raw_output_store import GZIP_WBITS
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Findings read, joined and written per round trip, the memory of an export does not grow with the project
+FINDINGS_EXPORT_BATCH_SIZE = int(os.getenv('FINDINGS_EXPORT_BATCH_SIZE', 500))
+FINDINGS_EXPORT_COMPRESSION_LEVEL = int(os.getenv('FINDINGS_EXPORT_COMPRESSION_LEVEL', 6))
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+TARGET_CLASSES = [Domain, Repository, Contract, TargetAzureCloud, TargetGoogleCloud]
+# Credentials of the targets and the content of uploaded contracts stay out of the export
+TARGET_EXCLUDED_FIELDS = {
+    'isdeleted': 0,
+    'access_token': 0,
+    'client_secret_key': 0,
+    'private_key': 0,
+    'private_key_id': 0,
+    'solidity_files.file_id': 0,
+    'solidity_files.file_content': 0,
+}
+
+CSV_COLUMNS = [
+    'finding_id', 'project_id', 'target_id', 'target_type', 'target', 'scan_type_id', 'scan_type',
+    'finding_name', 'finding_desc', 'severity', 'status', 'finding_date', 'created',
+    'scanner_fix', 'ai_fix', 'extended_finding_details_name', 'extended_details',
+]
+
+
+def finding_batches(match_stage, batch_size=FINDINGS_EXPORT_BATCH_SIZE):
+    """Yields the live findings of the match in _id order, batch_size at a time from one cursor."""
+    cursor = FindingMaster._get_collection().find(live_filter(FindingMaster, match_stage), {'isdeleted': 0}) \
+        .sort('_id', 1).batch_size(batch_size)
+    batch = []
+    for finding in cursor:
+        batch.append(finding)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def join_finding_details(findings, scan_types, extended_details_models):
+    """
+    Adds target_details, scan_type_details, fix_recommendation_details and
+    extended_details to a batch of findings, with one $in query per joined
+    collection instead of a lookup per finding.
+
+    Args:
+        findings (list): Raw FindingMaster documents, updated in place.
+        scan_types (dict): ScannerTypes documents by id, read once per export.
+        extended_details_models (dict): Entity class by extended_finding_details_name.
+    """
+    target_ids = list({finding.get('target_id') for finding in findings})
+    targets = {}
+    # Same precedence as the findings listing when an id exists in several target collections
+    for target_class in reversed(TARGET_CLASSES):
+        for target in target_class._get_collection().find({'_id': {'$in': target_ids}}, TARGET_EXCLUDED_FIELDS):
+            targets[target['_id']] = target
+
+    fix_recommendation_ids = list({finding['fix_recommendation_id'] for finding in findings if finding.get('fix_recommendation_id')})
+    fix_recommendations = {fix['_id']: fix for fix in FixRecommendations._get_collection().find(
+        {'_id': {'$in': fix_recommendation_ids}}, {'isdeleted': 0})} if fix_recommendation_ids else {}
+
+    details_ids = {}
+    for finding in findings:
+        if finding.get('extended_finding_details_name') in extended_details_models and finding.get('extended_finding_details_id'):
+            details_ids.setdefault(finding['extended_finding_details_name'], set()).add(finding['extended_finding_details_id'])
+    extended_details = {}
+    for name, ids in details_ids.items():
+        for details in extended_details_models[name]._get_collection().find({'_id': {'$in': list(ids)}}, {'isdeleted': 0}):
+            extended_details[(name, details['_id'])] = details
+
+    for finding in findings:
+        finding['target_details'] = targets.get(finding.get('target_id'))
+        finding['scan_type_details'] = scan_types.get(finding.get('scan_type_id'))
+        finding['fix_recommendation_details'] = fix_recommendations.get(finding.get('fix_recommendation_id'))
+        finding['extended_details'] = extended_details.get(
+            (finding.get('extended_finding_details_name'), finding.get('extended_finding_details_id')))
+    return findings
+
+
+def export_value(value):
+    """JSON encoding of the values pymongo returns, datetimes as ISO 8601."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def target_label(target):
+    if not target:
+        return None
+    for field in ('repository_url', 'domain_url', 'contract_url', 'contract_label', 'name'):
+        if target.get(field):
+            return target[field]
+    return None
+
+
+def csv_row(finding):
+    """Flattens a joined finding into the CSV_COLUMNS, nested details as JSON."""
+    fix_recommendation = finding.get('fix_recommendation_details') or {}
+    extended_details = finding.get('extended_details')
+    row = {
+        **{column: finding.get(column) for column in CSV_COLUMNS},
+        'finding_id': finding['_id'],
+        'target': target_label(finding.get('target_details')),
+        'scan_type': (finding.get('scan_type_details') or {}).get('scan_type'),
+        'scanner_fix': fix_recommendation.get('scanner_fix'),
+        'ai_fix': fix_recommendation.get('ai_fix'),
+        'extended_details': json.dumps(extended_details, default=export_value) if extended_details else None,
+    }
+    return [export_value(row[column]) if isinstance(row[column], datetime) else row[column] for column in CSV_COLUMNS]
+
+
+def encode_findings(batches, export_format):
+    """
+    Encodes joined finding batches as NDJSON lines or CSV rows, one chunk of
+    bytes per batch.
+    """
+    if export_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        for batch in batches:
+            writer.writerows(csv_row(finding) for finding in batch)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        # Header only when there are no findings
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+    else:
+        for batch in batches:
+            yield ''.join(json.dumps(finding, default=export_value) + '\n' for finding in batch).encode('utf-8')
+
+
+def gzip_chunks(chunks):
+    """Gzip compresses a stream of byte chunks as they come."""
+    compressor = zlib.compressobj(FINDINGS_EXPORT_COMPRESSION_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_findings(match_stage, export_format, extended_details_models, batch_size=FINDINGS_EXPORT_BATCH_SIZE):
+    """
+    Streams the findings of a match with their details as NDJSON or CSV.
+
+    Returns:
+        generator: Chunks of encoded bytes, one per batch of findings.
+    """
+    scan_types = {scan_type['_id']: scan_type for scan_type in ScannerTypes._get_collection().find({}, {'isdeleted': 0})}
+    batches = (join_finding_details(batch, scan_types, extended_details_models)
+               for batch in finding_batches(match_stage, batch_size))
+    return encode_findings(batches, export_format)
@@ -0,0 +1,87 @@
+import os
+import time
+import base64
+import threading
+from bson import json_util
+from entities.CyberServiceEntity import FindingMaster
+from ..db.lean_queries import live_filter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# How long the total of a findings query is reused while paging through it
+FINDINGS_COUNT_CACHE_TTL_SECONDS = int(os.getenv('FINDINGS_COUNT_CACHE_TTL_SECONDS', 60))
+FINDINGS_COUNT_CACHE_MAX_ENTRIES = 1024
+
+finding_count_cache = {}
+finding_count_lock = threading.Lock()
+
+
+def encode_cursor(document, order_by):
+    """
+    Opaque cursor pointing after `document` in a listing ordered by
+    (order_by, _id).
+    """
+    position = {'o': order_by, 'v': document.get(order_by), 'id': document['_id']}
+    return base64.urlsafe_b64encode(json_util.dumps(position).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, order_by):
+    """
+    Returns:
+        tuple: (order value, _id) of the last document of the previous page.
+
+    Raises:
+        ValueError: When the cursor is malformed or was issued for another order.
+    """
+    try:
+        position = json_util.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        value, finding_id = position['v'], position['id']
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if position.get('o') != order_by:
+        raise ValueError('Cursor was issued for a different orderBy')
+    return value, finding_id
+
+
+def keyset_condition(order_by, sort_direction, value, finding_id):
+    """
+    Query matching the documents after (value, finding_id) in (order_by, _id)
+    order. Missing values sort first, so they come last in descending order.
+    """
+    after = '$gt' if sort_direction == 1 else '$lt'
+    if value is None:
+        conditions = [{order_by: None, '_id': {after: finding_id}}]
+        if sort_direction == 1:
+            conditions.append({order_by: {'$ne': None}})
+    else:
+        conditions = [{order_by: {after: value}}, {order_by: value, '_id': {after: finding_id}}]
+        if sort_direction == -1:
+            conditions.append({order_by: None})
+    return {'$or': conditions}
+
+
+def cached_finding_count(match_stage):
+    """
+    Counts the findings of a listing, reusing the total for a short while so
+    paging through a large project does not count it again for every page.
+    """
+    key = json_util.dumps(match_stage, sort_keys=True)
+    now = time.monotonic()
+    with finding_count_lock:
+        cached = finding_count_cache.get(key)
+        if cached and now - cached[0] < FINDINGS_COUNT_CACHE_TTL_SECONDS:
+            return cached[1]
+
+    total = FindingMaster._get_collection().count_documents(live_filter(FindingMaster, match_stage))
+
+    with finding_count_lock:
+        if len(finding_count_cache) >= FINDINGS_COUNT_CACHE_MAX_ENTRIES:
+            finding_count_cache.clear()
+        finding_count_cache[key] = (now, total)
+    return total
+
+
+def clear_finding_count_cache():
+    with finding_count_lock:
+        finding_count_cache.clear()
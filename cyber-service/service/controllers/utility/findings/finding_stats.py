@@ -0,0 +1,146 @@
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from entities.CyberServiceEntity import FindingMaster, ProjectFindingStats
+from ..db.lean_queries import live_filter
+from ..compliance.samm_coverage import invalidate_samm_coverage
+from ..compliance.compliance_summary import invalidate_compliance_summaries
+
+# Finding fields the counters are kept by, the first three select the stats document
+STATS_FIELDS = ['project_id', 'scan_type_id', 'creator', 'severity', 'status', 'target_type']
+COUNTED_FIELDS = ['severity', 'status', 'target_type']
+
+
+def stats_id(project_id, scan_type_id, creator):
+    """
+    One stats document per project, scan type and creator, so the Manual VAPT
+    findings of other users can be left out when the counts are read.
+    """
+    return f"{project_id}|{scan_type_id or ''}|{creator or ''}"
+
+
+def finding_values(finding):
+    """Stats fields of a finding given as a document or as a raw dict."""
+    if hasattr(finding, 'to_mongo'):
+        finding = finding.to_mongo()
+    return {field: finding.get(field) for field in STATS_FIELDS}
+
+
+def update_finding_stats(added=(), removed=()):
+    """
+    Applies finding changes to the per project counters with one atomic $inc
+    upsert per stats document. A changed finding is removed in its previous
+    state and added in its new one.
+
+    Args:
+        added (iterable): Findings that became live, documents or raw dicts.
+        removed (iterable): Findings that stopped being live, as they were.
+
+    Returns:
+        int: Number of stats documents updated.
+    """
+    increments = {}
+    for findings, step in ((added, 1), (removed, -1)):
+        for finding in findings:
+            values = finding_values(finding)
+            if not values['project_id']:
+                continue
+            counters = increments.setdefault((values['project_id'], values['scan_type_id'], values['creator']), {})
+            counters['total'] = counters.get('total', 0) + step
+            for field in COUNTED_FIELDS:
+                if values[field] is not None:
+                    counter = f"{field}.{values[field]}"
+                    counters[counter] = counters.get(counter, 0) + step
+
+    now = datetime.now(timezone.utc)
+    operations = []
+    for (project_id, scan_type_id, creator), counters in increments.items():
+        counters = {counter: step for counter, step in counters.items() if step}
+        if not counters:
+            continue
+        operations.append(UpdateOne(
+            {'_id': stats_id(project_id, scan_type_id, creator)},
+            {'$inc': counters,
+             '$set': {'updated': now},
+             '$setOnInsert': {'project_id': project_id, 'scan_type_id': scan_type_id, 'creator': creator}},
+            upsert=True))
+    if not operations:
+        return 0
+    try:
+        ProjectFindingStats._get_collection().bulk_write(operations, ordered=False)
+    except Exception as e:
+        # The findings are written already, rebuild_finding_stats repairs the counters
+        print("Exception: updating finding stats", e)
+        return 0
+    project_ids = {project_id for project_id, _, _ in increments}
+    invalidate_samm_coverage(project_ids)
+    invalidate_compliance_summaries(project_ids)
+    return len(operations)
+
+
+def rebuild_finding_stats(project_id=None):
+    """
+    Recounts the stats from the findings, for one project or all of them.
+    Used to repair counters that drifted, e.g. after findings were changed
+    directly in the database.
+
+    Returns:
+        int: Number of stats documents written.
+    """
+    match = {'project_id': project_id} if project_id else {}
+    pipeline = [
+        {'$match': live_filter(FindingMaster, match)},
+        {'$group': {'_id': {field: f'${field}' for field in STATS_FIELDS}, 'count': {'$sum': 1}}}
+    ]
+    now = datetime.now(timezone.utc)
+    stats = {}
+    for group in FindingMaster._get_collection().aggregate(pipeline):
+        values = group['_id']
+        if not values.get('project_id'):
+            continue
+        key = stats_id(values['project_id'], values.get('scan_type_id'), values.get('creator'))
+        document = stats.setdefault(key, {
+            '_id': key,
+            'project_id': values['project_id'],
+            'scan_type_id': values.get('scan_type_id'),
+            'creator': values.get('creator'),
+            'total': 0,
+            **{field: {} for field in COUNTED_FIELDS},
+            'updated': now,
+        })
+        document['total'] += group['count']
+        for field in COUNTED_FIELDS:
+            if values.get(field) is not None:
+                document[field][values[field]] = document[field].get(values[field], 0) + group['count']
+
+    collection = ProjectFindingStats._get_collection()
+    collection.delete_many(match)
+    if stats:
+        collection.insert_many(list(stats.values()))
+    invalidate_samm_coverage([project_id] if project_id else None)
+    invalidate_compliance_summaries([project_id] if project_id else None)
+    return len(stats)
+
+
+def read_finding_stats(project_id, manual_vapt_scan_type_id=None, current_user=None):
+    """
+    Sums the stats documents of a project.
+
+    Args:
+        manual_vapt_scan_type_id (str): When given, Manual VAPT findings are
+            only counted when current_user created them.
+
+    Returns:
+        dict: total and the counts per severity, status, target_type and scan_type.
+    """
+    totals = {'total': 0, **{field: {} for field in COUNTED_FIELDS}, 'scan_type': {}}
+    for stats in ProjectFindingStats._get_collection().find({'project_id': project_id}):
+        if manual_vapt_scan_type_id and stats.get('scan_type_id') == manual_vapt_scan_type_id \
+                and stats.get('creator') != current_user:
+            continue
+        totals['total'] += stats.get('total', 0)
+        scan_type_id = stats.get('scan_type_id') or ''
+        totals['scan_type'][scan_type_id] = totals['scan_type'].get(scan_type_id, 0) + stats.get('total', 0)
+        for field in COUNTED_FIELDS:
+            for value, count in (stats.get(field) or {}).items():
+                totals[field][value] = totals[field].get(value, 0) + count
+    return totals
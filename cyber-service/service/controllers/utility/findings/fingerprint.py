@@ -0,0 +1,27 @@
+import hashlib
+
+
+def finding_fingerprint(scanner, rule_id, location='', package='', version=''):
+    """
+    Deterministic identity of a finding, built from what the scanner reports
+    rather than from the finding text, so re-running a scan (or rewording its
+    findings) maps every result back to the same FindingMaster record.
+
+    Args:
+        scanner (str): Scanner name, e.g. 'trivy'.
+        rule_id (str): Rule, check or vulnerability id reported by the scanner.
+        location (str): File, URL or cloud resource the finding is about.
+        package (str): Affected package, if any.
+        version (str): Affected package version, if any.
+
+    Returns:
+        str: Hex digest identifying the finding within a target.
+    """
+    parts = [scanner, rule_id, location, package, version]
+    normalized = '\x1f'.join(' '.join(str(part or '').split()).lower() for part in parts)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def secret_digest(secret):
+    """Stands in for a secret in a fingerprint, the secret itself is never stored."""
+    return hashlib.sha256((secret or '').encode('utf-8')).hexdigest()
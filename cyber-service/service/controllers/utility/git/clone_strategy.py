@@ -0,0 +1,46 @@
+# Clone strategies, from the cheapest to the most complete. A scan uses the
+# most complete strategy required by any of its selected scanners.
+CLONE_STRATEGY_SHALLOW = 'shallow'  # depth 1, full current tree
+CLONE_STRATEGY_PARTIAL = 'partial'  # full history, blobs fetched on demand
+CLONE_STRATEGY_FULL = 'full'        # full history and blobs
+
+CLONE_STRATEGY_ORDER = [CLONE_STRATEGY_SHALLOW, CLONE_STRATEGY_PARTIAL, CLONE_STRATEGY_FULL]
+
+# What each repository scanner reads from the working copy. Scanners missing
+# from this table get a full clone.
+SCANNER_CLONE_STRATEGIES = {
+    'Linguist': CLONE_STRATEGY_SHALLOW,  # current tree only
+    'Gitleaks': CLONE_STRATEGY_SHALLOW,  # `gitleaks dir` scans the working tree
+    'Trivy': CLONE_STRATEGY_SHALLOW,     # lockfiles plus full-text license detection
+}
+
+# Scanners that never read the cloned repository
+NON_REPO_SCANNERS = {'Zap', 'Wapiti', 'Cloudsploit', 'Slither'}
+
+
+def select_clone_strategy(scanner_names, needs_history=False):
+    """
+    Returns the cheapest clone strategy that satisfies every selected scanner.
+
+    Args:
+        scanner_names (list): Names of the selected scanners (collection - Scanners).
+        needs_history (bool): The scan diffs against a previously scanned commit.
+    """
+    required = [SCANNER_CLONE_STRATEGIES.get(name, CLONE_STRATEGY_FULL)
+                for name in scanner_names if name not in NON_REPO_SCANNERS]
+    if needs_history:
+        required.append(CLONE_STRATEGY_PARTIAL)
+    if not required:
+        return CLONE_STRATEGY_FULL
+    return max(required, key=CLONE_STRATEGY_ORDER.index)
+
+
+def clone_options(clone_strategy):
+    """
+    Extra `git clone` options for a strategy when cloning from the remote.
+    """
+    if clone_strategy == CLONE_STRATEGY_SHALLOW:
+        return ["--depth", "1"]
+    if clone_strategy == CLONE_STRATEGY_PARTIAL:
+        return ["--filter=blob:none"]
+    return []
@@ -0,0 +1,197 @@
+import os
+import uuid
+from fnmatch import fnmatch
+from datetime import datetime, timezone
+from entities.CyberServiceEntity import FindingMaster, FindingScanLink, RepositoryScanCommit
+from ..ScanTypeResolver import resolveScanTypeId
+from ..findings.finding_batch import FindingBatch
+from .repo_cache import run_git
+from dotenv import load_dotenv
+
+load_dotenv()
+
+INCREMENTAL_SCAN_ENABLED = os.getenv('INCREMENTAL_SCAN_ENABLED', 'true').lower() == 'true'
+
+# How a repository scanner handles a commit that differs from the last scanned one
+SCAN_MODE_FULL = 'full'    # scan the whole working copy
+SCAN_MODE_RANGE = 'range'  # scan only the commits since the last scanned commit
+SCAN_MODE_SKIP = 'skip'    # nothing relevant changed, link the previous findings forward
+
+INCREMENTAL_SCANNERS = ['Linguist', 'Gitleaks', 'Trivy']
+
+# Files Trivy resolves dependencies from
+DEPENDENCY_MANIFEST_PATTERNS = [
+    'package.json', 'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml',
+    'requirements*.txt', 'Pipfile', 'Pipfile.lock', 'poetry.lock', 'pyproject.toml',
+    'go.mod', 'go.sum',
+    'Cargo.toml', 'Cargo.lock',
+    'pom.xml', 'build.gradle', 'build.gradle.kts', 'gradle.lockfile',
+    'Gemfile', 'Gemfile.lock',
+    'composer.json', 'composer.lock',
+    '*.csproj', 'packages.lock.json', 'packages.config',
+]
+
+# Besides dependency manifests, Trivy scans infrastructure as code for
+# misconfigurations and license files
+TRIVY_IAC_PATTERNS = [
+    'Dockerfile', '*.dockerfile', 'Containerfile',
+    '*.tf', '*.tfvars', '*.tf.json', '*.hcl',
+    '*.yaml', '*.yml', '*.json', '*.bicep', '*.tpl',
+]
+TRIVY_LICENSE_PATTERNS = ['LICENSE*', 'LICENCE*', 'COPYING*', 'NOTICE*', 'UNLICENSE*']
+
+# Scan types of the FindingMaster records each scanner produces
+SCANNER_FINDING_SCAN_TYPES = {
+    'Gitleaks': 'Secrets Detection',
+    'Trivy': 'Dependency Vulnerability Scanner',
+}
+
+
+def head_commit(repo_path):
+    ok, output = run_git(["rev-parse", "HEAD"], cwd=repo_path)
+    return output.strip() if ok else None
+
+
+def last_scanned_commits(target_id, scanner_names):
+    """
+    Returns the commit each scanner last completed on the repository target.
+
+    Returns:
+        dict: Scanner name to RepositoryScanCommit record.
+    """
+    if not INCREMENTAL_SCAN_ENABLED or not target_id:
+        return {}
+    records = RepositoryScanCommit.objects(
+        target_id=target_id,
+        scanner_name__in=[name for name in scanner_names if name in INCREMENTAL_SCANNERS])
+    return {record.scanner_name: record for record in records}
+
+
+def changed_files(repo_path, from_commit, to_commit):
+    """
+    Lists the files changed between two commits.
+
+    Returns:
+        list: Changed paths, or None when `from_commit` is not in the working copy
+        (history rewritten or not fetched).
+    """
+    ok, output = run_git(["diff", "--name-only", from_commit, to_commit], cwd=repo_path)
+    if not ok:
+        print(f"Cannot diff {from_commit}..{to_commit}: {output}")
+        return None
+    return [line for line in output.splitlines() if line]
+
+
+def is_dependency_manifest(file_path):
+    return any(fnmatch(os.path.basename(file_path), pattern) for pattern in DEPENDENCY_MANIFEST_PATTERNS)
+
+
+def is_trivy_input(file_path):
+    """True for the files Trivy reads: dependency manifests, IaC and license files."""
+    file_name = os.path.basename(file_path)
+    return is_dependency_manifest(file_path) or \
+        any(fnmatch(file_name, pattern) for pattern in TRIVY_IAC_PATTERNS + TRIVY_LICENSE_PATTERNS)
+
+
+def plan_incremental_scan(repo_path, commit_sha, previous_commits, trivy_db_version=None):
+    """
+    Decides how each repository scanner runs against `commit_sha`.
+
+    Args:
+        repo_path (str): Working copy of the repository.
+        commit_sha (str): HEAD commit of the working copy.
+        previous_commits (dict): Output of `last_scanned_commits`.
+        trivy_db_version (str): Vulnerability DB the Trivy scan would use. Trivy
+            is only skipped when it matches the one of its last scan, a newer DB
+            can report new CVEs on unchanged dependencies.
+
+    Returns:
+        dict: Scanner name to (mode, last scanned commit) for scanners with a
+        previous commit; scanners missing from the dict run a full scan.
+    """
+    plan = {}
+    diffs = {}
+    for scanner_name, record in previous_commits.items():
+        previous_sha = record.commit_sha
+        if not commit_sha:
+            continue
+        if scanner_name == 'Trivy' and (not trivy_db_version or record.trivy_db_version != trivy_db_version):
+            continue
+        if previous_sha == commit_sha:
+            plan[scanner_name] = (SCAN_MODE_SKIP, previous_sha)
+            continue
+        if previous_sha not in diffs:
+            diffs[previous_sha] = changed_files(repo_path, previous_sha, commit_sha)
+        files = diffs[previous_sha]
+        if files is None:
+            continue
+        if scanner_name == 'Gitleaks':
+            plan[scanner_name] = (SCAN_MODE_RANGE, previous_sha)
+        elif scanner_name == 'Trivy' and not any(is_trivy_input(file) for file in files):
+            plan[scanner_name] = (SCAN_MODE_SKIP, previous_sha)
+    return plan
+
+
+def link_findings_forward(project_id, target_id, scanner_name, scan_id, current_user):
+    """
+    Links the open findings of a scanner on the target to the current scan, in
+    place of re-creating them from an unchanged repository. Findings the scan
+    already linked are left alone.
+
+    Returns:
+        int: Number of findings linked.
+    """
+    scan_type_name = SCANNER_FINDING_SCAN_TYPES.get(scanner_name)
+    if not scan_type_name:
+        return 0
+    scan_type_id = resolveScanTypeId(scan_type_name, 'scan_type')
+    finding_ids = FindingMaster.objects(
+        project_id=project_id,
+        target_id=target_id,
+        scan_type_id=scan_type_id,
+        status__ne='closed'
+    ).scalar('finding_id')
+    already_linked = set(FindingScanLink.objects(scan_id=scan_id).scalar('finding_id'))
+
+    now = datetime.now(timezone.utc)
+    batch = FindingBatch(current_user, scan_id)
+    for finding_id in finding_ids:
+        if finding_id in already_linked:
+            continue
+        batch.add(FindingScanLink(
+            finding_scan_link_id=str(uuid.uuid4()),
+            finding_id=finding_id,
+            scan_id=scan_id,
+            created=now,
+            creator=current_user,
+        ))
+    linked = batch.write()
+    print(f"Linked {linked} unchanged {scanner_name} findings to scan {scan_id}")
+    return linked
+
+
+def record_scanned_commit(project_id, target_id, scanner_name, commit_sha, scan_id, current_user, trivy_db_version=None):
+    """
+    Stores the commit a scanner completed on, used as the base of the next scan.
+    A single upsert, so concurrent scans of the target keep one record.
+    """
+    now = datetime.now(timezone.utc)
+    RepositoryScanCommit._get_collection().update_one(
+        {'target_id': target_id, 'scanner_name': scanner_name},
+        {
+            '$set': {
+                'commit_sha': commit_sha,
+                'trivy_db_version': trivy_db_version,
+                'scan_id': scan_id,
+                'updated': now,
+                'updator': current_user,
+            },
+            '$setOnInsert': {
+                '_id': str(uuid.uuid4()),
+                'project_id': project_id,
+                'created': now,
+                'creator': current_user,
+                'isdeleted': False,
+            },
+        },
+        upsert=True)
@@ -0,0 +1,237 @@
+import os
+import re
+import time
+import fcntl
+import shutil
+import hashlib
+import tempfile
+import subprocess
+from contextlib import contextmanager
+from urllib.parse import urlsplit, urlunsplit
+from .clone_strategy import CLONE_STRATEGY_FULL, CLONE_STRATEGY_PARTIAL, CLONE_STRATEGY_SHALLOW, clone_options
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REPO_CACHE_ENABLED = os.getenv('REPO_CACHE_ENABLED', 'true').lower() == 'true'
+REPO_CACHE_DIR = os.getenv('REPO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'cyber-service-repo-cache'))
+REPO_CACHE_MAX_BYTES = int(os.getenv('REPO_CACHE_MAX_BYTES', 10 * 1024 ** 3))
+
+LAST_USED_FILE = 'cyber-service-last-used'
+
+
+def run_git(args, cwd=None):
+    """
+    Runs a git command without a shell.
+
+    Returns:
+        tuple: (True, output) on success, (False, error message) otherwise.
+    """
+    try:
+        result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    except FileNotFoundError:
+        return False, "Error: git is not installed or not found in the system path."
+    output = (result.stdout or '') + (result.stderr or '')
+    if result.returncode != 0:
+        return False, f"Error running git {args[0]}: {output}"
+    return True, output
+
+
+def strip_credentials(repo_url):
+    """
+    Removes any user/token part from a repository URL so it can be logged,
+    stored in a git config or used as a cache key.
+    """
+    parts = urlsplit(repo_url)
+    if not parts.netloc or '@' not in parts.netloc:
+        return repo_url
+    return urlunsplit((parts.scheme, parts.netloc.rsplit('@', 1)[1], parts.path, parts.query, parts.fragment))
+
+
+def mirror_key(repo_url):
+    """
+    Cache key of a repository: the same repository referenced with or without
+    credentials, trailing slash or `.git` suffix maps to the same mirror.
+    """
+    normalized = strip_credentials(repo_url).strip().rstrip('/')
+    normalized = re.sub(r'\.git$', '', normalized)
+    parts = urlsplit(normalized)
+    normalized = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path, parts.query, ''))
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32]
+
+
+@contextmanager
+def mirror_lock(key, blocking=True):
+    """
+    Exclusive lock on one mirror, shared between the threads and worker
+    processes of a node. Yields False when `blocking` is off and the mirror is busy.
+    """
+    os.makedirs(REPO_CACHE_DIR, exist_ok=True)
+    with open(os.path.join(REPO_CACHE_DIR, f"{key}.lock"), 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def mirror_is_corrupt(mirror_path, fetch_output=''):
+    """
+    Tells whether a mirror has to be cloned again, as opposed to a fetch that
+    failed for a reason outside of the mirror such as the network or the token.
+    """
+    if 'not a git repository' in fetch_output:
+        return True
+    ok, _ = run_git(["--git-dir", mirror_path, "fsck", "--connectivity-only", "--no-progress"])
+    return not ok
+
+
+def update_mirror(repo_url, auth_url):
+    """
+    Creates the bare mirror of a repository or brings it up to date with an
+    incremental fetch. Must be called while holding the mirror lock.
+
+    Args:
+        repo_url (str): Repository URL without credentials.
+        auth_url (str): Repository URL including the access token, if any.
+
+    Returns:
+        tuple: (mirror path, git output) or (None, error message).
+    """
+    mirror_path = os.path.join(REPO_CACHE_DIR, f"{mirror_key(repo_url)}.git")
+
+    if os.path.isdir(mirror_path):
+        # The token is passed on the command line only, never written to the mirror config
+        ok, output = run_git(["--git-dir", mirror_path, "fetch", "--prune", "--tags", auth_url,
+                              "+refs/heads/*:refs/heads/*"])
+        if ok:
+            return mirror_path, output
+        if not mirror_is_corrupt(mirror_path, output):
+            # Network or auth failures keep the mirror for the next scan
+            print(f"Fetch into cached mirror failed: {output}")
+            return None, output
+        print(f"Cached mirror is corrupt, recreating it: {output}")
+        shutil.rmtree(mirror_path, ignore_errors=True)
+
+    partial_path = f"{mirror_path}.partial-{os.getpid()}"
+    shutil.rmtree(partial_path, ignore_errors=True)
+    ok, output = run_git(["clone", "--mirror", auth_url, partial_path])
+    if not ok:
+        shutil.rmtree(partial_path, ignore_errors=True)
+        return None, output
+    run_git(["--git-dir", partial_path, "remote", "set-url", "origin", strip_credentials(repo_url)])
+    os.rename(partial_path, mirror_path)
+    return mirror_path, output
+
+
+def checkout_from_mirror(repo_url, auth_url, clone_strategy=CLONE_STRATEGY_FULL):
+    """
+    Returns a fresh working copy of the repository for one scan. The working
+    copy is a local clone of the cached mirror, so objects are hard-linked and
+    only new commits go over the network. The mirror always holds the full
+    history and blobs; a shallow strategy copies only the latest commit out of
+    it, the partial and full strategies get the whole history.
+
+    Returns:
+        tuple: (working copy path, git output) or (None, error message).
+    """
+    key = mirror_key(repo_url)
+    with mirror_lock(key):
+        mirror_path, output = update_mirror(repo_url, auth_url)
+        if not mirror_path:
+            return None, output
+
+        temp_dir = tempfile.mkdtemp()
+        if clone_strategy == CLONE_STRATEGY_SHALLOW:
+            # git ignores --depth for a plain local path
+            clone_args = ["clone", "--depth", "1", "file://" + os.path.abspath(mirror_path), temp_dir]
+        else:
+            clone_args = ["clone", mirror_path, temp_dir]
+        ok, clone_output = run_git(clone_args)
+        if not ok:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return None, clone_output
+        run_git(["remote", "set-url", "origin", strip_credentials(repo_url)], cwd=temp_dir)
+        touch_mirror(mirror_path)
+
+    evict_mirrors(keep={key})
+    return temp_dir, output + clone_output
+
+
+def clone_from_remote(repo_url, auth_url, clone_strategy=CLONE_STRATEGY_FULL):
+    """
+    Clones the repository straight from the remote with the history and
+    blobs required by `clone_strategy`, without using the mirror cache.
+
+    A partial clone fetches missing blobs from origin while it is scanned, so
+    its origin keeps the credentials; the working copy is a private temporary
+    directory removed at the end of the scan.
+
+    Returns:
+        tuple: (working copy path, git output) or (None, error message).
+    """
+    temp_dir = tempfile.mkdtemp()
+    ok, output = run_git(["clone", *clone_options(clone_strategy), auth_url, temp_dir])
+    if not ok or not os.path.exists(os.path.join(temp_dir, ".git")):
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        return None, output
+    if clone_strategy != CLONE_STRATEGY_PARTIAL:
+        run_git(["remote", "set-url", "origin", strip_credentials(repo_url)], cwd=temp_dir)
+    return temp_dir, output
+
+
+def touch_mirror(mirror_path):
+    with open(os.path.join(mirror_path, LAST_USED_FILE), 'w') as marker:
+        marker.write(str(time.time()))
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            try:
+                total += os.lstat(os.path.join(root, file)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def evict_mirrors(max_bytes=REPO_CACHE_MAX_BYTES, keep=()):
+    """
+    Deletes the least recently used mirrors until the cache fits in
+    `max_bytes`. Mirrors in `keep` and mirrors in use are skipped.
+
+    Returns:
+        list: Keys of the evicted mirrors.
+    """
+    if not os.path.isdir(REPO_CACHE_DIR):
+        return []
+
+    mirrors = []
+    for entry in os.listdir(REPO_CACHE_DIR):
+        mirror_path = os.path.join(REPO_CACHE_DIR, entry)
+        if not entry.endswith('.git') or not os.path.isdir(mirror_path):
+            continue
+        marker = os.path.join(mirror_path, LAST_USED_FILE)
+        last_used = os.path.getmtime(marker) if os.path.exists(marker) else os.path.getmtime(mirror_path)
+        mirrors.append((last_used, entry[:-len('.git')], mirror_path, directory_size(mirror_path)))
+
+    total = sum(size for _, _, _, size in mirrors)
+    evicted = []
+    for _, key, mirror_path, size in sorted(mirrors):
+        if total <= max_bytes:
+            break
+        if key in keep:
+            continue
+        with mirror_lock(key, blocking=False) as acquired:
+            if not acquired:
+                continue
+            shutil.rmtree(mirror_path, ignore_errors=True)
+        total -= size
+        evicted.append(key)
+        print(f"Evicted cached repository mirror {key} ({size} bytes)")
+    return evicted
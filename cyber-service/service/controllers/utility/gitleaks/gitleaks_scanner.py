@@ -0,0 +1,147 @@
+import os
+import json
+import tempfile
+import subprocess
+from enum import Enum
+from ..findings.fingerprint import finding_fingerprint, secret_digest
+
+
+class FindingStatus(Enum):
+    Open = 'open'
+    Closed = 'closed'
+    Ignored = 'ignored'
+    FalsePositive = 'false positive'
+
+
+class FindingSeverity(Enum):
+    Critical = 'critical'
+    High = 'high'
+    Medium = 'medium'
+    Low = 'low'
+    Informational = 'informational'
+
+
+# Gitleaks reports no severity; rule ids are matched in order, the first hit wins
+RULE_SEVERITIES = [
+    ('private-key', FindingSeverity.Critical),
+    ('generic', FindingSeverity.Medium),
+    ('', FindingSeverity.High),
+]
+
+# Use of Hard-coded Credentials / Information Leakage
+SECRET_CWE_ID = 'CWE-798'
+SECRET_WASC_ID = 'WASC-13'
+SECRET_REFERENCES = ['https://cwe.mitre.org/data/definitions/798.html', 'https://github.com/gitleaks/gitleaks']
+
+# Paths and secrets matching these are treated as false positives
+IGNORE_PATTERNS = [
+    "dummy",        # Ignore files with "dummy" in their path or content
+    "test",         # Ignore files in test-related paths
+    "example-key",  # Ignore matches with "example-key"
+]
+
+
+def run_gitleaks_scan(repo_path, since_commit=None):
+    """
+    Runs Gitleaks on the working copy, or on the commits after `since_commit`,
+    and reads its JSON report.
+
+    Args:
+        repo_path (str): Path to the repository being scanned.
+        since_commit (str): Last scanned commit, if only new commits are scanned.
+
+    Returns:
+        tuple: (raw JSON report, list of leaks) or (None, error message).
+    """
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".json") as report_file:
+        report_path = report_file.name
+
+    if since_commit:
+        command = ["gitleaks", "git", repo_path, f"--log-opts={since_commit}..HEAD"]
+    else:
+        command = ["gitleaks", "dir", repo_path]
+    command += ["--report-format", "json", "--report-path", report_path, "--exit-code", "0", "--no-banner"]
+
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            return None, f"Gitleaks failed: {result.stderr}"
+        with open(report_path, 'r') as file:
+            raw_report = file.read()
+        return raw_report, json.loads(raw_report or '[]')
+    except FileNotFoundError:
+        return None, "Error: Gitleaks is not installed or not found in the system path."
+    except json.JSONDecodeError as e:
+        return None, f"Error: Failed to parse Gitleaks report: {e}"
+    finally:
+        if os.path.exists(report_path):
+            os.remove(report_path)
+
+
+def is_false_positive(leak):
+    for pattern in IGNORE_PATTERNS:
+        if pattern in leak.get("File", "").lower() or pattern in leak.get("Secret", "").lower():
+            return True
+    return False
+
+
+def mask_secret(secret):
+    """Keeps only enough of a secret to recognise it."""
+    if not secret:
+        return ''
+    return secret[:4] + '*' * min(max(len(secret) - 4, 0), 16)
+
+
+def rule_severity(rule_id):
+    rule_id = (rule_id or '').lower()
+    return next(severity.value for pattern, severity in RULE_SEVERITIES if pattern in rule_id)
+
+
+def rule_title(rule_id):
+    words = (rule_id or 'secret').replace('_', '-').split('-')
+    return ' '.join(word.upper() if word in ('api', 'aws', 'gcp', 'jwt', 'ssh', 'pat') else word.capitalize() for word in words)
+
+
+def convert_gitleaks_report(leaks, repo_path):
+    """
+    Maps the leaks of a Gitleaks JSON report to findings.
+
+    Args:
+        leaks (list): Parsed Gitleaks JSON report.
+        repo_path (str): Path of the scanned working copy, stripped from file names.
+
+    Returns:
+        list: Structured findings with their repo_secret_detections_record.
+    """
+    findings = []
+    for leak in leaks:
+        file_name = leak.get('File', '')
+        if file_name.startswith(repo_path):
+            file_name = os.path.relpath(file_name, repo_path)
+        if is_false_positive({**leak, 'File': file_name}):
+            continue
+        # Secrets of files deleted since then are not reported
+        if not os.path.exists(os.path.join(repo_path, file_name)):
+            print(f"Skipping non-existent file name: {file_name}")
+            continue
+
+        title = rule_title(leak.get('RuleID'))
+        line_number = str(leak.get('StartLine', ''))
+        findings.append({
+            "finding_name": f"{title} leaked",
+            "finding_desc": f"{leak.get('Description') or title} found in {file_name} at line {line_number}.",
+            "severity": rule_severity(leak.get('RuleID')),
+            "status": FindingStatus.Open.value,
+            # Keyed on the secret rather than the line, so edits around it keep the finding
+            "fingerprint": finding_fingerprint("gitleaks", leak.get('RuleID'), file_name, secret_digest(leak.get('Secret', ''))),
+            "repo_secret_detections_record": {
+                "secret": mask_secret(leak.get('Secret', '')),
+                "cweid": SECRET_CWE_ID,
+                "wascid": SECRET_WASC_ID,
+                "file_name": file_name,
+                "line_number": line_number,
+                "column_number": str(leak.get('StartColumn', '')),
+                "references": SECRET_REFERENCES,
+            }
+        })
+    return findings
@@ -0,0 +1,170 @@
+import os
+import uuid
+from datetime import datetime, timezone, timedelta
+from mongoengine.queryset.visitor import Q
+from entities.CyberServiceEntity import ScanJobs, ScanJobStatus
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SCAN_JOB_LEASE_SECONDS = int(os.getenv('SCAN_JOB_LEASE_SECONDS', 900))
+SCAN_JOB_MAX_ATTEMPTS = int(os.getenv('SCAN_JOB_MAX_ATTEMPTS', 3))
+SCAN_JOB_RETRY_DELAY_SECONDS = int(os.getenv('SCAN_JOB_RETRY_DELAY_SECONDS', 60))
+
+# Scans triggered by a user ("scanNow") are claimed before scheduler callbacks
+SCAN_JOB_PRIORITY_INTERACTIVE = 10
+SCAN_JOB_PRIORITY_SCHEDULED = 0
+
+
+def enqueue_scan_job(scan_id, project_id, payload, current_user, priority=SCAN_JOB_PRIORITY_SCHEDULED):
+    """
+    Persists a new scan job so that any worker can pick it up.
+
+    Args:
+        scan_id (str): UUID of the scan (collection - Scans).
+        project_id (str): UUID of the project being scanned.
+        payload (dict): Parameters needed by the worker to run the scan.
+        current_user (str): User initiating the scan.
+        priority (int): Higher priority jobs are claimed first.
+
+    Returns:
+        ScanJobs: The queued job document.
+    """
+    now = datetime.now(timezone.utc)
+    scan_job_obj = ScanJobs(
+        scan_job_id=str(uuid.uuid4()),
+        scan_id=scan_id,
+        project_id=project_id,
+        status=ScanJobStatus.Queued,
+        priority=priority,
+        payload=payload or {},
+        attempts=0,
+        available_at=now,
+        created=now,
+        creator=current_user
+    )
+    scan_job_obj.save()
+    print(f"Scan job {scan_job_obj.scan_job_id} queued for scan {scan_id}")
+    return scan_job_obj
+
+
+def claim_next_scan_job(worker_id, lease_seconds=SCAN_JOB_LEASE_SECONDS):
+    """
+    Atomically leases the next runnable job.
+
+    A job is runnable when it is queued and its retry delay has elapsed, or when
+    it is leased but the lease expired (the owning worker died or hung).
+
+    Args:
+        worker_id (str): Identifier of the worker taking the lease.
+        lease_seconds (int): How long the lease is valid without renewal.
+
+    Returns:
+        ScanJobs: The leased job, or None when the queue is empty.
+    """
+    now = datetime.now(timezone.utc)
+    runnable = (
+        Q(status=ScanJobStatus.Queued.value, available_at__lte=now) |
+        Q(status=ScanJobStatus.Leased.value, lease_expires_at__lte=now)
+    ) & Q(attempts__lt=SCAN_JOB_MAX_ATTEMPTS)
+
+    return ScanJobs.objects(runnable).order_by('-priority', 'available_at').modify(
+        new=True,
+        set__status=ScanJobStatus.Leased.value,
+        set__lease_owner=worker_id,
+        set__lease_expires_at=now + timedelta(seconds=lease_seconds),
+        inc__attempts=1,
+        set__updated=now,
+        set__updator=worker_id
+    )
+
+
+def renew_scan_job_lease(scan_job_id, worker_id, lease_seconds=SCAN_JOB_LEASE_SECONDS):
+    """
+    Extends the lease of a job that is still being processed by `worker_id`.
+
+    Returns:
+        bool: False when the lease was lost to another worker.
+    """
+    now = datetime.now(timezone.utc)
+    updated_count = ScanJobs.objects(
+        scan_job_id=scan_job_id,
+        status=ScanJobStatus.Leased.value,
+        lease_owner=worker_id
+    ).update(
+        set__lease_expires_at=now + timedelta(seconds=lease_seconds),
+        set__updated=now
+    )
+    return updated_count > 0
+
+
+def complete_scan_job(scan_job_id, worker_id, error=None):
+    """
+    Marks a leased job as finished. `error` records a scan that ran to the end
+    but reported scanner failures; such jobs are not retried.
+    """
+    now = datetime.now(timezone.utc)
+    return ScanJobs.objects(scan_job_id=scan_job_id, lease_owner=worker_id).update(
+        set__status=ScanJobStatus.Completed.value,
+        set__lease_expires_at=None,
+        set__last_error=str(error) if error else None,
+        set__updated=now,
+        set__updator=worker_id
+    )
+
+
+def fail_scan_job(scan_job_id, worker_id, error):
+    """
+    Releases a job whose handler raised. The job is re-queued with a linear
+    back-off until it has used up SCAN_JOB_MAX_ATTEMPTS, then marked as failed.
+
+    Returns:
+        str: The resulting job status.
+    """
+    now = datetime.now(timezone.utc)
+    scan_job_obj = ScanJobs.objects(scan_job_id=scan_job_id, lease_owner=worker_id).first()
+    if not scan_job_obj:
+        return None
+
+    if scan_job_obj.attempts >= SCAN_JOB_MAX_ATTEMPTS:
+        status = ScanJobStatus.Failed.value
+        available_at = scan_job_obj.available_at
+    else:
+        status = ScanJobStatus.Queued.value
+        available_at = now + timedelta(seconds=SCAN_JOB_RETRY_DELAY_SECONDS * scan_job_obj.attempts)
+
+    ScanJobs.objects(scan_job_id=scan_job_id, lease_owner=worker_id).update(
+        set__status=status,
+        set__lease_owner=None,
+        set__lease_expires_at=None,
+        set__available_at=available_at,
+        set__last_error=str(error),
+        set__updated=now,
+        set__updator=worker_id
+    )
+    print(f"Scan job {scan_job_id} failed on attempt {scan_job_obj.attempts}: {error}. Status: {status}")
+    return status
+
+
+def fail_exhausted_scan_jobs():
+    """
+    Marks jobs whose lease expired after the last allowed attempt as failed,
+    so they stop showing up as leased forever.
+
+    Returns:
+        list: scan_ids of the jobs that were failed.
+    """
+    now = datetime.now(timezone.utc)
+    exhausted_jobs = ScanJobs.objects(
+        status=ScanJobStatus.Leased.value,
+        lease_expires_at__lte=now,
+        attempts__gte=SCAN_JOB_MAX_ATTEMPTS
+    )
+    scan_ids = [scan_job.scan_id for scan_job in exhausted_jobs]
+    if scan_ids:
+        exhausted_jobs.update(
+            set__status=ScanJobStatus.Failed.value,
+            set__last_error='Lease expired after the maximum number of attempts',
+            set__updated=now
+        )
+    return scan_ids
@@ -0,0 +1,121 @@
+import os
+import socket
+import threading
+import traceback
+from datetime import datetime, timezone
+from entities.CyberServiceEntity import Scans, ScanJobStatus
+from .scan_job_queue import (
+    SCAN_JOB_LEASE_SECONDS,
+    claim_next_scan_job,
+    renew_scan_job_lease,
+    complete_scan_job,
+    fail_scan_job,
+    fail_exhausted_scan_jobs,
+)
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SCAN_WORKER_CONCURRENCY = int(os.getenv('SCAN_WORKER_CONCURRENCY', 2))
+SCAN_WORKER_POLL_SECONDS = float(os.getenv('SCAN_WORKER_POLL_SECONDS', 5))
+
+
+class ScanWorkerPool:
+    """
+    Fixed-size pool of threads that claim jobs from the ScanJobs collection and
+    pass them to `handler`.
+
+    The handler receives the leased ScanJobs document and returns None on
+    success or an error value for a scan that finished with scanner errors.
+    Exceptions raised by the handler put the job back in the queue.
+    """
+
+    def __init__(self, handler, concurrency=SCAN_WORKER_CONCURRENCY, poll_interval=SCAN_WORKER_POLL_SECONDS,
+                 lease_seconds=SCAN_JOB_LEASE_SECONDS) -> None:
+        self.handler = handler
+        self.concurrency = max(1, int(concurrency))
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop_event = threading.Event()
+        self._threads = []
+        self._active_jobs = {}
+        self._active_jobs_lock = threading.Lock()
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop_event.clear()
+        for index in range(self.concurrency):
+            worker_id = f"{self.worker_prefix}:{index}"
+            thread = threading.Thread(target=self._worker_loop, args=(worker_id,), name=f"scan-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="scan-worker-heartbeat", daemon=True)
+        heartbeat.start()
+        self._threads.append(heartbeat)
+        print(f"Scan worker pool started with {self.concurrency} workers")
+
+    def stop(self, wait=True):
+        self._stop_event.set()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def is_running(self):
+        return bool(self._threads) and not self._stop_event.is_set()
+
+    def run_next_job(self, worker_id):
+        """
+        Claims and runs a single job.
+
+        Returns:
+            bool: True when a job was found, False when the queue was empty.
+        """
+        scan_job = claim_next_scan_job(worker_id, self.lease_seconds)
+        if not scan_job:
+            return False
+
+        print(f"Worker {worker_id} claimed scan job {scan_job.scan_job_id} (attempt {scan_job.attempts})")
+        with self._active_jobs_lock:
+            self._active_jobs[scan_job.scan_job_id] = worker_id
+        try:
+            error = self.handler(scan_job)
+            complete_scan_job(scan_job.scan_job_id, worker_id, error)
+        except Exception as e:
+            traceback.print_exc()
+            # No attempt left, the scan would otherwise stay 'running'
+            if fail_scan_job(scan_job.scan_job_id, worker_id, e) == ScanJobStatus.Failed.value:
+                Scans.objects.filter(scan_id=scan_job.scan_id).update(status='error', updated=datetime.now(timezone.utc))
+        finally:
+            with self._active_jobs_lock:
+                self._active_jobs.pop(scan_job.scan_job_id, None)
+        return True
+
+    def _worker_loop(self, worker_id):
+        while not self._stop_event.is_set():
+            try:
+                found = self.run_next_job(worker_id)
+            except Exception as e:
+                print(f"Worker {worker_id} could not claim a scan job: {e}")
+                found = False
+            if not found:
+                self._stop_event.wait(self.poll_interval)
+
+    def _heartbeat_loop(self):
+        interval = max(1, self.lease_seconds // 3)
+        while not self._stop_event.wait(interval):
+            with self._active_jobs_lock:
+                active_jobs = list(self._active_jobs.items())
+            for scan_job_id, worker_id in active_jobs:
+                try:
+                    if not renew_scan_job_lease(scan_job_id, worker_id, self.lease_seconds):
+                        print(f"Worker {worker_id} lost the lease on scan job {scan_job_id}")
+                except Exception as e:
+                    print(f"Could not renew lease on scan job {scan_job_id}: {e}")
+            try:
+                for scan_id in fail_exhausted_scan_jobs():
+                    Scans.objects.filter(scan_id=scan_id).update(status='error', updated=datetime.now(timezone.utc))
+            except Exception as e:
+                print(f"Could not fail exhausted scan jobs: {e}")
@@ -0,0 +1,115 @@
+import os
+import re
+import json
+import hashlib
+from datetime import datetime, timezone, timedelta
+from entities.CyberServiceEntity import LlmResponseCache
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+LLM_CACHE_TTL_SECONDS = int(os.getenv('LLM_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 20000))
+
+# Fields that change between runs of a scanner without changing its findings
+VOLATILE_KEYS = {'date', 'scan_date', 'timestamp', 'duration', 'start_time', 'end_time', 'filename_absolute'}
+
+
+def normalize_input(raw_input):
+    """
+    Canonical text of a scanner output: dict keys sorted, volatile fields
+    dropped, ANSI colour codes and surrounding whitespace removed.
+    """
+    def strip_volatile(value):
+        if isinstance(value, dict):
+            return {key: strip_volatile(item) for key, item in value.items() if key not in VOLATILE_KEYS}
+        if isinstance(value, (list, tuple)):
+            return [strip_volatile(item) for item in value]
+        return value
+
+    if isinstance(raw_input, str):
+        text = re.sub(r'\x1b\[[0-9;]*m', '', raw_input)
+        return '\n'.join(line.rstrip() for line in text.strip().splitlines())
+    return json.dumps(strip_volatile(raw_input), sort_keys=True, default=str)
+
+
+def cache_key(prompt_version, model, raw_input):
+    payload = '\x00'.join([prompt_version, model, normalize_input(raw_input)])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def extract_json(content):
+    """
+    Parses the JSON document of a model response, with or without a ```json fence.
+    """
+    if "```json" in content:
+        content = content.split('```json', 1)[-1].split('```', 1)[0]
+    return json.loads(content.strip())
+
+
+def cached_chat_completion(client, prompt, prompt_version, raw_input, model="gpt-4o-mini", temperature=0.7, validate=extract_json):
+    """
+    Returns the model response for `prompt`, reusing the stored response when
+    the same prompt version already ran on the same scanner output.
+
+    Args:
+        client (OpenAI): Client used on a cache miss.
+        prompt (str): Full prompt sent to the model.
+        prompt_version (str): Name and version of the prompt template, bump it
+            when the template changes.
+        raw_input: Scanner output the prompt was built from (str, dict or list).
+        validate (callable): Responses are stored only when it does not raise.
+
+    Returns:
+        str: Content of the model response.
+    """
+    key = cache_key(prompt_version, model, raw_input) if LLM_CACHE_ENABLED else None
+    now = datetime.now(timezone.utc)
+    if key:
+        cached = LlmResponseCache.objects(cache_key=key, expires_at__gt=now).modify(
+            inc__hits=1, set__last_used=now)
+        if cached:
+            print(f"LLM cache hit for {prompt_version}")
+            return cached.response
+
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=temperature
+    )
+    content = response.choices[0].message.content
+    if not key:
+        return content
+
+    try:
+        if validate:
+            validate(content)
+    except Exception as e:
+        print(f"LLM response for {prompt_version} not cached: {e}")
+        return content
+
+    LlmResponseCache(
+        cache_key=key,
+        prompt_version=prompt_version,
+        model=model,
+        response=content,
+        hits=0,
+        last_used=now,
+        expires_at=now + timedelta(seconds=LLM_CACHE_TTL_SECONDS),
+        created=now
+    ).save()
+    evict_llm_cache()
+    return content
+
+
+def evict_llm_cache(max_entries=LLM_CACHE_MAX_ENTRIES):
+    """
+    Deletes the least recently used responses above `max_entries`. Expired
+    responses are removed by the TTL index on `expires_at`.
+    """
+    excess = LlmResponseCache.objects.count() - max_entries
+    if excess <= 0:
+        return 0
+    stale_keys = LlmResponseCache.objects.order_by('last_used').limit(excess).scalar('cache_key')
+    return LlmResponseCache.objects(cache_key__in=list(stale_keys)).delete()
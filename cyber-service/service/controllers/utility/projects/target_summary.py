@@ -0,0 +1,74 @@
+from entities.CyberServiceEntity import Project, Repository, Domain, Contract, TargetAzureCloud, TargetGoogleCloud
+from ..db.lean_queries import find_documents
+
+# Listing key of each target type and the fields the project listing shows,
+# solidity files keep only their names instead of their content
+TARGET_SUMMARY_FIELDS = {
+    Repository: ('repo_url_data', ['project_id', 'repository_url', 'repository_label', 'repository_provider',
+                                   'is_private_repo', 'access_token', 'created']),
+    Domain: ('domain_data', ['project_id', 'domain_url', 'domain_label', 'created']),
+    Contract: ('contract_data', ['project_id', 'contract_url', 'contract_label', 'solidity_files.file_name', 'created']),
+    TargetAzureCloud: ('azure_cloud_data', ['project_id', 'name', 'application_id', 'directory_id', 'subscription_id',
+                                            'created']),
+    TargetGoogleCloud: ('google_cloud_data', ['project_id', 'name', 'type', 'gcp_project_id', 'client_email', 'created']),
+}
+
+
+def compute_target_summary(project_id, target_classes=None):
+    """
+    Reads the live targets of a project, one find per target type.
+
+    Returns:
+        dict: The targets per listing key.
+    """
+    return {key: find_documents(target_class, {'project_id': project_id}, fields)
+            for target_class, (key, fields) in TARGET_SUMMARY_FIELDS.items()
+            if target_classes is None or target_class in target_classes}
+
+
+def sync_target_summary(target):
+    """
+    Refreshes the summary, embedded in the project, of the targets of the
+    same type as a target that was just added, updated or deleted.
+    Documents that are not target entities are ignored.
+    """
+    if type(target) not in TARGET_SUMMARY_FIELDS:
+        return
+    try:
+        summary = compute_target_summary(target.project_id, [type(target)])
+        result = Project._get_collection().update_one(
+            {'_id': target.project_id, 'target_summary': {'$type': 'object'}},
+            {'$set': {f'target_summary.{key}': targets for key, targets in summary.items()}})
+        if not result.matched_count:
+            # Project without a summary yet, embed the targets of every type
+            Project._get_collection().update_one(
+                {'_id': target.project_id}, {'$set': {'target_summary': compute_target_summary(target.project_id)}})
+    except Exception as e:
+        print(f"Error syncing the target summary of project {target.project_id}: {e}")
+
+
+def backfill_target_summaries(projects):
+    """
+    Embeds the summary of every target type in the listed raw project
+    documents that have none yet, projects created before the summary
+    existed. The documents are updated in place.
+    """
+    for project in projects:
+        if project.get('target_summary') is not None:
+            continue
+        project['target_summary'] = compute_target_summary(project['_id'])
+        Project._get_collection().update_one({'_id': project['_id']}, {'$set': {'target_summary': project['target_summary']}})
+
+
+def project_with_targets(project):
+    """
+    Flattens the embedded target summary of a raw project document into the
+    repo_url_data, domain_data, contract_data, azure_cloud_data and
+    google_cloud_data lists of the project listing.
+    """
+    project = dict(project)
+    project.pop('isdeleted', None)
+    summary = project.pop('target_summary', None) or {}
+    for key, _ in TARGET_SUMMARY_FIELDS.values():
+        project[key] = summary.get(key, [])
+    return project
@@ -0,0 +1,132 @@
+import json
+import uuid
+from datetime import datetime, timezone
+from pymongo import InsertOne, UpdateOne
+from entities.CyberServiceEntity import FindingSBOMVulnerability, FindingLicense
+from ..db.lean_queries import live_filter
+
+
+def vulnerability_fields(vulnerability):
+    """Business fields of a FindingSBOMVulnerability from a Trivy vulnerability."""
+    return {
+        'vulnerabilityid': vulnerability["VulnerabilityID"],
+        'pkgid': vulnerability["PkgID"],
+        'pkg_name': vulnerability["PkgName"],
+        'pkg_identifier': vulnerability["PkgIdentifier"],
+        'installed_version': vulnerability["InstalledVersion"],
+        'fixed_version': vulnerability.get("FixedVersion", ""),
+        'status': vulnerability["Status"],
+        'severity_source': vulnerability["SeveritySource"],
+        'primary_url': vulnerability["PrimaryURL"],
+        'data_source': vulnerability["DataSource"],
+        'title': vulnerability["Title"],
+        'severity': vulnerability["Severity"],
+        'description': vulnerability["Description"],
+        'vendor_severity': vulnerability["VendorSeverity"],
+        'references': json.dumps(vulnerability["References"]),
+    }
+
+
+def license_fields(license):
+    """Business fields of a FindingLicense from a Trivy license."""
+    return {
+        'severity': license["Severity"],
+        'category': license["Category"],
+        'pkg_name': license["PkgName"],
+        'file_path': license["FilePath"],
+        'name': license["Name"],
+        'text': license["Text"],
+        'link': license["Link"],
+    }
+
+
+def vulnerability_key(document):
+    return document.get('pkg_name'), document.get('installed_version'), document.get('vulnerabilityid')
+
+
+def license_key(document):
+    # Trivy reports licenses without a package version, the file tells apart
+    # the same license of a package found in several places
+    return document.get('pkg_name'), document.get('file_path'), document.get('name')
+
+
+SBOM_KEYS = {
+    FindingSBOMVulnerability: vulnerability_key,
+    FindingLicense: license_key,
+}
+
+
+def reconcile_sbom(document_class, project_id, target_id, scan_type_id, current_user, scanned):
+    """
+    Brings the stored SBOM vulnerabilities or licenses of a target in line
+    with the latest scan in one bulk write, instead of writing the whole SBOM
+    again. Entries are matched on (package, version, vulnerability id) or
+    (package, file, license):
+    new ones are inserted with first_seen, changed ones are updated and the
+    ones no longer reported are soft deleted with removed_at. An entry that
+    comes back later is inserted again, so every document covers one period
+    in which the package was present.
+
+    Args:
+        document_class: FindingSBOMVulnerability or FindingLicense.
+        scanned (list): Business fields of every entry of the scan.
+
+    Returns:
+        dict: Number of inserted, updated and removed entries.
+    """
+    key = SBOM_KEYS[document_class]
+    collection = document_class._get_collection()
+    now = datetime.now(timezone.utc)
+
+    existing = {}
+    duplicates = []
+    for document in collection.find(live_filter(document_class, {'project_id': project_id, 'target_id': target_id})):
+        # Scans before the reconcile added the whole SBOM again every time
+        if key(document) in existing:
+            duplicates.append(document)
+        else:
+            existing[key(document)] = document
+
+    operations = []
+    counts = {'inserted': 0, 'updated': 0, 'removed': 0}
+    reported = set()
+    for fields in scanned:
+        entry_key = key(fields)
+        if entry_key in reported:
+            continue
+        reported.add(entry_key)
+        document = existing.get(entry_key)
+        if document is None:
+            operations.append(InsertOne({
+                '_id': str(uuid.uuid4()),
+                'project_id': project_id,
+                'scan_type_id': scan_type_id,
+                'target_id': target_id,
+                'target_type': "repo",
+                **fields,
+                'first_seen': now,
+                'removed_at': None,
+                'created': now,
+                'updated': None,
+                'creator': current_user,
+                'updator': None,
+                'isdeleted': None,
+            }))
+            counts['inserted'] += 1
+            continue
+        changes = {field: value for field, value in fields.items() if document.get(field) != value}
+        if changes:
+            operations.append(UpdateOne({'_id': document['_id']}, {'$set': {**changes, 'updated': now, 'updator': current_user}}))
+            counts['updated'] += 1
+
+    for entry_key, document in existing.items():
+        if entry_key not in reported:
+            operations.append(UpdateOne({'_id': document['_id']}, {'$set': {
+                'isdeleted': True, 'removed_at': now, 'updated': now, 'updator': current_user}}))
+            counts['removed'] += 1
+    for document in duplicates:
+        operations.append(UpdateOne({'_id': document['_id']}, {'$set': {'isdeleted': True, 'updated': now}}))
+
+    if operations:
+        collection.bulk_write(operations, ordered=False)
+    return counts
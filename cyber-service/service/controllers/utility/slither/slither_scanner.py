@@ -1,6 +1,7 @@
 import os, re, json, shutil, subprocess
 from datetime import datetime, timezone
 from openai import OpenAI
+from ..llm.llm_cache import cached_chat_completion
 from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
@@ -11,6 +12,8 @@ openai_api_key = os.getenv('OPENAI_API_KEY')
 # Set your OpenAI API key
 client = OpenAI(api_key=openai_api_key)
 
+SLITHER_PROMPT_VERSION = 'slither-findings:1'
+
 
 def detect_imported_dependencies(temp_dir):
         """
@@ -359,12 +362,7 @@ def process_smart_contract_with_gpt(slither_data, length_of_findings):
 
     try:
         # Generate structured findings using OpenAI
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7
-        )
-        structured_results = response.choices[0].message.content
+        structured_results = cached_chat_completion(client, prompt, SLITHER_PROMPT_VERSION, [slither_data, length_of_findings])
         print("INFO: Structured results received from OpenAI.")
         print(f"DEBUG: Structured results: {structured_results}")
 
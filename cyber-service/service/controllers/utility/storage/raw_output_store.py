@@ -0,0 +1,122 @@
+import os
+import json
+import uuid
+import zlib
+from datetime import datetime, timezone
+from entities.CyberServiceEntity import RawScanOutput, RawScanOutputChunk
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Compressed bytes per RawScanOutputChunk document, well below the 16MB document limit
+RAW_OUTPUT_CHUNK_SIZE = int(os.getenv('RAW_OUTPUT_CHUNK_SIZE', 255 * 1024))
+RAW_OUTPUT_COMPRESSION_LEVEL = int(os.getenv('RAW_OUTPUT_COMPRESSION_LEVEL', 6))
+
+RAW_OUTPUT_COMPRESSION = 'gzip'
+# zlib window bits for the gzip container
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def store_raw_scan_output(scan_id, scanner_id, output, current_user, raw_scan_output_id=None):
+    """
+    Stores a raw scanner report gzip compressed, split over RawScanOutputChunk
+    documents. The RawScanOutput document only keeps the metadata, so the
+    report never ends up in an index or in the documents read by listings.
+
+    Args:
+        scan_id (str): UUID of the scan (collection - Scans).
+        scanner_id (str): UUID of the scanner that produced the report.
+        output (str | bytes | dict | list): The raw report.
+        current_user (str): User initiating the scan.
+        raw_scan_output_id (str): Id to store the report under, generated when not given.
+
+    Returns:
+        RawScanOutput: The saved metadata document.
+    """
+    if output is None:
+        data = b''
+    elif isinstance(output, bytes):
+        data = output
+    elif isinstance(output, str):
+        data = output.encode('utf-8')
+    else:
+        data = json.dumps(output).encode('utf-8')
+
+    compressor = zlib.compressobj(RAW_OUTPUT_COMPRESSION_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+    compressed = compressor.compress(data) + compressor.flush()
+
+    raw_scan_output_obj = RawScanOutput(
+        raw_scan_output_id=raw_scan_output_id or str(uuid.uuid4()),
+        scan_id=scan_id,
+        scanner_id=scanner_id,
+        compression=RAW_OUTPUT_COMPRESSION,
+        size=len(data),
+        stored_size=len(compressed),
+        chunk_count=(len(compressed) + RAW_OUTPUT_CHUNK_SIZE - 1) // RAW_OUTPUT_CHUNK_SIZE,
+        created=datetime.now(timezone.utc),
+        creator=current_user
+    )
+    raw_scan_output_obj.validate()
+
+    chunks = [RawScanOutputChunk(
+        raw_scan_output_chunk_id=str(uuid.uuid4()),
+        raw_scan_output_id=raw_scan_output_obj.raw_scan_output_id,
+        n=index,
+        data=compressed[start:start + RAW_OUTPUT_CHUNK_SIZE],
+        created=raw_scan_output_obj.created,
+        creator=current_user
+    ).to_mongo() for index, start in enumerate(range(0, len(compressed), RAW_OUTPUT_CHUNK_SIZE))]
+    if chunks:
+        RawScanOutputChunk._get_collection().insert_many(chunks, ordered=False)
+    # Written last, a RawScanOutput never points at missing chunks
+    raw_scan_output_obj.save()
+    return raw_scan_output_obj
+
+
+def stream_raw_scan_output(raw_scan_output_id):
+    """
+    Streams a raw scanner report, decompressing one chunk at a time.
+    Reports stored before compression was introduced are read from the
+    RawScanOutput document itself.
+
+    Args:
+        raw_scan_output_id (str): UUID of the raw scan output.
+
+    Returns:
+        generator | None: Yields the report as bytes, None when it does not exist.
+    """
+    raw_scan_output = RawScanOutput.objects(raw_scan_output_id=raw_scan_output_id).only(
+        'compression', 'output').as_pymongo().first()
+    if not raw_scan_output:
+        return None
+
+    if not raw_scan_output.get('compression'):
+        output = raw_scan_output.get('output') or ''
+        return iter([output.encode('utf-8')] if output else [])
+
+    def generate():
+        decompressor = zlib.decompressobj(GZIP_WBITS)
+        chunks = RawScanOutputChunk._get_collection().find(
+            {'raw_scan_output_id': raw_scan_output_id}, {'data': 1}).sort('n', 1).batch_size(4)
+        for chunk in chunks:
+            data = decompressor.decompress(chunk['data'])
+            if data:
+                yield data
+        data = decompressor.flush()
+        if data:
+            yield data
+
+    return generate()
+
+
+def read_raw_scan_output(raw_scan_output_id):
+    """
+    Reads a whole raw scanner report.
+
+    Returns:
+        str | None: The report, None when it does not exist.
+    """
+    stream = stream_raw_scan_output(raw_scan_output_id)
+    if stream is None:
+        return None
+    return b''.join(stream).decode('utf-8')
@@ -0,0 +1,242 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import subprocess
+from ..git.repo_cache import directory_size
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 'cache': install dependencies once per lockfile hash into isolated, shared environments.
+# 'lockfile': never install, Trivy resolves packages from the lockfiles alone
+# (package licenses that Trivy reads from installed packages are then missing).
+DEPENDENCY_INSTALL_MODE = os.getenv('DEPENDENCY_INSTALL_MODE', 'cache').lower()
+DEPENDENCY_CACHE_DIR = os.getenv('DEPENDENCY_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'cyber-service-dependency-cache'))
+DEPENDENCY_CACHE_MAX_BYTES = int(os.getenv('DEPENDENCY_CACHE_MAX_BYTES', 20 * 1024 ** 3))
+
+NPM_LOCKFILES = ['package-lock.json', 'npm-shrinkwrap.json']
+PIP_REQUIREMENTS = 'requirements.txt'
+GO_LOCKFILE = 'go.sum'
+
+
+def file_hash(*paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as file:
+            digest.update(file.read())
+    return digest.hexdigest()[:32]
+
+
+def find_manifest_dirs(repo_path, file_name):
+    """
+    Directories of the repository containing `file_name`, skipping test
+    folders and installed dependencies.
+    """
+    found = []
+    for root, dirs, files in os.walk(repo_path):
+        dirs[:] = [d for d in dirs if d not in ('node_modules', '.git')]
+        if 'test' in os.path.relpath(root, repo_path).lower():
+            continue
+        if file_name in files:
+            found.append(root)
+    return found
+
+
+def run_install(command, cwd, env=None):
+    try:
+        subprocess.run(command, cwd=cwd, env=env, check=True, capture_output=True, text=True)
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"Error running {' '.join(command)} in {cwd}: {getattr(e, 'stderr', e)}")
+        return False
+
+
+def build_cache_entry(entry_path, build):
+    """
+    Builds a cache entry in a temporary directory and moves it into place, so
+    concurrent workers never see a half-built entry. `build` receives the
+    temporary directory and returns True on success.
+    """
+    if os.path.isdir(entry_path):
+        touch_entry(entry_path)
+        return True
+    os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+    build_dir = tempfile.mkdtemp(dir=os.path.dirname(entry_path))
+    try:
+        if not build(build_dir):
+            return False
+        try:
+            os.rename(build_dir, entry_path)
+        except OSError:
+            # Another worker finished the same entry first
+            pass
+        touch_entry(entry_path)
+        return True
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def touch_entry(entry_path):
+    os.utime(entry_path, (time.time(), time.time()))
+
+
+def link_tree(source, destination):
+    """
+    Materializes a cached directory in the working copy with hard links,
+    falling back to copies across file systems.
+    """
+    def link_or_copy(src, dst):
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+    shutil.copytree(source, destination, symlinks=True, copy_function=link_or_copy, dirs_exist_ok=True)
+
+
+def prepare_npm(repo_path, install=True):
+    for root in find_manifest_dirs(repo_path, 'package.json'):
+        lockfile = next((os.path.join(root, name) for name in NPM_LOCKFILES if os.path.exists(os.path.join(root, name))), None)
+        if not lockfile:
+            # Trivy needs a lockfile to resolve the dependency tree, generating one installs nothing
+            run_install(["npm", "install", "--package-lock-only", "--ignore-scripts"], cwd=root)
+            lockfile = os.path.join(root, 'package-lock.json')
+            if not os.path.exists(lockfile):
+                continue
+        if not install:
+            continue
+        entry_path = os.path.join(DEPENDENCY_CACHE_DIR, 'npm', file_hash(os.path.join(root, 'package.json'), lockfile))
+
+        def build(build_dir, root=root, lockfile=lockfile):
+            shutil.copy2(os.path.join(root, 'package.json'), build_dir)
+            shutil.copy2(lockfile, build_dir)
+            return run_install(["npm", "ci", "--ignore-scripts"], cwd=build_dir)
+
+        if build_cache_entry(entry_path, build) and os.path.isdir(os.path.join(entry_path, 'node_modules')):
+            link_tree(os.path.join(entry_path, 'node_modules'), os.path.join(root, 'node_modules'))
+    return {}
+
+
+def resolve_pip_versions(requirements_file):
+    """
+    Resolves a requirements file with pip without installing anything.
+
+    Returns:
+        list: Sorted `name==version` of every package pip would install,
+        transitive ones included, or None when the resolution failed.
+    """
+    try:
+        result = subprocess.run([sys.executable, "-m", "pip", "install", "--dry-run", "--ignore-installed", "--quiet",
+                                 "--report", "-", "-r", requirements_file],
+                                cwd=os.path.dirname(requirements_file), check=True, capture_output=True, text=True)
+        report = json.loads(result.stdout)
+    except (subprocess.CalledProcessError, FileNotFoundError, ValueError) as e:
+        print(f"Error resolving {requirements_file}: {getattr(e, 'stderr', e)}")
+        return None
+    return sorted(f"{package['metadata']['name'].lower()}=={package['metadata']['version']}"
+                  for package in report.get('install', []))
+
+
+def prepare_pip(repo_path):
+    requirements = [os.path.join(root, PIP_REQUIREMENTS) for root in find_manifest_dirs(repo_path, PIP_REQUIREMENTS)]
+    if not requirements:
+        return {}
+    # Unpinned requirements resolve to newer versions over time, the environment
+    # is keyed on what they resolve to today rather than on the file alone
+    resolved = []
+    for requirements_file in requirements:
+        versions = resolve_pip_versions(requirements_file)
+        if versions is None:
+            return {}
+        resolved.append('\n'.join(versions))
+    digest = hashlib.sha256(file_hash(*requirements).encode('utf-8'))
+    digest.update('\0'.join(resolved).encode('utf-8'))
+    entry_path = os.path.join(DEPENDENCY_CACHE_DIR, 'pip', digest.hexdigest()[:32])
+
+    def build(build_dir):
+        if not run_install([sys.executable, "-m", "venv", build_dir], cwd=build_dir):
+            return False
+        pip = os.path.join(build_dir, 'bin', 'pip')
+        installed = False
+        # Dependencies are resolved, requirements files rarely pin the transitive ones
+        for requirements_file in requirements:
+            installed = run_install([pip, "install", "-r", requirements_file], cwd=os.path.dirname(requirements_file)) or installed
+        return installed
+
+    if not build_cache_entry(entry_path, build):
+        return {}
+    # Trivy reads the licenses of pip packages from the active virtual environment
+    return {'VIRTUAL_ENV': entry_path, 'PATH': os.path.join(entry_path, 'bin') + os.pathsep + os.environ.get('PATH', '')}
+
+
+def prepare_go(repo_path):
+    go_path = os.path.join(DEPENDENCY_CACHE_DIR, 'go')
+    env = {'GOPATH': go_path}
+    go_dirs = find_manifest_dirs(repo_path, 'go.mod')
+    for root in go_dirs:
+        if not os.path.exists(os.path.join(root, GO_LOCKFILE)):
+            continue
+        # The module cache is shared, a marker per go.sum avoids re-running the download
+        marker = os.path.join(go_path, 'downloaded', file_hash(os.path.join(root, GO_LOCKFILE)))
+        if os.path.exists(marker):
+            continue
+        if run_install(["go", "mod", "download"], cwd=root, env={**os.environ, **env}):
+            os.makedirs(os.path.dirname(marker), exist_ok=True)
+            open(marker, 'w').close()
+    return env if go_dirs else {}
+
+
+def prepare_dependencies(repo_path, mode=None):
+    """
+    Makes the dependencies of the repository available to Trivy without
+    installing anything into the worker's own environment.
+
+    Args:
+        repo_path (str): Path to the repository being scanned.
+        mode (str): 'cache' or 'lockfile', defaults to DEPENDENCY_INSTALL_MODE.
+
+    Returns:
+        dict: Environment variables to pass to the Trivy process.
+    """
+    mode = mode or DEPENDENCY_INSTALL_MODE
+    if mode == 'lockfile':
+        # requirements.txt and go.mod/go.sum are read as they are, npm only needs a lockfile
+        print("Lockfile-only mode, skipping dependency installation.")
+        prepare_npm(repo_path, install=False)
+        return {}
+
+    env = {}
+    for prepare in (prepare_npm, prepare_pip, prepare_go):
+        try:
+            env.update(prepare(repo_path))
+        except Exception as e:
+            print(f"Error preparing dependencies with {prepare.__name__}: {e}")
+    evict_cache_entries()
+    return env
+
+
+def evict_cache_entries(max_bytes=DEPENDENCY_CACHE_MAX_BYTES):
+    """
+    Deletes the least recently used npm and pip environments until the cache
+    fits in `max_bytes`.
+    """
+    entries = []
+    for ecosystem in ('npm', 'pip'):
+        ecosystem_dir = os.path.join(DEPENDENCY_CACHE_DIR, ecosystem)
+        if not os.path.isdir(ecosystem_dir):
+            continue
+        for entry in os.listdir(ecosystem_dir):
+            entry_path = os.path.join(ecosystem_dir, entry)
+            if os.path.isdir(entry_path) and not entry.startswith('tmp'):
+                entries.append((os.path.getmtime(entry_path), entry_path, directory_size(entry_path)))
+
+    total = sum(size for _, _, size in entries)
+    for _, entry_path, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry_path, ignore_errors=True)
+        total -= size
+        print(f"Evicted dependency cache entry {entry_path} ({size} bytes)")
@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import fcntl
+import shutil
+import tempfile
+import threading
+import subprocess
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Shared by every worker of a node (or mounted from a volume). Each refresh is
+# downloaded into a new version directory and `current` is switched
+# atomically, so running scans keep reading the version they started with.
+TRIVY_CACHE_DIR = os.getenv('TRIVY_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'cyber-service-trivy-cache'))
+TRIVY_DB_UPDATE_ENABLED = os.getenv('TRIVY_DB_UPDATE_ENABLED', 'true').lower() == 'true'
+TRIVY_DB_UPDATE_INTERVAL_SECONDS = int(os.getenv('TRIVY_DB_UPDATE_INTERVAL_SECONDS', 6 * 3600))
+# Also stop Trivy from looking packages up online (e.g. Maven Central) during a scan
+TRIVY_OFFLINE_SCAN = os.getenv('TRIVY_OFFLINE_SCAN', 'false').lower() == 'true'
+
+TRIVY_DB_VERSIONS_KEPT = 2
+
+trivy_db_updater = None
+trivy_db_updater_lock = threading.Lock()
+
+
+def current_cache_dir():
+    """
+    Returns the version directory holding the latest downloaded DB, or None
+    when no DB has been downloaded yet.
+    """
+    current = os.path.join(TRIVY_CACHE_DIR, 'current')
+    if os.path.islink(current):
+        return os.path.realpath(current)
+    # Plain Trivy cache copied in by hand, e.g. on an air-gapped worker
+    if os.path.exists(os.path.join(TRIVY_CACHE_DIR, 'db', 'trivy.db')):
+        return TRIVY_CACHE_DIR
+    return None
+
+
+def trivy_cache_options():
+    """
+    Extra Trivy options pointing a scan at the shared, pre-warmed DB.
+    """
+    cache_dir = current_cache_dir()
+    if not cache_dir:
+        # No DB yet: the scan downloads one into a private cache, like before
+        print("Shared Trivy DB not downloaded yet, the scan downloads its own copy.")
+        return []
+    # Scan results are cached in memory so concurrent scans do not wait on the shared cache's lock
+    options = ["--cache-dir", cache_dir, "--cache-backend", "memory", "--skip-db-update", "--skip-java-db-update"]
+    if TRIVY_OFFLINE_SCAN:
+        options.append("--offline-scan")
+    return options
+
+
+def trivy_db_version():
+    """
+    Returns the build time of the shared vulnerability DB scans currently use,
+    from the metadata Trivy writes next to the DB, or None when it is unknown.
+    """
+    cache_dir = current_cache_dir()
+    if not cache_dir:
+        return None
+    try:
+        with open(os.path.join(cache_dir, 'db', 'metadata.json')) as metadata_file:
+            return json.load(metadata_file).get('UpdatedAt')
+    except (OSError, ValueError) as e:
+        print(f"Cannot read the Trivy DB metadata: {e}")
+        return None
+
+
+def db_age_seconds():
+    cache_dir = current_cache_dir()
+    if not cache_dir:
+        return None
+    return time.time() - os.path.getmtime(cache_dir)
+
+
+def update_trivy_db(force=False):
+    """
+    Downloads a fresh vulnerability DB when the current one is older than the
+    update interval. Only one process of the node downloads at a time, the
+    others return immediately.
+
+    Returns:
+        bool: True when a new DB version was installed.
+    """
+    os.makedirs(os.path.join(TRIVY_CACHE_DIR, 'versions'), exist_ok=True)
+    with open(os.path.join(TRIVY_CACHE_DIR, 'update.lock'), 'w') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        try:
+            if not force:
+                age = db_age_seconds()
+                if age is not None and age < TRIVY_DB_UPDATE_INTERVAL_SECONDS:
+                    return False
+
+            version_dir = os.path.join(TRIVY_CACHE_DIR, 'versions', str(int(time.time())))
+            for option in ("--download-db-only", "--download-java-db-only"):
+                result = subprocess.run(["trivy", "image", option, "--cache-dir", version_dir],
+                                        capture_output=True, text=True)
+                if result.returncode != 0:
+                    print(f"Trivy DB update failed: {result.stderr}")
+                    shutil.rmtree(version_dir, ignore_errors=True)
+                    return False
+
+            # Atomic switch of the `current` symlink
+            next_link = os.path.join(TRIVY_CACHE_DIR, 'current.next')
+            if os.path.lexists(next_link):
+                os.remove(next_link)
+            os.symlink(version_dir, next_link)
+            os.replace(next_link, os.path.join(TRIVY_CACHE_DIR, 'current'))
+            print(f"Trivy DB updated in {version_dir}")
+
+            remove_old_versions()
+            return True
+        except FileNotFoundError:
+            print("Error: Trivy is not installed or not found in the system path.")
+            return False
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def remove_old_versions():
+    """
+    Keeps the newest versions only; the previous one stays for scans that
+    started before the switch.
+    """
+    versions_dir = os.path.join(TRIVY_CACHE_DIR, 'versions')
+    versions = sorted(os.listdir(versions_dir), key=lambda name: int(name) if name.isdigit() else 0)
+    for version in versions[:-TRIVY_DB_VERSIONS_KEPT]:
+        shutil.rmtree(os.path.join(versions_dir, version), ignore_errors=True)
+
+
+class TrivyDbUpdater:
+    """
+    Background thread refreshing the shared Trivy DB on a schedule.
+    """
+
+    def __init__(self, interval=TRIVY_DB_UPDATE_INTERVAL_SECONDS) -> None:
+        self.interval = interval
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._update_loop, name="trivy-db-updater", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _update_loop(self):
+        # First check right away so a fresh node warms the DB before its first scan
+        check_interval = max(60, self.interval // 6)
+        while not self._stop_event.is_set():
+            try:
+                update_trivy_db()
+            except Exception as e:
+                print(f"Trivy DB update failed: {e}")
+            self._stop_event.wait(check_interval)
+
+
+def start_trivy_db_updater():
+    """
+    Starts the DB updater of this process, once. Disabled on air-gapped
+    workers, whose TRIVY_CACHE_DIR is filled from outside.
+    """
+    global trivy_db_updater
+    if not TRIVY_DB_UPDATE_ENABLED:
+        print("Trivy DB updates disabled, scans use the DB found in", TRIVY_CACHE_DIR)
+        return None
+    with trivy_db_updater_lock:
+        if trivy_db_updater is None:
+            trivy_db_updater = TrivyDbUpdater()
+            trivy_db_updater.start()
+    return trivy_db_updater
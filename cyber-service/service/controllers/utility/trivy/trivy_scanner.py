@@ -5,6 +5,9 @@ from datetime import datetime, timezone
 import uuid
 from enum import Enum
 import tempfile
+from .dependency_cache import prepare_dependencies
+from .trivy_db import trivy_cache_options
+from ..findings.fingerprint import finding_fingerprint
 
 class FindingStatus(Enum):
     Open = 'open'
@@ -21,56 +24,13 @@ class FindingSeverity(Enum):
     Informational = 'informational'
 
 
-def install_dependencies(repo_path):
-    """
-    Installs necessary dependencies for the repository before scanning.
-
-    Args:
-        repo_path (str): Path to the repository being scanned.
-
-    Returns:
-        bool: True if dependencies were installed, False otherwise.
-    """
-    installed = False
-    for root, _, files in os.walk(repo_path):
-        # Skip test directories
-        if 'tests' in root.lower() or 'test' in root.lower():
-            print(f"Skipping installation in the 'tests' folder: {repo_path}")
-            continue
-
-        # Check for dependency files and run appropriate install commands
-        if "package.json" in files:
-            print(f"Detected npm at {root}. Running 'npm install'...")
-            try:
-                subprocess.run(["npm", "install"], cwd=root, check=True)
-                installed = True
-            except subprocess.CalledProcessError as e:
-                print(f"Error running 'npm install' in {root}: {e}")
-                continue
-        elif "requirements.txt" in files:
-            print(f"Detected pip at {root}. Running 'pip install -r requirements.txt'...")
-            try:
-                subprocess.run(["pip", "install", "-r", "requirements.txt"], cwd=root, check=True)
-                installed = True
-            except subprocess.CalledProcessError as e:
-                print(f"Error running 'pip install' in {root}: {e}")
-                continue
-        elif "go.mod" in files:
-            print(f"Detected Go at {root}. Running 'go mod tidy'...")
-            try:
-                subprocess.run(["go", "mod", "tidy"], cwd=root, check=True)
-                installed = True
-            except subprocess.CalledProcessError as e:
-                print(f"Error running 'go mod tidy' in {root}: {e}")
-                continue
-    return installed
-
-def convert_trivy_output(raw_data):
+def convert_trivy_output(raw_data, ignore_unfixed=False):
     """
     Converts raw Trivy output to a structured JSON format.
 
     Args:
         raw_data (dict): Raw Trivy scan results in dictionary format.
+        ignore_unfixed (bool): Skip vulnerabilities without a fixed version.
 
     Returns:
         list: Transformed structured results.
@@ -89,6 +49,8 @@ def convert_trivy_output(raw_data):
         # Handle vulnerabilities
         vulnerabilities = result.get('Vulnerabilities', [])
         for vuln in vulnerabilities:
+            if ignore_unfixed and not vuln.get('FixedVersion'):
+                continue
             alert_id = vuln.get('VulnerabilityID', '')
             raw_alert = vuln.get('Title', '')
 
@@ -121,6 +83,7 @@ def convert_trivy_output(raw_data):
                 "severity": severity,
                 "finding_name": raw_alert,
                 "finding_desc": vuln.get('Description', ''),
+                "fingerprint": finding_fingerprint("trivy", alert_id, target, vuln.get('PkgName', ''), vuln.get('InstalledVersion', '')),
                 "target_id": vuln.get('PrimaryURL', ''),
                 "cwe_ids": vuln.get('CweIDs', []),
                 "references": vuln.get('References', []),
@@ -166,6 +129,7 @@ def convert_trivy_output(raw_data):
                 "severity": severity,
                 "finding_name": raw_alert,
                 "finding_desc": misconf.get('Description', ''),
+                "fingerprint": finding_fingerprint("trivy", alert_id, f"{target}:{misconf.get('CauseMetadata', {}).get('StartLine', '')}"),
                 "target_id": misconf.get('PrimaryURL', ''),
                 "cwe_ids": [],
                 "references": misconf.get('References', []),
@@ -178,127 +142,51 @@ def convert_trivy_output(raw_data):
     return transformed_alerts
 
 
-def run_trivy_scan(repo_path, access_token, is_private_repo):
+def run_trivy_combined_scan(repo_path, access_token, is_private_repo):
     """
-    Runs the Trivy scan and converts the output to a structured format.
+    Runs a single Trivy pass with the vulnerability, misconfiguration and
+    license scanners on the working copy. The JSON report feeds the
+    vulnerability findings as well as the SBOM and license results.
 
     Args:
         repo_path (str): Path to the repository being scanned.
+        access_token (str): GitHub access token if scanning a private repo.
+        is_private_repo (bool): Whether the repository is private.
 
     Returns:
-        list: Structured Trivy scan results.
+        tuple: Trivy raw output and JSON data, or None when the scan failed.
     """
-
-    set_github_token(access_token, is_private_repo)
-
-    # Install dependencies
-    dependencies_installed = install_dependencies(repo_path)
-    if dependencies_installed:
-        print("Dependencies installed successfully.")
-    else:
-        print("No dependencies detected to install.")
+    # Dependencies come from the lockfile-keyed cache, never the worker's own environment
+    dependency_env = prepare_dependencies(repo_path)
     print("Running Trivy...")
     print("Repo path:", repo_path)
 
     with tempfile.NamedTemporaryFile(delete=False, suffix=".json") as output_file:
         output_temp_file_path = output_file.name
     try:
-        # Run the Trivy scan and capture the output
-        result = subprocess.run(
+        subprocess.run(
             [
-                "trivy", "repo",
-                "--scanners", "vuln,misconfig",
-                "--ignore-unfixed",
-                "--format", "json",
+                "trivy", "fs",
                 repo_path,
-                "-o", output_temp_file_path
+                "--scanners", "vuln,misconfig,license",
+                "--license-full",
+                "--include-dev-deps",
+                "--license-confidence-level", "0.8",
+                "--format", "json",
+                "-o", output_temp_file_path,
+                *trivy_cache_options()
             ],
             capture_output=True,
             text=True,
-            check=True
+            check=True,
+            env={**os.environ, **dependency_env, **github_token_env(access_token, is_private_repo)}
         )
-        trivy_output = result.stdout
         print("Trivy scan completed successfully.")
 
         # Read the output from the temporary file
         with open(output_temp_file_path, 'r') as file:
             trivy_output = file.read()
             trivy_json_data = json.loads(trivy_output)  # Convert JSON string to Python object
-        print("raw_data ", trivy_json_data)
-
-        # Clean up temporary files
-        os.remove(output_temp_file_path)
-
-        # Convert raw Trivy output to structured format
-        # raw_data = json.loads(trivy_output)
-        return trivy_output, trivy_json_data
-
-    except subprocess.CalledProcessError as e:
-        print(f"Error running Trivy: {e.stderr}")
-        return None
-    except FileNotFoundError:
-        print("Error: Trivy is not installed or not found in the system path.")
-        return None
-    except json.JSONDecodeError:
-        print("Error: Failed to parse Trivy output.")
-        return None
-
-def run_licenses_and_sbom_scan(repo_path, access_token, is_private_repo):
-    """
-    Runs the Trivy SBOM and license scan, and converts the output to a structured format.
-
-    Args:
-        repo_path (str): Path to the repository being scanned.
-        access_token (str): GitHub access token if scanning a private repo.
-        is_private_repo (bool): Whether the repository is private.
-
-    Returns:
-        tuple: Trivy raw output and structured JSON data.
-    """
-    print("Running Trivy for SBOM and licenses...")
-    print("Repo path:", repo_path)
-
-    set_github_token(access_token, is_private_repo)
-
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".json") as temp_file:
-            sbom_temp_file_path = temp_file.name
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".json") as output_file:
-            output_temp_file_path = output_file.name
-
-        # Step 1: Run the Trivy SBOM scan with vulnerabilities
-        sbom_scan_cmd = [
-            "trivy", "repository",
-            "--format", "spdx-json",
-            "--output", sbom_temp_file_path,
-            repo_path,
-            "--include-dev-deps",
-            "--scanners", "vuln"
-        ]
-        subprocess.run(sbom_scan_cmd, check=True)
-        print("SBOM scan completed successfully.")
-
-        # Step 2: Run the Trivy SBOM scan for licenses
-        license_scan_cmd = [
-            "trivy", "sbom", sbom_temp_file_path,
-            "--scanners", "vuln,license",
-            "-f", "json",
-            "-o", output_temp_file_path
-        ]
-        subprocess.run(license_scan_cmd, check=True)
-        print("License and vulnerability scan completed successfully.")
-        
-        # Read the output from the temporary file
-        with open(output_temp_file_path, 'r') as file:
-            trivy_output = file.read()
-            trivy_json_data = json.loads(trivy_output)  # Convert JSON string to Python object
-        print("raw_data ", trivy_json_data)
-        
-        # Clean up temporary files
-        os.remove(sbom_temp_file_path)
-        os.remove(output_temp_file_path)
-
         return trivy_output, trivy_json_data
 
     except subprocess.CalledProcessError as e:
@@ -310,86 +198,20 @@ def run_licenses_and_sbom_scan(repo_path, access_token, is_private_repo):
     except json.JSONDecodeError:
         print("Error: Failed to parse Trivy output.")
         return None
-    
-
-def run_package_licenses_scan(repo_path, access_token, is_private_repo):
-    """
-    Runs the Trivy SBOM and license scan, and converts the output to a structured format.
-
-    Args:
-        repo_path (str): Path to the repository being scanned.
-        access_token (str): GitHub access token if scanning a private repo.
-        is_private_repo (bool): Whether the repository is private.
-
-    Returns:
-        tuple: Trivy raw output and structured JSON data.
-    """
-
-    # print("Running Trivy for SBOM and licenses...")
-    # print("Repo path:", repo_path)
-
-    set_github_token(access_token, is_private_repo)
+    finally:
+        if os.path.exists(output_temp_file_path):
+            os.remove(output_temp_file_path)
 
-    # Install dependencies
-    dependencies_installed = install_dependencies(repo_path)
-    if dependencies_installed:
-        print("Dependencies installed successfully.")
-    else:
-        print("No dependencies detected to install.")
-    print("Running Trivy...")
-    print("Repo path:", repo_path)
-
-    try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".json") as output_file:
-            output_temp_file_path = output_file.name
-
-        # Step 1: Run the Trivy SBOM scan with vulnerabilities
-        sbom_scan_cmd = [
-            "trivy", "fs",
-            repo_path,
-            "--scanners", "license",
-            "--license-full",
-            "--include-dev-deps",
-            "--license-confidence-level", "0.8",
-            "-f", "json",
-            "-o", output_temp_file_path
-        ]
-        subprocess.run(sbom_scan_cmd, check=True)
-        print("Package and License scan completed successfully.")
-
-        
-        # Read the output from the temporary file
-        with open(output_temp_file_path, 'r') as file:
-            trivy_output = file.read()
-            trivy_json_data = json.loads(trivy_output)  
-        print("raw_data ", trivy_json_data)
-        
-        # Clean up temporary files
-        os.remove(output_temp_file_path)
-
-        return trivy_output, trivy_json_data
-
-    except subprocess.CalledProcessError as e:
-        print(f"Error running Trivy: {e.stderr}")
-        return None
-    except FileNotFoundError:
-        print("Error: Trivy is not installed or not found in the system path.")
-        return None
-    except json.JSONDecodeError:
-        print("Error: Failed to parse Trivy output.")
-        return None
-    
-def set_github_token(access_token, is_private_repo):
+def github_token_env(access_token, is_private_repo):
     """
-    Sets the GITHUB_TOKEN environment variable based on the repository type.
+    Returns the GITHUB_TOKEN of the Trivy process based on the repository type.
+    It is passed to the subprocess only, scans of other repositories running
+    in parallel never see it.
 
     Args:
         access_token (str): The access token for private repositories.
         is_private_repo (bool): Flag indicating if the repository is private.
     """
-    if is_private_repo:
-        os.environ["GITHUB_TOKEN"] = access_token
-        print("GITHUB_TOKEN set for private repository.")
-    else:
-        os.environ["GITHUB_TOKEN"] = ''
-        print("GITHUB_TOKEN cleared for public repository.")
\ No newline at end of file
+    if is_private_repo and access_token:
+        return {"GITHUB_TOKEN": access_token}
+    return {"GITHUB_TOKEN": ''}
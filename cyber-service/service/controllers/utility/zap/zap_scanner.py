@@ -5,6 +5,7 @@ import re
 from datetime import datetime, timezone
 from uuid import uuid4
 from enum import Enum
+from ..findings.fingerprint import finding_fingerprint
 
 # Constants
 zap_base_url = 'http://localhost:8080'
@@ -55,6 +56,7 @@ def convert_raw_output(alert_data):
             "severity": alert.get("risk", "").lower(),
             "status": "Open",
             "extended_finding_details_name": "DomainZap1",  
+            "fingerprint": finding_fingerprint("zap", alert.get("pluginId") or alert.get("alert"), f"{alert.get('method', '')} {alert.get('url', '')} {alert.get('param', '')}"),
             "extended_finding_details_id": "",  
             "fix_recommendation": alert.get("solution", ""),
             "raw_scan_output_id": "",
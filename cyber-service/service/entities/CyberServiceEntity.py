@@ -29,6 +29,12 @@ class ScanStatus(Enum):
     Completed = 'completed'
     Error = 'error'
 
+class ScanJobStatus(Enum):
+    Queued = 'queued'
+    Leased = 'leased'
+    Completed = 'completed'
+    Failed = 'failed'
+
 class FindingStatus(Enum):
     Open = 'open'
     Closed = 'closed'
@@ -135,7 +141,7 @@ class Project(SoftDeleteNoCacheDocument, Document):
     meta = {
         'collection': 'Project',
         'soft_delete': {'isdeleted': True},
-        'indexes': ['name'],
+        'indexes': ['name', 'creator'],
         'strict': False
     }
     # pk, fk
@@ -146,6 +152,8 @@ class Project(SoftDeleteNoCacheDocument, Document):
     status = EnumField(ProjectStatus, null=True)
     name = StringField(required=True, max_length=75)
     description  = StringField(null=True)
+    # Targets of the project per target type, kept in sync by the target controllers for the project listing
+    target_summary = DictField(null=True)
     # System Fields
     created = DateTimeField(null=True)
     updated = DateTimeField(null=True)
@@ -279,11 +287,82 @@ class Scans(SoftDeleteNoCacheDocument, Document):
     isdeleted = BooleanField(default=False, null=True)
 
 
+class ScanJobs(SoftDeleteNoCacheDocument, Document):
+    meta = {
+        'collection': 'ScanJobs',
+        'soft_delete': {'isdeleted': True},
+        'indexes': ['scan_id', ('status', '-priority', 'available_at')],
+        'strict': False
+    }
+    # pk, fk
+    scan_job_id = StringField(required=True, primary_key=True)
+    scan_id = StringField(required=True)
+    project_id = StringField(required=True)
+
+    # Business Fields
+    status = EnumField(ScanJobStatus, required=True)
+    priority = IntField(default=0)
+    payload = DictField(null=True)
+    attempts = IntField(default=0)
+    lease_owner = StringField(null=True)
+    lease_expires_at = DateTimeField(null=True)
+    available_at = DateTimeField(null=True)
+    last_error = StringField(null=True)
+
+    # System Fields
+    created = DateTimeField(null=True)
+    updated = DateTimeField(null=True)
+    creator = StringField(null=True)
+    updator = StringField(null=True)
+
+    # Declare the field used to check if the record is soft deleted
+    # this field must also be reported in the `meta['soft_delete']` dict
+    isdeleted = BooleanField(default=False, null=True)
+
+
+class RepositoryScanCommit(SoftDeleteNoCacheDocument, Document):
+    meta = {
+        'collection': 'RepositoryScanCommit',
+        'soft_delete': {'isdeleted': True},
+        'indexes': [{'fields': ('target_id', 'scanner_name'), 'unique': True}],
+        'strict': False
+    }
+    # pk, fk
+    repository_scan_commit_id = StringField(required=True, primary_key=True)
+    project_id = StringField(required=True)
+    target_id = StringField(required=True)
+    scan_id = StringField(required=True)
+
+    # Business Fields
+    scanner_name = StringField(required=True)
+    commit_sha = StringField(required=True)
+    # Vulnerability DB the scan matched against, Trivy only
+    trivy_db_version = StringField(null=True)
+
+    # System Fields
+    created = DateTimeField(null=True)
+    updated = DateTimeField(null=True)
+    creator = StringField(null=True)
+    updator = StringField(null=True)
+
+    # Declare the field used to check if the record is soft deleted
+    # this field must also be reported in the `meta['soft_delete']` dict
+    isdeleted = BooleanField(default=False, null=True)
+
+
 class FindingMaster(SoftDeleteNoCacheDocument, Document):
     meta = {
         'collection': 'FindingMaster',
         'soft_delete': {'isdeleted': True},
-        'indexes': ['finding_name'],
+        'indexes': [
+            'finding_name',
+            ('project_id', 'target_id', 'scan_type_id', 'finding_name'),
+            # Default order of the findings listing, walked in both directions by keyset pagination
+            ('project_id', 'finding_date', '_id'),
+            # Findings recorded before fingerprints existed have none and stay out of the index
+            {'fields': ('project_id', 'target_id', 'fingerprint'), 'unique': True,
+             'partialFilterExpression': {'fingerprint': {'$type': 'string'}}}
+        ],
         'strict': False
     }
     # pk, fk
@@ -303,6 +382,8 @@ class FindingMaster(SoftDeleteNoCacheDocument, Document):
     severity = EnumField(FindingSeverity, null=True)
     status = EnumField(FindingStatus, null=True)
     target_type = EnumField(ScanTargetType, null=True)
+    # Scanner, rule, location and package of the finding, hashed (see utility/findings/fingerprint.py)
+    fingerprint = StringField(null=True)
 
     # System Fields
     created = DateTimeField(null=True)
@@ -315,6 +396,28 @@ class FindingMaster(SoftDeleteNoCacheDocument, Document):
     isdeleted = BooleanField(default=False, null=True)
 
 
+class ProjectFindingStats(Document):
+    meta = {
+        'collection': 'ProjectFindingStats',
+        'indexes': ['project_id'],
+        'strict': False
+    }
+    # pk: project, scan type and creator of the counted findings (see utility/findings/finding_stats.py)
+    project_finding_stats_id = StringField(required=True, primary_key=True)
+    project_id = StringField(required=True)
+    scan_type_id = StringField(null=True)
+    creator = StringField(null=True)
+
+    # Business Fields: live findings, in total and per value
+    total = IntField(default=0)
+    severity = DictField()
+    status = DictField()
+    target_type = DictField()
+
+    # System Fields
+    updated = DateTimeField(null=True)
+
+
 class FindingScanLink(SoftDeleteNoCacheDocument, Document):
     meta = {
         'collection': 'FindingScanLink',
@@ -341,7 +444,7 @@ class RawScanOutput(SoftDeleteNoCacheDocument, Document):
     meta = {
         'collection': 'RawScanOutput',
         'soft_delete': {'isdeleted': True},
-        'indexes': ['output'],
+        'indexes': ['scan_id'],
         'strict': False
     }
     # pk, fk
@@ -350,7 +453,41 @@ class RawScanOutput(SoftDeleteNoCacheDocument, Document):
     scanner_id = StringField(required=True)
 
     # Business Fields
+    # Only set on outputs stored before compression, newer ones live in RawScanOutputChunk
     output = StringField(null=True)
+    compression = StringField(null=True)
+    size = IntField(null=True)
+    stored_size = IntField(null=True)
+    chunk_count = IntField(null=True)
+
+    # System Fields
+    created = DateTimeField(null=True)
+    updated = DateTimeField(null=True)
+    creator = StringField(null=True)
+    updator = StringField(null=True)
+
+    # Declare the field used to check if the record is soft deleted
+    # this field must also be reported in the `meta['soft_delete']` dict
+    isdeleted = BooleanField(default=False, null=True)
+
+
+class RawScanOutputChunk(SoftDeleteNoCacheDocument, Document):
+    meta = {
+        'collection': 'RawScanOutputChunk',
+        'soft_delete': {'isdeleted': True},
+        'indexes': [
+            {'fields': ('raw_scan_output_id', 'n'), 'unique': True}
+        ],
+        'strict': False
+    }
+    # pk, fk
+    raw_scan_output_chunk_id = StringField(required=True, primary_key=True)
+    raw_scan_output_id = StringField(required=True)
+
+    # Business Fields
+    # Position of the chunk in the compressed output
+    n = IntField(required=True)
+    data = BinaryField(required=True)
 
     # System Fields
     created = DateTimeField(null=True)
@@ -909,6 +1046,38 @@ class FrameworkScannerMapping(Document):
     # Soft Delete
     isdeleted = BooleanField(default=False, null=True)
 
+class ProjectSammCoverage(Document):
+    meta = {
+        'collection': 'ProjectSammCoverage',
+        'strict': False
+    }
+    # pk, fk
+    project_id = StringField(required=True, primary_key=True)
+
+    # Business Fields: SAMM practices with their finding counts, see utility/compliance/samm_coverage.py
+    practices = ListField(DictField())
+
+    # System Fields
+    computed = DateTimeField(null=True)
+    version = StringField(null=True)  # set when a computation starts, only that computation stores the coverage
+
+
+class ProjectComplianceSummary(Document):
+    meta = {
+        'collection': 'ProjectComplianceSummary',
+        'strict': False
+    }
+    # pk, fk
+    project_id = StringField(required=True, primary_key=True)
+
+    # Business Fields: compliance summary of the project, see utility/compliance/compliance_summary.py
+    summary = ListField(DictField())
+
+    # System Fields
+    computed = DateTimeField(null=True)
+    version = StringField(null=True)  # set when a computation starts, only that computation stores the summary
+
+
 class ManualComplianceEvaluation(Document):
     meta = {
         'collection': 'ManualComplianceEvaluation',
@@ -939,7 +1108,7 @@ class FindingSBOMVulnerability(SoftDeleteNoCacheDocument, Document):
     meta = {
         'collection': 'FindingSBOMVulnerability',
         'soft_delete': {'isdeleted': True},
-        'indexes': ['vulnerabilityid'],
+        'indexes': ['vulnerabilityid', ('project_id', 'target_id')],
         'strict': False
     }
 
@@ -967,6 +1136,10 @@ class FindingSBOMVulnerability(SoftDeleteNoCacheDocument, Document):
     vendor_severity = DictField(null=True)
     references = StringField(null=True)
 
+    # When the entry was first reported for the target and when a later scan no longer reported it
+    first_seen = DateTimeField(null=True)
+    removed_at = DateTimeField(null=True)
+
     # System Fields
     created = DateTimeField(required=True)
     updated = DateTimeField(null=True)
@@ -981,7 +1154,7 @@ class FindingLicense(SoftDeleteNoCacheDocument, Document):
     meta = {
         'collection': 'FindingLicense',
         'soft_delete': {'isdeleted': True},
-        'indexes': ['pkg_name'],
+        'indexes': ['pkg_name', ('project_id', '-created')],
         'strict': False
     }
 
@@ -1001,6 +1174,10 @@ class FindingLicense(SoftDeleteNoCacheDocument, Document):
     text = StringField(null=True)
     link = StringField(null=True)
 
+    # When the entry was first reported for the target and when a later scan no longer reported it
+    first_seen = DateTimeField(null=True)
+    removed_at = DateTimeField(null=True)
+
     # System Fields
     created = DateTimeField(required=True)
     updated = DateTimeField(null=True)
@@ -1011,6 +1188,30 @@ class FindingLicense(SoftDeleteNoCacheDocument, Document):
     # this field must also be reported in the `meta['soft_delete']` dict
     isdeleted = BooleanField(default=False, null=True)
 
+class LlmResponseCache(Document):
+    meta = {
+        'collection': 'LlmResponseCache',
+        'indexes': [
+            'last_used',
+            {'fields': ['expires_at'], 'expireAfterSeconds': 0}
+        ],
+        'strict': False
+    }
+    # pk: hash of the prompt version, the model and the normalized scanner output
+    cache_key = StringField(required=True, primary_key=True)
+
+    # Business Fields
+    prompt_version = StringField(required=True)
+    model = StringField(required=True)
+    response = StringField(required=True)
+    hits = IntField(default=0)
+    last_used = DateTimeField(null=True)
+    expires_at = DateTimeField(null=True)
+
+    # System Fields
+    created = DateTimeField(null=True)
+
+
 class VaptReport(SoftDeleteNoCacheDocument, Document):
     meta = {
         'collection': 'VaptReport',
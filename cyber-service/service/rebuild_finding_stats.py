@@ -0,0 +1,29 @@
+# rebuild_finding_stats.py
+#
+# Recounts the ProjectFindingStats counters from the FindingMaster collection.
+# The counters are updated as findings are written; run this once after
+# deploying them and whenever they drifted, e.g. after findings were changed
+# directly in the database:
+#
+#     python -m rebuild_finding_stats [--project-id <project_id>]
+
+import argparse
+from config_params import *
+from mongoengine import register_connection
+from controllers.utility.findings.finding_stats import rebuild_finding_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the per project finding counters")
+    parser.add_argument("--project-id", default=None,
+                        help="Only rebuild the counters of this project")
+    args = parser.parse_args()
+
+    register_connection(alias='default', name=DATABASE_NAME, host=DATABASE_CONNECTION_STRING)
+
+    rebuilt = rebuild_finding_stats(args.project_id)
+    print(f"Rebuilt {rebuilt} finding stats documents.")
+
+
+if __name__ == "__main__":
+    main()
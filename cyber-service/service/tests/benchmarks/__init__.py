@@ -0,0 +1,3 @@
+"""
+Benchmarks for CyberSecurity Service hot paths, run as modules, not collected by pytest
+"""
@@ -0,0 +1,91 @@
+"""
+Compares the to_json() round trip used by the controllers with the raw
+pymongo reads of controllers/utility/db/lean_queries.py.
+
+Run from the service directory:
+    python -m tests.benchmarks.bench_lean_queries
+
+Uses mongomock unless BENCHMARK_MONGO_URI points at a real MongoDB, in which
+case a throwaway `bench_lean_queries` database is created and dropped.
+"""
+
+import os
+import sys
+import json
+import timeit
+from datetime import datetime, timezone
+
+import mongomock
+from mongoengine import connect, disconnect
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from entities.CyberServiceEntity import Domain, Repository, ScannerTypes, Scanners
+from controllers.utility.db.lean_queries import find_documents
+
+BENCHMARK_MONGO_URI = os.getenv('BENCHMARK_MONGO_URI')
+PROJECTS = 50
+SCANNER_TYPES = 200
+ROUNDS = 200
+
+
+def seed():
+    now = datetime.now(timezone.utc)
+    for index in range(PROJECTS):
+        Domain(target_domain_id=f'domain-{index}', project_id=f'project-{index}',
+               domain_url=f'https://{index}.example.com', created=now, creator='bench').save()
+        Repository(target_repository_id=f'repo-{index}', project_id=f'project-{index}',
+                   repository_url=f'https://github.com/acme/app-{index}', repository_provider='github',
+                   access_token='token', created=now, creator='bench').save()
+    Scanners(scanner_id='scanner-1', name='Trivy', created=now, creator='bench').save()
+    for index in range(SCANNER_TYPES):
+        ScannerTypes(scan_type_id=f'scan-type-{index}', scanner_ids=['scanner-1'], scan_type=f'Scan type {index}',
+                     description='x' * 500, created=now, creator='bench').save()
+
+
+def targets_to_json(project_id):
+    domain_data = json.loads(Domain.objects(project_id=project_id).to_json())
+    repo_data = json.loads(Repository.objects(project_id=project_id).to_json())
+    return domain_data[0]['domain_url'], repo_data[0]['repository_url']
+
+
+def targets_lean(project_id):
+    domain_data = find_documents(Domain, {'project_id': project_id}, ['domain_url'], limit=1)
+    repo_data = find_documents(Repository, {'project_id': project_id}, ['repository_url'], limit=1)
+    return domain_data[0]['domain_url'], repo_data[0]['repository_url']
+
+
+def scanner_types_to_json():
+    return [(scanner_type['_id'], scanner_type['scan_type'])
+            for scanner_type in json.loads(ScannerTypes.objects(scanner_ids='scanner-1').to_json())]
+
+
+def scanner_types_lean():
+    return [(scanner_type['_id'], scanner_type['scan_type'])
+            for scanner_type in find_documents(ScannerTypes, {'scanner_ids': 'scanner-1'}, ['scan_type'])]
+
+
+def measure(name, current, lean):
+    assert current() == lean()
+    current_time = min(timeit.repeat(current, number=ROUNDS, repeat=3)) / ROUNDS
+    lean_time = min(timeit.repeat(lean, number=ROUNDS, repeat=3)) / ROUNDS
+    print(f"{name:<28} to_json {current_time * 1000:8.3f} ms   lean {lean_time * 1000:8.3f} ms   {current_time / lean_time:5.1f}x")
+
+
+def main():
+    disconnect()
+    if BENCHMARK_MONGO_URI:
+        connection = connect('bench_lean_queries', host=BENCHMARK_MONGO_URI)
+    else:
+        connection = connect('bench_lean_queries', host='localhost', mongo_client_class=mongomock.MongoClient)
+    try:
+        seed()
+        measure('scan targets of a project', lambda: targets_to_json('project-25'), lambda: targets_lean('project-25'))
+        measure(f'{SCANNER_TYPES} scanner types', scanner_types_to_json, scanner_types_lean)
+    finally:
+        connection.drop_database('bench_lean_queries')
+        disconnect()
+
+
+if __name__ == '__main__':
+    main()
@@ -69,6 +69,11 @@ def mock_db():
     
     # Create mock connection with proper mongo_client_class
     connect('mongoenginetest', host='localhost', mongo_client_class=mongomock.MongoClient)
+    # The scan type catalog cached in-process belongs to the previous database
+    from controllers.utility.ScanTypeResolver import invalidateScanTypeCache
+    from controllers.utility.findings.finding_page import clear_finding_count_cache
+    invalidateScanTypeCache()
+    clear_finding_count_cache()
     
     yield
     
@@ -190,6 +195,32 @@ def sample_finding_data():
     }
 
 
+@pytest.fixture
+def make_finding():
+    """Factory of valid FindingMaster documents, keyword arguments override the defaults."""
+    import uuid
+    from datetime import datetime, timezone
+    from entities.CyberServiceEntity import FindingMaster
+
+    def make(**fields):
+        return FindingMaster(**{
+            'finding_id': str(uuid.uuid4()),
+            'project_id': 'project-1',
+            'target_id': 'target-1',
+            'target_type': 'repo',
+            'scan_type_id': 'scan-type-1',
+            'finding_name': 'finding',
+            'finding_desc': 'desc',
+            'severity': 'high',
+            'status': 'open',
+            'raw_scan_output_id': 'raw-1',
+            'created': datetime.now(timezone.utc),
+            'creator': 'test-user',
+            **fields
+        })
+    return make
+
+
 @pytest.fixture
 def sample_compliance_data():
     """Sample compliance data for testing."""
@@ -0,0 +1,123 @@
+"""
+Tests for the FindingMasterController findings listing
+"""
+
+import csv
+import gzip
+import json
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+from tests.unit.controllers.controller_test_base import ControllerTestBase
+from controllers.FindingMasterController import FindingMasterController
+from entities.CyberServiceEntity import FindingMaster, Domain, FixRecommendations, DomainZap1
+
+
+@pytest.mark.usefixtures('mock_db')
+class TestFindingMasterListing(ControllerTestBase):
+
+    @pytest.fixture(autouse=True)
+    def jwt(self):
+        with patch('controllers.FindingMasterController.verify_jwt_in_request'), \
+                patch('controllers.FindingMasterController.get_jwt_identity', return_value='test-user'), \
+                patch('controllers.FindingMasterController.get_jwt', return_value={'role': 'admin'}):
+            yield
+
+    @pytest.fixture
+    def controller(self):
+        return FindingMasterController()
+
+    @pytest.fixture
+    def findings(self):
+        Domain(target_domain_id='domain-1', project_id='project-1', domain_url='https://example.com').save()
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        # Two findings share a date, one has none
+        dates = [start, start + timedelta(days=1), start + timedelta(days=1), start + timedelta(days=2), None, start + timedelta(days=3)]
+        for index, finding_date in enumerate(dates):
+            FindingMaster(
+                finding_id=f'finding-{index}',
+                project_id='project-1',
+                target_id='domain-1',
+                scan_type_id='scan-type-1',
+                finding_name=f'Finding {index}',
+                finding_desc='desc',
+                finding_date=finding_date,
+                severity='high',
+                status='open',
+                raw_scan_output_id='raw-1',
+                created=start,
+                creator='test-user'
+            ).save()
+        FindingMaster.objects.get(finding_id='finding-5').soft_delete()
+
+    def fetch(self, controller, **args):
+        with self.app.test_request_context('/', query_string=args):
+            return controller.fetch_by_project_id({'project_id': 'project-1'})
+
+    @pytest.mark.parametrize('order_direction', ['desc', 'asc'])
+    def test_cursor_pages_match_offset_order(self, controller, findings, order_direction):
+        response, _ = self.fetch(controller, limit=10, orderDirection=order_direction)
+        expected = [finding['_id'] for finding in response['data']]
+
+        seen = []
+        cursor = ''
+        while cursor is not None:
+            response, status = self.fetch(controller, limit=2, cursor=cursor, orderDirection=order_direction)
+            assert status == '200 Ok'
+            assert response['pagination']['total'] == 5
+            seen += [finding['_id'] for finding in response['data']]
+            cursor = response['pagination']['next_cursor']
+
+        assert seen == expected
+        assert len(seen) == 5
+
+    def test_page_is_joined_with_target_details(self, controller, findings):
+        response, _ = self.fetch(controller, limit=2, cursor='')
+
+        assert [finding['_id'] for finding in response['data']] == ['finding-3', 'finding-2']
+        assert response['data'][0]['target_details']['domain_url'] == 'https://example.com'
+        assert response['pagination']['has_more'] is True
+
+    def test_rejects_foreign_cursor(self, controller, findings):
+        response, _ = self.fetch(controller, limit=2, cursor='')
+        cursor = response['pagination']['next_cursor']
+
+        assert self.fetch(controller, limit=2, cursor=cursor, orderBy='severity')[1] == '400 Bad Request'
+        assert self.fetch(controller, limit=2, cursor='not-a-cursor')[1] == '400 Bad Request'
+
+    def export(self, controller, headers=None, **args):
+        """Returns the export response and its body, read while the request is still active."""
+        with self.app.test_request_context('/', query_string=args, headers=headers or {}):
+            response = controller.export_by_project_id('project-1')
+            return response, b''.join(response.response)
+
+    def test_export_streams_joined_findings_in_batches(self, controller, findings):
+        FixRecommendations(fix_recommendation_id='fix-1', scanner_fix='Upgrade').save()
+        DomainZap1(domain_zap_1_id='zap-1').save()
+        FindingMaster.objects(finding_id='finding-0').update(set__fix_recommendation_id='fix-1',
+                                                             set__extended_finding_details_name='DomainZap1',
+                                                             set__extended_finding_details_id='zap-1')
+
+        with patch('controllers.utility.findings.finding_export.FINDINGS_EXPORT_BATCH_SIZE', 2):
+            response, body = self.export(controller)
+
+        assert response.mimetype == 'application/x-ndjson'
+        exported = [json.loads(line) for line in body.decode('utf-8').splitlines()]
+        assert [finding['_id'] for finding in exported] == ['finding-0', 'finding-1', 'finding-2', 'finding-3', 'finding-4']
+        assert exported[0]['target_details']['domain_url'] == 'https://example.com'
+        assert exported[0]['fix_recommendation_details']['scanner_fix'] == 'Upgrade'
+        assert exported[0]['extended_details']['_id'] == 'zap-1'
+        assert exported[1]['fix_recommendation_details'] is None
+        assert exported[0]['created'] == '2024-01-01T00:00:00'
+
+    def test_export_csv_is_gzip_encoded_when_accepted(self, controller, findings):
+        response, body = self.export(controller, headers={'Accept-Encoding': 'gzip'}, format='csv', severity='high')
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        rows = list(csv.DictReader(gzip.decompress(body).decode('utf-8').splitlines()))
+        assert len(rows) == 5
+        assert rows[0]['target'] == 'https://example.com'
+
+    def test_export_rejects_unknown_format(self, controller):
+        with self.app.test_request_context('/', query_string={'format': 'xml'}):
+            assert controller.export_by_project_id('project-1')[1] == '400 Bad Request'
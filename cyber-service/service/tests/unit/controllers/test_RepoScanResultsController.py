@@ -0,0 +1,70 @@
+"""
+Tests for the RepoScanResultsController licenses and SBOM listing
+"""
+
+import pytest
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+from tests.unit.controllers.controller_test_base import ControllerTestBase
+from controllers.RepoScanResultsController import RepoScanResultsController
+from entities.CyberServiceEntity import FindingLicense
+
+
+@pytest.mark.usefixtures('mock_db')
+class TestLicensesAndSbom(ControllerTestBase):
+
+    @pytest.fixture(autouse=True)
+    def jwt(self):
+        with patch('controllers.RepoScanResultsController.verify_jwt_in_request'):
+            yield
+
+    @pytest.fixture
+    def controller(self):
+        return RepoScanResultsController()
+
+    @pytest.fixture
+    def licenses(self):
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        rows = [('MIT', 'LOW', 'express'), ('MIT', 'low', 'lodash'), ('GPL-3.0', 'HIGH', 'readline'),
+                (None, None, 'lodash'), ('Apache-2.0', 'SEVERE', None)]
+        for index, (name, severity, pkg_name) in enumerate(rows):
+            FindingLicense(license_id=f'license-{index}', project_id='project-1', name=name, severity=severity,
+                           pkg_name=pkg_name, created=start + timedelta(days=index), creator='test-user').save()
+        FindingLicense(license_id='other-project', project_id='project-2', name='MIT', severity='LOW',
+                       pkg_name='express', created=start, creator='test-user').save()
+
+    def fetch(self, controller, **args):
+        with self.app.test_request_context('/', query_string=args):
+            from flask import request
+            return controller.fetch_licenses_and_sbom(request, {'project_id': 'project-1'})
+
+    def test_statistics_cover_every_page(self, controller, licenses):
+        response, status = self.fetch(controller, page=2, limit=2)
+
+        assert status == '200 Ok'
+        data = response['data']
+        assert [finding['_id'] for finding in data['findings']] == ['license-2', 'license-1']
+        assert data['pagination'] == {'page': 2, 'limit': 2, 'total': 5, 'total_pages': 3}
+        assert data['license_stats'] == {'MIT': 2, 'GPL-3.0': 1, 'NOASSERTION': 1, 'Apache-2.0': 1}
+        assert data['severity_stats'] == {'LOW': 2, 'MEDIUM': 0, 'HIGH': 1, 'CRITICAL': 0, 'UNKNOWN': 0}
+        assert data['package_stats'] == {'express': 1, 'lodash': 2, 'readline': 1, 'NOASSERTION': 1}
+        assert data['summary_stats']['total_findings'] == 5
+        assert data['summary_stats']['unique_package_count'] == 4
+        assert data['summary_stats']['no_assertion_count'] == 1
+        # Missing and unexpected severities
+        assert data['summary_stats']['unknown_severity_count'] == 2
+
+    def test_filters_and_sort_apply_to_the_page(self, controller, licenses):
+        response, status = self.fetch(controller, severity='LOW', sort_by='pkg_name', sort_order='asc')
+
+        data = response['data']
+        assert [finding['_id'] for finding in data['findings']] == ['license-0', 'license-1']
+        assert data['pagination'] == {'page': 1, 'limit': 10, 'total': 2, 'total_pages': 1}
+        assert data['summary_stats']['total_findings'] == 5
+
+        response, status = self.fetch(controller, name='NOASSERTION,GPL-3.0', sort_by='name', sort_order='desc')
+        assert [finding['_id'] for finding in response['data']['findings']] == ['license-2', 'license-3']
+
+    def test_project_without_licenses(self, controller):
+        response, status = self.fetch(controller)
+        assert response == {'error': 'No records found for the provided project_id'}
@@ -3,9 +3,11 @@ Minimal working tests for ScansController
 """
 
 import pytest
+import json
 from unittest.mock import Mock, patch
 from tests.unit.controllers.controller_test_base import ControllerTestBase
 from controllers.ScansController import ScansController
+from controllers.utility.git.incremental_scan import SCAN_MODE_RANGE, SCAN_MODE_SKIP
 
 
 class TestScansController(ControllerTestBase):
@@ -35,3 +37,83 @@ class TestScansController(ControllerTestBase):
         
         # At least one method should exist
         assert len(existing_methods) >= 1
+
+    @pytest.mark.usefixtures('mock_db')
+    @patch('controllers.ScansController.run_trivy_combined_scan')
+    def test_run_trivy_fans_out_single_report(self, mock_trivy_scan, controller):
+        """One Trivy report feeds the findings, SBOM vulnerabilities and licenses."""
+        from entities.CyberServiceEntity import FindingMaster, FindingSBOMVulnerability, FindingLicense, RawScanOutput
+        vulnerability = {
+            'VulnerabilityID': 'CVE-2024-0001', 'PkgID': 'flask@2.2.2', 'PkgName': 'flask',
+            'PkgIdentifier': {'PURL': 'pkg:pypi/flask@2.2.2'}, 'InstalledVersion': '2.2.2',
+            'Status': 'affected', 'SeveritySource': 'ghsa', 'PrimaryURL': 'https://example.com',
+            'DataSource': {'ID': 'ghsa'}, 'Title': 'Flask issue', 'Severity': 'HIGH',
+            'Description': 'desc', 'VendorSeverity': {'ghsa': 3}, 'References': [],
+        }
+        report = {'Results': [
+            {'Target': 'requirements.txt', 'Type': 'pip', 'Vulnerabilities': [
+                dict(vulnerability, FixedVersion='2.3.0'),
+                dict(vulnerability, VulnerabilityID='CVE-2024-0002', Title='Unfixed issue'),
+            ]},
+            {'Target': 'LICENSE', 'Class': 'license-file', 'Licenses': [
+                {'Severity': 'LOW', 'Category': 'notice', 'PkgName': '', 'FilePath': 'LICENSE',
+                 'Name': 'MIT', 'Text': '', 'Link': ''},
+            ]},
+        ]}
+        mock_trivy_scan.return_value = (json.dumps(report), report)
+
+        result = controller.run_trivy('project-1', 'scan-1', 'target-1', '/tmp/repo', 'test-user-id', 'trivy-id', None, False)
+
+        assert result == ("Trivy scan completed and results saved.", "200 OK")
+        mock_trivy_scan.assert_called_once()
+        assert RawScanOutput.objects(scan_id='scan-1').count() == 1
+        assert [finding.finding_name for finding in FindingMaster.objects(project_id='project-1')] == ['Flask issue']
+        assert FindingSBOMVulnerability.objects(project_id='project-1').count() == 2
+        assert FindingLicense.objects(project_id='project-1').count() == 1
+
+    @pytest.mark.usefixtures('mock_db')
+    def test_build_scan_context_reads_live_targets(self, controller):
+        """The scan context only uses the scanners and targets that are not deleted."""
+        from datetime import datetime, timezone
+        from entities.CyberServiceEntity import ScannerTypes, Scanners, Domain, Repository
+        now = datetime.now(timezone.utc)
+        ScannerTypes(scan_type_id='secrets', scanner_ids=['gitleaks-id'], scan_type='Secrets Detection', description='', created=now).save()
+        Scanners(scanner_id='gitleaks-id', name='Gitleaks', created=now).save()
+        Domain(target_domain_id='domain-old', project_id='project-1', domain_url='https://old.example.com', created=now).save().soft_delete()
+        Domain(target_domain_id='domain-1', project_id='project-1', domain_url='https://example.com', created=now).save()
+        Repository(target_repository_id='repo-1', project_id='project-1', repository_url='https://github.com/acme/app',
+                   repository_provider='github', is_private_repo=True, access_token='token', created=now).save()
+
+        scan_context, error = controller.build_scan_context('project-1', ['secrets'])
+
+        assert error is None
+        assert scan_context['unique_scanner_names_list'] == ['Gitleaks']
+        assert scan_context['matching_scanners'] == [{'_id': 'gitleaks-id', 'name': 'Gitleaks'}]
+        assert (scan_context['domain_target_id'], scan_context['domain_url']) == ('domain-1', 'https://example.com')
+        assert (scan_context['repo_target_id'], scan_context['repo_url']) == ('repo-1', 'https://github.com/acme/app')
+        assert scan_context['is_private_repo'] is True
+        assert scan_context['azure_cloud_data'] == []
+
+    def test_scanner_error_detects_every_error_shape(self, controller):
+        assert controller.scanner_error({'error': 'Trivy execution failed'}) == 'Trivy execution failed'
+        assert controller.scanner_error(({'error': 'Unexpected error'}, '500 Internal Server Error')) == 'Unexpected error'
+        assert controller.scanner_error((None, 'Failed to store Trivy results')) == 'Failed to store Trivy results'
+        assert controller.scanner_error(("Trivy scan completed and results saved.", "200 OK")) is None
+        assert controller.scanner_error(None) is None
+
+    def test_failed_range_scan_does_not_record_the_commit_or_link_findings(self, controller, tmp_path):
+        plan = {'Gitleaks': (SCAN_MODE_RANGE, 'old-sha'), 'Trivy': (SCAN_MODE_SKIP, 'old-sha')}
+        with patch('controllers.ScansController.last_scanned_commits', return_value={'Gitleaks': Mock(), 'Trivy': Mock()}), \
+                patch.object(controller, 'clone_github_repo', return_value=(str(tmp_path), '')), \
+                patch('controllers.ScansController.head_commit', return_value='new-sha'), \
+                patch('controllers.ScansController.plan_incremental_scan', return_value=plan), \
+                patch.object(controller, 'run_gitleaks', return_value={'error': 'Gitleaks execution failed'}), \
+                patch('controllers.ScansController.link_findings_forward') as link_findings_forward, \
+                patch('controllers.ScansController.Scans'), \
+                patch('controllers.ScansController.record_scanned_commit') as record_scanned_commit:
+            result = controller.run_scan('project-1', 'scan-1', None, None, 'repo-1', 'https://github.com/acme/app', None,
+                                         None, None, ['Gitleaks', 'Trivy'], [], 'test-user-id', False, [], None, [], None, 'github')
+
+        assert result == ({'error': 'Gitleaks execution failed'}, 500)
+        assert [call.args[2] for call in record_scanned_commit.call_args_list] == ['Trivy']
+        assert [call.args[2] for call in link_findings_forward.call_args_list] == ['Trivy']
@@ -7,11 +7,7 @@ from unittest.mock import Mock, patch, MagicMock
 import json
 from bson import ObjectId
 
-from controllers.utility.FindDuplicateFindingAndLink import (
-    findDuplicateFindingAndLink,
-    findDuplicateFindingAndLinkForLanguages,
-    findDuplicateFindingAndLinkForSmartContract
-)
+from controllers.utility.FindDuplicateFindingAndLink import findDuplicateFindingAndLinkForLanguages
 
 
 class TestFindDuplicateFindingAndLink:
@@ -381,4 +377,5 @@ class TestFindDuplicateFindingAndLink:
             finding1, finding2 = pair
             assert finding1['scanner_type'] != finding2['scanner_type']
             assert finding1['title'] == finding2['title']
-            assert finding1['location'] == finding2['location']
\ No newline at end of file
+            assert finding1['location'] == finding2['location']
+
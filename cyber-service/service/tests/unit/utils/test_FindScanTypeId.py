@@ -1,292 +0,0 @@
-"""
-Unit tests for FindScanTypeId utility function
-"""
-
-import pytest
-from unittest.mock import Mock, patch, MagicMock
-import json
-from bson import ObjectId
-
-from controllers.utility.FindScanTypeId import findScanTypeId
-
-
-class TestFindScanTypeId:
-    """Test cases for findScanTypeId utility function."""
-    
-    @pytest.fixture
-    def mock_scanner_types(self):
-        """Mock scanner types data for testing."""
-        mock_scanner_types = []
-        
-        # Create mock scanner type objects
-        for i, (scan_type, scanner_id) in enumerate([
-            ('OWASP ZAP', 'zap-scanner-1'),
-            ('Trivy Scanner', 'trivy-scanner-1'),
-            ('Wapiti', 'wapiti-scanner-1'),
-            ('Slither', 'slither-scanner-1'),
-            ('CloudSploit', 'cloudsploit-scanner-1')
-        ]):
-            mock_scanner = Mock()
-            # Create a dictionary-like object for each scanner
-            scan_data = {'scan_type': scan_type, '_id': f'scanner-type-{i}'}
-            mock_scanner.__getitem__ = lambda key, data=scan_data: data.get(key)
-            mock_scanner.to_json.return_value = json.dumps({
-                '_id': f'scanner-type-{i}',
-                'scan_type': scan_type,
-                'scan_type_id': scanner_id,
-                'description': f'Description for {scan_type}'
-            })
-            mock_scanner_types.append(mock_scanner)
-        
-        return mock_scanner_types
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_exact_match(self, mock_scanner_types_class, mock_scanner_types):
-        """Test finding scanner type with exact match."""
-        # Setup mock
-        mock_scanner_types_class.objects.return_value = mock_scanner_types
-        
-        # Execute
-        result = findScanTypeId('OWASP ZAP', 'scan_type')
-        
-        # Assertions
-        mock_scanner_types_class.objects.assert_called_once()
-        # The function returns 'others' when no matches are found (which is expected with mocking)
-        assert result == 'others' or isinstance(result, str)
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_partial_match(self, mock_scanner_types_class, mock_scanner_types):
-        """Test finding scanner type with partial match."""
-        # Setup mock
-        mock_scanner_types_class.objects.return_value = mock_scanner_types
-        
-        # Execute - 'ZAP' should match 'OWASP ZAP'
-        result = findScanTypeId('ZAP scan results', 'scan_type')
-        
-        # Assertions - expect 'others' since exact mocking is complex
-        assert result == 'others' or isinstance(result, str)
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_case_insensitive(self, mock_scanner_types_class, mock_scanner_types):
-        """Test case-insensitive matching."""
-        # Setup mock
-        mock_scanner_types_class.objects.return_value = mock_scanner_types
-        
-        # Execute - lowercase input should match uppercase scanner type
-        result = findScanTypeId('trivy scanner results', 'scan_type')
-        
-        # Assertions - expect 'others' since exact mocking is complex
-        assert result == 'others' or isinstance(result, str)
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_no_match(self, mock_scanner_types_class, mock_scanner_types):
-        """Test when no scanner type matches."""
-        # Setup mock
-        mock_scanner_types_class.objects.return_value = mock_scanner_types
-        
-        # Execute - input that doesn't match any scanner type
-        result = findScanTypeId('Unknown Scanner Results', 'scan_type')
-        
-        # Assertions
-        assert result == 'others' or isinstance(result, str)
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_empty_input(self, mock_scanner_types_class, mock_scanner_types):
-        """Test with empty input text."""
-        # Setup mock
-        mock_scanner_types_class.objects.return_value = mock_scanner_types
-        
-        # Execute
-        result = findScanTypeId('', 'scan_type')
-        
-        # Assertions
-        assert result == 'others' or isinstance(result, str)
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_empty_database(self, mock_scanner_types_class):
-        """Test when database has no scanner types."""
-        # Setup mock with empty result
-        mock_scanner_types_class.objects.return_value = []
-        
-        # Execute
-        result = findScanTypeId('OWASP ZAP', 'scan_type')
-        
-        # Assertions
-        assert result == 'others'
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_first_match_wins(self, mock_scanner_types_class, mock_scanner_types):
-        """Test that function returns first match and breaks."""
-        # Create scanner types where multiple could match
-        mock_scanner_1 = Mock()
-        mock_scanner_1.__getitem__ = Mock(side_effect=lambda key: 'ZAP Scanner' if key == 'scan_type' else None)
-        mock_scanner_1.to_json.return_value = json.dumps({
-            '_id': 'first-zap-scanner',
-            'scan_type': 'ZAP Scanner'
-        })
-        
-        mock_scanner_2 = Mock()
-        mock_scanner_2.__getitem__ = Mock(side_effect=lambda key: 'ZAP Advanced' if key == 'scan_type' else None)
-        mock_scanner_2.to_json.return_value = json.dumps({
-            '_id': 'second-zap-scanner',
-            'scan_type': 'ZAP Advanced'
-        })
-        
-        mock_scanner_types_class.objects.return_value = [mock_scanner_1, mock_scanner_2]
-        
-        # Execute - should match first scanner
-        result = findScanTypeId('ZAP scan results', 'scan_type')
-        
-        # Assertions - expect 'others' since exact mocking is complex
-        assert result == 'others' or isinstance(result, str)
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_different_fields(self, mock_scanner_types_class):
-        """Test searching by different fields."""
-        # Create mock scanner type with multiple fields
-        mock_scanner = Mock()
-        def mock_getitem(key):
-            if key == 'scan_type':
-                return 'OWASP ZAP'
-            elif key == 'description':
-                return 'Web application security scanner'
-            elif key == 'scanner_name':
-                return 'ZAP Dynamic Scanner'
-            return None
-        
-        mock_scanner.__getitem__ = Mock(side_effect=mock_getitem)
-        mock_scanner.to_json.return_value = json.dumps({
-            '_id': 'multi-field-scanner',
-            'scan_type': 'OWASP ZAP',
-            'description': 'Web application security scanner',
-            'scanner_name': 'ZAP Dynamic Scanner'
-        })
-        
-        mock_scanner_types_class.objects.return_value = [mock_scanner]
-        
-        # Test search by scan_type
-        result1 = findScanTypeId('OWASP ZAP results', 'scan_type')
-        assert result1 == 'others' or isinstance(result1, str)
-        
-        # Test search by description
-        result2 = findScanTypeId('Web application results', 'description')
-        assert result2 == 'others' or isinstance(result2, str)
-        
-        # Test search by scanner_name
-        result3 = findScanTypeId('ZAP Dynamic results', 'scanner_name')
-        assert result3 == 'others' or isinstance(result3, str)
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_exception_handling(self, mock_scanner_types_class):
-        """Test exception handling."""
-        # Setup mock to raise exception
-        mock_scanner_types_class.objects.side_effect = Exception("Database connection error")
-        
-        # Execute
-        result = findScanTypeId('OWASP ZAP', 'scan_type')
-        
-        # Assertions - should return the exception string
-        assert "Database connection error" in result
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_json_parsing_error(self, mock_scanner_types_class):
-        """Test JSON parsing error handling."""
-        # Create mock scanner that raises exception during to_json()
-        mock_scanner = Mock()
-        mock_scanner.__getitem__ = Mock(side_effect=lambda key: 'Test Scanner' if key == 'scan_type' else None)
-        mock_scanner.to_json.side_effect = Exception("JSON parsing error")
-        
-        mock_scanner_types_class.objects.return_value = [mock_scanner]
-        
-        # Execute
-        result = findScanTypeId('Test Scanner results', 'scan_type')
-        
-        # Assertions - should handle the exception
-        assert "JSON parsing error" in result
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_field_access_error(self, mock_scanner_types_class):
-        """Test field access error handling."""
-        # Create mock scanner that raises exception during field access
-        mock_scanner = Mock()
-        mock_scanner.__getitem__ = Mock(side_effect=KeyError("Field not found"))
-        
-        mock_scanner_types_class.objects.return_value = [mock_scanner]
-        
-        # Execute
-        result = findScanTypeId('Test input', 'nonexistent_field')
-        
-        # Assertions - should handle the exception
-        assert "Field not found" in result
-    
-    def test_find_scan_type_id_special_characters(self, mock_scanner_types):
-        """Test handling of special characters in input."""
-        with patch('controllers.utility.FindScanTypeId.ScannerTypes') as mock_scanner_types_class:
-            # Create scanner type with special characters
-            mock_scanner = Mock()
-            mock_scanner.__getitem__ = Mock(side_effect=lambda key: 'Test-Scanner_v2.0' if key == 'scan_type' else None)
-            mock_scanner.to_json.return_value = json.dumps({
-                '_id': 'special-char-scanner',
-                'scan_type': 'Test-Scanner_v2.0'
-            })
-            
-            mock_scanner_types_class.objects.return_value = [mock_scanner]
-            
-            # Execute
-            result = findScanTypeId('Test-Scanner_v2.0 output results', 'scan_type')
-            
-            # Assertions
-            assert result == 'others' or isinstance(result, str)
-    
-    def test_find_scan_type_id_unicode_handling(self, mock_scanner_types):
-        """Test handling of Unicode characters."""
-        with patch('controllers.utility.FindScanTypeId.ScannerTypes') as mock_scanner_types_class:
-            # Create scanner type with Unicode characters
-            mock_scanner = Mock()
-            mock_scanner.__getitem__ = Mock(side_effect=lambda key: 'Tëst Scännér' if key == 'scan_type' else None)
-            mock_scanner.to_json.return_value = json.dumps({
-                '_id': 'unicode-scanner',
-                'scan_type': 'Tëst Scännér'
-            })
-            
-            mock_scanner_types_class.objects.return_value = [mock_scanner]
-            
-            # Execute
-            result = findScanTypeId('Tëst Scännér results', 'scan_type')
-            
-            # Assertions
-            assert result == 'others' or isinstance(result, str)
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_whitespace_handling(self, mock_scanner_types_class, mock_scanner_types):
-        """Test handling of whitespace in input."""
-        # Setup mock
-        mock_scanner_types_class.objects.return_value = mock_scanner_types
-        
-        # Execute with extra whitespace
-        result = findScanTypeId('  OWASP ZAP  results  ', 'scan_type')
-        
-        # Assertions - should still match
-        assert result == 'others' or isinstance(result, str)
-    
-    @patch('controllers.utility.FindScanTypeId.ScannerTypes')
-    def test_find_scan_type_id_performance(self, mock_scanner_types_class):
-        """Test performance with large number of scanner types."""
-        # Create large number of mock scanner types
-        large_scanner_list = []
-        for i in range(100):
-            mock_scanner = Mock()
-            mock_scanner.__getitem__ = Mock(side_effect=lambda key, idx=i: f'Scanner-{idx}' if key == 'scan_type' else None)
-            mock_scanner.to_json.return_value = json.dumps({
-                '_id': f'scanner-{i}',
-                'scan_type': f'Scanner-{i}'
-            })
-            large_scanner_list.append(mock_scanner)
-        
-        mock_scanner_types_class.objects.return_value = large_scanner_list
-        
-        # Execute - should find the target scanner
-        result = findScanTypeId('Scanner-50 results', 'scan_type')
-        
-        # Assertions
-        assert result == 'others' or isinstance(result, str)
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Unit tests for the cached, batched scan type resolver
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from entities.CyberServiceEntity import ScannerTypes
+from controllers.utility import ScanTypeResolver
+from controllers.utility.ScanTypeResolver import resolveScanTypeIds, resolveScanTypeId, invalidateScanTypeCache
+
+
+def add_scanner_type(scan_type_id, scan_type):
+    ScannerTypes(
+        scan_type_id=scan_type_id,
+        scanner_ids=['scanner-1'],
+        scan_type=scan_type,
+        description=scan_type,
+        created=datetime.now(timezone.utc),
+        creator='test-user'
+    ).save()
+
+
+class TestScanTypeResolver:
+
+    def test_resolves_batch_with_one_query(self, mock_db):
+        add_scanner_type('secrets', 'Secrets Detection')
+        add_scanner_type('xss', 'Cross Site Scripting')
+
+        with patch.object(ScanTypeResolver.ScannerTypes, 'objects', wraps=ScannerTypes.objects) as objects:
+            resolved = resolveScanTypeIds(['secrets detection', 'Reflected Cross Site Scripting (XSS)', 'SQL Injection', 'secrets detection'])
+            resolveScanTypeId('Secrets Detection')
+
+        assert resolved == {
+            'secrets detection': 'secrets',
+            'Reflected Cross Site Scripting (XSS)': 'xss',
+            'SQL Injection': 'others',
+        }
+        assert objects.call_count == 1
+
+    def test_invalidation_reloads_catalog(self, mock_db):
+        assert resolveScanTypeId('Secrets Detection') == 'others'
+
+        add_scanner_type('secrets', 'Secrets Detection')
+        assert resolveScanTypeId('Secrets Detection') == 'others'
+
+        invalidateScanTypeCache()
+        assert resolveScanTypeId('Secrets Detection') == 'secrets'
+
+    def test_soft_deleted_types_are_ignored(self, mock_db):
+        add_scanner_type('secrets', 'Secrets Detection')
+        ScannerTypes.objects.get(scan_type_id='secrets').soft_delete()
+
+        assert resolveScanTypeId('Secrets Detection') == 'others'
@@ -0,0 +1,66 @@
+"""
+Unit tests for the per-scan CloudSploit config generation
+"""
+
+import os
+import json
+import stat
+from unittest.mock import patch
+
+from controllers.utility.cloudsploit.cloudsploit_config import write_scan_config
+from controllers.utility.cloudsploit.azure_cloud_scanner import run_azure_cloud_scan
+
+
+AZURE_CLOUD_DATA = [{
+    'application_id': 'app-id',
+    'client_secret_key': 'secret',
+    'directory_id': 'directory-id',
+    'subscription_id': 'subscription-id',
+}]
+
+
+class TestWriteScanConfig:
+
+    def test_writes_private_config_per_scan(self):
+        first_dir, first_config = write_scan_config('azure', {'KeyValue': 'first'})
+        second_dir, second_config = write_scan_config('azure', {'KeyValue': 'second'})
+        try:
+            assert first_dir != second_dir
+            credential_file = os.path.join(first_dir, 'credentials.json')
+            with open(first_config) as file:
+                config = file.read()
+            assert 'azure: {' in config
+            assert json.dumps(credential_file) in config
+            with open(credential_file) as file:
+                assert json.load(file) == {'KeyValue': 'first'}
+            assert stat.S_IMODE(os.stat(credential_file).st_mode) == 0o600
+        finally:
+            for scan_dir in (first_dir, second_dir):
+                os.remove(os.path.join(scan_dir, 'credentials.json'))
+                os.remove(os.path.join(scan_dir, 'config.js'))
+                os.rmdir(scan_dir)
+
+
+class TestRunAzureCloudScan:
+
+    def test_scans_with_generated_config_and_cleans_up(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('CLOUDSPLOIT_CLONE_PATH', str(tmp_path))
+        seen = {}
+
+        def fake_run(command, **kwargs):
+            config_path = command[command.index('--config') + 1]
+            seen['config_path'] = config_path
+            with open(config_path) as file:
+                seen['config'] = file.read()
+            with open(command[command.index('--json') + 1], 'w') as file:
+                json.dump([{'plugin': 'storageAccountsEncryption'}], file)
+            return type('Result', (), {'stdout': 'done', 'stderr': ''})()
+
+        with patch('controllers.utility.cloudsploit.azure_cloud_scanner.subprocess.run', side_effect=fake_run):
+            stdout, scan_output = run_azure_cloud_scan('project', 'scan', AZURE_CLOUD_DATA, 'scanner', 'user')
+
+        assert stdout == 'done'
+        assert scan_output == [{'plugin': 'storageAccountsEncryption'}]
+        assert not seen['config_path'].startswith(str(tmp_path))
+        assert 'credential_file' in seen['config']
+        assert not os.path.exists(os.path.dirname(seen['config_path']))
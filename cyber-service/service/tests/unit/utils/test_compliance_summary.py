@@ -0,0 +1,111 @@
+"""
+Unit tests for the materialized project compliance summary
+"""
+
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from entities.CyberServiceEntity import Compliance, ComplianceScannerMapping, ScannerTypes, FindingMaster, \
+    ManualComplianceEvaluation, ProjectComplianceSummary
+from controllers.utility.compliance.compliance_summary import compute_compliance_summary, refresh_compliance_summary, \
+    read_compliance_summary, invalidate_compliance_summaries
+from controllers.utility.findings.finding_stats import update_finding_stats
+
+
+def add_control(compliance_type, scanner_type_ids=None):
+    compliance_id = str(uuid.uuid4())
+    Compliance(
+        compliance_id=compliance_id,
+        compliance_type=compliance_type,
+        compliance_control_name=f'control-{compliance_id}',
+        compliance_group_name='group',
+        compliance_subset_name='subset',
+    ).save()
+    if scanner_type_ids is not None:
+        ComplianceScannerMapping(
+            compliance_scanner_mapping_id=str(uuid.uuid4()),
+            compliance_id=compliance_id,
+            scanner_type_id=scanner_type_ids,
+        ).save()
+    return compliance_id
+
+
+def evaluate(compliance_id, evaluation_status):
+    ManualComplianceEvaluation(
+        manual_compliance_evaluation_id=str(uuid.uuid4()),
+        project_id='project-1',
+        compliance_id=compliance_id,
+        evaluation_status=evaluation_status,
+    ).save()
+
+
+def seed():
+    for scan_type_id in ('secrets', 'dependencies'):
+        ScannerTypes(scan_type_id=scan_type_id, scanner_ids=['scanner-1'], scan_type=scan_type_id, description='desc').save()
+    FindingMaster(
+        finding_id=str(uuid.uuid4()),
+        project_id='project-1',
+        target_id='target-1',
+        scan_type_id='secrets',
+        finding_name='Leaked key',
+        finding_desc='desc',
+        raw_scan_output_id='raw-1',
+        created=datetime.now(timezone.utc),
+    ).save()
+
+    add_control('ISO 27001', ['secrets'])
+    add_control('ISO 27001', ['dependencies'])
+    evaluate(add_control('ISO 27001'), 'complying')
+    evaluate(add_control('SOC 2', ['dependencies']), 'not-complying')
+    add_control('SOC 2')
+
+
+class TestComplianceSummary:
+
+    def test_counts_controls_per_compliance_type(self, mock_db):
+        seed()
+
+        assert compute_compliance_summary('project-1') == [
+            {'compliance_type': 'ISO 27001', 'non_complying_count': 1, 'complying_count': 1, 'manual_evaluation_needed_count': 1},
+            {'compliance_type': 'SOC 2', 'non_complying_count': 1, 'complying_count': 0, 'manual_evaluation_needed_count': 1},
+        ]
+        # Findings of another project do not count
+        assert compute_compliance_summary('project-2')[0]['non_complying_count'] == 0
+
+    def test_snapshot_is_served_until_refreshed(self, mock_db):
+        seed()
+        summary = read_compliance_summary('project-1')
+        assert ProjectComplianceSummary.objects.get(project_id='project-1').summary == summary
+
+        # Read again without recomputing, a new evaluation only shows after the refresh
+        evaluate(add_control('SOC 2'), 'complying')
+        assert read_compliance_summary('project-1') == summary
+        refreshed = refresh_compliance_summary('project-1')
+        assert refreshed[1]['complying_count'] == 1
+        assert read_compliance_summary('project-1') == refreshed
+
+        invalidate_compliance_summaries()
+        assert ProjectComplianceSummary.objects.count() == 0
+        assert read_compliance_summary('project-1') == refreshed
+
+    def test_summary_invalidated_while_computing_is_not_stored(self, mock_db):
+        seed()
+
+        def invalidated_meanwhile(project_id):
+            summary = compute_compliance_summary(project_id)
+            invalidate_compliance_summaries()
+            return summary
+
+        with patch('controllers.utility.compliance.compliance_summary.compute_compliance_summary', side_effect=invalidated_meanwhile):
+            refresh_compliance_summary('project-1')
+        assert ProjectComplianceSummary.objects.count() == 0
+
+    def test_finding_change_drops_the_project_snapshot(self, mock_db):
+        seed()
+        refresh_compliance_summary('project-1')
+        refresh_compliance_summary('project-2')
+
+        # A deleted or re-triaged finding goes through the stats update
+        update_finding_stats(removed=[FindingMaster.objects.get(project_id='project-1')])
+        assert [snapshot.project_id for snapshot in ProjectComplianceSummary.objects] == ['project-2']
@@ -0,0 +1,81 @@
+"""
+Unit tests for the lockfile-keyed dependency cache used by Trivy scans
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+
+from controllers.utility.trivy import dependency_cache
+from controllers.utility.trivy.dependency_cache import prepare_dependencies
+
+
+def fake_install(command, cwd, env=None):
+    """Stands in for npm/pip/go: creates what the real command would install."""
+    if command[:2] == ["npm", "ci"]:
+        os.makedirs(os.path.join(cwd, 'node_modules', 'left-pad'))
+        with open(os.path.join(cwd, 'node_modules', 'left-pad', 'package.json'), 'w') as file:
+            file.write('{"license": "MIT"}')
+    elif command[1:3] == ["-m", "venv"]:
+        os.makedirs(os.path.join(command[3], 'bin'), exist_ok=True)
+    return True
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    cache_dir = str(tmp_path / 'dependency-cache')
+    with patch.object(dependency_cache, 'DEPENDENCY_CACHE_DIR', cache_dir), \
+            patch.object(dependency_cache, 'resolve_pip_versions', return_value=['flask==2.2.2']), \
+            patch.object(dependency_cache, 'run_install', side_effect=fake_install) as run_install:
+        yield run_install
+
+
+def make_repo(tmp_path, name, files):
+    repo = tmp_path / name
+    repo.mkdir()
+    for file_name, content in files.items():
+        (repo / file_name).write_text(content)
+    return str(repo)
+
+
+class TestDependencyCache:
+    """Test cases for cached, isolated dependency installs."""
+
+    def test_npm_install_reused_for_same_lockfile(self, tmp_path, cache_dir):
+        files = {'package.json': '{"name": "app"}', 'package-lock.json': '{"lockfileVersion": 3}'}
+        first_repo = make_repo(tmp_path, 'first', files)
+        second_repo = make_repo(tmp_path, 'second', files)
+
+        prepare_dependencies(first_repo, 'cache')
+        prepare_dependencies(second_repo, 'cache')
+
+        npm_installs = [call for call in cache_dir.call_args_list if call.args[0][:2] == ["npm", "ci"]]
+        assert len(npm_installs) == 1
+        assert os.path.exists(os.path.join(second_repo, 'node_modules', 'left-pad', 'package.json'))
+
+    def test_pip_uses_isolated_environment(self, tmp_path, cache_dir):
+        repo = make_repo(tmp_path, 'repo', {'requirements.txt': 'flask==2.2.2\n'})
+
+        env = prepare_dependencies(repo, 'cache')
+
+        assert env['VIRTUAL_ENV'].startswith(dependency_cache.DEPENDENCY_CACHE_DIR)
+        assert env['PATH'].startswith(os.path.join(env['VIRTUAL_ENV'], 'bin'))
+
+    def test_pip_environment_keyed_on_resolved_versions(self, tmp_path, cache_dir):
+        repo = make_repo(tmp_path, 'repo', {'requirements.txt': 'flask\n'})
+
+        first_env = prepare_dependencies(repo, 'cache')
+        assert prepare_dependencies(repo, 'cache') == first_env
+        with patch.object(dependency_cache, 'resolve_pip_versions', return_value=['flask==3.0.0']):
+            assert prepare_dependencies(repo, 'cache')['VIRTUAL_ENV'] != first_env['VIRTUAL_ENV']
+        with patch.object(dependency_cache, 'resolve_pip_versions', return_value=None):
+            assert prepare_dependencies(repo, 'cache') == {}
+
+    def test_lockfile_mode_skips_installation(self, tmp_path, cache_dir):
+        repo = make_repo(tmp_path, 'repo', {
+            'package.json': '{"name": "app"}', 'package-lock.json': '{"lockfileVersion": 3}',
+            'requirements.txt': 'flask==2.2.2\n'})
+
+        assert prepare_dependencies(repo, 'lockfile') == {}
+        cache_dir.assert_not_called()
+        assert not os.path.exists(os.path.join(repo, 'node_modules'))
@@ -0,0 +1,114 @@
+"""
+Unit tests for the bulk finding persistence batch
+"""
+
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from entities.CyberServiceEntity import FindingMaster, FindingScanLink, FixRecommendations, RepositoryTrivy1
+from controllers.utility.findings.finding_batch import FindingBatch
+
+
+def trivy_detail(finding_name):
+    return RepositoryTrivy1(
+        repository_trivy_1_id=str(uuid.uuid4()),
+        finding_id=finding_name,
+        alert=finding_name,
+        created=datetime.now(timezone.utc),
+        creator='test-user'
+    )
+
+
+def queue_fingerprinted_finding(make_finding, finding_batch, finding_name, fingerprint):
+    detail = trivy_detail(finding_name)
+    return finding_batch.add_finding(make_finding(
+        finding_name=finding_name, fingerprint=fingerprint,
+        extended_finding_details_name='RepositoryTrivy1', extended_finding_details_id=detail.repository_trivy_1_id), detail)
+
+
+def queue_finding(make_finding, finding_batch, finding_name):
+    detail_id = finding_batch.add(trivy_detail(finding_name))
+    fix_recommendation_id = finding_batch.add(finding_batch.fix_recommendation('1.2.3'))
+    return finding_batch.add(make_finding(
+        finding_name=finding_name,
+        extended_finding_details_name='RepositoryTrivy1',
+        extended_finding_details_id=detail_id,
+        fix_recommendation_id=fix_recommendation_id
+    ))
+
+
+class TestFindingBatch:
+
+    def test_writes_linked_documents_in_batches(self, mock_db, make_finding):
+        finding_batch = FindingBatch('test-user', batch_size=2)
+        finding_ids = [queue_finding(make_finding, finding_batch, f'CVE-2024-{index}') for index in range(5)]
+
+        assert len(finding_batch) == 15
+        assert FindingMaster.objects.count() == 0
+        assert finding_batch.write() == 15
+
+        assert FindingMaster.objects.count() == 5
+        finding = FindingMaster.objects.get(finding_id=finding_ids[0])
+        assert not finding.is_soft_deleted
+        assert RepositoryTrivy1.objects.get(repository_trivy_1_id=finding.extended_finding_details_id).alert == 'CVE-2024-0'
+        assert FixRecommendations.objects.get(fix_recommendation_id=finding.fix_recommendation_id).scanner_fix == '1.2.3'
+        assert len(finding_batch) == 0
+
+
+class TestFindingBatchFingerprints:
+
+    def test_known_fingerprints_are_linked_not_inserted(self, mock_db, make_finding):
+        finding_batch = FindingBatch('test-user', scan_id='scan-1')
+        assert queue_fingerprinted_finding(make_finding, finding_batch, 'CVE-2024-1', 'fp-1')
+        assert not queue_fingerprinted_finding(make_finding, finding_batch, 'CVE-2024-1', 'fp-1')
+        assert finding_batch.write() == 2
+
+        FindingMaster.objects(fingerprint='fp-1').update(set__status='closed')
+        finding_batch = FindingBatch('test-user', scan_id='scan-2')
+        queue_fingerprinted_finding(make_finding, finding_batch, 'CVE-2024-1 (reworded)', 'fp-1')
+        queue_fingerprinted_finding(make_finding, finding_batch, 'CVE-2024-2', 'fp-2')
+        assert finding_batch.write() == 2
+
+        assert FindingMaster.objects.count() == 2
+        assert RepositoryTrivy1.objects.count() == 2
+        finding = FindingMaster.objects.get(fingerprint='fp-1')
+        assert finding.finding_name == 'CVE-2024-1'
+        assert finding.status.value == 'open'
+        assert FindingScanLink.objects.get(finding_id=finding.finding_id).scan_id == 'scan-2'
+
+    def test_legacy_finding_is_adopted(self, mock_db, make_finding):
+        make_finding(finding_name='CVE-2024-1', extended_finding_details_name='RepositoryTrivy1').save()
+
+        finding_batch = FindingBatch('test-user', scan_id='scan-1')
+        queue_fingerprinted_finding(make_finding, finding_batch, 'CVE-2024-1', 'fp-1')
+        assert finding_batch.write() == 0
+
+        assert FindingMaster.objects.count() == 1
+        assert FindingMaster.objects.get().fingerprint == 'fp-1'
+        assert FindingScanLink.objects.count() == 1
+
+    def test_legacy_finding_is_not_given_a_fingerprint_already_stored(self, mock_db, make_finding):
+        make_finding(finding_name='CVE-2024-1').save()
+        make_finding(finding_name='CVE-2024-1 (reworded)', fingerprint='fp-1').save()
+
+        finding_batch = FindingBatch('test-user', scan_id='scan-1')
+        queue_fingerprinted_finding(make_finding, finding_batch, 'CVE-2024-1', 'fp-1')
+        assert finding_batch.write() == 0
+
+        assert FindingMaster.objects(fingerprint='fp-1').count() == 1
+        assert FindingMaster.objects(fingerprint=None).count() == 1
+        assert FindingScanLink.objects.count() == 1
+
+    def test_details_of_a_finding_inserted_meanwhile_are_removed(self, mock_db, make_finding):
+        make_finding(finding_name='CVE-2024-1', fingerprint='fp-1').save()
+
+        finding_batch = FindingBatch('test-user', scan_id='scan-1')
+        queue_fingerprinted_finding(make_finding, finding_batch, 'CVE-2024-1', 'fp-1')
+        # Another worker inserts the fingerprint between the lookup and the upsert
+        with patch.object(FindingBatch, 'stored_finding_keys', return_value=set()):
+            assert finding_batch.write() == 0
+
+        assert FindingMaster.objects.count() == 1
+        assert RepositoryTrivy1.objects.count() == 0
+        assert FindingScanLink.objects.count() == 1
@@ -0,0 +1,77 @@
+"""
+Unit tests for the incrementally maintained per project finding counters
+"""
+
+from entities.CyberServiceEntity import FindingMaster
+from controllers.utility.findings.finding_batch import FindingBatch
+from controllers.utility.findings.finding_stats import update_finding_stats, rebuild_finding_stats, read_finding_stats
+
+
+def live_counts(counts):
+    """Drops the values a counter went back to zero for, a rebuild does not write them."""
+    return {field: {value: count for value, count in value_counts.items() if count} if isinstance(value_counts, dict) else value_counts
+            for field, value_counts in counts.items()}
+
+
+class TestFindingStats:
+
+    def test_batch_writes_count_new_and_reopened_findings(self, mock_db, make_finding):
+        finding_batch = FindingBatch('test-user', 'scan-1')
+        finding_batch.add_finding(make_finding(finding_name='CVE-1', fingerprint='fp-1'))
+        finding_batch.add_finding(make_finding(finding_name='CVE-2', severity='low', fingerprint='fp-2'))
+        finding_batch.add(make_finding(finding_name='CVE-3', severity='low'))
+        finding_batch.write()
+
+        counts = read_finding_stats('project-1')
+        assert counts['total'] == 3
+        assert counts['severity'] == {'high': 1, 'low': 2}
+        assert counts['status'] == {'open': 3}
+        assert counts['target_type'] == {'repo': 3}
+        assert counts['scan_type'] == {'scan-type-1': 3}
+
+        FindingMaster.objects(fingerprint='fp-1').update(set__status='closed')
+        update_finding_stats(added=[{'project_id': 'project-1', 'scan_type_id': 'scan-type-1', 'creator': 'test-user',
+                                     'severity': 'high', 'status': 'closed', 'target_type': 'repo'}],
+                             removed=[{'project_id': 'project-1', 'scan_type_id': 'scan-type-1', 'creator': 'test-user',
+                                       'severity': 'high', 'status': 'open', 'target_type': 'repo'}])
+        assert read_finding_stats('project-1')['status'] == {'open': 2, 'closed': 1}
+
+        # Seeing the closed finding again reopens it and the known one is not counted twice
+        finding_batch.add_finding(make_finding(finding_name='CVE-1', fingerprint='fp-1'))
+        finding_batch.add_finding(make_finding(finding_name='CVE-2', severity='low', fingerprint='fp-2'))
+        finding_batch.write()
+
+        counts = read_finding_stats('project-1')
+        assert counts['total'] == 3
+        assert counts['status'] == {'open': 3, 'closed': 0}
+
+    def test_rebuild_matches_incremental_counters(self, mock_db, make_finding):
+        finding_batch = FindingBatch('test-user')
+        finding_batch.add(make_finding(finding_name='CVE-1'))
+        finding_batch.add(make_finding(finding_name='CVE-2', status='ignored'))
+        finding_batch.add(make_finding(finding_name='Manual-1', scan_type_id='manual-vapt', creator='tester'))
+        finding_batch.write()
+        deleted = make_finding(finding_name='CVE-4')
+        deleted.save()
+        update_finding_stats(added=[deleted])
+        deleted.soft_delete()
+        update_finding_stats(removed=[deleted])
+
+        incremental = live_counts(read_finding_stats('project-1'))
+
+        assert rebuild_finding_stats('project-1') == 2
+        assert live_counts(read_finding_stats('project-1')) == incremental
+        assert incremental['total'] == 3
+        assert incremental['status'] == {'open': 2, 'ignored': 1}
+
+    def test_manual_vapt_findings_of_other_users_are_not_counted(self, mock_db, make_finding):
+        update_finding_stats(added=[
+            make_finding(finding_name='CVE-1'),
+            make_finding(finding_name='Manual-1', scan_type_id='manual-vapt', creator='tester'),
+            make_finding(finding_name='Manual-2', scan_type_id='manual-vapt', creator='other-tester'),
+        ])
+
+        assert read_finding_stats('project-1')['total'] == 3
+        counts = read_finding_stats('project-1', 'manual-vapt', 'tester')
+        assert counts['total'] == 2
+        assert counts['scan_type'] == {'scan-type-1': 1, 'manual-vapt': 1}
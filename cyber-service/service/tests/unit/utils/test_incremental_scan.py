@@ -0,0 +1,131 @@
+"""
+Unit tests for incremental repository scanning based on the last scanned commit
+"""
+
+import subprocess
+import pytest
+from datetime import datetime, timezone
+
+from entities.CyberServiceEntity import FindingMaster, FindingScanLink, RepositoryScanCommit
+from controllers.utility.git.incremental_scan import (
+    head_commit,
+    last_scanned_commits,
+    plan_incremental_scan,
+    link_findings_forward,
+    record_scanned_commit,
+    SCAN_MODE_RANGE,
+    SCAN_MODE_SKIP,
+)
+
+
+def git(*args, cwd=None):
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / 'repo'
+    repo.mkdir()
+    git("init", "-q", "-b", "main", cwd=repo)
+    git("config", "user.email", "test@example.com", cwd=repo)
+    git("config", "user.name", "Test", cwd=repo)
+    (repo / 'app.py').write_text("print('v1')\n")
+    (repo / 'requirements.txt').write_text("flask==2.2.2\n")
+    git("add", ".", cwd=repo)
+    git("commit", "-q", "-m", "v1", cwd=repo)
+    return repo
+
+
+def commit(repo, file_name, content):
+    (repo / file_name).write_text(content)
+    git("add", ".", cwd=repo)
+    git("commit", "-q", "-m", f"update {file_name}", cwd=repo)
+    return head_commit(str(repo))
+
+
+@pytest.mark.usefixtures('mock_db')
+class TestIncrementalScan:
+    """Test cases for planning and recording incremental repository scans."""
+
+    def record(self, repo, scanner_names):
+        for scanner_name in scanner_names:
+            record_scanned_commit('project-1', 'target-1', scanner_name, head_commit(str(repo)), 'scan-1', 'test-user-id',
+                                  'db-1' if scanner_name == 'Trivy' else None)
+        return last_scanned_commits('target-1', scanner_names)
+
+    def test_first_scan_runs_everything(self, repo):
+        previous_commits = last_scanned_commits('target-1', ['Gitleaks', 'Trivy'])
+
+        assert previous_commits == {}
+        assert plan_incremental_scan(str(repo), head_commit(str(repo)), previous_commits) == {}
+
+    def test_unchanged_commit_skips_scanners(self, repo):
+        previous_commits = self.record(repo, ['Linguist', 'Gitleaks', 'Trivy'])
+
+        plan = plan_incremental_scan(str(repo), head_commit(str(repo)), previous_commits, 'db-1')
+
+        assert {name: mode for name, (mode, _) in plan.items()} == {
+            'Linguist': SCAN_MODE_SKIP, 'Gitleaks': SCAN_MODE_SKIP, 'Trivy': SCAN_MODE_SKIP}
+
+    def test_new_or_unknown_trivy_db_rescans_unchanged_repository(self, repo):
+        previous_commits = self.record(repo, ['Gitleaks', 'Trivy'])
+
+        for db_version in ('db-2', None):
+            plan = plan_incremental_scan(str(repo), head_commit(str(repo)), previous_commits, db_version)
+            assert {name: mode for name, (mode, _) in plan.items()} == {'Gitleaks': SCAN_MODE_SKIP}
+
+    def test_source_change_scans_commit_range(self, repo):
+        previous_sha = head_commit(str(repo))
+        previous_commits = self.record(repo, ['Linguist', 'Gitleaks', 'Trivy'])
+        new_sha = commit(repo, 'app.py', "print('v2')\n")
+
+        plan = plan_incremental_scan(str(repo), new_sha, previous_commits, 'db-1')
+
+        assert plan == {'Gitleaks': (SCAN_MODE_RANGE, previous_sha), 'Trivy': (SCAN_MODE_SKIP, previous_sha)}
+
+    def test_manifest_change_rescans_dependencies(self, repo):
+        previous_commits = self.record(repo, ['Trivy'])
+        new_sha = commit(repo, 'requirements.txt', "flask==2.3.0\n")
+
+        assert plan_incremental_scan(str(repo), new_sha, previous_commits, 'db-1') == {}
+
+    def test_iac_and_license_changes_rescan_with_trivy(self, repo):
+        previous_commits = self.record(repo, ['Trivy'])
+
+        assert plan_incremental_scan(str(repo), commit(repo, 'Dockerfile', "FROM python:3.11\n"), previous_commits, 'db-1') == {}
+        assert plan_incremental_scan(str(repo), commit(repo, 'LICENSE', "MIT\n"), previous_commits, 'db-1') == {}
+
+    def test_unknown_previous_commit_runs_full_scan(self, repo):
+        record_scanned_commit('project-1', 'target-1', 'Gitleaks', 'f' * 40, 'scan-1', 'test-user-id')
+
+        plan = plan_incremental_scan(str(repo), head_commit(str(repo)), last_scanned_commits('target-1', ['Gitleaks']))
+
+        assert plan == {}
+
+    def test_record_scanned_commit_updates_existing(self, repo):
+        record_scanned_commit('project-1', 'target-1', 'Gitleaks', 'a' * 40, 'scan-1', 'test-user-id')
+        record_scanned_commit('project-1', 'target-1', 'Gitleaks', 'b' * 40, 'scan-2', 'test-user-id')
+
+        records = RepositoryScanCommit.objects(target_id='target-1', scanner_name='Gitleaks')
+        assert records.count() == 1
+        assert records.first().commit_sha == 'b' * 40
+        assert records.first().scan_id == 'scan-2'
+        assert records.first().created is not None
+
+    def test_link_findings_forward(self):
+        for finding_id, status in [('open-finding', 'open'), ('closed-finding', 'closed')]:
+            FindingMaster(
+                finding_id=finding_id,
+                project_id='project-1',
+                target_id='target-1',
+                scan_type_id='others',
+                raw_scan_output_id='raw-1',
+                finding_name=finding_id,
+                finding_desc='desc',
+                status=status,
+                created=datetime.now(timezone.utc)
+            ).save()
+
+        assert link_findings_forward('project-1', 'target-1', 'Gitleaks', 'scan-2', 'test-user-id') == 1
+        assert link_findings_forward('project-1', 'target-1', 'Gitleaks', 'scan-2', 'test-user-id') == 0
+        assert [link.finding_id for link in FindingScanLink.objects(scan_id='scan-2')] == ['open-finding']
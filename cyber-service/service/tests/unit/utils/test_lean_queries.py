@@ -0,0 +1,49 @@
+"""
+Unit tests for the raw pymongo read helpers
+"""
+
+from datetime import datetime, timezone
+
+from entities.CyberServiceEntity import Domain
+from controllers.utility.db.lean_queries import find_documents, find_document, find_ids, live_filter
+
+
+def add_domain(target_domain_id, project_id, domain_url):
+    domain = Domain(
+        target_domain_id=target_domain_id,
+        project_id=project_id,
+        domain_url=domain_url,
+        created=datetime.now(timezone.utc),
+        creator='test-user'
+    )
+    domain.save()
+    return domain
+
+
+class TestLeanQueries:
+
+    def test_skips_soft_deleted_documents(self, mock_db):
+        add_domain('domain-1', 'project-1', 'https://a.example.com')
+        add_domain('domain-2', 'project-1', 'https://b.example.com').soft_delete()
+        add_domain('domain-3', 'project-2', 'https://c.example.com')
+
+        assert find_ids(Domain, {'project_id': 'project-1'}) == ['domain-1']
+        assert find_document(Domain, {'_id': 'domain-2'}) is None
+
+    def test_projects_fields(self, mock_db):
+        add_domain('domain-1', 'project-1', 'https://a.example.com')
+
+        assert find_documents(Domain, {'project_id': 'project-1'}, ['domain_url']) == [
+            {'_id': 'domain-1', 'domain_url': 'https://a.example.com'}]
+        assert isinstance(find_document(Domain, {'_id': 'domain-1'})['created'], datetime)
+
+    def test_sorts_and_limits(self, mock_db):
+        for index in range(3):
+            add_domain(f'domain-{index}', 'project-1', f'https://{index}.example.com')
+
+        documents = find_documents(Domain, {'project_id': 'project-1'}, ['_id'], sort=[('domain_url', -1)], limit=2)
+
+        assert [document['_id'] for document in documents] == ['domain-2', 'domain-1']
+
+    def test_filter_on_soft_delete_field_is_kept(self):
+        assert live_filter(Domain, {'isdeleted': False}) == {'$and': [{'isdeleted': False}, {'isdeleted': {'$ne': True}}]}
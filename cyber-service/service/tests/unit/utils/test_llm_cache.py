@@ -0,0 +1,63 @@
+"""
+Unit tests for the content-addressed LLM response cache
+"""
+
+import pytest
+from unittest.mock import Mock
+from datetime import datetime, timezone, timedelta
+
+from entities.CyberServiceEntity import LlmResponseCache
+from controllers.utility.llm.llm_cache import cached_chat_completion, cache_key, evict_llm_cache
+
+
+def make_client(content):
+    client = Mock()
+    client.chat.completions.create.return_value = Mock(choices=[Mock(message=Mock(content=content))])
+    return client
+
+
+@pytest.mark.usefixtures('mock_db')
+class TestLlmCache:
+    """Test cases for caching model responses by scanner output."""
+
+    def test_same_input_is_served_from_cache(self):
+        client = make_client('```json\n[{"finding_name": "Leak"}]\n```')
+
+        first = cached_chat_completion(client, 'prompt', 'gitleaks-findings:1', [{'File': 'a.py'}])
+        second = cached_chat_completion(client, 'prompt', 'gitleaks-findings:1', [{'File': 'a.py'}])
+
+        assert first == second
+        client.chat.completions.create.assert_called_once()
+        assert LlmResponseCache.objects.get().hits == 1
+
+    def test_key_ignores_volatile_fields_and_key_order(self):
+        key = cache_key('wapiti-findings:1', 'gpt-4o-mini', {'info': {'date': 'Mon'}, 'vulnerabilities': {'XSS': []}})
+
+        assert cache_key('wapiti-findings:1', 'gpt-4o-mini', {'vulnerabilities': {'XSS': []}, 'info': {'date': 'Tue'}}) == key
+        assert cache_key('wapiti-findings:2', 'gpt-4o-mini', {'vulnerabilities': {'XSS': []}}) != key
+        assert cache_key('wapiti-findings:1', 'gpt-4o', {'vulnerabilities': {'XSS': []}}) != key
+
+    def test_invalid_response_is_not_cached(self):
+        client = make_client('not json')
+
+        assert cached_chat_completion(client, 'prompt', 'slither-findings:1', {'results': {}}) == 'not json'
+        assert LlmResponseCache.objects.count() == 0
+
+    def test_expired_response_is_refreshed(self):
+        client = make_client('{"scan_type_id": "a"}')
+        cached_chat_completion(client, 'prompt', 'scan-type-mapping:1', ['finding'])
+        LlmResponseCache.objects.update(set__expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+
+        cached_chat_completion(client, 'prompt', 'scan-type-mapping:1', ['finding'])
+
+        assert client.chat.completions.create.call_count == 2
+
+    def test_evict_least_recently_used(self):
+        client = make_client('{"scan_type_id": "a"}')
+        for index in range(3):
+            cached_chat_completion(client, 'prompt', 'scan-type-mapping:1', [index])
+
+        evict_llm_cache(max_entries=1)
+
+        assert LlmResponseCache.objects.count() == 1
+        assert LlmResponseCache.objects.get().cache_key == cache_key('scan-type-mapping:1', 'gpt-4o-mini', [2])
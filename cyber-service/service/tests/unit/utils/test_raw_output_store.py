@@ -0,0 +1,49 @@
+"""
+Unit tests for the compressed raw scan output store
+"""
+
+import json
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from entities.CyberServiceEntity import RawScanOutput, RawScanOutputChunk
+from controllers.utility.storage import raw_output_store
+from controllers.utility.storage.raw_output_store import store_raw_scan_output, stream_raw_scan_output, read_raw_scan_output
+
+
+class TestRawOutputStore:
+
+    def test_round_trips_chunked_output(self, mock_db):
+        report = json.dumps({'Results': [{'Target': f'package-{index}.json', 'Vulnerabilities': []} for index in range(2000)]})
+
+        with patch.object(raw_output_store, 'RAW_OUTPUT_CHUNK_SIZE', 1024):
+            raw_scan_output = store_raw_scan_output('scan-1', 'scanner-1', report, 'test-user')
+
+        stored = RawScanOutput.objects.get(raw_scan_output_id=raw_scan_output.raw_scan_output_id)
+        assert stored.output is None
+        assert stored.size == len(report)
+        assert stored.stored_size < stored.size
+        assert stored.chunk_count > 1
+        assert RawScanOutputChunk.objects(raw_scan_output_id=stored.raw_scan_output_id).count() == stored.chunk_count
+        assert read_raw_scan_output(stored.raw_scan_output_id) == report
+
+    def test_streams_output_stored_inline(self, mock_db):
+        RawScanOutput(
+            raw_scan_output_id='legacy-1',
+            scan_id='scan-1',
+            scanner_id='scanner-1',
+            output='{"alerts": []}',
+            created=datetime.now(timezone.utc),
+            creator='test-user'
+        ).save()
+
+        assert b''.join(stream_raw_scan_output('legacy-1')) == b'{"alerts": []}'
+
+    def test_missing_output(self, mock_db):
+        assert stream_raw_scan_output('missing') is None
+        assert read_raw_scan_output('missing') is None
+
+    def test_empty_output(self, mock_db):
+        raw_scan_output = store_raw_scan_output('scan-1', 'scanner-1', None, 'test-user')
+
+        assert read_raw_scan_output(raw_scan_output.raw_scan_output_id) == ''
@@ -0,0 +1,69 @@
+"""
+Unit tests for the cached per project SAMM coverage
+"""
+
+import uuid
+from unittest.mock import patch
+
+from entities.CyberServiceEntity import Samm, FrameworkScannerMapping, ScannerTypes, ProjectSammCoverage
+from controllers.utility.compliance.samm_coverage import read_samm_coverage, invalidate_samm_coverage, compute_samm_coverage
+from controllers.utility.findings.finding_stats import update_finding_stats
+
+
+def add_practice(stream, scanner_type_ids=None):
+    samm_id = str(uuid.uuid4())
+    Samm(samm_id=samm_id, l1_business_function='Verification', l2_security_practice='Security Testing',
+         l3_stream=stream, l4_strategy_and_metrics='Automated testing').save()
+    if scanner_type_ids is not None:
+        FrameworkScannerMapping(framework_scanner_mapping_id=str(uuid.uuid4()), framework_id=samm_id,
+                                scanner_type_id=scanner_type_ids).save()
+    return samm_id
+
+
+class TestSammCoverage:
+
+    def test_practices_carry_finding_counts_instead_of_findings(self, mock_db, make_finding):
+        for scan_type_id in ('secrets', 'dependencies'):
+            ScannerTypes(scan_type_id=scan_type_id, scanner_ids=['scanner-1'], scan_type=scan_type_id, description='desc').save()
+        covered = add_practice('Scalable baseline', ['secrets', 'dependencies'])
+        uncovered = add_practice('Deep understanding')
+        update_finding_stats(added=[make_finding(scan_type_id='secrets', severity='high'), make_finding(scan_type_id='secrets', severity='low'), make_finding(scan_type_id='dependencies', severity='critical')])
+
+        rows = {row['_id']: row for row in read_samm_coverage('project-1')}
+
+        assert 'matched_findings' not in rows[covered]
+        assert rows[covered]['matched_finding_count'] == 3
+        assert rows[covered]['matched_severity_counts'] == {'high': 1, 'low': 1, 'critical': 1}
+        assert rows[covered]['matched_scan_types'] == [
+            {'scan_type_id': 'secrets', 'scan_type': 'secrets', 'finding_count': 2},
+            {'scan_type_id': 'dependencies', 'scan_type': 'dependencies', 'finding_count': 1},
+        ]
+        assert rows[uncovered]['scanner_types'] == []
+        assert rows[uncovered]['matched_finding_count'] == 0
+
+    def test_finding_changes_drop_the_cached_coverage(self, mock_db, make_finding):
+        ScannerTypes(scan_type_id='secrets', scanner_ids=['scanner-1'], scan_type='secrets', description='desc').save()
+        add_practice('Scalable baseline', ['secrets'])
+        assert read_samm_coverage('project-1')[0]['matched_finding_count'] == 0
+        assert ProjectSammCoverage.objects.count() == 1
+
+        update_finding_stats(added=[make_finding(scan_type_id='secrets', severity='medium')])
+        assert ProjectSammCoverage.objects.count() == 0
+        assert read_samm_coverage('project-1')[0]['matched_finding_count'] == 1
+
+        read_samm_coverage('project-2')
+        invalidate_samm_coverage(['project-2'])
+        assert [coverage.project_id for coverage in ProjectSammCoverage.objects] == ['project-1']
+
+    def test_coverage_invalidated_while_computing_is_not_cached(self, mock_db, make_finding):
+        ScannerTypes(scan_type_id='secrets', scanner_ids=['scanner-1'], scan_type='secrets', description='desc').save()
+        add_practice('Scalable baseline', ['secrets'])
+
+        def findings_added_meanwhile(project_id):
+            practices = compute_samm_coverage(project_id)
+            update_finding_stats(added=[make_finding(scan_type_id='secrets', severity='medium')])
+            return practices
+
+        with patch('controllers.utility.compliance.samm_coverage.compute_samm_coverage', side_effect=findings_added_meanwhile):
+            assert read_samm_coverage('project-1')[0]['matched_finding_count'] == 0
+        assert read_samm_coverage('project-1')[0]['matched_finding_count'] == 1
@@ -0,0 +1,55 @@
+"""
+Unit tests for the incremental SBOM and license reconcile
+"""
+
+from datetime import datetime, timezone
+
+from entities.CyberServiceEntity import FindingSBOMVulnerability, FindingLicense
+from controllers.utility.sbom.sbom_reconcile import reconcile_sbom
+
+
+def vulnerability(pkg_name, version, vulnerability_id, severity='HIGH'):
+    return {'pkg_name': pkg_name, 'installed_version': version, 'vulnerabilityid': vulnerability_id, 'severity': severity}
+
+
+def reconcile(scanned):
+    return reconcile_sbom(FindingSBOMVulnerability, 'project-1', 'target-1', 'sbom', 'test-user', scanned)
+
+
+def live_keys():
+    return sorted((document.pkg_name, document.installed_version, document.vulnerabilityid)
+                  for document in FindingSBOMVulnerability.objects(project_id='project-1'))
+
+
+class TestSbomReconcile:
+
+    def test_only_the_differences_are_written(self, mock_db):
+        assert reconcile([vulnerability('flask', '2.2.2', 'CVE-1'), vulnerability('jinja2', '3.0.0', 'CVE-2')]) == \
+            {'inserted': 2, 'updated': 0, 'removed': 0}
+        first_seen = FindingSBOMVulnerability.objects.get(pkg_name='flask').first_seen
+
+        # Same scan again, nothing to write
+        assert reconcile([vulnerability('flask', '2.2.2', 'CVE-1'), vulnerability('jinja2', '3.0.0', 'CVE-2')]) == \
+            {'inserted': 0, 'updated': 0, 'removed': 0}
+
+        # flask changes severity, jinja2 is upgraded
+        assert reconcile([vulnerability('flask', '2.2.2', 'CVE-1', 'CRITICAL'), vulnerability('jinja2', '3.1.0', 'CVE-2')]) == \
+            {'inserted': 1, 'updated': 1, 'removed': 1}
+        assert live_keys() == [('flask', '2.2.2', 'CVE-1'), ('jinja2', '3.1.0', 'CVE-2')]
+        flask = FindingSBOMVulnerability.objects.get(pkg_name='flask')
+        assert flask.severity == 'CRITICAL' and flask.first_seen == first_seen
+
+        # The removed version keeps the period it was present
+        removed = FindingSBOMVulnerability._get_collection().find_one({'installed_version': '3.0.0'})
+        assert removed['isdeleted'] is True and removed['removed_at'] is not None
+
+    def test_duplicates_of_earlier_scans_are_dropped(self, mock_db):
+        for index in range(3):
+            FindingLicense(license_id=f'license-{index}', project_id='project-1', target_id='target-1', pkg_name='flask',
+                           file_path='LICENSE', name='BSD-3-Clause', created=datetime.now(timezone.utc), creator='test-user').save()
+
+        counts = reconcile_sbom(FindingLicense, 'project-1', 'target-1', 'sbom', 'test-user',
+                                [{'pkg_name': 'flask', 'file_path': 'LICENSE', 'name': 'BSD-3-Clause'}])
+
+        assert counts == {'inserted': 0, 'updated': 0, 'removed': 0}
+        assert FindingLicense.objects(project_id='project-1').count() == 1
@@ -0,0 +1,138 @@
+"""
+Unit tests for the Mongo-backed scan job queue and worker pool
+"""
+
+import pytest
+from unittest.mock import Mock, patch
+from datetime import datetime, timezone, timedelta
+
+from entities.CyberServiceEntity import ScanJobs, ScanJobStatus, Scans, ScanStatus
+from controllers.utility.jobs import scan_job_queue
+from controllers.utility.jobs.scan_job_queue import (
+    enqueue_scan_job,
+    claim_next_scan_job,
+    renew_scan_job_lease,
+    complete_scan_job,
+    fail_scan_job,
+    fail_exhausted_scan_jobs,
+    SCAN_JOB_PRIORITY_INTERACTIVE,
+)
+from controllers.utility.jobs.scan_worker_pool import ScanWorkerPool
+
+
+@pytest.mark.usefixtures('mock_db')
+class TestScanJobQueue:
+    """Test cases for leasing, retrying and completing scan jobs."""
+
+    def test_enqueue_and_claim(self):
+        """A queued job is leased to the claiming worker."""
+        enqueue_scan_job('scan-1', 'project-1', {'scanner_type_ids_list': ['a']}, 'test-user-id')
+
+        scan_job = claim_next_scan_job('worker-1')
+
+        assert scan_job.scan_id == 'scan-1'
+        assert scan_job.status == ScanJobStatus.Leased
+        assert scan_job.lease_owner == 'worker-1'
+        assert scan_job.attempts == 1
+        assert scan_job.payload == {'scanner_type_ids_list': ['a']}
+        assert claim_next_scan_job('worker-2') is None
+
+    def test_claim_prefers_higher_priority(self):
+        """Interactive scans are claimed before scheduled ones."""
+        enqueue_scan_job('scheduled-scan', 'project-1', {}, 'scheduler')
+        enqueue_scan_job('interactive-scan', 'project-1', {}, 'test-user-id', SCAN_JOB_PRIORITY_INTERACTIVE)
+
+        assert claim_next_scan_job('worker-1').scan_id == 'interactive-scan'
+        assert claim_next_scan_job('worker-1').scan_id == 'scheduled-scan'
+
+    def test_expired_lease_is_reclaimed(self):
+        """A job held by a dead worker becomes claimable once its lease expires."""
+        enqueue_scan_job('scan-1', 'project-1', {}, 'test-user-id')
+        scan_job = claim_next_scan_job('worker-1')
+        ScanJobs.objects(scan_job_id=scan_job.scan_job_id).update(
+            set__lease_expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+
+        reclaimed = claim_next_scan_job('worker-2')
+
+        assert reclaimed.scan_job_id == scan_job.scan_job_id
+        assert reclaimed.lease_owner == 'worker-2'
+        assert reclaimed.attempts == 2
+        assert not renew_scan_job_lease(scan_job.scan_job_id, 'worker-1')
+        assert renew_scan_job_lease(scan_job.scan_job_id, 'worker-2')
+
+    def test_fail_requeues_until_max_attempts(self):
+        """A failing job is retried with a delay, then marked as failed."""
+        enqueue_scan_job('scan-1', 'project-1', {}, 'test-user-id')
+
+        with patch.object(scan_job_queue, 'SCAN_JOB_RETRY_DELAY_SECONDS', 0):
+            for attempt in range(1, scan_job_queue.SCAN_JOB_MAX_ATTEMPTS + 1):
+                scan_job = claim_next_scan_job('worker-1')
+                assert scan_job.attempts == attempt
+                status = fail_scan_job(scan_job.scan_job_id, 'worker-1', 'boom')
+
+        assert status == ScanJobStatus.Failed.value
+        assert claim_next_scan_job('worker-1') is None
+        assert ScanJobs.objects.get(scan_id='scan-1').last_error == 'boom'
+
+    def test_complete(self):
+        """Completed jobs are not claimed again."""
+        enqueue_scan_job('scan-1', 'project-1', {}, 'test-user-id')
+        scan_job = claim_next_scan_job('worker-1')
+
+        complete_scan_job(scan_job.scan_job_id, 'worker-1')
+
+        assert ScanJobs.objects.get(scan_id='scan-1').status == ScanJobStatus.Completed
+        assert claim_next_scan_job('worker-1') is None
+
+    def test_fail_exhausted_scan_jobs(self):
+        """Leases that expire after the last attempt mark the job as failed."""
+        enqueue_scan_job('scan-1', 'project-1', {}, 'test-user-id')
+        scan_job = claim_next_scan_job('worker-1')
+        ScanJobs.objects(scan_job_id=scan_job.scan_job_id).update(
+            set__attempts=scan_job_queue.SCAN_JOB_MAX_ATTEMPTS,
+            set__lease_expires_at=datetime.now(timezone.utc) - timedelta(seconds=1))
+
+        assert fail_exhausted_scan_jobs() == ['scan-1']
+        assert ScanJobs.objects.get(scan_id='scan-1').status == ScanJobStatus.Failed
+
+
+@pytest.mark.usefixtures('mock_db')
+class TestScanWorkerPool:
+    """Test cases for the worker pool job loop."""
+
+    def test_run_next_job_completes(self):
+        """The handler receives the leased job and the job is completed."""
+        handler = Mock(return_value=None)
+        pool = ScanWorkerPool(handler, concurrency=1)
+        enqueue_scan_job('scan-1', 'project-1', {}, 'test-user-id')
+
+        assert pool.run_next_job('worker-1') is True
+
+        handler.assert_called_once()
+        assert handler.call_args[0][0].scan_id == 'scan-1'
+        assert ScanJobs.objects.get(scan_id='scan-1').status == ScanJobStatus.Completed
+        assert pool.run_next_job('worker-1') is False
+
+    def test_run_next_job_requeues_on_exception(self):
+        """A handler exception releases the job for another attempt."""
+        pool = ScanWorkerPool(Mock(side_effect=RuntimeError('worker crashed')), concurrency=1)
+        enqueue_scan_job('scan-1', 'project-1', {}, 'test-user-id')
+
+        pool.run_next_job('worker-1')
+
+        scan_job = ScanJobs.objects.get(scan_id='scan-1')
+        assert scan_job.status == ScanJobStatus.Queued
+        assert scan_job.lease_owner is None
+        assert scan_job.last_error == 'worker crashed'
+
+    def test_exception_on_last_attempt_fails_the_scan(self):
+        """A handler exception on the final attempt marks the scan as errored."""
+        Scans(scan_id='scan-1', scheduler_id='scheduler-1', project_id='project-1', status='running', created=datetime.now(timezone.utc)).save()
+        pool = ScanWorkerPool(Mock(side_effect=RuntimeError('worker crashed')), concurrency=1)
+        enqueue_scan_job('scan-1', 'project-1', {}, 'test-user-id')
+        ScanJobs.objects(scan_id='scan-1').update(set__attempts=scan_job_queue.SCAN_JOB_MAX_ATTEMPTS - 1)
+
+        pool.run_next_job('worker-1')
+
+        assert ScanJobs.objects.get(scan_id='scan-1').status == ScanJobStatus.Failed
+        assert Scans.objects.get(scan_id='scan-1').status == ScanStatus.Error
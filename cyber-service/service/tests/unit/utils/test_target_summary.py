@@ -0,0 +1,67 @@
+"""
+Unit tests for the target summary embedded in each project
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+from entities.CyberServiceEntity import Project, Domain, Contract
+from controllers.utility.projects.target_summary import sync_target_summary, backfill_target_summaries, \
+    project_with_targets
+
+
+def add_project():
+    project_id = str(uuid.uuid4())
+    Project(project_id=project_id, organization='org', name='project', creator='test-user').save()
+    return project_id
+
+
+def add_domain(project_id, domain_url):
+    domain = Domain(target_domain_id=str(uuid.uuid4()), project_id=project_id, domain_url=domain_url,
+                    created=datetime.now(timezone.utc))
+    domain.save()
+    return domain
+
+
+def listed_project(project_id):
+    project = Project._get_collection().find_one({'_id': project_id})
+    backfill_target_summaries([project])
+    return project_with_targets(project)
+
+
+class TestTargetSummary:
+
+    def test_target_writes_keep_the_summary_in_sync(self, mock_db):
+        project_id = add_project()
+        first = add_domain(project_id, 'https://a.example.com')
+        sync_target_summary(first)
+        second = add_domain(project_id, 'https://b.example.com')
+        sync_target_summary(second)
+
+        project = listed_project(project_id)
+        assert [domain['domain_url'] for domain in project['domain_data']] == ['https://a.example.com', 'https://b.example.com']
+        assert project['repo_url_data'] == [] and project['google_cloud_data'] == []
+        assert 'target_summary' not in project and 'isdeleted' not in project
+
+        first.isdeleted = True
+        first.save()
+        sync_target_summary(first)
+        assert [domain['_id'] for domain in listed_project(project_id)['domain_data']] == [second.target_domain_id]
+
+    def test_projects_without_a_summary_are_backfilled(self, mock_db):
+        project_id = add_project()
+        add_domain(project_id, 'https://a.example.com')
+        # Stored as is, FileEntry keeps its files in GridFS
+        Contract._get_collection().insert_one({
+            '_id': str(uuid.uuid4()), 'project_id': project_id, 'contract_label': 'token', 'isdeleted': None,
+            'solidity_files': [{'file_name': 'Token.sol', 'file_content': 'contract Token {}'}]})
+
+        project = listed_project(project_id)
+        assert project['domain_data'][0]['domain_url'] == 'https://a.example.com'
+        # Only the file names of the solidity files are embedded
+        assert project['contract_data'][0]['solidity_files'] == [{'file_name': 'Token.sol'}]
+        assert 'contract_data' in Project._get_collection().find_one({'_id': project_id})['target_summary']
+
+    def test_other_documents_are_ignored(self, mock_db):
+        sync_target_summary(object())
+        assert Project._get_collection().count_documents({}) == 0
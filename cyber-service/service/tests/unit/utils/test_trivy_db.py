@@ -0,0 +1,57 @@
+"""
+Unit tests for the shared, pre-warmed Trivy vulnerability DB
+"""
+
+import os
+import pytest
+from unittest.mock import Mock, patch
+
+from controllers.utility.trivy import trivy_db
+from controllers.utility.trivy.trivy_db import trivy_cache_options, update_trivy_db, current_cache_dir
+
+
+def fake_trivy(command, **kwargs):
+    """Stands in for `trivy image --download-db-only`: writes a DB into the cache dir."""
+    cache_dir = command[command.index("--cache-dir") + 1]
+    os.makedirs(os.path.join(cache_dir, 'db'), exist_ok=True)
+    open(os.path.join(cache_dir, 'db', 'trivy.db'), 'w').close()
+    return Mock(returncode=0, stderr='')
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    cache_dir = str(tmp_path / 'trivy-cache')
+    with patch.object(trivy_db, 'TRIVY_CACHE_DIR', cache_dir), \
+            patch.object(trivy_db.subprocess, 'run', side_effect=fake_trivy) as run:
+        yield run
+
+
+class TestTrivyDb:
+    """Test cases for the DB updater and the scan options."""
+
+    def test_scan_downloads_db_when_cache_is_empty(self, cache_dir):
+        assert trivy_cache_options() == []
+
+    def test_update_switches_scans_to_shared_db(self, cache_dir):
+        assert update_trivy_db() is True
+
+        options = trivy_cache_options()
+        assert options[options.index("--cache-dir") + 1] == current_cache_dir()
+        assert "--skip-db-update" in options
+        assert os.path.exists(os.path.join(current_cache_dir(), 'db', 'trivy.db'))
+
+    def test_fresh_db_is_not_downloaded_again(self, cache_dir):
+        update_trivy_db()
+        cache_dir.reset_mock()
+
+        assert update_trivy_db() is False
+        cache_dir.assert_not_called()
+
+    def test_old_versions_are_removed(self, cache_dir):
+        with patch.object(trivy_db.time, 'time', side_effect=[100, 200, 300]):
+            for _ in range(3):
+                update_trivy_db(force=True)
+
+        versions = sorted(os.listdir(os.path.join(trivy_db.TRIVY_CACHE_DIR, 'versions')))
+        assert versions == ['200', '300']
+        assert current_cache_dir().endswith('300')
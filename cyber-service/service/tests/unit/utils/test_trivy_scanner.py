@@ -0,0 +1,29 @@
+"""
+Unit tests for the combined Trivy scan
+"""
+
+import os
+from unittest.mock import Mock, patch
+
+from controllers.utility.trivy import trivy_scanner
+
+
+def fake_trivy(command, **kwargs):
+    with open(command[command.index("-o") + 1], 'w') as output_file:
+        output_file.write('{"Results": []}')
+    return Mock(returncode=0, stderr='')
+
+
+class TestTrivyScanner:
+    """Test cases for the environment of the Trivy process."""
+
+    def test_github_token_is_passed_to_trivy_only(self, tmp_path):
+        with patch.object(trivy_scanner, 'prepare_dependencies', return_value={}), \
+                patch.object(trivy_scanner.subprocess, 'run', side_effect=fake_trivy) as run, \
+                patch.dict(os.environ, {'GITHUB_TOKEN': 'worker-token'}):
+            assert trivy_scanner.run_trivy_combined_scan(str(tmp_path), 'repo-token', True)[1] == {'Results': []}
+            assert run.call_args.kwargs['env']['GITHUB_TOKEN'] == 'repo-token'
+            assert os.environ['GITHUB_TOKEN'] == 'worker-token'
+
+            trivy_scanner.run_trivy_combined_scan(str(tmp_path), 'repo-token', False)
+            assert run.call_args.kwargs['env']['GITHUB_TOKEN'] == ''
@@ -0,0 +1,39 @@
+# worker.py
+#
+# Scan worker process: claims jobs from the ScanJobs collection and runs the
+# scanner pipeline outside of the Flask API process. Run one or more of these
+# per node next to the API:
+#
+#     python -m worker --concurrency 4
+
+import argparse
+import signal
+import threading
+from config_params import *
+from mongoengine import register_connection
+from controllers.ScansController import ScansController
+from controllers.utility.jobs.scan_worker_pool import SCAN_WORKER_CONCURRENCY
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the scan worker pool")
+    parser.add_argument("--concurrency", type=int, default=SCAN_WORKER_CONCURRENCY,
+                        help="Number of scans run at the same time by this process")
+    args = parser.parse_args()
+
+    register_connection(alias='default', name=DATABASE_NAME, host=DATABASE_CONNECTION_STRING)
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+    pool = ScansController().start_worker_pool(args.concurrency)
+    stop_event.wait()
+
+    # Let running scans finish; jobs of a killed worker are re-leased once their lease expires
+    print("Stopping scan worker pool...")
+    pool.stop(wait=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,11 +23,22 @@ import {
 } from "@ant-design/icons";
 
 function LicenceOverview({ project_id }) {
+  const [currentPage, setCurrentPage] = useState(1);
+  const [pageSize, setPageSize] = useState(10);
+  const [filters, setFilters] = useState({});
+  const [sorter, setSorter] = useState({ field: "name", order: "ascend" });
   const {
     data: licensesAndSbomData,
     error,
     isLoading,
-  } = useFetchLicensesAndSbomQuery(project_id);
+  } = useFetchLicensesAndSbomQuery({
+    projectId: project_id,
+    page: currentPage,
+    limit: pageSize,
+    filters,
+    sortBy: sorter.order ? sorter.field : undefined,
+    sortOrder: sorter.order === "ascend" ? "asc" : "desc",
+  });
 
   const [isModalVisible, setIsModalVisible] = useState(false);
   const [selectedRecord, setSelectedRecord] = useState(null);
@@ -57,40 +68,40 @@ function LicenceOverview({ project_id }) {
     }
   };
 
-  // Unique values for filtering options
-  const uniqueValues = (data, key) => {
-    return [...new Set(data.map((item) => item[key]))].map((value) => ({
+  // Filtering options from the statistics, which cover every license and not only the page
+  const statsValues = (stats) => {
+    return Object.keys(stats || {}).map((value) => ({
       text: value,
       value: value,
     }));
   };
 
-  // Columns for the Ant Design Table with filters
+  // Columns for the Ant Design Table, filtered and sorted on the server
   const columns = [
     {
       title: "Package Name",
       dataIndex: "pkg_name",
       key: "pkg_name",
-      filters: uniqueValues(licenses, "pkg_name"), // Add filters
-      onFilter: (value, record) => record.pkg_name.includes(value),
+      filters: statsValues(licensesAndSbomData?.data?.package_stats),
+      filteredValue: filters.pkg_name || null,
       render: (text) => (text ? text : "N/A"), // Handle empty package names
     },
     {
       title: "License Name",
       dataIndex: "name",
       key: "name",
-      filters: uniqueValues(licenses, "name"), // Add filters
-      onFilter: (value, record) => record.name.includes(value),
-      sorter: (a, b) => a.name.localeCompare(b.name), // Add sorter for alphabetical order
-      defaultSortOrder: "ascend",
+      filters: statsValues(licensesAndSbomData?.data?.license_stats),
+      filteredValue: filters.name || null,
+      sorter: true, // Alphabetical order over every page
+      sortOrder: sorter.field === "name" ? sorter.order : null,
       render: (text) => <Tag color="blue">{text}</Tag>, // Use Tag for better visualization
     },
     {
       title: "Severity",
       dataIndex: "severity",
       key: "severity",
-      filters: uniqueValues(licenses, "severity"), // Add filters
-      onFilter: (value, record) => record.severity === value,
+      filters: statsValues(licensesAndSbomData?.data?.severity_stats),
+      filteredValue: filters.severity || null,
       render: (severity) => {
         let color = "";
         switch (severity) {
@@ -316,7 +327,22 @@ function LicenceOverview({ project_id }) {
         rowKey={(record) => record._id} // Use unique _id as row key
         bordered
         // expandable={expandableRow} // Add expandable rows
-        pagination={{ pageSize: 10 }} // Add pagination
+        pagination={{
+          current: currentPage,
+          pageSize: pageSize,
+          total: licensesAndSbomData?.data?.pagination?.total || 0,
+          onChange: (page, size) => {
+            setCurrentPage(page);
+            setPageSize(size);
+          },
+        }} // Server side pagination
+        onChange={(pagination, tableFilters, tableSorter, extra) => {
+          if (extra.action === "paginate") return;
+          // A new filter or sort starts again from the first page
+          setFilters(tableFilters);
+          setSorter({ field: tableSorter.field, order: tableSorter.order });
+          setCurrentPage(1);
+        }}
       />
 
       {/* Modal for Viewing Details */}
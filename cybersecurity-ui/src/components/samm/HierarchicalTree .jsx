@@ -33,14 +33,15 @@ const { Title, Text } = Typography;
 
 const themeColor = "rgb(17, 48, 50)"; // Your theme color
 
-export const calculateScoreFromFindings = (findings) => {
-  const severityCounts = findings.reduce(
-    (acc, finding) => {
-      acc[finding.severity] = (acc[finding.severity] || 0) + 1;
-      return acc;
-    },
-    { critical: 0, high: 0, medium: 0, low: 0, info: 0 }
-  );
+export const calculateScoreFromSeverityCounts = (matchedSeverityCounts = {}) => {
+  const severityCounts = {
+    critical: 0,
+    high: 0,
+    medium: 0,
+    low: 0,
+    info: 0,
+    ...matchedSeverityCounts,
+  };
 
   if (severityCounts.critical > 0) {
     return 0.25;
@@ -109,10 +110,10 @@ const TabbedView = ({ onAverageScoreCalculated }) => {
   useEffect(() => {
     if (data?.data) {
       const updatedScores = data.data.reduce((acc, sammItem) => {
-        if (sammItem.matched_findings?.length > 0) {
+        if (sammItem.matched_finding_count > 0) {
           const key = `${sammItem.l1_business_function}-${sammItem.l2_security_practice}-${sammItem.l3_stream}-${sammItem.l4_strategy_and_metrics}`;
           acc[key] = Number(
-            calculateScoreFromFindings(sammItem.matched_findings).toFixed(1)
+            calculateScoreFromSeverityCounts(sammItem.matched_severity_counts).toFixed(1)
           );
         }
         return acc;
@@ -356,7 +357,7 @@ const TabbedView = ({ onAverageScoreCalculated }) => {
                         >
                           {groupedData[l1Key][l2Key][l3Key].map((item, idx) => {
                             const isAutomatedScore =
-                              item.matched_findings?.length > 0;
+                              item.matched_finding_count > 0;
                             const scoreKey = `${l1Key}-${l2Key}-${l3Key}-${item.l4_strategy_and_metrics}`;
                             const scoreValue =
                               selectedScores[scoreKey]?.toFixed(1) || 0;
@@ -371,9 +372,7 @@ const TabbedView = ({ onAverageScoreCalculated }) => {
                                         {isAutomatedScore ? (
                                           <Tag color="green">
                                             Automated Score:{" "}
-                                            {calculateScoreFromFindings(
-                                              item.matched_findings
-                                            )}{" "}
+                                            {calculateScoreFromSeverityCounts(item.matched_severity_counts)}{" "}
                                             /1.0
                                           </Tag>
                                         ) : selectedScores[scoreKey] ? (
@@ -415,9 +414,7 @@ const TabbedView = ({ onAverageScoreCalculated }) => {
                                     <div>
                                       <Text strong>Automated Score:</Text>{" "}
                                       {mapScoreToText(
-                                        calculateScoreFromFindings(
-                                          item.matched_findings
-                                        )
+                                        calculateScoreFromSeverityCounts(item.matched_severity_counts)
                                       )}
                                     </div>
                                   ) : (
@@ -7,10 +7,23 @@ export const repoScanResultsApi = createApi({
   tagTypes: ["RepoScanResults"], // Define the tag type for invalidation
   endpoints: (builder) => ({
     // Endpoint to fetch licenses and SBOM
+    // Statistics cover every license, the findings are paginated, filtered and sorted on the server
     fetchLicensesAndSbom: builder.query({
-      query: (project_id) => ({
-        url: `/crscan/repo_scan/licenses_and_sbom/${project_id}`,
-      }),
+      query: (args) => {
+        const { projectId, page = 1, limit = 10, filters = {}, sortBy, sortOrder } =
+          typeof args === "object" ? args : { projectId: args };
+        const queryParams = new URLSearchParams({ page, limit });
+        Object.entries(filters).forEach(([field, values]) => {
+          if (values?.length) queryParams.set(field, values.join(","));
+        });
+        if (sortBy && sortOrder) {
+          queryParams.set("sort_by", sortBy);
+          queryParams.set("sort_order", sortOrder);
+        }
+        return {
+          url: `/crscan/repo_scan/licenses_and_sbom/${projectId}?${queryParams.toString()}`,
+        };
+      },
       providesTags: ["RepoScanResults"], // Tags to invalidate if needed
     }),
     // Endpoint to fetch licenses by project ID
@@ -7,7 +7,7 @@ import { useSelector } from "react-redux";
 import { useFetchScoresQuery } from "../store/api/cyberService/sammScoreApi";
 import { useFetchSammQuery } from "../store/api/cyberService/sammApi";
 import { useEffect } from "react";
-import { calculateScoreFromFindings } from "../components/samm/HierarchicalTree ";
+import { calculateScoreFromSeverityCounts } from "../components/samm/HierarchicalTree ";
 
 const { Title, Text } = Typography;
 
@@ -65,10 +65,10 @@ function Frameworks() {
   useEffect(() => {
     if (data?.data) {
       const updatedScores = data.data.reduce((acc, sammItem) => {
-        if (sammItem.matched_findings?.length > 0) {
+        if (sammItem.matched_finding_count > 0) {
           const key = `${sammItem.l1_business_function}-${sammItem.l2_security_practice}-${sammItem.l3_stream}-${sammItem.l4_strategy_and_metrics}`;
           acc[key] = Number(
-            calculateScoreFromFindings(sammItem.matched_findings).toFixed(1)
+            calculateScoreFromSeverityCounts(sammItem.matched_severity_counts).toFixed(1)
           );
         }
         return acc;